@@ -0,0 +1,73 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import os
+from tempfile import TemporaryDirectory
+from typing import Dict, List, Optional
+
+from rasterio.enums import Resampling
+
+from vibe_core.data import AssetVibe, Raster, gen_guid
+from vibe_lib.band_math import BandMath, band_refs_from_rasters, write_band_math
+
+
+class CallbackBuilder:
+    def __init__(
+        self,
+        expressions: Optional[Dict[str, str]],
+        mask: Optional[str],
+        dtype: str,
+        nodata: Optional[float],
+        resampling: str,
+        num_workers: int,
+        block_size: int,
+    ):
+        self.tmp_dir = TemporaryDirectory()
+        if not expressions:
+            raise ValueError(
+                "Expressions must not be empty. "
+                "Did you forget to overwrite the value on the workflow definition?"
+            )
+        # Compile expressions early, so that invalid ones fail before any data is read
+        self.band_math = BandMath(expressions, mask)
+        self.dtype = dtype
+        self.nodata = nodata
+        self.resampling = Resampling[resampling]
+        self.num_workers = num_workers if num_workers > 0 else (os.cpu_count() or 1)
+        self.block_size = block_size
+
+    def __call__(self):
+        def callback(rasters: List[Raster]) -> Dict[str, Raster]:
+            if not rasters:
+                raise ValueError("At least one input raster is required")
+            band_refs = band_refs_from_rasters(
+                [r.raster_asset.url for r in rasters],
+                [r.bands for r in rasters],
+                self.band_math.variables,
+            )
+            asset_id = gen_guid()
+            out_path = os.path.join(self.tmp_dir.name, f"{asset_id}.tif")
+            write_band_math(
+                self.band_math,
+                band_refs,
+                rasters[0].raster_asset.url,
+                out_path,
+                dtype=self.dtype,
+                nodata=self.nodata,
+                resampling=self.resampling,
+                num_workers=self.num_workers,
+                block_size=self.block_size,
+            )
+            asset = AssetVibe(reference=out_path, type="image/tiff", id=asset_id)
+            raster = Raster.clone_from(
+                rasters[0],
+                id=gen_guid(),
+                assets=[asset],
+                bands={name: i for i, name in enumerate(self.band_math.expressions)},
+            )
+            return {"raster": raster}
+
+        return callback
+
+    def __del__(self):
+        self.tmp_dir.cleanup()
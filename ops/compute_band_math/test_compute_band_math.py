@@ -0,0 +1,94 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import os
+from datetime import datetime
+from tempfile import TemporaryDirectory
+from typing import Dict, List, cast
+
+import numpy as np
+import pytest
+import xarray as xr
+from shapely import geometry as shpg
+
+from vibe_core.data import Raster
+from vibe_dev.testing.op_tester import OpTester
+from vibe_lib.raster import load_raster, save_raster_to_asset
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), "compute_band_math.yaml")
+
+
+@pytest.fixture
+def tmp_dir():
+    _tmp_dir = TemporaryDirectory()
+    yield _tmp_dir.name
+    _tmp_dir.cleanup()
+
+
+def fake_raster(tmp_dir: str, data: np.ndarray, bands: List[str]) -> Raster:
+    y, x = data.shape[1:]
+    fake_da = xr.DataArray(
+        data,
+        coords={
+            "bands": np.arange(len(bands)),
+            "x": np.linspace(0, 1, x),
+            "y": np.linspace(0, 1, y),
+        },
+        dims=["bands", "y", "x"],
+    )
+    fake_da.rio.write_crs("epsg:4326", inplace=True)
+    asset = save_raster_to_asset(fake_da, tmp_dir)
+    return Raster(
+        id="fake_id",
+        time_range=(datetime(2023, 1, 1), datetime(2023, 1, 1)),
+        geometry=shpg.mapping(shpg.box(*fake_da.rio.bounds())),
+        assets=[asset],
+        bands={b: i for i, b in enumerate(bands)},
+    )
+
+
+@pytest.fixture
+def rasters(tmp_dir: str) -> List[Raster]:
+    rng = np.random.default_rng(0)
+    landsat = rng.uniform(0.1, 1, size=(3, 128, 128)).astype(np.float32)
+    mask = rng.integers(0, 2, size=(1, 128, 128)).astype(np.float32)
+    return [
+        fake_raster(tmp_dir, landsat, ["green", "red", "nir"]),
+        fake_raster(tmp_dir, mask, ["cloud_water_mask"]),
+    ]
+
+
+def test_compute_band_math(rasters: List[Raster]):
+    op = OpTester(CONFIG_PATH)
+    expressions: Dict[str, str] = {
+        "ndvi": "(nir - red) / (nir + red)",
+        "gi": "nir / green",
+        "water": "green > nir",
+    }
+    op.update_parameters(
+        {"expressions": expressions, "mask": "cloud_water_mask == 1", "block_size": 32}
+    )
+    output = op.run(rasters=rasters)  # type: ignore
+    raster = cast(Raster, output["raster"])
+    assert raster.bands == {"ndvi": 0, "gi": 1, "water": 2}
+
+    out = load_raster(raster)
+    green, red, nir = load_raster(rasters[0]).values
+    valid = load_raster(rasters[1]).values[0] == 1
+    expected = [(nir - red) / (nir + red), nir / green, green > nir]
+    for band, exp in zip(out.values, expected):
+        np.testing.assert_allclose(band[valid], exp[valid], rtol=1e-6)
+        assert np.isnan(band[~valid]).all()
+
+
+def test_compute_band_math_unknown_band(rasters: List[Raster]):
+    op = OpTester(CONFIG_PATH)
+    op.update_parameters({"expressions": {"ndwi": "(green - swir) / (green + swir)"}})
+    with pytest.raises(ValueError):
+        op.run(rasters=rasters)  # type: ignore
+
+
+def test_compute_band_math_requires_expressions(rasters: List[Raster]):
+    op = OpTester(CONFIG_PATH)
+    with pytest.raises(ValueError):
+        op.run(rasters=rasters)  # type: ignore
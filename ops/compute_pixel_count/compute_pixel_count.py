@@ -1,18 +1,19 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT License.
 
-import os
 from tempfile import TemporaryDirectory
 from typing import Any, Dict
 
 import numpy as np
+import pandas as pd
 import rasterio
 from numpy._typing import NDArray
 from rasterio.mask import mask
 from shapely import geometry as shpg
 
-from vibe_core.data import Raster, RasterPixelCount, gen_guid
-from vibe_core.data.core_types import AssetVibe, BaseGeometry
+from vibe_core.data import Raster, RasterPixelCount
+from vibe_core.data.core_types import BaseGeometry
+from vibe_core.data.tabular import write_table
 
 UNIQUE_VALUES_COLUMN = "unique_values"
 COUNTS_COLUMN = "counts"
@@ -32,9 +33,9 @@ def read_data(raster: Raster, geom: BaseGeometry) -> NDArray[Any]:
         return raw_data.compressed()  # type: ignore
 
 
-def calculate_unique_values(data: NDArray[Any]) -> NDArray[Any]:
+def calculate_unique_values(data: NDArray[Any]) -> pd.DataFrame:
     unique_values, counts = np.unique(data, return_counts=True)
-    return np.column_stack((unique_values, counts))
+    return pd.DataFrame({UNIQUE_VALUES_COLUMN: unique_values, COUNTS_COLUMN: counts})
 
 
 class CallbackBuilder:
@@ -44,24 +45,11 @@ class CallbackBuilder:
     def __call__(self):
         def callback(raster: Raster) -> Dict[str, RasterPixelCount]:
             data = read_data(raster, shpg.shape(raster.geometry))
-            stack_data = calculate_unique_values(data)
-            guid = gen_guid()
-            filepath = os.path.join(self.tmp_dir.name, f"{guid}.csv")
-
-            # Save the data to a CSV file
-            np.savetxt(
-                filepath,
-                stack_data,
-                delimiter=",",
-                fmt="%d",
-                header=f"{UNIQUE_VALUES_COLUMN},{COUNTS_COLUMN}",
-                comments="",
-            )
-
+            counts = calculate_unique_values(data)
             raster_pixel_count = RasterPixelCount.clone_from(
                 raster,
                 id="pixel_count_" + raster.id,
-                assets=[AssetVibe(reference=filepath, type="text/csv", id=guid)],
+                assets=[write_table(counts, self.tmp_dir.name)],
             )
 
             return {"pixel_count": raster_pixel_count}
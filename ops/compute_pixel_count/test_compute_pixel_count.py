@@ -6,13 +6,13 @@ from datetime import datetime
 from typing import cast
 
 import numpy as np
-import pandas as pd
 import pytest
 import shapely.geometry as shpg
 import xarray as xr
 from compute_pixel_count import COUNTS_COLUMN, UNIQUE_VALUES_COLUMN
 
 from vibe_core.data import Raster, RasterPixelCount
+from vibe_core.data.tabular import PARQUET_MIMETYPE, read_table
 from vibe_dev.testing.op_tester import OpTester
 from vibe_lib.raster import save_raster_to_asset
 
@@ -61,11 +61,11 @@ def test_compute_pixel_count(fake_raster: Raster):
     pixel_count = cast(RasterPixelCount, output["pixel_count"])
     assert len(pixel_count.assets) == 1
 
-    asset_path = pixel_count.assets[0].path_or_url
-    assert os.path.exists(asset_path)
+    asset = pixel_count.assets[0]
+    assert os.path.exists(asset.path_or_url)
+    assert asset.type == PARQUET_MIMETYPE
 
-    # Read the CSV file
-    df = pd.read_csv(asset_path)
+    df = read_table(asset)
 
     # Check the columns
     assert UNIQUE_VALUES_COLUMN in df.columns  # type: ignore
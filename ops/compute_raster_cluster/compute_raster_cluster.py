@@ -2,6 +2,7 @@
 # Licensed under the MIT License.
 
 import logging
+import os
 from tempfile import TemporaryDirectory
 from typing import Any, Dict
 
@@ -27,6 +28,8 @@ class CallbackBuilder:
         warmup_steps: int,
         warmup_half_side_length: int,
         window: int,
+        tolerance: float,
+        num_workers: int,
     ):
         self.tmp_dir = TemporaryDirectory()
         self.clustering_method = clustering_method
@@ -37,6 +40,8 @@ class CallbackBuilder:
         self.warmup_steps = warmup_steps
         self.warmup_half_side_length = warmup_half_side_length
         self.window = window
+        self.tolerance = tolerance
+        self.num_workers = num_workers if num_workers > 0 else (os.cpu_count() or 1)
 
     def __call__(self):
         def operator_callback(input_raster: Raster) -> Dict[str, Raster]:
@@ -55,6 +60,8 @@ class CallbackBuilder:
                 warmup_steps=self.warmup_steps,
                 warmup_half_side_length=self.warmup_half_side_length,
                 window=self.window,
+                tolerance=self.tolerance,
+                num_workers=self.num_workers,
             )
 
             vis_dict: Dict[str, Any] = {
@@ -4,11 +4,12 @@
 import mimetypes
 import os
 from tempfile import TemporaryDirectory
-from typing import Any, Dict, List, cast
+from typing import Any, Dict, List, Optional, cast
 
 import planetary_computer as pc
+from shapely import geometry as shpg
 
-from vibe_core.data import AssetVibe, DemProduct, DemRaster, gen_guid, gen_hash_id
+from vibe_core.data import AssetVibe, DataVibe, DemProduct, DemRaster, gen_guid, gen_hash_id
 from vibe_lib.planetary_computer import validate_dem_provider
 from vibe_lib.raster import RGBA, interpolated_cmap_from_colors, json_to_asset
 
@@ -26,14 +27,22 @@ class CallbackBuilder:
         self.api_key = api_key
 
     def __call__(self):
-        def op(input_product: DemProduct) -> Dict[str, DemRaster]:
+        def op(
+            input_product: DemProduct, input_geometry: Optional[DataVibe] = None
+        ) -> Dict[str, DemRaster]:
             pc.set_subscription_key(self.api_key)
             collection = validate_dem_provider(
                 input_product.provider.upper(), input_product.resolution
             )
             item = collection.query_by_id(input_product.tile_id)
+            geometry = input_product.geometry
+            window = None
+            if input_geometry is not None:
+                # Only read the part of the tile that covers the input geometry
+                window = shpg.shape(input_geometry.geometry).intersection(shpg.shape(geometry))
+                geometry = shpg.mapping(window)
             assets = collection.download_item(
-                item, os.path.join(self.tmp_dir.name, input_product.id)
+                item, os.path.join(self.tmp_dir.name, input_product.id), window
             )
             assets = [
                 AssetVibe(reference=a, type=cast(str, mimetypes.guess_type(a)[0]), id=gen_guid())
@@ -51,11 +60,11 @@ class CallbackBuilder:
             downloaded_product = DemRaster(
                 id=gen_hash_id(
                     f"{input_product.id}_download_dem_product",
-                    input_product.geometry,
+                    geometry,
                     input_product.time_range,
                 ),
                 time_range=input_product.time_range,
-                geometry=input_product.geometry,
+                geometry=geometry,
                 assets=assets,
                 bands={"elevation": 0},
                 tile_id=input_product.tile_id,
@@ -5,14 +5,17 @@ import os
 from datetime import datetime, timezone
 from unittest.mock import MagicMock, patch
 
-from shapely.geometry import Polygon, box, mapping
+from shapely.geometry import Polygon, box, mapping, shape
 
-from vibe_core.data import DemProduct
+from vibe_core.data import DataVibe, DemProduct
 from vibe_core.data.rasters import DemRaster
 from vibe_dev.testing.op_tester import OpTester
 from vibe_lib.planetary_computer import USGS3DEPCollection
 
 CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "download_dem.yaml")
+WINDOW_CONFIG_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "download_dem_window.yaml"
+)
 
 
 @patch(
@@ -52,3 +55,41 @@ def test_op(_: MagicMock, __: MagicMock, ___: MagicMock):
     assert output_name in output_data
     output_product = output_data[output_name]
     assert isinstance(output_product, DemRaster)
+
+
+@patch(
+    "vibe_lib.planetary_computer.get_available_collections",
+    return_value=[USGS3DEPCollection.collection],
+)
+@patch.object(USGS3DEPCollection, "query_by_id")
+@patch(
+    "vibe_lib.planetary_computer.USGS3DEPCollection.download_item", return_value=["/tmp/test.tif"]
+)
+def test_op_window(download_item: MagicMock, __: MagicMock, ___: MagicMock):
+    tile = box(-98.0, 43.0, -97.0, 44.0)
+    field = box(-97.51, 43.49, -97.49, 43.51)
+    time_range = (
+        datetime(2021, 2, 1, tzinfo=timezone.utc),
+        datetime(2021, 2, 11, tzinfo=timezone.utc),
+    )
+    product = DemProduct(
+        id="n44w098-13",
+        time_range=time_range,
+        geometry=mapping(tile),
+        assets=[],
+        tile_id="n44w098-13",
+        resolution=10,
+        provider="USGS3DEP",
+    )
+    input_geometry = DataVibe(id="field", time_range=time_range, geometry=mapping(field), assets=[])
+
+    output_data = OpTester(WINDOW_CONFIG_PATH).run(
+        input_product=product, input_geometry=input_geometry
+    )
+
+    output_product = output_data["downloaded_product"]
+    assert isinstance(output_product, DemRaster)
+    # Only the window covering the input geometry is requested
+    window = download_item.call_args[0][2]
+    assert window.equals(field)
+    assert shape(output_product.geometry).equals(field)
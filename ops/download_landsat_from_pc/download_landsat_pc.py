@@ -6,8 +6,9 @@ from tempfile import TemporaryDirectory
 from typing import Dict, Optional
 
 import planetary_computer as pc
+from shapely import geometry as shpg
 
-from vibe_core.data import LandsatProduct, gen_hash_id
+from vibe_core.data import DataVibe, LandsatProduct, gen_hash_id
 from vibe_lib.planetary_computer import LandsatCollection
 
 LOGGER = logging.getLogger(__name__)
@@ -21,24 +22,35 @@ class CallbackBuilder:
     def __call__(self):
         def download_product(
             landsat_product: LandsatProduct,
+            input_geometry: Optional[DataVibe] = None,
         ) -> Dict[str, Optional[LandsatProduct]]:
             pc.set_subscription_key(self.api_key)
             collection = LandsatCollection()
             item = collection.query_by_id(landsat_product.tile_id)
 
+            geometry = landsat_product.geometry
+            window = None
+            if input_geometry is not None:
+                # Only read the part of the tile that covers the input geometry
+                window = shpg.shape(input_geometry.geometry).intersection(shpg.shape(geometry))
+                geometry = shpg.mapping(window)
+
             downloaded_product = LandsatProduct.clone_from(
                 landsat_product,
                 id=gen_hash_id(
                     f"{landsat_product.id}_download_landsat_product",
-                    landsat_product.geometry,
+                    geometry,
                     landsat_product.time_range,
                 ),
+                geometry=geometry,
                 assets=[],
             )
 
             for k in collection.asset_keys:
                 try:
-                    asset_path = collection.download_asset(item.assets[k], self.tmp_dir.name)
+                    asset_path = collection.download_asset(
+                        item.assets[k], self.tmp_dir.name, window
+                    )
                     downloaded_product.add_downloaded_band(k, asset_path)
                 except KeyError as e:
                     LOGGER.warning(f"No band {k} found. Original exception {e}")
@@ -4,11 +4,12 @@
 import mimetypes
 import os
 from tempfile import TemporaryDirectory
-from typing import Dict, cast
+from typing import Dict, Optional, cast
 
 import planetary_computer as pc
+from shapely import geometry as shpg
 
-from vibe_core.data import AssetVibe, NaipProduct, NaipRaster, gen_guid, gen_hash_id
+from vibe_core.data import AssetVibe, DataVibe, NaipProduct, NaipRaster, gen_guid, gen_hash_id
 from vibe_lib.planetary_computer import NaipCollection
 from vibe_lib.raster import json_to_asset
 
@@ -19,12 +20,20 @@ class CallbackBuilder:
         self.api_key = api_key
 
     def __call__(self):
-        def op(input_product: NaipProduct) -> Dict[str, NaipRaster]:
+        def op(
+            input_product: NaipProduct, input_geometry: Optional[DataVibe] = None
+        ) -> Dict[str, NaipRaster]:
             pc.set_subscription_key(self.api_key)
             collection = NaipCollection()
             item = collection.query_by_id(input_product.tile_id)
+            geometry = input_product.geometry
+            window = None
+            if input_geometry is not None:
+                # Only read the part of the tile that covers the input geometry
+                window = shpg.shape(input_geometry.geometry).intersection(shpg.shape(geometry))
+                geometry = shpg.mapping(window)
             assets = collection.download_item(
-                item, os.path.join(self.tmp_dir.name, input_product.id)
+                item, os.path.join(self.tmp_dir.name, input_product.id), window
             )
             vibe_assets = [
                 AssetVibe(reference=a, type=cast(str, mimetypes.guess_type(a)[0]), id=gen_guid())
@@ -35,11 +44,11 @@ class CallbackBuilder:
             downloaded_product = NaipRaster(
                 id=gen_hash_id(
                     f"{input_product.id}_download_naip_product",
-                    input_product.geometry,
+                    geometry,
                     input_product.time_range,
                 ),
                 time_range=input_product.time_range,
-                geometry=input_product.geometry,
+                geometry=geometry,
                 assets=vibe_assets,
                 bands={k: v for v, k in enumerate(("red", "green", "blue", "nir"))},
                 tile_id=input_product.tile_id,
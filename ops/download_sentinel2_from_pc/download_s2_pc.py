@@ -9,8 +9,9 @@ from typing import Dict, Optional
 
 import planetary_computer as pc
 from azure.storage.blob import BlobClient
+from shapely import geometry as shpg
 
-from vibe_core.data import gen_guid
+from vibe_core.data import DataVibe, gen_guid, gen_hash_id
 from vibe_core.data.sentinel import DownloadedSentinel2Product, Sentinel2Product, discriminator_date
 from vibe_core.file_downloader import download_file
 from vibe_lib.planetary_computer import Sentinel2Collection
@@ -30,6 +31,7 @@ class CallbackBuilder:
     def __call__(self):
         def download_product(
             sentinel_product: Sentinel2Product,
+            input_geometry: Optional[DataVibe] = None,
         ) -> Dict[str, Optional[DownloadedSentinel2Product]]:
             pc.set_subscription_key(self.api_key)
             collection = Sentinel2Collection()
@@ -52,12 +54,28 @@ class CallbackBuilder:
                 )
 
             item = matches[0]
-            downloaded_product = DownloadedSentinel2Product.clone_from(
-                sentinel_product, sentinel_product.id, []
-            )
+            if input_geometry is None:
+                window = None
+                downloaded_product = DownloadedSentinel2Product.clone_from(
+                    sentinel_product, sentinel_product.id, []
+                )
+            else:
+                # Only read the part of the tile that covers the input geometry
+                window = shpg.shape(input_geometry.geometry).intersection(
+                    shpg.shape(sentinel_product.geometry)
+                )
+                geometry = shpg.mapping(window)
+                downloaded_product = DownloadedSentinel2Product.clone_from(
+                    sentinel_product,
+                    gen_hash_id(
+                        f"{sentinel_product.id}_window", geometry, sentinel_product.time_range
+                    ),
+                    [],
+                    geometry=geometry,
+                )
             # Adding bands
             for k in collection.asset_keys:  # where actual download happens
-                asset_path = collection.download_asset(item.assets[k], self.tmp_dir.name)
+                asset_path = collection.download_asset(item.assets[k], self.tmp_dir.name, window)
                 downloaded_product.add_downloaded_band(k, asset_path)
 
             # Adding cloud mask
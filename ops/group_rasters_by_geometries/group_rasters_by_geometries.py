@@ -5,10 +5,8 @@ import hashlib
 from functools import partial
 from typing import Dict, List
 
-from shapely import geometry as shpg
-
 from vibe_core.data import DataVibe, Raster, RasterSequence
-from vibe_lib.geometry import is_approx_equal
+from vibe_lib.spatial_join import approx_equal_pairs
 
 
 def callback(
@@ -18,13 +16,9 @@ def callback(
     if not all(r.bands == ref_bands for r in rasters):
         raise ValueError("Expected to group rasters with the same bands")
     sequences: List[RasterSequence] = []
-    for g in group_by:
-        matching_rasters: List[Raster] = []
-        geom_g = shpg.shape(g.geometry)
-        for r in rasters:
-            geom_r = shpg.shape(r.geometry)
-            if is_approx_equal(geom_r, geom_g, threshold=threshold):
-                matching_rasters.append(r)
+    group_idx, raster_idx = approx_equal_pairs(group_by, rasters, threshold=threshold)
+    for i, g in enumerate(group_by):
+        matching_rasters = [rasters[j] for j in raster_idx[group_idx == i]]
         matching_rasters = sorted(matching_rasters, key=lambda x: x.id)
         t = [r.time_range[0] for r in matching_rasters]
         seq = RasterSequence(
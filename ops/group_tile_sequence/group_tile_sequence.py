@@ -15,6 +15,7 @@ from shapely.geometry.base import BaseGeometry
 from vibe_core.data import BBox, DataVibe, TimeRange
 from vibe_core.data.sentinel import ListTileData, Tile2Sequence, TileData, TileSequenceData
 from vibe_lib.spaceeye.dataset import get_read_intervals, get_write_intervals
+from vibe_lib.spatial_join import SpatialIndex
 
 LOGGER = logging.getLogger(__name__)
 KML_DRIVER_NAMES = "kml KML libkml LIBKML".split()
@@ -47,28 +48,33 @@ def group_rasters(rasters: ListTileData, input_data: List[DataVibe], tile_dfs: g
     sequences_geom: Dict[Tuple[str, BBox], BaseGeometry] = defaultdict()
     sequences_time_range: Dict[Tuple[str, BBox], TimeRange] = defaultdict()
 
-    # Iterate over all rasters that cover the input geometries
-    for item in rasters:
-        tile_id = item.tile_id
-        tile_geom = tile_dfs.loc[tile_dfs["Name"] == tile_id]["geometry"].iloc[0]  # type: ignore
-        tile_start_date = item.time_range[0]
-
-        # For now, we only consider a single geometry within input_data. In the future,
-        # we might allow multiple geometries, so this already covers that.
-        for input_geom in input_data:
-            # We are interested in the intersection between tile geom and input geometry
-            # for all tiles captured within the time range of the input geometry
-            geom = shpg.shape(input_geom.geometry)
-            start_date, end_date = input_geom.time_range
-
-            if (start_date <= tile_start_date <= end_date) and geom.intersects(tile_geom):
-                intersected_geom = geom.intersection(tile_geom)
-
-                # Use tile id and bounding box of intersecting region as keys
-                sequence_key = (item.tile_id, tuple(intersected_geom.bounds))
-                sequences[sequence_key].append(item)
-                sequences_geom[sequence_key] = intersected_geom
-                sequences_time_range[sequence_key] = input_geom.time_range
+    tile_geoms: Dict[str, BaseGeometry] = {}
+    for name, tile_geom in zip(tile_dfs["Name"], tile_dfs["geometry"]):
+        tile_geoms.setdefault(name, tile_geom)
+    # For now, we only consider a single geometry within input_data. In the future,
+    # we might allow multiple geometries, so this already covers that.
+    input_index = SpatialIndex(input_data)
+    # Pairs of rasters and input geometries that intersect the raster tile
+    raster_idx, input_idx = input_index.intersects([tile_geoms[r.tile_id] for r in rasters])
+    # Rasters of the same tile share the intersection with each input geometry
+    intersections: Dict[Tuple[str, int], BaseGeometry] = {}
+    for i, j in zip(raster_idx, input_idx):
+        item, input_geom = rasters[i], input_data[j]
+        # We are interested in the intersection between tile geom and input geometry
+        # for all tiles captured within the time range of the input geometry
+        start_date, end_date = input_geom.time_range
+        if not start_date <= item.time_range[0] <= end_date:
+            continue
+        key = (item.tile_id, int(j))
+        if key not in intersections:
+            intersections[key] = input_index.geometries[j].intersection(tile_geoms[item.tile_id])
+        intersected_geom = intersections[key]
+
+        # Use tile id and bounding box of intersecting region as keys
+        sequence_key = (item.tile_id, tuple(intersected_geom.bounds))
+        sequences[sequence_key].append(item)
+        sequences_geom[sequence_key] = intersected_geom
+        sequences_time_range[sequence_key] = input_geom.time_range
 
     return sequences, sequences_geom, sequences_time_range
 
@@ -1,7 +1,6 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT License.
 
-import os
 from datetime import datetime as dt
 from tempfile import TemporaryDirectory
 from typing import Any, Dict, List, Tuple
@@ -11,10 +10,13 @@ import pandas as pd
 from numpy._typing import NDArray
 from scipy.stats import norm
 
-from vibe_core.data import AssetVibe, OrdinalTrendTest, RasterPixelCount, gen_guid
+from vibe_core.data import OrdinalTrendTest, RasterPixelCount, gen_guid
+from vibe_core.data.tabular import TableFormat, read_table, write_table
 
 NODATA = None
 DATE_FORMAT = "%Y/%m/%d"
+UNIQUE_VALUES_COLUMN = "unique_values"
+COUNTS_COLUMN = "counts"
 
 
 def cochran_armitage_trend_test(contingency_table: NDArray[Any]) -> Tuple[float, float]:
@@ -48,24 +50,34 @@ def cochran_armitage_trend_test(contingency_table: NDArray[Any]) -> Tuple[float,
     return float(p_value), float(z_score)
 
 
-def load_contingency_table(pixel_counts: List[RasterPixelCount]) -> pd.DataFrame:
-    columns = []
-    for pixel_count in pixel_counts:
-        columns.append(np.loadtxt(pixel_count.assets[0].path_or_url, delimiter=",", skiprows=1))
+def unique_names(names: List[str]) -> List[str]:
+    # Repeated names get a suffix, as they would when reading a CSV file with pandas
+    counts: Dict[str, int] = {}
+    unique = []
+    for name in names:
+        count = counts.get(name, 0)
+        counts[name] = count + 1
+        unique.append(f"{name}.{count}" if count else name)
+    return unique
 
-    # Return the unique values for the existing pixels
-    unique_values = np.unique(np.concatenate(columns, axis=0)[:, 0])
-    contingency_table = pd.DataFrame(index=unique_values)
 
-    for pixel_count, column in zip(pixel_counts, columns):
-        contingency_table[pixel_count.id] = pd.Series(column[:, 1], index=column[:, 0])
+def load_contingency_table(pixel_counts: List[RasterPixelCount]) -> pd.DataFrame:
+    columns = [
+        read_table(pixel_count.assets[0], index_col=UNIQUE_VALUES_COLUMN)[COUNTS_COLUMN].rename(
+            pixel_count.id
+        )
+        for pixel_count in pixel_counts
+    ]
 
-    return contingency_table.fillna(0)
+    # Align the counts on the unique values of the existing pixels
+    contingency_table = pd.concat(columns, axis=1).sort_index()
+    return contingency_table.fillna(0).astype(float)
 
 
 class CallbackBuilder:
-    def __init__(self):
+    def __init__(self, table_format: str):
         self.tmp_dir = TemporaryDirectory()
+        self.table_format = TableFormat(table_format)
 
     def __call__(self):
         def callback(pixel_count: List[RasterPixelCount]) -> Dict[str, OrdinalTrendTest]:
@@ -89,17 +101,15 @@ class CallbackBuilder:
             p_value, z_score = cochran_armitage_trend_test(contingency_table.values)
 
             contingency_table.index.name = "category"
-            contingency_table.columns = time_ranges  # type: ignore
+            contingency_table.columns = unique_names(time_ranges)  # type: ignore
 
-            guid = gen_guid()
-            filepath = os.path.join(self.tmp_dir.name, f"{guid}.csv")
-            contingency_table.to_csv(filepath)
+            asset = write_table(contingency_table, self.tmp_dir.name, format=self.table_format)
 
             ordinal_trend_result = OrdinalTrendTest(
                 gen_guid(),
                 time_range=(min_date, max_date),
                 geometry=pixel_count[0].geometry,
-                assets=[AssetVibe(reference=filepath, type="text/csv", id=guid)],
+                assets=[asset],
                 p_value=p_value,
                 z_score=z_score,
             )
@@ -3,23 +3,16 @@
 
 from typing import Dict, List, Union
 
-from shapely import geometry as shpg
-
 from vibe_core.data import Raster
+from vibe_lib.spatial_join import SpatialIndex
 
 
 def callback(
     rasters1: List[Raster], rasters2: List[Raster]
 ) -> Dict[str, Union[List[Raster], List[Raster]]]:
-    paired_rasters1 = []
-    paired_rasters2 = []
-    for r1 in rasters1:
-        geom_n = shpg.shape(r1.geometry)
-        for r2 in rasters2:
-            geom_d = shpg.shape(r2.geometry)
-            if geom_n.intersects(geom_d):
-                paired_rasters1.append(r1)
-                paired_rasters2.append(r2)
+    idx1, idx2 = SpatialIndex(rasters2).intersects(rasters1)
+    paired_rasters1 = [rasters1[i] for i in idx1]
+    paired_rasters2 = [rasters2[i] for i in idx2]
 
     if not paired_rasters1:
         raise ValueError("No intersecting rasters could be paired")
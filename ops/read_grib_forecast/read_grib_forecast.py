@@ -3,14 +3,80 @@
 
 import mimetypes
 import os
+from datetime import datetime
 from tempfile import TemporaryDirectory
-from typing import Dict, List
+from typing import Dict, List, Optional, Sequence, Union
 
+import numpy as np
+import pandas as pd
 import xarray as xr
 from shapely import geometry as shpg
+from shapely.ops import unary_union
 
 from vibe_core.data import AssetVibe, DataVibe, GfsForecast, gen_forecast_time_hash_id, gen_guid
 
+LOCATION_DIM = "location"
+LOCATION_ID_COLUMN = "location_id"
+PUBLISH_TIME_COLUMN = "publish_time"
+
+
+def to_gfs_longitude(lon: Union[float, Sequence[float]]) -> np.ndarray:
+    """Converts longitudes from a [-180, 180] scale to the 0-360 range used by GFS."""
+    return (np.asarray(lon) + 360) % 360
+
+
+def open_grib_file(grib_file: str, index_dir: Optional[str] = None) -> xr.Dataset:
+    """Lazily opens the surface variables of a global forecast.
+
+    Args:
+        grib_file: the path to the grib file for the given time of interest
+        index_dir: optional directory in which cfgrib stores the decoded index of the grib file.
+            Reusing the same directory across calls avoids re-scanning the whole file.
+
+    Returns:
+        Dataset backed by the grib file. Values are only decoded when accessed.
+    """
+    keys = {"typeOfLevel": "surface"}
+    if not grib_file.endswith("f000.grib"):
+        keys["stepType"] = "instant"
+
+    kwargs = {}
+    if index_dir is not None:
+        kwargs["indexpath"] = os.path.join(
+            index_dir, f"{os.path.basename(grib_file)}.{{short_hash}}.idx"
+        )
+
+    return xr.open_dataset(grib_file, engine="cfgrib", filter_by_keys=keys, **kwargs)
+
+
+def extract_points(
+    ds: xr.Dataset, location_ids: Sequence[str], lats: Sequence[float], lons: Sequence[float]
+) -> pd.DataFrame:
+    """Extracts the nearest grid point for every location in a single vectorized selection.
+
+    Args:
+        ds: global forecast dataset with `latitude` and `longitude` coordinates (GFS 0-360 range)
+        location_ids: identifiers used to key the rows of the output table
+        lats: the latitudes of the locations [-90, 90]
+        lons: the longitudes of the locations [-180, 180]
+
+    Returns:
+        DataFrame with one row per location, indexed by location id
+    """
+    if not (len(location_ids) == len(lats) == len(lons)):
+        raise ValueError(
+            f"Expected the same number of location ids ({len(location_ids)}), "
+            f"latitudes ({len(lats)}) and longitudes ({len(lons)})"
+        )
+    points = ds.sel(
+        latitude=xr.DataArray(np.asarray(lats), dims=LOCATION_DIM),
+        longitude=xr.DataArray(to_gfs_longitude(lons), dims=LOCATION_DIM),
+        method="nearest",
+    )
+    df = points.load().to_dataframe().reset_index(drop=True)
+    df.insert(0, LOCATION_ID_COLUMN, list(location_ids))
+    return df.set_index(LOCATION_ID_COLUMN)
+
 
 def parse_grib_file(grib_file: str, lat: float, lon: float, output_dir: str) -> AssetVibe:
     """Extracts the local data from a global forecast.
@@ -25,15 +91,10 @@ def parse_grib_file(grib_file: str, lat: float, lon: float, output_dir: str) ->
         VibeAsset containging the forecast for the time and location specified
     """
     # GFS stores longitude in a range from 0-360
-    # compute unsigned value from [-180,180] scale
-    gfs_lon = (lon + 360) % 360
+    gfs_lon = float(to_gfs_longitude(lon))
 
-    keys = {"typeOfLevel": "surface"}
-    if not grib_file.endswith("f000.grib"):
-        keys["stepType"] = "instant"
-
-    ds = xr.load_dataset(grib_file, engine="cfgrib", filter_by_keys=keys)
-    forecast = ds.sel(latitude=lat, longitude=gfs_lon, method="nearest")
+    with open_grib_file(grib_file) as ds:
+        forecast = ds.sel(latitude=lat, longitude=gfs_lon, method="nearest").load()
 
     data_file = "{file}_{lat}_{lon}.csv".format(file=grib_file[:-5], lat=lat, lon=lon)
 
@@ -45,6 +106,43 @@ def parse_grib_file(grib_file: str, lat: float, lon: float, output_dir: str) ->
     return AssetVibe(reference=file_path, type=mimetypes.types_map[".csv"], id=gen_guid())
 
 
+def parse_grib_files_batch(
+    global_forecast: List[GfsForecast],
+    location: List[DataVibe],
+    output_dir: str,
+    index_dir: Optional[str] = None,
+) -> AssetVibe:
+    """Extracts the local data of many locations from one or more global forecasts.
+
+    Each grib file is opened once and all locations are extracted with a single nearest-index
+    selection, so the cost of decoding the global forecast is shared by every location.
+
+    Args:
+        global_forecast: global forecasts to extract data from
+        location: locations of interest. The centroid of each geometry is used.
+        output_dir: directory in which to save the csv table
+        index_dir: optional directory in which the decoded grib indices are cached
+
+    Returns:
+        VibeAsset containing a single table keyed by location id and publish time
+    """
+    # wkt format is (lon, lat)
+    lons, lats = zip(*[shpg.shape(loc.geometry).centroid.coords[0] for loc in location])
+    location_ids = [loc.id for loc in location]
+
+    tables = []
+    for forecast_data in global_forecast:
+        with open_grib_file(forecast_data.assets[0].local_path, index_dir) as ds:
+            df = extract_points(ds, location_ids, lats, lons)
+        df.insert(0, PUBLISH_TIME_COLUMN, forecast_data.publish_time)
+        tables.append(df.set_index(PUBLISH_TIME_COLUMN, append=True))
+
+    file_path = os.path.join(output_dir, f"{gen_guid()}.csv")
+    pd.concat(tables).to_csv(file_path)
+
+    return AssetVibe(reference=file_path, type=mimetypes.types_map[".csv"], id=gen_guid())
+
+
 class CallbackBuilder:
     def __init__(self):
         self.temp_dir = TemporaryDirectory()
@@ -79,3 +177,51 @@ class CallbackBuilder:
 
     def __del__(self):
         self.temp_dir.cleanup()
+
+
+class BatchCallbackBuilder:
+    def __init__(self):
+        self.temp_dir = TemporaryDirectory()
+        # Decoded grib indices are kept for the lifetime of the builder, so the same global
+        # forecast is only scanned once even if it is read by several op calls
+        self.index_dir = os.path.join(self.temp_dir.name, "index")
+        os.makedirs(self.index_dir)
+
+    def __call__(self):
+        def read_forecast_batch(
+            location: List[DataVibe], global_forecast: List[GfsForecast]
+        ) -> Dict[str, GfsForecast]:
+            if not location:
+                raise ValueError("At least one location is required to read the forecast")
+            if not global_forecast:
+                raise ValueError("At least one global forecast is required")
+
+            forecast_asset = parse_grib_files_batch(
+                global_forecast, location, self.temp_dir.name, self.index_dir
+            )
+
+            geometry = shpg.mapping(unary_union([shpg.shape(loc.geometry) for loc in location]))
+            time_range = (
+                min(loc.time_range[0] for loc in location),
+                max(loc.time_range[1] for loc in location),
+            )
+            publish_time = min(
+                global_forecast, key=lambda f: datetime.fromisoformat(f.publish_time)
+            ).publish_time
+
+            local_forecast = GfsForecast(
+                id=gen_forecast_time_hash_id(
+                    "local_forecast_batch", geometry, publish_time, time_range
+                ),
+                geometry=geometry,
+                time_range=time_range,
+                assets=[forecast_asset],
+                publish_time=publish_time,
+            )
+
+            return {"local_forecast": local_forecast}
+
+        return read_forecast_batch
+
+    def __del__(self):
+        self.temp_dir.cleanup()
@@ -0,0 +1,96 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+from datetime import datetime
+from tempfile import TemporaryDirectory
+from typing import Optional
+from unittest.mock import MagicMock
+
+import numpy as np
+import pandas as pd
+import pytest
+import read_grib_forecast
+import xarray as xr
+from read_grib_forecast import (
+    LOCATION_ID_COLUMN,
+    PUBLISH_TIME_COLUMN,
+    extract_points,
+    parse_grib_files_batch,
+)
+from shapely import geometry as shpg
+
+from vibe_core.data import AssetVibe, DataVibe, GfsForecast
+
+
+@pytest.fixture
+def tmp_dir():
+    _tmp_dir = TemporaryDirectory()
+    yield _tmp_dir.name
+    _tmp_dir.cleanup()
+
+
+@pytest.fixture
+def global_ds() -> xr.Dataset:
+    lat = np.arange(90, -90.25, -0.25)
+    lon = np.arange(0, 360, 0.25)
+    # Encode the position in the values so we can check which grid point was selected
+    t = lat[:, None] * 1000 + lon[None, :]
+    return xr.Dataset(
+        {"t": (("latitude", "longitude"), t)},
+        coords={"latitude": lat, "longitude": lon, "time": np.datetime64("2023-01-01T00")},
+    )
+
+
+def test_extract_points_nearest(global_ds: xr.Dataset):
+    lats = [47.61, -33.9, 0.1]
+    lons = [-122.33, 18.42, 179.9]
+    df = extract_points(global_ds, ["a", "b", "c"], lats, lons)
+
+    assert list(df.index) == ["a", "b", "c"]
+    for loc_id, lat, lon in zip(df.index, lats, lons):
+        expected = global_ds.sel(latitude=lat, longitude=(lon + 360) % 360, method="nearest")
+        assert df.loc[loc_id, "t"] == expected["t"].item()
+
+
+def test_extract_points_mismatched_lengths(global_ds: xr.Dataset):
+    with pytest.raises(ValueError):
+        extract_points(global_ds, ["a"], [0.0, 1.0], [0.0, 1.0])
+
+
+def test_parse_grib_files_batch(
+    global_ds: xr.Dataset, tmp_dir: str, monkeypatch: pytest.MonkeyPatch
+):
+    opened = MagicMock()
+
+    def fake_open(grib_file: str, index_dir: Optional[str] = None):
+        opened(grib_file, index_dir)
+        return global_ds
+
+    monkeypatch.setattr(read_grib_forecast, "open_grib_file", fake_open)
+
+    time_range = (datetime(2023, 1, 1), datetime(2023, 1, 1))
+    locations = [
+        DataVibe(f"loc{i}", time_range, shpg.mapping(shpg.Point(lon, lat)), [])
+        for i, (lon, lat) in enumerate([(-122.3, 47.6), (18.4, -33.9)])
+    ]
+    forecasts = [
+        GfsForecast(
+            f"gfs{i}",
+            time_range,
+            shpg.mapping(shpg.Point(0, 0)),
+            [AssetVibe(reference=f"/fake/{i}.grib", type=None, id=f"asset{i}")],
+            publish_time=publish_time,
+        )
+        for i, publish_time in enumerate(["2023-01-01T00:00:00+00:00", "2023-01-01T06:00:00+00:00"])
+    ]
+
+    asset = parse_grib_files_batch(forecasts, locations, tmp_dir, "index")
+
+    # Every grib file is opened exactly once, regardless of the number of locations
+    assert opened.call_count == len(forecasts)
+    df = pd.read_csv(asset.local_path, index_col=[LOCATION_ID_COLUMN, PUBLISH_TIME_COLUMN])
+    assert len(df) == len(locations) * len(forecasts)
+    assert set(df.index.get_level_values(LOCATION_ID_COLUMN)) == {"loc0", "loc1"}
+    assert set(df.index.get_level_values(PUBLISH_TIME_COLUMN)) == {
+        f.publish_time for f in forecasts
+    }
@@ -4,9 +4,8 @@
 from tempfile import TemporaryDirectory
 from typing import Dict, List
 
-import numpy as np
-
 from vibe_core.data import Raster
+from vibe_lib.band_math import recode
 from vibe_lib.raster import load_raster, save_raster_from_ref
 
 
@@ -20,7 +19,8 @@ class CallbackBuilder:
                 f"Got {len(from_values)} and {len(to_values)}, respectively."
             )
 
-        self.recode_map = dict(zip(from_values, to_values))
+        self.from_values = from_values
+        self.to_values = to_values
 
     def __call__(self):
         def callback(raster: Raster) -> Dict[str, Raster]:
@@ -28,7 +28,7 @@ class CallbackBuilder:
 
             # Return the same pixel value if it is not in the recode map
             transformed_ar = data_ar.copy(
-                data=np.vectorize(lambda x: self.recode_map.get(x, x))(data_ar)
+                data=recode(data_ar.values, self.from_values, self.to_values)
             )
             transformed_raster = save_raster_from_ref(transformed_ar, self.tmp_dir.name, raster)
 
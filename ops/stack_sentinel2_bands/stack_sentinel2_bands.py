@@ -5,13 +5,21 @@ import logging
 import mimetypes
 import os
 from tempfile import TemporaryDirectory
-from typing import Dict, List, Sequence, Tuple, Union
+from typing import Any, Dict, List, Sequence, Tuple, Union
 
 import geopandas as gpd
 import numpy as np
+from numpy.typing import NDArray
+from rasterio import Affine
 from rasterio.features import rasterize
 from rasterio.vrt import WarpedVRT
 from rasterio.warp import Resampling
+from rasterio.windows import Window
+from rasterio.windows import bounds as window_bounds
+from rasterio.windows import transform as window_transform
+from shapely import geometry as shpg
+from shapely.geometry.base import BaseGeometry
+from shapely.strtree import STRtree
 
 from vibe_core.data import (
     AssetVibe,
@@ -20,7 +28,12 @@ from vibe_core.data import (
     Sentinel2Raster,
     gen_guid,
 )
-from vibe_lib.raster import INT_COMPRESSION_KWARGS, open_raster_from_ref
+from vibe_lib.raster import (
+    INT_COMPRESSION_KWARGS,
+    get_windows,
+    imap_windows,
+    open_raster_from_ref,
+)
 
 BAND_ORDER: List[str] = [
     "B01",
@@ -39,50 +52,52 @@ BAND_ORDER: List[str] = [
 ]
 
 CLOUD_CATEGORIES = ["NO-CLOUD", "OPAQUE", "CIRRUS", "OTHER"]
+CLOUD_NODATA = 100
 LOGGER = logging.getLogger(__name__)
 
 
-def save_stacked_raster(band_filepaths: Sequence[str], ref_filepath: str, out_path: str) -> None:
+def read_warped_block(
+    band_filepaths: Sequence[str], win: Window, dtype: str, **vrt_options: Any
+) -> NDArray[Any]:
     """
-    Save raster by stacking all bands.
-    Reprojects all bands to match the reference band file provided
+    Read a window of several band files, resampled to a reference grid.
     """
-    with open_raster_from_ref(ref_filepath) as src:
-        meta = src.meta
-    out_meta = meta.copy()
-    out_meta.update(
-        {
-            "count": len(band_filepaths),
-            "driver": "GTiff",
-            "nodata": 0,
-            **INT_COMPRESSION_KWARGS,
-        }
-    )
+    out = np.empty((len(band_filepaths), win.height, win.width), dtype=dtype)
+    for i, path in enumerate(band_filepaths):
+        with open_raster_from_ref(path) as src:
+            with WarpedVRT(src, **vrt_options) as vrt:
+                vrt.read(1, window=win, out=out[i])
+    return out
 
-    vrt_options = {
-        "resampling": Resampling.bilinear,
-        "crs": meta["crs"],
-        "transform": meta["transform"],
-        "height": meta["height"],
-        "width": meta["width"],
-    }
 
-    with open_raster_from_ref(out_path, "w", **out_meta) as dst:
-        for i, path in enumerate(band_filepaths):
-            with open_raster_from_ref(path) as src:
-                with WarpedVRT(src, **vrt_options) as vrt:
-                    data = vrt.read(1)
-            dst.write(data, i + 1)
+class CloudRasterizer:
+    """
+    Rasterizes cloud shapes one window at a time into a uint8 buffer.
+    Only the shapes that intersect the window are burned, using a spatial index.
+    """
+
+    def __init__(self, geometries: Sequence[BaseGeometry], values: Sequence[int]):
+        self.geometries = np.asarray(geometries, dtype=object)
+        self.values = np.asarray(values, dtype=np.uint8)
+        self.tree = STRtree(self.geometries)
+
+    def rasterize(self, win: Window, transform: Affine) -> NDArray[np.uint8]:
+        out = np.full((win.height, win.width), CLOUD_CATEGORIES.index("NO-CLOUD"), dtype=np.uint8)
+        win_transform = window_transform(win, transform)
+        idx = self.tree.query(shpg.box(*window_bounds(win, transform)))
+        if len(idx):
+            rasterize(
+                zip(self.geometries[idx], self.values[idx]),
+                out=out,
+                transform=win_transform,
+            )
+        return out
 
 
-def rasterize_clouds(item: DownloadedSentinel2Product, ref_file: str, out_path: str) -> None:
+def read_cloud_shapes(item: DownloadedSentinel2Product) -> CloudRasterizer:
     """
-    Rasterize cloud shapes and save compressed tiff file.
+    Read cloud shapes from the product GML file and map them to cloud categories.
     """
-    with open_raster_from_ref(ref_file) as src:
-        meta = src.meta
-    meta.update({"nodata": 100, "driver": "GTiff", "dtype": "uint8", **INT_COMPRESSION_KWARGS})
-    out = np.zeros((meta["height"], meta["width"]))
     try:
         gml_path = item.get_downloaded_cloudmask().path_or_url
         df = gpd.read_file(gml_path, WRITE_GFS="NO")
@@ -93,26 +108,80 @@ def rasterize_clouds(item: DownloadedSentinel2Product, ref_file: str, out_path:
         values = (
             df["maskType"].map(cloud_map).fillna(CLOUD_CATEGORIES.index("OTHER"))  # type: ignore
         )
-        rasterize(
-            ((g, v) for g, v in zip(df["geometry"], values)),  # type: ignore
-            out=out,
-            transform=meta["transform"],
-        )
+        return CloudRasterizer(list(df["geometry"]), values.astype(int).tolist())  # type: ignore
     except ValueError:
         # Empty file means no clouds
         LOGGER.debug(
             "ValueError when opening cloud GML file. Assuming there are no clouds and ignoring.",
             exc_info=True,
         )
-        pass
     except KeyError:
         LOGGER.warning(f"No cloudmask available on downloaded product {item.product_name}")
-    with open_raster_from_ref(out_path, "w", **meta) as dst:
-        dst.write(out, 1)
+    return CloudRasterizer([], [])
+
+
+def save_stacked_raster(
+    band_filepaths: Sequence[str],
+    ref_filepath: str,
+    out_path: str,
+    clouds: CloudRasterizer,
+    cloud_path: str,
+    num_workers: int,
+    block_size: int,
+) -> None:
+    """
+    Save raster by stacking all bands and the rasterized cloud mask in a single pass.
+    Reprojects all bands to match the reference band file provided. The raster is processed in
+    blocks by a pool of threads, so only a few blocks are held in memory at any time.
+    """
+    with open_raster_from_ref(ref_filepath) as src:
+        meta = src.meta
+    out_meta = meta.copy()
+    out_meta.update(
+        {
+            "count": len(band_filepaths),
+            "driver": "GTiff",
+            "nodata": 0,
+            **INT_COMPRESSION_KWARGS,
+        }
+    )
+    cloud_meta = meta.copy()
+    cloud_meta.update(
+        {
+            "count": 1,
+            "driver": "GTiff",
+            "nodata": CLOUD_NODATA,
+            "dtype": "uint8",
+            **INT_COMPRESSION_KWARGS,
+        }
+    )
+
+    vrt_options = {
+        "resampling": Resampling.bilinear,
+        "crs": meta["crs"],
+        "transform": meta["transform"],
+        "height": meta["height"],
+        "width": meta["width"],
+    }
+
+    def process_block(win: Window) -> Tuple[NDArray[Any], NDArray[np.uint8]]:
+        data = read_warped_block(band_filepaths, win, meta["dtype"], **vrt_options)
+        return data, clouds.rasterize(win, meta["transform"])
+
+    wins = get_windows(meta["width"], meta["height"], block_size, block_size)
+    with open_raster_from_ref(out_path, "w", **out_meta, num_threads="all_cpus") as dst:
+        with open_raster_from_ref(cloud_path, "w", **cloud_meta) as cloud_dst:
+            for win, (data, cloud) in imap_windows(process_block, wins, num_workers):
+                dst.write(data, window=win)
+                cloud_dst.write(cloud, 1, window=win)
 
 
 def process_s2(
-    item: DownloadedSentinel2Product, output_file_name: str, tmp_folder: str
+    item: DownloadedSentinel2Product,
+    output_file_name: str,
+    tmp_folder: str,
+    num_workers: int,
+    block_size: int,
 ) -> Tuple[str, str, List[str]]:
     output_img_path = os.path.join(tmp_folder, output_file_name)
     output_cloud_path = os.path.join(tmp_folder, "cloudmask.tif")
@@ -121,17 +190,25 @@ def process_s2(
     valid_bands = [b for b in BAND_ORDER if b in item.asset_map]
     band_filepaths = [item.get_downloaded_band(b).path_or_url for b in valid_bands]
     ref_filepath = band_filepaths[BAND_ORDER.index("B02")]
-    save_stacked_raster(band_filepaths, ref_filepath, output_img_path)
-
-    # Generate cloud mask
-    rasterize_clouds(item, ref_filepath, output_cloud_path)
+    clouds = read_cloud_shapes(item)
+    save_stacked_raster(
+        band_filepaths,
+        ref_filepath,
+        output_img_path,
+        clouds,
+        output_cloud_path,
+        num_workers,
+        block_size,
+    )
 
     return output_img_path, output_cloud_path, valid_bands
 
 
 class CallbackBuilder:
-    def __init__(self):
+    def __init__(self, num_workers: int, block_size: int):
         self.tmp_dir = TemporaryDirectory()
+        self.num_workers = num_workers if num_workers > 0 else (os.cpu_count() or 1)
+        self.block_size = block_size
 
     def __call__(self):
         def process_sentinel_2(
@@ -142,7 +219,9 @@ class CallbackBuilder:
             tmp_dir = os.path.join(self.tmp_dir.name, ref_name)
             os.makedirs(tmp_dir)
 
-            img, cloud, valid_bands = process_s2(input_item, output_file_name, tmp_dir)
+            img, cloud, valid_bands = process_s2(
+                input_item, output_file_name, tmp_dir, self.num_workers, self.block_size
+            )
 
             img_asset = AssetVibe(reference=img, type=mimetypes.types_map[".tif"], id=gen_guid())
             cloud_asset = AssetVibe(
@@ -0,0 +1,117 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import os
+from tempfile import TemporaryDirectory
+from typing import List
+
+import numpy as np
+import pytest
+import rasterio
+from rasterio.crs import CRS
+from rasterio.features import rasterize
+from rasterio.transform import from_origin
+from rasterio.vrt import WarpedVRT
+from rasterio.warp import Resampling
+from shapely import geometry as shpg
+from stack_sentinel2_bands import CLOUD_NODATA, CloudRasterizer, save_stacked_raster
+
+SIZE = 300
+ORIGIN_X, ORIGIN_Y = 500000.0, 4500000.0
+UTM = CRS.from_epsg(32615)
+# Band resolutions in meters, the first one is the reference
+RESOLUTIONS = [10, 10, 20, 60]
+
+
+@pytest.fixture
+def tmp_dir():
+    _tmp_dir = TemporaryDirectory()
+    yield _tmp_dir.name
+    _tmp_dir.cleanup()
+
+
+@pytest.fixture
+def band_paths(tmp_dir: str) -> List[str]:
+    rng = np.random.default_rng(0)
+    paths = []
+    for i, res in enumerate(RESOLUTIONS):
+        size = SIZE * RESOLUTIONS[0] // res
+        path = os.path.join(tmp_dir, f"B{i}.tif")
+        with rasterio.open(
+            path,
+            "w",
+            driver="GTiff",
+            width=size,
+            height=size,
+            count=1,
+            dtype="uint16",
+            crs=UTM,
+            transform=from_origin(ORIGIN_X, ORIGIN_Y, res, res),
+        ) as dst:
+            dst.write(rng.integers(1, 10000, (1, size, size), dtype=np.uint16))
+        paths.append(path)
+    return paths
+
+
+def test_blockwise_stack_matches_full_read(band_paths: List[str], tmp_dir: str):
+    geometries = [
+        shpg.box(ORIGIN_X + 100, ORIGIN_Y - 1000, ORIGIN_X + 1230, ORIGIN_Y - 95),
+        shpg.Point(ORIGIN_X + 2000, ORIGIN_Y - 2000).buffer(400),
+    ]
+    values = [1, 2]
+    out_path = os.path.join(tmp_dir, "stacked.tif")
+    cloud_path = os.path.join(tmp_dir, "cloud.tif")
+    save_stacked_raster(
+        band_paths,
+        band_paths[0],
+        out_path,
+        CloudRasterizer(geometries, values),
+        cloud_path,
+        num_workers=4,
+        block_size=64,
+    )
+
+    with rasterio.open(band_paths[0]) as ref:
+        meta = ref.meta
+    vrt_options = {
+        "resampling": Resampling.bilinear,
+        "crs": meta["crs"],
+        "transform": meta["transform"],
+        "height": meta["height"],
+        "width": meta["width"],
+    }
+    with rasterio.open(out_path) as dst:
+        assert dst.count == len(band_paths)
+        assert dst.transform == meta["transform"]
+        stacked = dst.read()
+    for i, path in enumerate(band_paths):
+        with rasterio.open(path) as src, WarpedVRT(src, **vrt_options) as vrt:
+            assert np.array_equal(stacked[i], vrt.read(1))
+
+    expected_cloud = rasterize(
+        zip(geometries, values),
+        out_shape=(SIZE, SIZE),
+        transform=meta["transform"],
+        dtype="uint8",
+    )
+    with rasterio.open(cloud_path) as dst:
+        assert dst.dtypes[0] == "uint8"
+        assert dst.nodata == CLOUD_NODATA
+        cloud = dst.read(1)
+    assert np.array_equal(cloud, expected_cloud)
+    assert set(np.unique(cloud)) == {0, 1, 2}
+
+
+def test_no_clouds(band_paths: List[str], tmp_dir: str):
+    cloud_path = os.path.join(tmp_dir, "cloud.tif")
+    save_stacked_raster(
+        band_paths,
+        band_paths[0],
+        os.path.join(tmp_dir, "stacked.tif"),
+        CloudRasterizer([], []),
+        cloud_path,
+        num_workers=2,
+        block_size=128,
+    )
+    with rasterio.open(cloud_path) as dst:
+        assert not dst.read().any()
@@ -1,7 +1,6 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT License.
 
-import os
 from tempfile import TemporaryDirectory
 from typing import Any, Dict, Optional
 
@@ -9,7 +8,7 @@ import pandas as pd
 from shapely import geometry as shpg
 
 from vibe_core.data import DataSummaryStatistics, DataVibe, Raster, gen_guid
-from vibe_core.data.core_types import AssetVibe
+from vibe_core.data.tabular import write_table
 from vibe_lib.raster import load_raster_from_url
 
 
@@ -50,16 +49,12 @@ class CallbackBuilder:
         ) -> Dict[str, DataSummaryStatistics]:
             geom = input_geometry.geometry
             stats = summarize_raster(raster, mask, geom)
-            guid = gen_guid()
-            filepath = os.path.join(self.tmp_dir.name, f"{guid}.csv")
-            pd.DataFrame(stats, index=pd.Index([raster.time_range[0]], name="date")).to_csv(
-                filepath
-            )
+            df = pd.DataFrame(stats, index=pd.Index([raster.time_range[0]], name="date"))
             summary = DataSummaryStatistics.clone_from(
                 raster,
                 geometry=geom,
                 id=gen_guid(),
-                assets=[AssetVibe(reference=filepath, type="text/csv", id=guid)],
+                assets=[write_table(df, self.tmp_dir.name)],
             )
             return {"summary": summary}
 
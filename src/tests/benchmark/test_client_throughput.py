@@ -0,0 +1,64 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, TypeVar
+
+from shapely import geometry as shpg
+
+from vibe_core.client import FarmvibesAiClient
+from vibe_dev.testing.fake_service import FakeService
+
+NUM_RUNS = 200
+# Round trip to the REST API, and time it takes to answer
+LATENCY_S = 0.02
+WORKFLOW = "helloworld"
+
+R = TypeVar("R")
+
+
+def run_kwargs() -> List[Dict[str, Any]]:
+    return [
+        {
+            "name": f"field-{i}",
+            "geometry": shpg.Point(i, i).buffer(0.1),
+            "time_range": (datetime(2023, 1, 1), datetime(2023, 2, 1)),
+        }
+        for i in range(NUM_RUNS)
+    ]
+
+
+def timed(service: FakeService, name: str, fun: Callable[[], R]) -> R:
+    requests = service.requests
+    start = time.perf_counter()
+    result = fun()
+    elapsed = time.perf_counter() - start
+    requests = service.requests - requests
+    print(
+        f"{name}: {NUM_RUNS} runs in {elapsed:.2f}s ({NUM_RUNS / elapsed:.1f} runs/s), "
+        f"{requests} requests ({requests / elapsed:.1f} requests/s)"
+    )
+    return result
+
+
+def test_client_throughput():
+    with FakeService(latency_s=LATENCY_S) as service:
+        client = FarmvibesAiClient(service.url)
+        print()
+        runs = timed(
+            service,
+            "Sequential submission",
+            lambda: [client.run(WORKFLOW, **kwargs) for kwargs in run_kwargs()],
+        )
+        batched = timed(
+            service, "Batched submission", lambda: client.run_many(WORKFLOW, run_kwargs())
+        )
+        ids = [r.id for r in runs]
+        sequential = timed(
+            service, "Sequential describe_run", lambda: [client.describe_run(i) for i in ids]
+        )
+        concurrent = timed(service, "Concurrent describe_runs", lambda: client.describe_runs(ids))
+
+    assert [r.name for r in batched] == [r.name for r in runs]
+    assert concurrent == sequential
@@ -0,0 +1,109 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import os
+import shutil
+from dataclasses import asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict
+
+import pytest
+
+from vibe_agent.storage import LocalFileAssetManagerConfig, LocalStorageConfig
+from vibe_core.data import DataVibe, StacConverter
+from vibe_core.data.core_types import OpIOType
+from vibe_core.data.utils import serialize_stac
+from vibe_core.datamodel import RunStatus
+from vibe_dev.testing.control_plane import LocalControlPlane
+from vibe_dev.testing.fake_workflows_fixtures import get_fake_workflow_path
+from vibe_server.workflow.spec_parser import WorkflowParser
+
+WIDTH = 200
+DEPTH = 30
+# Round trip to the state store through the Dapr sidecar
+STATESTORE_LATENCY_S = 0.002
+# Fake op whose parameter is part of the cache key, so each step of a chain is a cache miss
+CHAIN_STEP_OP = """
+name: chain_step
+inputs:
+  user_data: DataVibe
+output:
+  processed_data: DataVibe
+parameters:
+  step: 0
+dependencies:
+  parameters:
+    - step
+entrypoint:
+  file: vibe_op.py
+  callback_builder: callback_builder
+"""
+
+
+@pytest.fixture
+def ops_dir(tmp_path: Path, fake_ops_dir: str) -> str:
+    ops_dir = tmp_path / "ops"
+    shutil.copytree(fake_ops_dir, ops_dir)
+    (ops_dir / "fake" / "chain_step.yaml").write_text(CHAIN_STEP_OP)
+    return str(ops_dir)
+
+
+def wide_workflow(ops_dir: str, fake_workflows_dir: str) -> Dict[str, Any]:
+    spec = WorkflowParser.parse(
+        get_fake_workflow_path("fan_out_and_in"), ops_dir, fake_workflows_dir
+    )
+    spec.tasks["to_list"].parameters["num_items"] = WIDTH
+    return asdict(spec)
+
+
+def deep_workflow(ops_dir: str, fake_workflows_dir: str) -> Dict[str, Any]:
+    tasks = [f"task{i}" for i in range(DEPTH)]
+    workflow = {
+        "name": "deep",
+        "tasks": {
+            t: {"op": "chain_step", "op_dir": "fake", "parameters": {"step": i}}
+            for i, t in enumerate(tasks)
+        },
+        "edges": [
+            {"origin": f"{o}.processed_data", "destination": [f"{d}.user_data"]}
+            for o, d in zip(tasks[:-1], tasks[1:])
+        ],
+        "sources": {"input": [f"{tasks[0]}.user_data"]},
+        "sinks": {"output": f"{tasks[-1]}.processed_data"},
+    }
+    return asdict(WorkflowParser.parse_dict(workflow, ops_dir, fake_workflows_dir))
+
+
+def workflow_input() -> OpIOType:
+    x = DataVibe(
+        "input",
+        time_range=(datetime.now(), datetime.now()),
+        geometry={"type": "Point", "coordinates": [0.0, 0.0]},
+        assets=[],
+    )
+    return {"input": serialize_stac(StacConverter().to_stac_item(x))}  # type: ignore
+
+
+@pytest.mark.parametrize("build_workflow", [wide_workflow, deep_workflow], ids=["wide", "deep"])
+@pytest.mark.anyio
+async def test_orchestration_throughput(
+    build_workflow: Any, tmp_path: Path, ops_dir: str, fake_workflows_dir: str
+):
+    storage_spec = LocalStorageConfig(
+        local_path=str(tmp_path),
+        asset_manager=LocalFileAssetManagerConfig(os.path.join(tmp_path, "assets")),
+    )
+    workflow = build_workflow(ops_dir, fake_workflows_dir)
+    async with LocalControlPlane(
+        storage_spec, ops_dir, statestore_latency_s=STATESTORE_LATENCY_S
+    ) as control_plane:
+        stats = await control_plane.run_workflow(workflow, workflow_input())
+        # Everything is cached in the second run
+        cached = await control_plane.run_workflow(workflow, workflow_input())
+
+    print(f"\n{workflow['name']} workflow: {stats.summary()}")
+    print(f"Message bytes by topic: {stats.message_bytes}")
+    print(f"{workflow['name']} workflow, cached: {cached.summary()}")
+    assert stats.status == cached.status == RunStatus.done
+    assert stats.subtasks == cached.subtasks
@@ -0,0 +1,83 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import os
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from tempfile import TemporaryDirectory
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from pystac import Asset, Item
+
+from vibe_lib import planetary_computer as pc_lib
+from vibe_lib.planetary_computer import PlanetaryComputerCollection
+
+NUM_ASSETS = 12
+ASSET_SIZE = 2 * 1024 * 1024
+LATENCY_S = 0.05
+# Bandwidth of a single connection, to emulate a remote server
+CONNECTION_BANDWIDTH = 20 * 1024 * 1024
+SEND_CHUNK = 64 * 1024
+CONTENT = os.urandom(ASSET_SIZE)
+
+
+class MockAssetHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: Any):
+        pass
+
+    def do_GET(self):
+        time.sleep(LATENCY_S)
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(CONTENT)))
+        self.end_headers()
+        for i in range(0, len(CONTENT), SEND_CHUNK):
+            self.wfile.write(CONTENT[i : i + SEND_CHUNK])
+            time.sleep(SEND_CHUNK / CONNECTION_BANDWIDTH)
+
+
+class MockCollection(PlanetaryComputerCollection):
+    collection = "mock"
+    asset_keys = [f"B{i:02}" for i in range(NUM_ASSETS)]
+
+
+@pytest.fixture
+def server_url():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), MockAssetHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def time_download_item(server_url: str, max_concurrent_downloads: int) -> float:
+    with patch.object(pc_lib, "get_available_collections", return_value=["mock"]):
+        collection = MockCollection()
+    collection.max_concurrent_downloads = max_concurrent_downloads
+    item = Item("item", None, None, datetime.now(), {})
+    for k in collection.asset_keys:
+        item.add_asset(k, Asset(href=f"{server_url}/{k}.tif"))
+
+    with TemporaryDirectory() as tmp_dir:
+        start = time.time()
+        paths = collection.download_item(item, os.path.join(tmp_dir, "item"))
+        elapsed = time.time() - start
+        assert all(os.path.getsize(p) == ASSET_SIZE for p in paths)
+    return elapsed
+
+
+def test_download_item_wall_clock(server_url: str):
+    sequential = time_download_item(server_url, max_concurrent_downloads=1)
+    concurrent = time_download_item(server_url, pc_lib.MAX_CONCURRENT_DOWNLOADS)
+    print(
+        f"Downloaded {NUM_ASSETS} assets of {ASSET_SIZE / 2**20:.0f}MB: "
+        f"sequential {sequential:.2f}s, concurrent {concurrent:.2f}s "
+        f"({sequential / concurrent:.1f}x)"
+    )
+    assert concurrent < sequential
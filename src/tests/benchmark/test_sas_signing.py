@@ -0,0 +1,73 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import base64
+import time
+from datetime import datetime, timedelta
+from typing import Callable, List
+from urllib.parse import urljoin, urlparse
+
+from azure.storage.blob import BlobClient, BlobSasPermissions, generate_blob_sas
+
+from vibe_common.tokens import BlobTokenManagerConnectionString
+
+NUM_URLS = 10_000
+NUM_RUNS = 100
+SAS_EXPIRATION = timedelta(days=1)
+ACCOUNT_KEY = base64.b64encode(b"benchmark-key").decode()
+# Signing with an account key is local, so no storage account (or emulator) is needed
+CONNECTION_STRING = (
+    "DefaultEndpointsProtocol=https;AccountName=benchmark;"
+    f"AccountKey={ACCOUNT_KEY};EndpointSuffix=core.windows.net"
+)
+
+
+def asset_urls() -> List[str]:
+    return [
+        f"https://benchmark.blob.core.windows.net/assets/run-{i % NUM_RUNS}/asset-{i}.tif"
+        for i in range(NUM_URLS)
+    ]
+
+
+def sign_uncached(url: str) -> str:
+    """Signs a URL with a new blob token, as every URL was signed before tokens were cached."""
+    blob_client = BlobClient.from_blob_url(blob_url=url)
+    token = generate_blob_sas(
+        account_name=blob_client.account_name,  # type: ignore
+        container_name=blob_client.container_name,
+        blob_name=blob_client.blob_name,
+        account_key=ACCOUNT_KEY,
+        permission=BlobSasPermissions(read=True),
+        start=datetime.utcnow(),
+        expiry=datetime.utcnow() + SAS_EXPIRATION,
+    )
+    return f"{urljoin(url, urlparse(url).path)}?{token}"
+
+
+def time_signing(sign: Callable[[str], str], urls: List[str]) -> float:
+    start = time.perf_counter()
+    for url in urls:
+        sign(url)
+    return time.perf_counter() - start
+
+
+def test_sas_signing_throughput():
+    urls = asset_urls()
+    uncached = time_signing(sign_uncached, urls)
+    blob_scoped = BlobTokenManagerConnectionString(CONNECTION_STRING)
+    blob_first = time_signing(blob_scoped.sign_url, urls)
+    blob_again = time_signing(blob_scoped.sign_url, urls)
+    container_scoped = BlobTokenManagerConnectionString(CONNECTION_STRING, container_scoped=True)
+    container = time_signing(container_scoped.sign_url, urls)
+
+    for name, elapsed in [
+        ("uncached", uncached),
+        ("blob-scoped", blob_first),
+        ("blob-scoped, signed again", blob_again),
+        ("container-scoped", container),
+    ]:
+        print(
+            f"Signed {NUM_URLS} URLs ({name}): {elapsed:.2f}s, {elapsed / NUM_URLS * 1e6:.1f}us/URL"
+        )
+    assert container < uncached
+    assert blob_again < blob_first
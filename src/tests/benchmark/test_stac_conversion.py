@@ -0,0 +1,68 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List
+
+import pytest
+from shapely import geometry as shpg
+
+from vibe_core.data import AssetVibe, BaseVibe, RasterChunk, StacConverter
+from vibe_core.data.sentinel import Sentinel2Product
+
+NUM_ITEMS = 10_000
+GEOMETRY: Dict[str, Any] = shpg.mapping(shpg.box(-1, -1, 1, 1))
+
+
+def make_chunk(i: int) -> RasterChunk:
+    start = datetime(2023, 1, 1) + timedelta(days=i % 365)
+    return RasterChunk(
+        id=f"chunk-{i}",
+        time_range=(start, start),
+        geometry=GEOMETRY,
+        assets=[AssetVibe(reference=f"/data/{i}.tif", type="image/tiff", id=f"asset-{i}")],
+        bands={"B02": 0, "B03": 1, "B04": 2},
+        chunk_pos=(i % 100, i // 100),
+        num_chunks=(100, NUM_ITEMS // 100),
+        limits=(0, 0, 256, 256),
+        write_rel_limits=(0, 0, 256, 256),
+    )
+
+
+def make_product(i: int) -> Sentinel2Product:
+    start = datetime(2023, 1, 1) + timedelta(days=i % 365)
+    return Sentinel2Product(
+        id=f"product-{i}",
+        time_range=(start, start),
+        geometry=GEOMETRY,
+        assets=[],
+        product_name=f"S2A_MSIL2A_{i}",
+        orbit_number=i,
+        relative_orbit_number=i % 143,
+        orbit_direction="descending",
+        platform="A",
+        extra_info={"cloud_cover": 10.5, "tags": ["a", "b"]},
+        tile_id="15TVG",
+        processing_level="L2A",
+    )
+
+
+@pytest.mark.parametrize("make_item", [make_chunk, make_product], ids=["chunk", "product"])
+def test_stac_conversion_throughput(make_item: Callable[[int], BaseVibe]):
+    converter = StacConverter()
+    items: List[BaseVibe] = [make_item(i) for i in range(NUM_ITEMS)]
+
+    start = time.perf_counter()
+    stac_items = converter.to_stac_item(items)
+    to_stac = time.perf_counter() - start
+
+    start = time.perf_counter()
+    converted = converter.from_stac_item(stac_items)
+    from_stac = time.perf_counter() - start
+
+    print(
+        f"Converted {NUM_ITEMS} {type(items[0]).__name__} items: "
+        f"to_stac_item {to_stac:.2f}s, from_stac_item {from_stac:.2f}s"
+    )
+    assert converted == items
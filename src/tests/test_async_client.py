@@ -0,0 +1,105 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+from datetime import datetime
+from typing import Any, Dict, Iterator, List
+
+import pytest
+from requests.exceptions import HTTPError
+from shapely import geometry as shpg
+
+from vibe_core.async_client import LIST_RUNS_MAX_IDS, AsyncFarmvibesAiClient, run_sync
+from vibe_core.client import FarmvibesAiClient, RunSubmissionError
+from vibe_dev.testing.fake_service import FakeService
+
+MAX_CONNECTIONS = 4
+
+
+@pytest.fixture
+def service() -> Iterator[FakeService]:
+    with FakeService(latency_s=0.01) as service:
+        yield service
+
+
+def run_kwargs(num_runs: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "name": f"field-{i}",
+            "geometry": shpg.Point(i, i).buffer(0.1),
+            "time_range": (datetime(2023, 1, 1), datetime(2023, 2, 1)),
+            "parameters": {"index": i},
+        }
+        for i in range(num_runs)
+    ]
+
+
+@pytest.mark.anyio
+async def test_run_many_and_describe_runs(service: FakeService):
+    num_runs = 20
+    async with AsyncFarmvibesAiClient(service.url, MAX_CONNECTIONS) as client:
+        run_ids = await client.run_many("helloworld", run_kwargs(num_runs), max_concurrency=2)
+        assert service.max_in_flight <= 2
+        runs = await client.describe_runs(run_ids)
+    assert [str(r.id) for r in runs] == run_ids
+    assert [r.name for r in runs] == [f"field-{i}" for i in range(num_runs)]
+    assert service.max_in_flight <= MAX_CONNECTIONS
+    # Disk space is verified once, and runs are submitted and described with one request each
+    assert service.requests == 2 * num_runs + 1
+
+
+@pytest.mark.anyio
+async def test_list_runs_by_id(service: FakeService):
+    async with AsyncFarmvibesAiClient(service.url) as client:
+        run_ids = await client.run_many("helloworld", run_kwargs(LIST_RUNS_MAX_IDS + 1))
+        requests = service.requests
+        runs = await client.list_runs_by_id(run_ids[::-1], fields=["id", "name"])
+    assert [r["id"] for r in runs] == run_ids[::-1]
+    assert service.requests - requests == 2
+
+
+@pytest.mark.anyio
+async def test_errors_are_raised(service: FakeService):
+    async with AsyncFarmvibesAiClient(service.url) as client:
+        with pytest.raises(HTTPError, match="404 Client Error.*not found"):
+            await client.describe_run("missing")
+
+
+@pytest.mark.anyio
+async def test_run_many_keeps_submitted_runs_on_failure():
+    with FakeService(failing_names=["field-1", "field-3"]) as service:
+        async with AsyncFarmvibesAiClient(service.url) as client:
+            with pytest.raises(RunSubmissionError, match="2 of 5 runs") as exc_info:
+                await client.run_many("helloworld", run_kwargs(5))
+    error = exc_info.value
+    assert set(error.errors) == {1, 3}
+    assert all(isinstance(e, HTTPError) for e in error.errors.values())
+    assert [r is None for r in error.runs] == [False, True, False, True, False]
+    assert sorted(error.submitted) == sorted(service.runs)
+
+
+def test_sync_run_many_keeps_submitted_runs_on_failure():
+    with FakeService(failing_names=["field-0"]) as service:
+        client = FarmvibesAiClient(service.url)
+        with pytest.raises(RunSubmissionError) as exc_info:
+            client.run_many("helloworld", run_kwargs(3))
+    assert exc_info.value.runs[0] is None
+    assert [r.name for r in exc_info.value.submitted] == ["field-1", "field-2"]
+    assert sorted(r.id for r in exc_info.value.submitted) == sorted(service.runs)
+
+
+def test_sync_client_wrappers(service: FakeService):
+    client = FarmvibesAiClient(service.url)
+    runs = client.run_many("helloworld", run_kwargs(3))
+    assert [r.name for r in runs] == ["field-0", "field-1", "field-2"]
+    assert runs[1].parameters == {"index": 1}
+    descriptions = client.describe_runs([r.id for r in runs])
+    assert [str(d.id) for d in descriptions] == [r.id for r in runs]
+    assert descriptions[0] == client.describe_run(runs[0].id)
+
+
+@pytest.mark.anyio
+async def test_run_sync_in_running_loop():
+    async def answer() -> int:
+        return 42
+
+    assert run_sync(answer()) == 42
@@ -4,16 +4,19 @@
 import os
 import shutil
 import tempfile
+import threading
 from dataclasses import asdict
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
+from unittest.mock import patch
 
 import pytest
 import yaml
 
 from vibe_agent.ops import OperationFactoryConfig
 from vibe_agent.storage import LocalFileAssetManagerConfig, LocalStorageConfig
+from vibe_agent.worker import Worker
 from vibe_common.secret_provider import AzureSecretProviderConfig
 from vibe_core.data.core_types import BaseVibe, DataVibe, OpIOType
 from vibe_core.data.utils import StacConverter, get_base_type, serialize_stac
@@ -255,6 +258,58 @@ async def test_fan_out_single_element(tmp_path: Path, fake_ops_dir: str, fake_wo
         assert all(len(o) == num_items for o in out.values())
 
 
+@pytest.mark.anyio
+async def test_local_runner_runs_subtasks_in_parallel(
+    tmp_path: Path, fake_ops_dir: str, fake_workflows_dir: str
+):
+    spec = WorkflowParser.parse(
+        get_fake_workflow_path("fan_out_and_in"), fake_ops_dir, fake_workflows_dir
+    )
+    spec.tasks["to_list"].parameters["num_items"] = 3
+    workflow = Workflow(spec)
+    tmp_asset_path = os.path.join(str(tmp_path), "assets")
+    storage_spec = LocalStorageConfig(
+        local_path=str(tmp_path), asset_manager=LocalFileAssetManagerConfig(tmp_asset_path)
+    )
+    runner = LocalWorkflowRunner.build(
+        workflow,
+        io_mapper=WorkflowIOHandler(workflow),
+        factory_spec=OperationFactoryConfig(storage_spec, AzureSecretProviderConfig()),
+        max_parallel_ops=2,
+    )
+    running: List[int] = []
+    lock = threading.Lock()
+    run_op_with_retry = Worker.run_op_with_retry
+
+    def tracked_run(self: Worker, *args: Any):
+        with lock:
+            running.append(running[-1] + 1 if running else 1)
+        try:
+            return run_op_with_retry(self, *args)
+        finally:
+            with lock:
+                running.append(running[-1] - 1)
+
+    x = DataVibe(
+        "input",
+        time_range=(datetime.now(), datetime.now()),
+        geometry={"type": "Point", "coordinates": [0.0, 0.0]},
+        assets=[],
+    )
+    with patch.object(Worker, "run_op_with_retry", tracked_run):
+        out = await runner.run({"input": serialize(x)})
+    assert all(len(o) == 3 for o in out.values())
+    # Subtasks of the same op ran at the same time, within the pool size
+    assert max(running) == 2
+    summary = runner.timing_summary()  # type: ignore
+    assert {k: v["subtasks"] for k, v in summary.items()} == {
+        "to_list": 1,
+        "scatter": 3,
+        "parallel": 3,
+        "gather": 1,
+    }
+
+
 @pytest.mark.anyio
 async def test_gather_not_parallel(tmp_path: Path, fake_ops_dir: str, fake_workflows_dir: str):
     runner = build_workflow_runner(
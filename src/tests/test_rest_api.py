@@ -1,7 +1,10 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT License.
 
+import asyncio
+import json
 from dataclasses import asdict
+from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional, Tuple, Union, cast
 from unittest.mock import MagicMock, patch
 from uuid import uuid4 as uuid
@@ -10,14 +13,32 @@ import pytest
 import requests
 from fastapi.testclient import TestClient
 
-from vibe_common.constants import CONTROL_STATUS_PUBSUB, WORKFLOW_REQUEST_PUBSUB_TOPIC
-from vibe_common.messaging import WorkflowCancellationMessage
+from vibe_common.constants import (
+    CONTROL_STATUS_PUBSUB,
+    RUN_STATUS_PUBSUB_TOPIC,
+    WORKFLOW_REQUEST_PUBSUB_TOPIC,
+)
+from vibe_common.messaging import WorkflowCancellationMessage, WorkMessageBuilder
+from vibe_common.run_index import RunIndex
 from vibe_common.statestore import StateStore
 from vibe_core.data.core_types import InnerIOType
 from vibe_core.data.utils import StacConverter, deserialize_stac
-from vibe_core.datamodel import RunConfig, RunConfigInput, RunDetails, RunStatus
+from vibe_core.datamodel import (
+    OpResourceUsage,
+    RunConfig,
+    RunConfigInput,
+    RunDetails,
+    RunStatus,
+)
+from vibe_dev.testing.statestore import InMemoryStateStore
 from vibe_server.href_handler import BlobHrefHandler, LocalHrefHandler
-from vibe_server.server import TerravibesAPI, TerravibesProvider
+from vibe_server.run_status import HEARTBEAT
+from vibe_server.server import (
+    NEXT_CURSOR_HEADER,
+    RUN_STATUS_EVENT_ROUTE,
+    TerravibesAPI,
+    TerravibesProvider,
+)
 from vibe_server.workflow.input_handler import build_args_for_workflow
 from vibe_server.workflow.workflow import load_workflow_by_name
 
@@ -78,13 +99,19 @@ def test_generate_api_documentation_page(request_client: requests.Session):
     assert openapi_json.status_code == 200
 
 
+def missing_key(key: str):
+    raise KeyError(key)
+
+
 @pytest.mark.parametrize("params", [None, {"param1": "new_param"}])
 @patch("vibe_server.server.send", return_value="OK")
 @patch.object(StateStore, "transaction")
 @patch.object(StateStore, "retrieve", side_effect=lambda _: [])
+@patch.object(StateStore, "retrieve_with_etag", side_effect=missing_key)
 @patch.object(StateStore, "retrieve_bulk", side_effect=lambda _: [])
 def test_workflow_submission(
     retrieve_bulk: MagicMock,
+    _: MagicMock,
     retrieve: MagicMock,
     transaction: MagicMock,
     send: MagicMock,
@@ -98,10 +125,11 @@ def test_workflow_submission(
     assert send.call_args[0][0].content.parameters == params
 
     assert response.status_code == 201
-    assert len(transaction.call_args.args[0]) == 2
+    # Run index directory, run index shard and run
+    assert len(transaction.call_args.args[0]) == 3
     id = response.json()["id"]
-    assert transaction.call_args.args[0][0]["value"][0] == id
-    submitted_config = asdict(transaction.call_args.args[0][1]["value"])
+    assert transaction.call_args.args[0][1]["value"][0][1] == id
+    submitted_config = asdict(transaction.call_args.args[0][2]["value"])
     # Add some tasks here
     tasks = ["task1", "task2", "task3"]
     submitted_config["tasks"] = tasks
@@ -113,15 +141,17 @@ def test_workflow_submission(
     assert all(retrieved_task_details[t]["status"] == RunStatus.pending for t in tasks)
 
     retrieve_bulk.side_effect = lambda _: [  # type: ignore
-        asdict(transaction.call_args.args[0][1]["value"])
+        asdict(transaction.call_args.args[0][2]["value"])
     ]
     response = request_client.get(f"/v0/runs/?ids={id}")
     assert response.status_code == 200
     assert len(response.json()) == 1
 
 
+@patch.object(StateStore, "transaction")
 @patch.object(StateStore, "retrieve", side_effect=lambda _: [])
-def test_no_workflow_runs(_, request_client: requests.Session):
+@patch.object(StateStore, "retrieve_with_etag", side_effect=missing_key)
+def test_no_workflow_runs(_, __: Any, ___: Any, request_client: requests.Session):
     response = request_client.get("/v0/runs")
     assert response.status_code == 200
     assert len(response.json()) == 0
@@ -146,9 +176,8 @@ def test_missing_field_workflow_submission(
 
 @patch.object(TerravibesProvider, "submit_work", side_effect=Exception("sorry"))
 @patch.object(TerravibesProvider, "update_run_state")
-@patch.object(TerravibesProvider, "list_runs_from_store", return_value=[])
 def test_submit_local_workflows_with_broken_work_submission(
-    _, __: Any, ___: Any, workflow_run_config: Dict[str, Any], request_client: requests.Session
+    _, __: Any, workflow_run_config: Dict[str, Any], request_client: requests.Session
 ):
     response = request_client.post("/v0/runs", json=workflow_run_config)
     assert response.status_code == 500, response
@@ -158,9 +187,11 @@ def test_submit_local_workflows_with_broken_work_submission(
 @patch.object(TerravibesProvider, "submit_work")
 @patch.object(StateStore, "transaction")
 @patch.object(StateStore, "retrieve", side_effect=lambda _: [])
+@patch.object(StateStore, "retrieve_with_etag", side_effect=missing_key)
 @patch.object(StateStore, "retrieve_bulk")
 def test_workflow_submission_and_cancellation(
     retrieve_bulk: MagicMock,
+    __: MagicMock,
     retrieve: MagicMock,
     transaction: MagicMock,
     _: MagicMock,
@@ -170,13 +201,13 @@ def test_workflow_submission_and_cancellation(
 ):
     response = request_client.post("/v0/runs", json=workflow_run_config)
     assert response.status_code == 201
-    assert len(transaction.call_args.args[0]) == 2
+    assert len(transaction.call_args.args[0]) == 3
     id = response.json()["id"]
-    assert transaction.call_args.args[0][0]["value"][0] == id
+    assert transaction.call_args.args[0][1]["value"][0][1] == id
 
     response = request_client.post(f"/v0/runs/{id}/cancel")
     assert response.status_code == 202
-    assert len(transaction.call_args.args[0]) == 2
+    assert len(transaction.call_args.args[0]) == 3
     message = send.call_args.args[0]
     assert isinstance(message, WorkflowCancellationMessage)
     assert str(message.run_id) == id
@@ -207,7 +238,7 @@ def test_workflow_resubmission(
         nonlocal submitted_runs
         submitted_runs.append(run)
 
-    def update_run_state_effect(run_ids: List[str], new_run: RunConfig):
+    def update_run_state_effect(new_run: RunConfig):
         nonlocal first_run
         first_run = asdict(new_run)
 
@@ -218,7 +249,7 @@ def test_workflow_resubmission(
     response = request_client.post("/v0/runs", json=workflow_run_config)
     assert response.status_code == 201
 
-    retrieve.side_effect = [first_run, []]
+    retrieve.side_effect = [first_run]
     response = request_client.post(f"/v0/runs/{uuid()}/resubmit")
 
     assert response.status_code == 201
@@ -330,3 +361,198 @@ def test_system_metrics(
     assert isinstance(metrics["used_mem"], int)
     assert isinstance(metrics["total_mem"], int)
     assert isinstance(metrics["disk_free"], df_type)
+
+
+InMemoryClient = Tuple[TestClient, InMemoryStateStore, List[RunConfig], TerravibesProvider]
+
+
+@pytest.fixture
+def in_memory_client(workflow_run_config: Dict[str, Any]):
+    """Client to a server backed by an in-memory state store with 30 runs, one per hour."""
+    terravibes_app = TerravibesAPI(LocalHrefHandler("/tmp"))
+    store = InMemoryStateStore()
+    provider = terravibes_app.terravibes
+    provider.state_store = store  # type: ignore
+    provider.run_index = RunIndex(store)
+    statuses = [RunStatus.done, RunStatus.failed, RunStatus.running]
+    runs: List[RunConfig] = []
+    for i in range(30):
+        run = provider.create_new_run(RunConfigInput(**workflow_run_config))[1]
+        run.workflow = "helloworld" if i % 2 else "other/workflow"
+        run.details.status = statuses[i % 3]
+        run.details.submission_time = datetime(2023, 1, 1) + timedelta(hours=i)
+        asyncio.run(provider.update_run_state(run))
+        # The orchestrator keeps track of the task names in the stored run
+        data = asyncio.run(store.retrieve(str(run.id)))
+        asyncio.run(store.store(str(run.id), {**data, "tasks": ["task"]}))
+        asyncio.run(store.store(f"{run.id}-task", asdict(RunDetails())))
+        runs.append(run)
+    client = TestClient(terravibes_app.versioned_wrapper)
+    yield client, store, runs, provider
+
+
+def test_list_runs_filters_and_paginates_before_fetching(
+    in_memory_client: InMemoryClient,
+):
+    client, store, runs, _ = in_memory_client
+    ids = [str(r.id) for r in runs]
+
+    # Without filters, all ids are listed in submission order
+    assert client.get("/v0/runs").json() == ids
+
+    # Newest first, one page at a time, following the cursor
+    store.calls = {}
+    response = client.get("/v0/runs", params={"newest_first": True, "items": 4})
+    assert response.json() == ids[::-1][:4]
+    # Only the run index is read, no run or task record
+    assert "retrieve_bulk" not in store.calls or store.calls["retrieve_bulk"] == 1
+    cursor = response.headers[NEXT_CURSOR_HEADER]
+    response = client.get("/v0/runs", params={"newest_first": True, "items": 4, "cursor": cursor})
+    assert response.json() == ids[::-1][4:8]
+
+    # Filters by workflow and submission time only use the index
+    params: Dict[str, Any] = {
+        "workflow": "helloworld",
+        "submitted_after": "2023-01-01T10:00:00",
+    }
+    assert client.get("/v0/runs", params=params).json() == ids[11::2]
+
+    # Status filter with projection
+    response = client.get(
+        "/v0/runs", params={"status": ["failed"], "fields": ["id", "details.status"], "items": 3}
+    )
+    assert response.json() == [{"id": i, "details.status": "failed"} for i in ids[1::3][:3]]
+    cursor = response.headers[NEXT_CURSOR_HEADER]
+    response = client.get(
+        "/v0/runs", params={"status": ["failed"], "fields": ["id"], "items": 20, "cursor": cursor}
+    )
+    assert response.json() == [{"id": i} for i in ids[1::3][3:]]
+    # Last page is not full, so there is no next cursor
+    assert NEXT_CURSOR_HEADER not in response.headers
+
+    assert client.get("/v0/runs", params={"cursor": "not a cursor"}).status_code == 400
+
+
+def test_list_runs_only_fetches_tasks_when_needed(
+    in_memory_client: InMemoryClient,
+):
+    client, store, runs, _ = in_memory_client
+    ids = [str(r.id) for r in runs[:5]]
+
+    store.calls = {}
+    response = client.get("/v0/runs", params={"ids": ids, "fields": ["id", "details.status"]})
+    assert len(response.json()) == 5
+    assert store.calls["retrieve_bulk"] == 1
+
+    store.calls = {}
+    response = client.get("/v0/runs", params={"ids": ids, "fields": ["id", "task_details"]})
+    assert all(r["task_details"]["task"]["status"] == "pending" for r in response.json())
+    assert store.calls["retrieve_bulk"] == 2
+
+
+def test_profile_ops(in_memory_client: InMemoryClient):
+    client, store, runs, _ = in_memory_client
+    for i, run in enumerate(runs):
+        data = asyncio.run(store.retrieve(str(run.id)))
+        usage = OpResourceUsage(
+            runs=2, wall_time_s=float(i), cpu_time_s=1.0, peak_rss_bytes=i, asset_bytes=10
+        )
+        data["details"]["resources"] = {"op": asdict(usage), f"op{i % 2}": asdict(usage)}
+        asyncio.run(store.store(str(run.id), data))
+
+    store.calls = {}
+    response = client.get("/v0/ops/profile", params={"workflow": "helloworld", "items": 2})
+    assert response.status_code == 200
+    # Only the index shards and the run records are fetched, not the task details of the runs
+    assert store.calls["retrieve_bulk"] == 2
+    profile = response.json()
+    assert sorted(profile) == ["op", "op1"]
+    assert profile["op"] == profile["op1"]
+    # Runs 27 and 29 are the most recent runs of the workflow
+    assert profile["op"]["runs"] == 4
+    assert profile["op"]["wall_time_s"] == 27 + 29
+    assert profile["op"]["mean_wall_time_s"] == (27 + 29) / 4
+    assert profile["op"]["mean_cpu_time_s"] == 0.5
+    assert profile["op"]["peak_rss_bytes"] == 29
+    assert profile["op"]["asset_bytes"] == 20
+
+    profile = client.get("/v0/ops/profile").json()
+    assert profile["op"]["runs"] == 2 * len(runs)
+    assert profile["op0"]["runs"] == profile["op1"]["runs"] == len(runs)
+
+
+def parse_event(event: str) -> Tuple[str, Any]:
+    name, data = event.strip().split("\n")
+    return name[len("event: ") :], json.loads(data[len("data: ") :])
+
+
+def test_stream_run_events(in_memory_client: InMemoryClient):
+    _, _, runs, provider = in_memory_client
+    provider.heartbeat_interval_s = 0.01  # type: ignore
+    done, running = str(runs[0].id), str(runs[2].id)
+
+    async def consume() -> List[str]:
+        response = cast(Any, await provider.stream_run_events([runs[0].id, runs[2].id]))
+        assert response.media_type == "text/event-stream"
+        events = response.body_iterator
+        received = [await events.__anext__() for _ in range(3)]
+        provider.run_status.publish(running, 10, None, {"task": {"status": "running"}})
+        # Updates can arrive out of order, stale ones are discarded
+        provider.run_status.publish(running, 5, None, {"task": {"status": "queued"}})
+        provider.run_status.publish(running, 11, {"status": "done"}, {})
+        # Updates of runs that are not followed are ignored
+        provider.run_status.publish(done, 12, {"status": "deleting"}, {})
+        return received + [e async for e in events]
+
+    events = asyncio.run(consume())
+    snapshots = [parse_event(e) for e in events[:2]]
+    assert [(name, data["id"]) for name, data in snapshots] == [
+        ("snapshot", done),
+        ("snapshot", running),
+    ]
+    assert snapshots[1][1]["details"]["status"] == "running"
+    assert snapshots[1][1]["task_details"]["task"]["status"] == "pending"
+    # Nothing happened before the heartbeat interval
+    assert events[2] == HEARTBEAT
+    assert [parse_event(e) for e in events[3:]] == [
+        ("update", {"id": running, "task_details": {"task": {"status": "running"}}}),
+        ("update", {"id": running, "details": {"status": "done"}, "task_details": {}}),
+        ("end", {}),
+    ]
+    # The stream unsubscribes when it ends
+    assert not provider.run_status.subscriptions
+
+
+def test_stream_missing_run_events(in_memory_client: InMemoryClient):
+    client, _, _, provider = in_memory_client
+    assert client.get("/v0/runs/events", params={"ids": [str(uuid())]}).status_code == 404
+    assert not provider.run_status.subscriptions
+
+
+def test_run_status_dapr_subscription(in_memory_client: InMemoryClient):
+    client, _, runs, provider = in_memory_client
+    subscriptions = client.get("/dapr/subscribe").json()
+    assert subscriptions == [
+        {
+            "pubsubname": CONTROL_STATUS_PUBSUB,
+            "topic": RUN_STATUS_PUBSUB_TOPIC,
+            "route": RUN_STATUS_EVENT_ROUTE,
+            "metadata": {},
+        }
+    ]
+
+    subscription = provider.run_status.subscribe([str(runs[2].id)])
+    message = WorkMessageBuilder.build_workflow_status_update(runs[2].id, 1, {"status": "done"}, {})
+    response = client.post(RUN_STATUS_EVENT_ROUTE, json=message.to_cloud_event("orchestrator"))
+    assert response.json() == {"status": "SUCCESS"}
+    assert subscription.queue.get_nowait() == {
+        "id": str(runs[2].id),
+        "details": {"status": "done"},
+        "task_details": {},
+    }
+
+    cancellation = WorkflowCancellationMessage(
+        header=message.header.copy(update={"type": "workflow_cancellation_request"}), content={}
+    )
+    response = client.post(RUN_STATUS_EVENT_ROUTE, json=cancellation.to_cloud_event("orchestrator"))
+    assert response.json() == {"status": "DROP"}
@@ -63,14 +63,21 @@ async def test_list_workflows(
     assert len(workflows) == len(await list_workflows())
 
 
+def missing_key(key: str):
+    raise KeyError(key)
+
+
+@patch.object(StateStore, "transaction")
 @patch.object(StateStore, "retrieve", side_effect=lambda _: [])
-def test_empty_list_runs(_, rest_client: FarmvibesAiClient):
+@patch.object(StateStore, "retrieve_with_etag", side_effect=missing_key)
+def test_empty_list_runs(_, __: Any, ___: Any, rest_client: FarmvibesAiClient):
     runs = rest_client.list_runs()
     assert not runs
 
 
 @pytest.mark.parametrize("workflow", ["helloworld", j(get_workflow_dir(), "helloworld.yaml")])
 @pytest.mark.parametrize("params", [None, {}, {"param1": 1}])
+@patch.object(StateStore, "retrieve_with_etag", side_effect=missing_key)
 @patch.object(TerravibesProvider, "submit_work")
 @patch.object(StateStore, "transaction")
 @patch.object(StateStore, "retrieve")
@@ -86,6 +93,7 @@ def test_submit_run(
     retrieve: MagicMock,
     transaction: MagicMock,
     _: MagicMock,
+    __: MagicMock,
     rest_client: FarmvibesAiClient,
     the_polygon: Polygon,
     params: Optional[Dict[str, Any]],
@@ -99,7 +107,7 @@ def test_submit_run(
         if first_retrieve_call:
             first_retrieve_call = False
             return []
-        return asdict(transaction.call_args.args[0][1]["value"])
+        return asdict(transaction.call_args.args[0][-1]["value"])
 
     def bulk_side_effect(_):
         return [retrieve_side_effect(_)]
@@ -122,6 +130,7 @@ def test_submit_run(
     validate.assert_called()
 
 
+@patch.object(StateStore, "retrieve_with_etag", side_effect=missing_key)
 @patch.object(TerravibesProvider, "submit_work")
 @patch.object(StateStore, "transaction")
 @patch.object(StateStore, "retrieve")
@@ -131,6 +140,7 @@ def test_submit_base_vibe_run(
     retrieve: MagicMock,
     transaction: MagicMock,
     _: MagicMock,
+    __: MagicMock,
     rest_client: FarmvibesAiClient,
 ):
     party_id = "fake-party-id"
@@ -147,7 +157,7 @@ def test_submit_base_vibe_run(
         if first_retrieve_call:
             first_retrieve_call = False
             return []
-        return asdict(transaction.call_args.args[0][1]["value"])
+        return asdict(transaction.call_args.args[0][-1]["value"])
 
     def bulk_side_effect(_):
         return [retrieve_side_effect(_)]
@@ -165,6 +175,7 @@ def test_submit_base_vibe_run(
 
 @pytest.mark.parametrize("workflow", ["helloworld", j(get_workflow_dir(), "helloworld.yaml")])
 @pytest.mark.parametrize("params", [None, {}, {"param1": 1}])
+@patch.object(StateStore, "retrieve_with_etag", side_effect=missing_key)
 @patch.object(TerravibesProvider, "submit_work")
 @patch.object(StateStore, "transaction")
 @patch.object(StateStore, "retrieve")
@@ -183,6 +194,7 @@ async def test_monitor_run_with_none_datetime_fields(
     retrieve: MagicMock,
     transaction: MagicMock,
     _: MagicMock,
+    __: MagicMock,
     rest_client: FarmvibesAiClient,
     the_polygon: Polygon,
     params: Optional[Dict[str, Any]],
@@ -203,7 +215,7 @@ async def test_monitor_run_with_none_datetime_fields(
             return []
 
         if run_config is None:
-            run_config = asdict(transaction.call_args.args[0][1]["value"])
+            run_config = asdict(transaction.call_args.args[0][-1]["value"])
             if not run_config["task_details"]:
                 run_config["task_details"]["hello"] = asdict(RunDetails())
         return run_config
@@ -0,0 +1,79 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import os
+from datetime import datetime
+from multiprocessing import get_context
+
+import numpy as np
+from shapely import geometry as shpg
+
+from vibe_agent.resource_usage import ResourceMeter, get_asset_bytes
+from vibe_core.data import AssetVibe, DataVibe, StacConverter
+from vibe_core.datamodel import OpResourceUsage, combine_resource_usage
+
+
+def make_item(tmp_path: str, name: str, size: int) -> DataVibe:
+    path = os.path.join(tmp_path, name)
+    with open(path, "wb") as f:
+        f.write(b"0" * size)
+    now = datetime.now()
+    return DataVibe(
+        name,
+        (now, now),
+        shpg.mapping(shpg.box(0, 0, 1, 1)),
+        [AssetVibe(reference=path, type="application/octet-stream", id=name)],
+    )
+
+
+def test_asset_bytes(tmp_path: str):
+    item1 = make_item(tmp_path, "a", 10)
+    item2 = make_item(tmp_path, "b", 20)
+    remote = DataVibe(
+        "remote",
+        item1.time_range,
+        item1.geometry,
+        [AssetVibe(reference="https://example.com/c.tif", type="image/tiff", id="c")],
+    )
+    converter = StacConverter()
+    items = {
+        "single": converter.to_stac_item(item1),
+        "list": converter.to_stac_item([item2, remote]),
+    }
+    assert get_asset_bytes(items) == 30
+
+
+def do_work(path: str, size: int) -> OpResourceUsage:
+    meter = ResourceMeter()
+    data = np.ones(size)
+    np.save(path, data)
+    np.load(path)
+    return meter.usage(asset_bytes=123)
+
+
+def test_meter_measures_work(tmp_path: str):
+    data = np.ones(4 * 1024**2)
+    path = os.path.join(tmp_path, "data.npy")
+    # Ops are measured in a child process, as in the worker
+    with get_context("forkserver").Pool(1) as pool:
+        usage = pool.apply(do_work, (path, data.size))
+        # The memory the child held before the meter was created is not included
+        idle = pool.apply(do_work, (path, 1))
+    assert idle.peak_rss_bytes < data.nbytes
+    assert usage.runs == 1
+    assert usage.wall_time_s > 0
+    assert usage.cpu_time_s >= 0
+    assert usage.peak_rss_bytes >= data.nbytes
+    assert usage.write_bytes >= data.nbytes
+    assert usage.read_bytes >= data.nbytes
+    assert usage.asset_bytes == 123
+
+
+def test_combine_usage():
+    usage1 = OpResourceUsage(wall_time_s=1.0, peak_rss_bytes=10, write_bytes=5)
+    usage2 = OpResourceUsage(runs=2, wall_time_s=2.0, peak_rss_bytes=5, write_bytes=5)
+    combined = combine_resource_usage({"a": usage1}, None, {"a": usage2, "b": usage2})
+    assert combined == {
+        "a": OpResourceUsage(runs=3, wall_time_s=3.0, peak_rss_bytes=10, write_bytes=10),
+        "b": usage2,
+    }
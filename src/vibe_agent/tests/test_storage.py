@@ -3,7 +3,7 @@
 
 import os
 from datetime import datetime, timezone
-from typing import Any, Dict
+from typing import Any, Dict, List
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -98,3 +98,36 @@ def test_cosmos_storage_split(mock_handle: MagicMock):
     assert len(mock_handle.call_args_list[0].args[2][0]["items"]) == 10
     assert len(mock_handle.call_args_list[1].args[2][0]["items"]) == 5
     assert len(mock_handle.call_args_list[2].args[2][0]["items"]) == 3
+
+
+@patch("vibe_agent.storage.CosmosStorage.process_items")
+@patch("vibe_agent.storage.CosmosStorage._get_container")
+def test_cosmos_storage_bulk_retrieve(_: MagicMock, process_items: MagicMock, item_dict: ItemDict):
+    cache_infos = [CacheInfo("test_op", "1.0", {}, {"parameters": {"param": i}}) for i in range(3)]
+    run_infos = {
+        c.hash: {"id": c.hash, "op_name": "test_op", "run_id": "run", "cache_info": {}}
+        for c in cache_infos[:2]
+    }
+    run_infos[cache_infos[0].hash].update(items=["list-0"], singular_items=[])
+    # Items of the second run are missing
+    run_infos[cache_infos[1].hash].update(items=["list-1"], singular_items=[])
+    item_lists = {"list-0": {"id": "list-0", "type": "item_list"}}
+
+    def query(container: Any, op_name: str, ids: List[str], type: str):
+        docs = run_infos if type == "run_info" else item_lists
+        return {i: docs[i] for i in ids if i in docs}
+
+    process_items.return_value = item_dict
+    storage = CosmosStorage(
+        key="",
+        asset_manager=None,  # type: ignore
+        stac_container_name="",
+        cosmos_database_name="",
+        cosmos_url="",
+    )
+    with patch.object(storage, "_query_by_ids", side_effect=query) as query_mock:
+        outputs = storage.retrieve_outputs_from_inputs_if_exist(cache_infos)
+    assert outputs == [item_dict, None, None]
+    # A single query for runs and one for items
+    assert query_mock.call_count == 2
+    process_items.assert_called_once()
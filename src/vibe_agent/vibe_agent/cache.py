@@ -2,19 +2,29 @@
 # Licensed under the MIT License.
 
 import asyncio
+import json
 import logging
 import os
+import traceback
 from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
-from typing import List, Optional, cast
+from typing import Any, Dict, List, Optional, Tuple, cast
 
 from cloudevents.sdk.event import v1
 from dapr.conf import settings
-from dapr.ext.grpc import App, TopicEventResponse
+from fastapi import Request, Response
 from hydra_zen import builds
 from opentelemetry import trace
+from starlette.concurrency import run_in_threadpool
 
-from vibe_common.constants import CACHE_PUBSUB_TOPIC, CONTROL_STATUS_PUBSUB, STATUS_PUBSUB_TOPIC
+from vibe_common.constants import (
+    CACHE_PROBE_METHOD,
+    CACHE_PUBSUB_TOPIC,
+    CONTROL_STATUS_PUBSUB,
+    MAX_PARALLEL_REQUESTS,
+    STATUS_PUBSUB_TOPIC,
+)
 from vibe_common.dapr import dapr_ready
+from vibe_common.dropdapr import App, TopicEventResponse
 from vibe_common.messaging import (
     ExecuteRequestContent,
     ExecuteRequestMessage,
@@ -23,9 +33,10 @@ from vibe_common.messaging import (
     accept_or_fail_event,
     event_to_work_message,
     extract_message_header_from_event,
-    send,
+    send_async,
 )
-from vibe_common.schemas import CacheInfo, OperationSpec, OpRunId
+from vibe_common.payloads import resolve_payload
+from vibe_common.schemas import CacheInfo, OperationDependencyResolver, OperationSpec, OpRunId
 from vibe_common.telemetry import (
     add_span_attributes,
     add_trace,
@@ -37,7 +48,6 @@ from vibe_core.data.core_types import OpIOType
 from vibe_core.logconfig import LOG_BACKUP_COUNT, MAX_LOG_FILE_BYTES, configure_logging
 
 from .cache_metadata_store_client import CacheMetadataStoreClient
-from .ops import OperationDependencyResolver
 from .ops_helper import OpIOConverter
 from .storage.storage import Storage, StorageConfig
 from .worker import WorkerMessenger
@@ -109,11 +119,45 @@ class Cache:
             logging.info(f"Cache miss with hash {cache_info.hash} in op {cache_info.name}")
             return None
 
+    def probe(self, run_id: str, cache_infos: List[CacheInfo]) -> List[Optional[OpIOType]]:
+        """Looks up the outputs of several op runs at once, returning None for cache misses.
+
+        References from the run to the outputs of cache hits are added, as they would be when
+        processing execute requests.
+        """
+        with trace.get_tracer(__name__).start_as_current_span("probe"):
+            add_span_attributes({"run_id": run_id, "num_probes": len(cache_infos)})
+            stored = self.storage.retrieve_outputs_from_inputs_if_exist(cache_infos)
+            outputs = [None if o is None else OpIOConverter.serialize_output(o) for o in stored]
+            hits = [(c, o) for c, o in zip(cache_infos, outputs) if o is not None]
+            logging.info(
+                f"Bulk cache probe for run {run_id}: {len(hits)} hits out of {len(cache_infos)}"
+            )
+
+            async def add_refs():
+                semaphore = asyncio.Semaphore(MAX_PARALLEL_REQUESTS)
+
+                async def add_ref(cache_info: CacheInfo, output: OpIOType):
+                    async with semaphore:
+                        await self.metadata_store.add_refs(
+                            run_id, OpRunId(name=cache_info.name, hash=cache_info.hash), output
+                        )
+
+                await asyncio.gather(*[add_ref(c, o) for c, o in hits])
+
+            asyncio.run(add_refs())
+            return outputs
+
+    def handle_probe(self, body: str) -> str:
+        request: Dict[str, Any] = json.loads(body)
+        cache_infos = [CacheInfo(**c) for c in request["cache_info"]]
+        return json.dumps({"outputs": self.probe(request["run_id"], cache_infos)})
+
     @add_trace
-    def run_new_op(self, message: WorkMessage):
+    async def run_new_op(self, message: WorkMessage):
         content = cast(ExecuteRequestContent, message.content)
         add_span_attributes({"op_name": str(content.operation_spec.name)})
-        send(
+        await send_async(
             message,
             self.__class__.__name__.lower(),
             self.pubsubname,
@@ -129,75 +173,137 @@ class Cache:
 
         logging.info(msg)
 
+    def _get_cache_info(self, message: WorkMessage) -> CacheInfo:
+        content = cast(ExecuteRequestContent, message.content)
+        op_config = cast(OperationSpec, content.operation_spec)
+        try:
+            # The request is forwarded to the worker as it was received, so that large
+            # inputs are still sent by reference
+            return get_cache_info(
+                self.dependency_resolver,
+                resolve_payload(content.input),
+                op_config,
+                get_current_trace_parent(),
+            )
+        except RecursionError as e:
+            logging.error(f"Recursion error for op {op_config.name} - restarting pod. {e}")
+            os._exit(1)
+        except Exception as e:
+            raise RuntimeError(
+                f"Failed to get cache info for op {op_config.name} with exception {type(e)}:{e}"
+            ) from e
+
+    async def _dispatch(
+        self, message: WorkMessage, cache_info: CacheInfo, possible_output: Optional[OpIOType]
+    ):
+        """Replies with the cached output of an op run, or sends the request to a worker."""
+        if possible_output is not None:
+            await self.metadata_store.add_refs(
+                str(message.run_id),
+                OpRunId(name=cache_info.name, hash=cache_info.hash),
+                possible_output,
+            )
+            logging.info(f"Cache hit for op {cache_info.name}")
+            await self.messenger.send_ack_reply(message)
+            await self.messenger.send_success_reply(message, possible_output, cache_info)
+        else:
+            await self.run_new_op(
+                WorkMessageBuilder.add_cache_info_to_execute_request(
+                    cast(ExecuteRequestMessage, message), cache_info
+                )
+            )
+
+    @add_trace
+    def _failure_callback(self, event: v1.Event, e: Exception, tb: List[str]) -> TopicEventResponse:
+        message = event_to_work_message(event)
+        content = cast(ExecuteRequestContent, message.content)
+        op_config = cast(OperationSpec, content.operation_spec)
+        log_text = f"Failure callback for op {op_config.name}, Exception {e}, Traceback {tb}"
+        logging.info(log_text)
+        # Send failure reply to orchestrator so we don't get our workflow stuck
+        asyncio.run(self.messenger.send_failure_reply(event.id, e, tb))
+        return TopicEventResponse("drop")
+
     def fetch_work(self, event: v1.Event) -> TopicEventResponse:
         @add_trace
         def success_callback(message: WorkMessage) -> TopicEventResponse:
             add_span_attributes({"run_id": str(message.header.run_id)})
-            content = cast(ExecuteRequestContent, message.content)
-            op_config = cast(OperationSpec, content.operation_spec)
-            recursion_msg = f"Recursion error for op {op_config.name} - restarting pod."
             try:
-                try:
-                    cache_info = get_cache_info(
-                        self.dependency_resolver,
-                        content.input,
-                        op_config,
-                        get_current_trace_parent(),
-                    )
-                except RecursionError as e:
-                    logging.error(f"{recursion_msg} {e}")
-                    os._exit(1)
-                except Exception as e:
-                    raise RuntimeError(
-                        f"Failed to get cache info for op {op_config.name} with exception "
-                        f"{type(e)}:{e}"
-                    ) from e
+                cache_info = self._get_cache_info(message)
                 possible_output = self.retrieve_possible_output(
                     cache_info, self.executor, get_current_trace_parent()
                 )
-
-                async def async_closure():
-                    if possible_output is not None:
-                        await self.metadata_store.add_refs(
-                            str(message.run_id),
-                            OpRunId(name=cache_info.name, hash=cache_info.hash),
-                            possible_output,
-                        )
-                        logging.info(f"Cache hit for op {op_config.name}")
-                        await self.messenger.send_ack_reply(message)
-                        await self.messenger.send_success_reply(
-                            message, possible_output, cache_info
-                        )
-                    else:
-                        self.run_new_op(
-                            WorkMessageBuilder.add_cache_info_to_execute_request(
-                                cast(ExecuteRequestMessage, message), cache_info
-                            )
-                        )
-
-                asyncio.run(async_closure())
+                asyncio.run(self._dispatch(message, cache_info, possible_output))
             except RecursionError as e:
-                logging.error(f"{recursion_msg} {e}")
+                logging.error(f"Recursion error - restarting pod. {e}")
                 os._exit(1)
 
             logging.debug(f"Removing message for run_id {message.header.run_id} from queue")
             return TopicEventResponse("success")
 
-        @add_trace
-        def failure_callback(event: v1.Event, e: Exception, tb: List[str]) -> TopicEventResponse:
-            message = event_to_work_message(event)
-            content = cast(ExecuteRequestContent, message.content)
-            op_config = cast(OperationSpec, content.operation_spec)
-            log_text = f"Failure callback for op {op_config.name}, Exception {e}, Traceback {tb}"
-            logging.info(log_text)
-            # Send failure reply to orchestrator so we don't get our workflow stuck
-            asyncio.run(self.messenger.send_failure_reply(event.id, e, tb))
-            return TopicEventResponse("drop")
-
         update_telemetry_context(extract_message_header_from_event(event).current_trace_parent)
 
         with trace.get_tracer(__name__).start_as_current_span("fetch_work"):
-            return accept_or_fail_event(event, success_callback, failure_callback)  # type: ignore
+            return accept_or_fail_event(event, success_callback, self._failure_callback)  # type: ignore
+
+    def fetch_work_batch(self, events: List[v1.Event]) -> List[TopicEventResponse]:
+        """Processes a batch of execute requests, as `fetch_work` would one at a time.
+
+        The outputs of all requests are looked up in storage at once, and the replies (or
+        requests to workers) are then sent concurrently. Requests that fail are replied to
+        with an error and dropped, without affecting the rest of the batch.
+        """
+        responses: List[TopicEventResponse] = []
+        accepted: List[Tuple[int, WorkMessage, CacheInfo]] = []
+
+        def success_callback(message: WorkMessage) -> TopicEventResponse:
+            # Called while processing the event at index len(responses)
+            accepted.append((len(responses), message, self._get_cache_info(message)))
+            return TopicEventResponse("success")
+
+        with trace.get_tracer(__name__).start_as_current_span("fetch_work_batch"):
+            add_span_attributes({"num_events": len(events)})
+            for event in events:
+                responses.append(
+                    accept_or_fail_event(event, success_callback, self._failure_callback)  # type: ignore
+                )
+
+            try:
+                stored = self.storage.retrieve_outputs_from_inputs_if_exist(
+                    [cache_info for _, _, cache_info in accepted]
+                )
+            except Exception as e:
+                tb = traceback.format_tb(e.__traceback__)
+                for idx, _, _ in accepted:
+                    responses[idx] = self._failure_callback(events[idx], e, tb)
+                return responses
+            outputs = [None if o is None else OpIOConverter.serialize_output(o) for o in stored]
+            logging.info(
+                f"Cache batch of {len(events)} events: "
+                f"{sum(o is not None for o in outputs)} hits out of {len(accepted)} requests"
+            )
+
+            async def dispatch_all() -> List[Optional[BaseException]]:
+                semaphore = asyncio.Semaphore(MAX_PARALLEL_REQUESTS)
+
+                async def dispatch(
+                    message: WorkMessage, cache_info: CacheInfo, output: Optional[OpIOType]
+                ):
+                    async with semaphore:
+                        await self._dispatch(message, cache_info, output)
+
+                return await asyncio.gather(
+                    *[dispatch(m, c, o) for (_, m, c), o in zip(accepted, outputs)],
+                    return_exceptions=True,
+                )
+
+            for (idx, _, _), error in zip(accepted, asyncio.run(dispatch_all())):
+                if isinstance(error, Exception):
+                    tb = traceback.format_tb(error.__traceback__)
+                    responses[idx] = self._failure_callback(events[idx], error, tb)
+                elif error is not None:
+                    raise error
+        return responses
 
     def run(self):
         self.app = App()
@@ -215,9 +321,16 @@ class Cache:
         if self.otel_service_name:
             setup_telemetry(appname, self.otel_service_name)
 
-        @self.app.subscribe(self.pubsubname, self.cache_topic)
-        def fetch_work(event: v1.Event) -> TopicEventResponse:
-            return self.fetch_work(event)
+        # Execute requests of the subtasks of wide ops are delivered in bulk
+        @self.app.subscribe_bulk(self.pubsubname, self.cache_topic)
+        def fetch_work(events: List[v1.Event]) -> List[TopicEventResponse]:
+            return self.fetch_work_batch(events)
+
+        @self.app.method(name=CACHE_PROBE_METHOD)
+        async def probe(request: Request) -> Response:
+            body = (await request.body()).decode()
+            outputs = await run_in_threadpool(self.handle_probe, body)
+            return Response(content=outputs, media_type="application/json")
 
         self.start_service()
 
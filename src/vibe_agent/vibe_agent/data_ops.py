@@ -33,6 +33,7 @@ from vibe_common.messaging import (
     extract_message_header_from_event,
     run_id_from_traceparent,
 )
+from vibe_common.payloads import resolve_payload_async
 from vibe_common.schemas import OpRunId, OpRunIdDict
 from vibe_common.statestore import StateStore
 from vibe_common.telemetry import add_trace, setup_telemetry, update_telemetry_context
@@ -154,7 +155,8 @@ class DataOpsManager:
 
                 run_id = str(message.run_id)
                 op_run_id = OpRunId(content.cache_info.name, content.cache_info.hash)
-                await self.add_references(run_id, op_run_id, content.output)
+                output = await resolve_payload_async(content.output)
+                await self.add_references(run_id, op_run_id, output)
 
             return TopicEventResponseStatus.success
 
@@ -6,7 +6,7 @@ import inspect
 import logging
 import os
 from importlib.abc import Loader
-from typing import Any, Callable, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, Optional, Union
 
 from azure.cosmos.exceptions import CosmosResourceExistsError
 from hydra_zen import builds
@@ -17,14 +17,15 @@ from vibe_common.schemas import (
     CacheInfo,
     EntryPointDict,
     ItemDict,
+    OperationDependencyResolver,
     OperationParser,
     OperationSpec,
-    OpResolvedDependencies,
 )
 from vibe_common.secret_provider import SecretProvider, SecretProviderConfig
 from vibe_core import data
 from vibe_core.data.core_types import BaseVibeDict, InnerIOType, OpIOType, TypeDictVibe
 
+from .resource_usage import get_asset_bytes
 from .storage import Storage, StorageConfig
 
 
@@ -36,6 +37,8 @@ class Operation:
     inputs_spec: TypeDictVibe
     output_spec: TypeDictVibe
     version: str
+    # Total size of the assets produced by the last run of the op
+    asset_bytes: int = 0
 
     def __init__(
         self,
@@ -108,6 +111,7 @@ class Operation:
         self.logger.info(f"Running callback for op {self.name}")
         stac_results = self._call_validate_op(**items)
         self.logger.info(f"Callback finished for op {self.name}")
+        self.asset_bytes = get_asset_bytes(stac_results)
 
         try:
             items_out = self.storage.store(run_id, stac_results, cache_info)
@@ -173,25 +177,6 @@ class CallableBuilder:
         return callable
 
 
-class OperationDependencyResolver:
-    def __init__(self):
-        self._resolver_map = {"parameters": self._resolve_params}
-
-    def resolve(self, op_spec: OperationSpec) -> OpResolvedDependencies:
-        output: OpResolvedDependencies = {}
-        for item, dependencies_list in op_spec.dependencies.items():
-            try:
-                output[item] = self._resolver_map[item](op_spec, dependencies_list)
-            except Exception as e:
-                raise ValueError(
-                    f"Dependency {item}: {dependencies_list} could not be resolved"
-                ) from e
-        return output
-
-    def _resolve_params(self, op_spec: OperationSpec, params_to_resolve: List[str]):
-        return {param_name: op_spec.parameters[param_name] for param_name in params_to_resolve}
-
-
 class OperationFactory:
     converter: data.StacConverter
     storage: Storage
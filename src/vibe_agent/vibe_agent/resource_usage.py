@@ -0,0 +1,109 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""
+Accounting of the resources consumed by op runs.
+
+Ops run in a child process of the worker, which measures what it consumed (including the children
+it started and waited for) right before returning the op output. Child processes are forked, and
+start with the resident set of the process they were forked from, so their peak RSS is measured
+as an increase over the peak RSS they started with.
+"""
+
+import os
+import resource
+import sys
+import time
+from typing import Dict, Tuple
+
+from pystac.item import Item
+
+from vibe_common.schemas import ItemDict
+from vibe_core.datamodel import OpResourceUsage
+from vibe_core.uri import is_local, local_uri_to_path
+
+PROC_IO_PATH = "/proc/self/io"
+# ru_maxrss is reported in bytes on macOS, and in kilobytes elsewhere
+MAXRSS_BYTES = 1 if sys.platform == "darwin" else 1024
+# Unit of ru_inblock and ru_oublock, used when the I/O counters of the process are not available
+BLOCK_BYTES = 512
+
+
+def read_io_counters() -> Tuple[int, int]:
+    """
+    Return the number of bytes read and written by the current process and its waited-for children
+    (through system calls, so reads from the page cache and sockets are included).
+    """
+    try:
+        with open(PROC_IO_PATH) as f:
+            counters: Dict[str, int] = {}
+            for line in f:
+                name, value = line.split(":")
+                counters[name] = int(value)
+        return counters["rchar"], counters["wchar"]
+    except (OSError, KeyError, ValueError):
+        usages = [resource.getrusage(w) for w in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN)]
+        return (
+            sum(u.ru_inblock for u in usages) * BLOCK_BYTES,
+            sum(u.ru_oublock for u in usages) * BLOCK_BYTES,
+        )
+
+
+def get_asset_bytes(items: ItemDict) -> int:
+    """Return the total size of the local assets of the items."""
+    total = 0
+    for value in items.values():
+        for item in value if isinstance(value, list) else [value]:
+            if not isinstance(item, Item):
+                continue
+            for asset in item.assets.values():
+                if is_local(asset.href):
+                    path = local_uri_to_path(asset.href)
+                    if os.path.isfile(path):
+                        total += os.path.getsize(path)
+    return total
+
+
+class ResourceMeter:
+    """Measures the resources consumed by the current process since the meter was created."""
+
+    def __init__(self):
+        self.start_time = time.monotonic()
+        self.start_cpu_s = self._cpu_time_s()
+        self.start_read_bytes, self.start_write_bytes = read_io_counters()
+        self.start_maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    @staticmethod
+    def _cpu_time_s() -> float:
+        return sum(
+            u.ru_utime + u.ru_stime
+            for u in (
+                resource.getrusage(resource.RUSAGE_SELF),
+                resource.getrusage(resource.RUSAGE_CHILDREN),
+            )
+        )
+
+    def usage(self, asset_bytes: int = 0) -> OpResourceUsage:
+        """
+        Return the resources consumed so far. The peak RSS is how much the peak RSS of the
+        process grew since the meter was created (or the peak RSS of its largest child, if
+        larger), so it does not account for memory the process held before, and is 0 when the
+        process does not go over its previous peak (e.g., when it ran a larger op before).
+
+        Arguments:
+            asset_bytes: total size of the assets produced so far
+        """
+        read_bytes, write_bytes = read_io_counters()
+        peak_rss = max(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - self.start_maxrss,
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+        )
+        return OpResourceUsage(
+            runs=1,
+            wall_time_s=time.monotonic() - self.start_time,
+            cpu_time_s=self._cpu_time_s() - self.start_cpu_s,
+            peak_rss_bytes=peak_rss * MAXRSS_BYTES,
+            read_bytes=read_bytes - self.start_read_bytes,
+            write_bytes=write_bytes - self.start_write_bytes,
+            asset_bytes=asset_bytes,
+        )
@@ -6,7 +6,7 @@ from dataclasses import asdict, dataclass, fields
 from functools import lru_cache
 from hashlib import sha256
 from math import ceil
-from typing import Any, Dict, List, Optional, cast
+from typing import Any, Dict, List, Optional, Tuple, cast
 
 from azure.cosmos import ContainerProxy, CosmosClient, PartitionKey
 from azure.cosmos.aio import (
@@ -59,6 +59,8 @@ class RunInfo(CosmosData):
 class CosmosStorage(Storage):
     PARTITION_KEY = "/op_name"
     LIST_MIN_SIZE: int = 1
+    # Maximum number of ids in a single query, to keep queries under Cosmos DB's size limits
+    BULK_QUERY_MAX_IDS: int = 256
     # https://docs.microsoft.com/en-us/rest/api/cosmos-db/http-status-codes-for-cosmosdb
     entity_too_large_status_code: int = 413
 
@@ -255,6 +257,43 @@ class CosmosStorage(Storage):
 
         return self._retrieve_items(run_info, container)
 
+    def _query_by_ids(
+        self, container: ContainerProxy, op_name: str, ids: List[str], type: str
+    ) -> Dict[str, Dict[str, Any]]:
+        retrieved: Dict[str, Dict[str, Any]] = {}
+        for i in range(0, len(ids), self.BULK_QUERY_MAX_IDS):
+            query_ids = ids[i : i + self.BULK_QUERY_MAX_IDS]
+            results = container.query_items(
+                "SELECT * FROM c WHERE c.type = @type AND ARRAY_CONTAINS(@ids, c.id)",
+                parameters=[{"name": "@type", "value": type}, {"name": "@ids", "value": query_ids}],
+                partition_key=op_name,
+            )
+            retrieved.update({r["id"]: r for r in results})
+        return retrieved
+
+    def retrieve_outputs_from_inputs_if_exist(
+        self, cache_infos: List[CacheInfo]
+    ) -> List[Optional[ItemDict]]:
+        container = self._get_container()
+        run_info_fields = [f.name for f in fields(RunInfo)]
+        outputs: Dict[Tuple[str, str], ItemDict] = {}
+        for op_name in {c.name for c in cache_infos}:
+            hashes = sorted({c.hash for c in cache_infos if c.name == op_name})
+            run_infos = [
+                RunInfo(**{k: v for k, v in r.items() if k in run_info_fields})
+                for r in self._query_by_ids(container, op_name, hashes, "run_info").values()
+            ]
+            item_ids = sorted({i for r in run_infos for i in r.items})
+            item_lists = self._query_by_ids(container, op_name, item_ids, "item_list")
+            for run_info in run_infos:
+                if any(i not in item_lists for i in run_info.items):
+                    # Incomplete runs are handled as cache misses
+                    continue
+                outputs[op_name, run_info.id] = self.process_items(
+                    run_info, [item_lists[i] for i in run_info.items]
+                )
+        return [outputs.get((c.name, c.hash)) for c in cache_infos]
+
     async def retrieve_output_from_input_if_exists_async(
         self, cache_info: CacheInfo, **kwargs: Any
     ) -> Optional[ItemDict]:
@@ -96,6 +96,16 @@ class Storage(ABC):
     ) -> Optional[ItemDict]:
         raise NotImplementedError
 
+    def retrieve_outputs_from_inputs_if_exist(
+        self, cache_infos: List[CacheInfo]
+    ) -> List[Optional[ItemDict]]:
+        """
+        Bulk version of "retrieve_output_from_input_if_exists", returning the output of each op run
+        (or None, if it is not cached). Storage classes that can look up several op runs at once
+        should override this method.
+        """
+        return [self.retrieve_output_from_input_if_exists(c) for c in cache_infos]
+
     @abstractmethod
     def remove(self, op_run_id: OpRunId):
         """
@@ -36,20 +36,23 @@ from vibe_common.messaging import (
     extract_message_header_from_event,
     send_async,
 )
+from vibe_common.payloads import resolve_payload
 from vibe_common.schemas import CacheInfo
 from vibe_common.statestore import StateStore
 from vibe_common.telemetry import (
+    add_resource_usage_attributes,
     add_span_attributes,
     add_trace,
     setup_telemetry,
     update_telemetry_context,
 )
 from vibe_core.data.core_types import OpIOType
-from vibe_core.datamodel import RunConfig, RunStatus
+from vibe_core.datamodel import OpResourceUsage, RunConfig, RunStatus
 from vibe_core.logconfig import LOG_BACKUP_COUNT, MAX_LOG_FILE_BYTES, configure_logging
 from vibe_core.utils import get_input_ids
 
 from .ops import OperationFactoryConfig, OperationSpec
+from .resource_usage import ResourceMeter
 
 MESSAGING_RETRY_INTERVAL_S = 1
 TERMINATION_GRACE_PERIOD_S = 5
@@ -131,7 +134,8 @@ def run_op(
     spec: OperationSpec,
     input: OpIOType,
     cache_info: CacheInfo,
-) -> Union[OpIOType, traceback.TracebackException]:
+) -> Union[Tuple[OpIOType, OpResourceUsage], traceback.TracebackException]:
+    meter = ResourceMeter()
     logger = logging.getLogger(f"{__name__}.run_op")
     logger.info(f"Building op {spec.name} to process input {get_input_ids(input)}")
 
@@ -142,7 +146,9 @@ def run_op(
 
     try:
         factory = instantiate(factory_spec)
-        return factory.build(spec).run(input, cache_info)
+        op = factory.build(spec)
+        out = op.run(input, cache_info)
+        return out, meter.usage(op.asset_bytes)
     except Exception as e:
         return traceback.TracebackException.from_exception(e)
 
@@ -189,6 +195,7 @@ class WorkerMessenger:
         origin: WorkMessage,
         out: OpIOType,
         cache_info: Optional[CacheInfo] = None,
+        resources: Optional[OpResourceUsage] = None,
     ) -> None:
         if cache_info is None and not isinstance(origin, CacheInfoExecuteRequestMessage):
             raise ValueError(
@@ -202,7 +209,9 @@ class WorkerMessenger:
                 ids=content.cache_info.ids,
                 parameters=content.cache_info.parameters,
             )
-        await self.send(WorkMessageBuilder.build_execute_reply(origin.id, cache_info, out))
+        await self.send(
+            WorkMessageBuilder.build_execute_reply(origin.id, cache_info, out, resources)
+        )
         self.logger.debug(msg=f"Sent success response for {origin.id}")
 
     async def send_failure_reply(self, traceparent: str, e: Exception, tb: List[str]) -> None:
@@ -229,6 +238,8 @@ class Worker:
     termination_grace_period_s: int = 2
     state_store: StateStore
     current_child: Optional[ProcessFuture] = None
+    # Resources consumed by the last op that ran successfully
+    last_resource_usage: Optional[OpResourceUsage] = None
     factory_spec: OperationFactoryConfig  # type: ignore
     otel_service_name: str
 
@@ -339,7 +350,9 @@ class Worker:
             self.current_message = message
             content = cast(CacheInfoExecuteRequestContent, message.content)
             out = self.run_op_with_retry(content, message.run_id, timeout_s)
-            asyncio.run(self.messenger.send_success_reply(message, out))
+            asyncio.run(
+                self.messenger.send_success_reply(message, out, resources=self.last_resource_usage)
+            )
         except ShuttingDownException:
             # We are shutting down. Don't send a reply. Another worker will pick
             # this up.
@@ -460,6 +473,9 @@ class Worker:
         ret = self.get_future_result(
             self.current_child, self.child_monitoring_period_s, inner_timeout
         )
+        if isinstance(ret, tuple):
+            ret, self.last_resource_usage = ret
+            add_resource_usage_attributes(self.last_resource_usage)
 
         return ret
 
@@ -468,6 +484,8 @@ class Worker:
         self, content: CacheInfoExecuteRequestContent, run_id: UUID, timeout_s: float
     ) -> OpIOType:
         spec = cast(OperationSpec, content.operation_spec)
+        self.last_resource_usage = None
+        content.input = resolve_payload(content.input)
         ret: Union[traceback.TracebackException, OpIOType] = traceback.TracebackException(
             RuntimeError, RuntimeError(f"Couldn't run op {spec} at all (run id: {run_id})"), None
         )
@@ -0,0 +1,98 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import json
+from typing import Any, Dict, List
+
+from cloudevents.sdk.event import v1
+from fastapi.testclient import TestClient
+
+from vibe_common.dropdapr import (
+    BULK_MAX_AWAIT_DURATION_MS,
+    App,
+    TopicEventResponse,
+    TopicEventResponseStatus,
+    bulk_response,
+    request_to_bulk_events,
+)
+
+
+def cloud_event(id: str, data: Any) -> Dict[str, Any]:
+    return {
+        "type": "com.dapr.event.sent",
+        "id": id,
+        "source": "test",
+        "data": data,
+        "datacontenttype": "application/json",
+    }
+
+
+def bulk_request(*events: Any) -> Dict[str, Any]:
+    return {
+        "id": "bulk",
+        "topic": "topic",
+        "pubsubname": "pubsub",
+        "entries": [
+            {"entryId": f"entry{i}", "event": e, "contentType": "application/cloudevents+json"}
+            for i, e in enumerate(events)
+        ],
+    }
+
+
+def test_request_to_bulk_events():
+    request = bulk_request(
+        cloud_event("0", {"value": 0}), json.dumps(cloud_event("1", {"value": 1})), {"id": "2"}
+    )
+    events = request_to_bulk_events(request)
+    assert list(events) == ["entry0", "entry1", "entry2"]
+    assert events["entry0"] is not None and events["entry0"].data == {"value": 0}
+    assert events["entry1"] is not None and events["entry1"].EventID() == "1"
+    assert events["entry2"] is None
+
+
+def test_bulk_response():
+    response = bulk_response(
+        ["a", "b", "c"],
+        {"a": TopicEventResponse("retry"), "b": None},  # type: ignore
+    )
+    assert response == {
+        "statuses": [
+            {"entryId": "a", "status": "RETRY"},
+            {"entryId": "b", "status": "SUCCESS"},
+            {"entryId": "c", "status": "DROP"},
+        ]
+    }
+
+
+def test_bulk_subscription():
+    app = App()
+    batches: List[List[Any]] = []
+
+    @app.subscribe_bulk_async("pubsub", "topic", max_messages_count=10)
+    async def handler(events: List[v1.Event]) -> List[TopicEventResponse]:
+        batches.append([e.data["value"] for e in events])
+        if any(e.data["value"] < 0 for e in events):
+            raise RuntimeError("Try again")
+        return [TopicEventResponse("success" if e.data["value"] else "drop") for e in events]
+
+    client = TestClient(app.app)
+    subscriptions = client.get("/dapr/subscribe").json()
+    assert subscriptions[0]["bulkSubscribe"] == {
+        "enabled": True,
+        "maxMessagesCount": 10,
+        "maxAwaitDurationMs": BULK_MAX_AWAIT_DURATION_MS,
+    }
+
+    request = bulk_request(
+        cloud_event("0", {"value": 1}), "invalid", cloud_event("2", {"value": 0})
+    )
+    response = client.post(subscriptions[0]["route"], json=request).json()
+    # Invalid entries are dropped without reaching the handler
+    assert batches == [[1, 0]]
+    assert [s["status"] for s in response["statuses"]] == ["SUCCESS", "DROP", "DROP"]
+
+    request = bulk_request(cloud_event("0", {"value": 1}), cloud_event("1", {"value": -1}))
+    response = client.post(subscriptions[0]["route"], json=request).json()
+    assert [s["status"] for s in response["statuses"]] == [
+        TopicEventResponseStatus.retry["status"]
+    ] * 2
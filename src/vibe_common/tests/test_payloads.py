@@ -0,0 +1,212 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import asyncio
+import json
+import uuid
+from typing import Dict, Iterator, List
+from unittest.mock import patch
+
+import pytest
+from cloudevents.sdk.event import v1
+
+from vibe_common.messaging import (
+    CacheInfoExecuteRequestMessage,
+    ExecuteReplyContent,
+    ExecuteRequestContent,
+    ExecuteRequestMessage,
+    OperationSpec,
+    WorkMessageBuilder,
+    event_to_work_message,
+    gen_traceparent,
+    send,
+)
+from vibe_common.payloads import PayloadCache, PayloadReference, payload_cache
+from vibe_common.schemas import CacheInfo
+from vibe_core.data.core_types import OpIOType
+
+
+class FakePayloadStore:
+    ttl_s = 1000
+
+    def __init__(self):
+        self.data: Dict[str, str] = {}
+        self.stored: List[str] = []
+        self.retrieved: List[str] = []
+
+    def store(self, key: str, data: str) -> None:
+        self.stored.append(key)
+        self.data[key] = data
+
+    def retrieve(self, key: str) -> str:
+        self.retrieved.append(key)
+        return self.data[key]
+
+    async def store_async(self, key: str, data: str) -> None:
+        self.store(key, data)
+
+    async def retrieve_async(self, key: str) -> str:
+        await asyncio.sleep(0.01)
+        return self.retrieve(key)
+
+
+class ExpiringPayloadStore(FakePayloadStore):
+    """Payload store whose payloads expire after `ttl_s` seconds of `now`."""
+
+    def __init__(self):
+        super().__init__()
+        self.now = 0.0
+        self.expires_at: Dict[str, float] = {}
+
+    def store(self, key: str, data: str) -> None:
+        super().store(key, data)
+        self.expires_at[key] = self.now + self.ttl_s
+
+    def retrieve(self, key: str) -> str:
+        if self.now >= self.expires_at[key]:
+            raise KeyError(f"Payload {key} expired")
+        return super().retrieve(key)
+
+
+@pytest.fixture
+def store() -> Iterator[FakePayloadStore]:
+    store = FakePayloadStore()
+    with patch.object(payload_cache, "store", store):
+        payload_cache._entries.clear()
+        payload_cache.size = 0
+        yield store
+    payload_cache._entries.clear()
+    payload_cache.size = 0
+
+
+def make_input(num_items: int) -> OpIOType:
+    return {"rasters": [{"id": f"raster-{i}", "assets": {}} for i in range(num_items)]}
+
+
+def to_event(message: ExecuteRequestMessage) -> v1.Event:
+    event = v1.Event()
+    event.data = json.dumps(message.to_cloud_event("test")["data"]).encode()
+    return event
+
+
+def request(simple_op_spec: OperationSpec, input: OpIOType) -> ExecuteRequestMessage:
+    run_id = uuid.uuid4()
+    message = WorkMessageBuilder.build_execute_request(
+        run_id, gen_traceparent(run_id), simple_op_spec, input
+    )
+    return message  # type: ignore
+
+
+@patch("requests.post")
+@patch.object(payload_cache, "threshold", 1000)
+def test_large_payloads_are_sent_by_reference(
+    _, store: FakePayloadStore, simple_op_spec: OperationSpec
+):
+    small = request(simple_op_spec, make_input(1))
+    send(small, "test", "fake", "fake")
+    assert not store.stored
+    assert isinstance(small.content.input, dict)
+
+    input = make_input(100)
+    message = request(simple_op_spec, input)
+    send(message, "test", "fake", "fake")
+    reference = message.content.input
+    assert isinstance(reference, PayloadReference)
+    assert store.stored == [reference.key]
+    assert len(to_event(message).data) < reference.size
+
+    # The same payload is only stored once
+    send(request(simple_op_spec, input), "test", "fake", "fake")
+    assert len(store.stored) == 1
+
+    received = event_to_work_message(to_event(message))
+    content = received.content
+    assert isinstance(content, ExecuteRequestContent)
+    assert content.input == reference
+    # Forwarding the request keeps the reference, without resolving it
+    forwarded = WorkMessageBuilder.add_cache_info_to_execute_request(
+        received,
+        CacheInfo("test_op", "1.0", {}, {}),  # type: ignore
+    )
+    assert isinstance(forwarded, CacheInfoExecuteRequestMessage)
+    assert forwarded.content.input == reference
+
+
+def test_references_are_resolved_once(store: FakePayloadStore):
+    writer = PayloadCache(store, threshold=100)
+    reader = PayloadCache(store, threshold=100)
+    input = make_input(100)
+    reference = writer.reference(input)
+    assert isinstance(reference, PayloadReference)
+    # The service that stored the payload does not need to fetch it
+    assert writer.resolve(reference) is input
+    assert reader.resolve(reference) == input
+    assert reader.resolve(reference) == input
+    assert store.retrieved == [reference.key]
+    assert reader.fetches == 1
+    # Values are passed as they are
+    assert reader.resolve(input) is input
+
+
+def test_concurrent_async_resolutions_share_fetch(store: FakePayloadStore):
+    writer = PayloadCache(store, threshold=100)
+    reader = PayloadCache(store, threshold=100)
+    reference = asyncio.run(writer.reference_async(make_input(100)))
+
+    async def resolve_all():
+        return await asyncio.gather(*[reader.resolve_async(reference) for _ in range(5)])
+
+    results = asyncio.run(resolve_all())
+    assert all(r == make_input(100) for r in results)
+    assert store.retrieved == [reference.key]
+
+
+def test_cache_is_bounded(store: FakePayloadStore):
+    cache = PayloadCache(store, threshold=100, max_bytes=5000)
+    references = [cache.reference(make_input(100 + i)) for i in range(3)]
+    assert cache.size <= 5000
+    assert [r.payload_ref in cache for r in references] == [False, False, True]  # type: ignore
+
+
+@patch.object(payload_cache, "threshold", 1000)
+def test_known_payloads_are_not_stored_again(store: FakePayloadStore):
+    run_id = uuid.uuid4()
+    output = make_input(100)
+    reply = WorkMessageBuilder.build_execute_reply(
+        gen_traceparent(run_id), CacheInfo("test_op", "1.0", {}, {}), output
+    )
+    asyncio.run(payload_cache.reference_async(output))
+    with patch("requests.post"):
+        send(reply, "test", "fake", "fake")
+    content = reply.content
+    assert isinstance(content, ExecuteReplyContent)
+    assert isinstance(content.output, PayloadReference)
+    # Only a single copy was stored
+    assert len(store.stored) == 1
+
+
+def test_payloads_are_stored_again_before_they_expire():
+    store = ExpiringPayloadStore()
+    writer = PayloadCache(store, threshold=100)
+    input = make_input(100)
+    with patch("vibe_common.payloads.monotonic", lambda: store.now):
+        reference = writer.reference(input)
+        store.now = store.ttl_s * 0.4
+        assert writer.reference(input) == reference
+        assert len(store.stored) == 1
+        store.now = store.ttl_s * 0.6
+        assert asyncio.run(writer.reference_async(input)) == reference
+        assert len(store.stored) == 2
+    # The reference handed out last is valid for longer than the remaining TTL of the first store
+    store.now = store.ttl_s * 1.2
+    assert PayloadCache(store).resolve(reference) == input
+
+
+def test_resolved_payloads_are_stored_when_referenced(store: FakePayloadStore):
+    input = make_input(100)
+    reference = PayloadCache(store, threshold=100).reference(input)
+    reader = PayloadCache(store, threshold=100)
+    reader.resolve(reference)
+    # The reader does not know when the payload was stored, so it stores it again
+    assert reader.reference(input) == reference
+    assert store.stored == [reference.key, reference.key]
@@ -0,0 +1,132 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, List, Optional
+from uuid import uuid4
+
+import pytest
+
+from vibe_common.constants import RUN_INDEX_KEY, RUNS_KEY
+from vibe_common.run_index import RunIndex, shard_key
+from vibe_common.statestore import StateConflictError, TransactionOperation
+from vibe_dev.testing.statestore import InMemoryStateStore
+
+START = datetime(2023, 5, 1, 12)
+
+
+@pytest.mark.anyio
+async def test_add_and_scan_runs():
+    store = InMemoryStateStore()
+    index = RunIndex(store)
+    times = [START + timedelta(hours=7 * i) for i in range(10)]
+    ids = [str(uuid4()) for _ in times]
+    # Add runs out of order, the index is still sorted by submission time
+    for i in [3, 0, 9, 1, 2, 8, 4, 7, 5, 6]:
+        await index.add(ids[i], times[i])
+
+    assert await index.list_run_ids() == ids
+    assert [e.run_id async for e in index.scan(newest_first=True)] == ids[::-1]
+    assert await index.list_run_ids(start=times[2], end=times[6]) == ids[2:6]
+    # One shard per day
+    assert len(store._get(RUN_INDEX_KEY)["shards"]) == 4
+
+
+@pytest.mark.anyio
+async def test_add_touches_a_single_shard():
+    store = InMemoryStateStore()
+    index = RunIndex(store)
+    for i in range(50):
+        await index.add(str(uuid4()), START - timedelta(days=i))
+    store.calls = {}
+    run_id = str(uuid4())
+    run_op: TransactionOperation = {"key": run_id, "operation": "upsert", "value": {"a": 1}}
+    await index.add(run_id, START, [run_op])
+    # One shard read and one transaction, regardless of the number of runs
+    assert store.calls == {"retrieve_with_etag": 1, "transaction": 1}
+    assert store._get(run_id) == {"a": 1}
+
+
+@pytest.mark.anyio
+async def test_concurrent_adds_are_not_lost():
+    store = InMemoryStateStore()
+    # Two indices emulate two server replicas sharing the same store
+    indices = [RunIndex(store), RunIndex(store)]
+    original_transaction = store.transaction
+    interleave = asyncio.Event()
+
+    async def slow_transaction(operations: List[TransactionOperation], *args: Any):
+        # Let the other replica read the shard before this one writes it
+        interleave.set()
+        await asyncio.sleep(0)
+        await original_transaction(operations)
+
+    store.transaction = slow_transaction  # type: ignore
+    ids = [str(uuid4()) for _ in range(20)]
+    await asyncio.gather(
+        *[indices[i % 2].add(run_id, START + timedelta(seconds=i)) for i, run_id in enumerate(ids)]
+    )
+    assert await indices[0].list_run_ids() == ids
+
+
+@pytest.mark.anyio
+async def test_gives_up_after_max_retries():
+    store = InMemoryStateStore()
+    index = RunIndex(store, max_retries=3)
+    await index.migrate()
+
+    async def conflicting_transaction(*args: Any):
+        raise StateConflictError("conflict")
+
+    store.transaction = conflicting_transaction  # type: ignore
+    with pytest.raises(StateConflictError):
+        await index.add(str(uuid4()), START)
+
+
+@pytest.mark.anyio
+async def test_migrates_legacy_run_list():
+    store = InMemoryStateStore()
+    legacy_ids = [str(uuid4()) for _ in range(5)]
+    times: List[Optional[datetime]] = [START + timedelta(days=i) for i in range(4)] + [None]
+    for run_id, submission_time in zip(legacy_ids, times):
+        await store.store(run_id, {"id": run_id, "details": {"submission_time": submission_time}})
+    await store.store(RUNS_KEY, legacy_ids)
+
+    index = RunIndex(store)
+    new_id = str(uuid4())
+    await index.add(new_id, START + timedelta(days=10))
+
+    # The run without submission time is listed first
+    assert await index.list_run_ids() == legacy_ids[-1:] + legacy_ids[:-1] + [new_id]
+    # The legacy key is left untouched
+    assert store._get(RUNS_KEY) == legacy_ids
+
+    # A second index (e.g., after a restart) does not migrate again
+    store.data[shard_key("1970-01-01")] = "[]"
+    assert len(await RunIndex(store).list_run_ids()) == len(legacy_ids)
+
+
+@pytest.mark.anyio
+async def test_empty_store():
+    index = RunIndex(InMemoryStateStore())
+    assert await index.list_run_ids() == []
+
+
+@pytest.mark.anyio
+async def test_scan_resumes_after_entry():
+    store = InMemoryStateStore()
+    index = RunIndex(store)
+    # Two runs share the same submission time, so the run id breaks the tie
+    times = [START + timedelta(hours=10 * i) for i in range(6)] + [START]
+    ids = [str(uuid4()) for _ in times]
+    for i, (run_id, t) in enumerate(zip(ids, times)):
+        await index.add(run_id, t, workflow="a" if i % 2 else "b")
+
+    entries = [e async for e in index.scan()]
+    assert [e.workflow for e in entries if e.run_id == ids[1]] == ["a"]
+    for newest_first in (False, True):
+        ordered = entries[::-1] if newest_first else entries
+        for i, entry in enumerate(ordered):
+            resumed = [e async for e in index.scan(newest_first=newest_first, after=entry)]
+            assert resumed == ordered[i + 1 :]
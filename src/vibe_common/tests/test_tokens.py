@@ -0,0 +1,80 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import base64
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from vibe_common.tokens import BlobLocation, BlobTokenManagerConnectionString, parse_blob_url
+
+ACCOUNT_URL = "https://fakeaccount.blob.core.windows.net"
+CONNECTION_STRING = (
+    "DefaultEndpointsProtocol=https;AccountName=fakeaccount;"
+    f"AccountKey={base64.b64encode(b'fake-key').decode()};EndpointSuffix=core.windows.net"
+)
+
+
+def sas_params(url: str):
+    return parse_qs(urlparse(url).query)
+
+
+def test_parse_blob_url():
+    url = f"{ACCOUNT_URL}/assets/some%20dir/file.tif"
+    assert parse_blob_url(url) == BlobLocation("fakeaccount", "assets", "some dir/file.tif")
+    # Storage emulator URLs have the account name in their path
+    url = "http://127.0.0.1:10000/devstoreaccount1/assets/file.tif"
+    assert parse_blob_url(url) == BlobLocation("devstoreaccount1", "assets", "file.tif")
+
+
+def test_container_scoped_tokens_are_shared():
+    manager = BlobTokenManagerConnectionString(CONNECTION_STRING, container_scoped=True)
+    with patch.object(manager, "_generate_token", wraps=manager._generate_token) as generate:
+        signed = [manager.sign_url(f"{ACCOUNT_URL}/assets/{i}/file.tif") for i in range(10)]
+        other = manager.sign_url(f"{ACCOUNT_URL}/other/file.tif?previous=token")
+    assert generate.call_count == 2
+    assert signed[0].startswith(f"{ACCOUNT_URL}/assets/0/file.tif?")
+    assert other.startswith(f"{ACCOUNT_URL}/other/file.tif?")
+    assert "previous" not in sas_params(other)
+    assert len({urlparse(s).query for s in signed}) == 1
+    params = sas_params(signed[0])
+    assert params["sr"] == ["c"] and params["sp"] == ["r"]
+    expiry = datetime.strptime(params["se"][0], "%Y-%m-%dT%H:%M:%SZ")
+    assert expiry >= datetime.utcnow() + manager.sas_expiration - timedelta(seconds=1)
+    assert expiry <= datetime.utcnow() + manager.sas_expiration + manager.sas_refresh_interval
+
+
+def test_tokens_are_blob_scoped_by_default():
+    manager = BlobTokenManagerConnectionString(CONNECTION_STRING)
+    urls = [f"{ACCOUNT_URL}/assets/{i}/file.tif" for i in range(3)]
+    with patch.object(manager, "_generate_token", wraps=manager._generate_token) as generate:
+        signed = [manager.sign_url(url) for url in urls + urls]
+    assert generate.call_count == len(urls)
+    assert signed[: len(urls)] == signed[len(urls) :]
+    assert len({urlparse(s).query for s in signed}) == len(urls)
+    assert sas_params(signed[0])["sr"] == ["b"]
+
+
+def test_tokens_are_refreshed():
+    manager = BlobTokenManagerConnectionString(CONNECTION_STRING, container_scoped=True)
+    url = f"{ACCOUNT_URL}/assets/file.tif"
+    now = datetime.utcnow()
+    with patch("vibe_common.tokens.datetime") as mock_datetime:
+        mock_datetime.utcnow.return_value = now
+        first = manager.sign_url(url)
+        mock_datetime.utcnow.return_value = now + manager.sas_refresh_interval
+        second = manager.sign_url(url)
+    first_expiry, second_expiry = sas_params(first)["se"], sas_params(second)["se"]
+    assert first_expiry != second_expiry
+
+
+def test_invalid_refresh_interval():
+    with pytest.raises(ValueError):
+        BlobTokenManagerConnectionString(CONNECTION_STRING, sas_refresh_interval=timedelta(days=2))
+
+
+def test_key_lease_must_outlive_tokens():
+    with pytest.raises(ValueError, match="Key lease time"):
+        BlobTokenManagerConnectionString(CONNECTION_STRING, lease_time_ratio=1)
@@ -2,10 +2,15 @@
 # Licensed under the MIT License.
 
 from datetime import datetime
-from typing import Any
+from typing import Any, AsyncIterator, List, Tuple
+from unittest.mock import patch
 
 import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from dapr.conf import settings
 
+from vibe_common.dapr import StateConflictError
 from vibe_common.vibe_dapr_client import VibeDaprClient
 from vibe_core.datamodel import Message, SpatioTemporalJson
 
@@ -64,3 +69,59 @@ async def test_state_store_response_deserialize_floats():
     assert isinstance(test_response_json["geojson"]["coordinates"][1], float)
     assert test_response_json["geojson"]["coordinates"][0] == lat
     assert test_response_json["geojson"]["coordinates"][1] == lon
+
+
+# What the Dapr sidecar answers when a transaction fails because of an ETag mismatch
+ETAG_MISMATCH_BODY = {
+    "errorCode": "ERR_STATE_TRANSACTION",
+    "message": "error while executing state transaction: possible etag mismatch. "
+    "error from state store: Entity with the specified id already exists in the system.",
+}
+
+
+@pytest.fixture
+async def dapr_sidecar() -> AsyncIterator[Tuple[TestServer, List[web.Request]]]:
+    requests: List[web.Request] = []
+
+    async def transaction(request: web.Request) -> web.Response:
+        requests.append(request)
+        return web.json_response(ETAG_MISMATCH_BODY, status=500)
+
+    async def failure(request: web.Request) -> web.Response:
+        requests.append(request)
+        return web.json_response(
+            {"errorCode": "ERR_STATE_TRANSACTION", "message": "connection reset"}, status=500
+        )
+
+    app = web.Application()
+    app.router.add_post("/v1.0/state/statestore/transaction", transaction)
+    app.router.add_post("/v1.0/state/failing/transaction", failure)
+    async with TestServer(app, host=settings.DAPR_RUNTIME_HOST) as server:
+        yield server, requests
+
+
+@pytest.mark.anyio
+async def test_transaction_etag_mismatch_raises_conflict(
+    dapr_sidecar: Tuple[TestServer, List[web.Request]],
+):
+    server, requests = dapr_sidecar
+    with pytest.raises(StateConflictError):
+        await VibeDaprClient().post(
+            str(server.make_url("/v1.0/state/statestore/transaction")), {}, traceparent=None
+        )
+    # Conflicts are not retried
+    assert len(requests) == 1
+
+
+@pytest.mark.anyio
+@patch("vibe_common.vibe_dapr_client.MAX_SESSION_ATTEMPTS", 2)
+async def test_failed_transaction_is_retried_and_raised(
+    dapr_sidecar: Tuple[TestServer, List[web.Request]],
+):
+    server, requests = dapr_sidecar
+    with pytest.raises(RuntimeError, match="Response 500") as exc_info:
+        await VibeDaprClient().post(
+            str(server.make_url("/v1.0/state/failing/transaction")), {}, traceparent=None
+        )
+    assert not isinstance(exc_info.value, StateConflictError)
+    assert len(requests) == 2
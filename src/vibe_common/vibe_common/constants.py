@@ -31,6 +31,7 @@ CONTROL_STATUS_PUBSUB: Final[str] = "control-pubsub"
 CONTROL_PUBSUB_TOPIC: Final[str] = "commands"
 CACHE_PUBSUB_TOPIC: Final[str] = "cache-commands"
 STATUS_PUBSUB_TOPIC: Final[str] = "updates"
+RUN_STATUS_PUBSUB_TOPIC: Final[str] = "run-status-updates"
 
 TRACEPARENT_VERSION: Final[str] = "00"
 TRACEPARENT_FLAGS: Final[int] = 1
@@ -64,8 +65,16 @@ DATA_OPS_INVOKE_URL_TEMPLATE: Final[str] = (
     f"{SERVICE_INVOCACATION_URL_PATH}/terravibes-data-ops/method/"
     "{}/{}"
 )
+CACHE_PROBE_METHOD: Final[str] = "probe"
+CACHE_INVOKE_URL_TEMPLATE: Final[str] = (
+    f"http://{settings.DAPR_RUNTIME_HOST}:{settings.DAPR_HTTP_PORT}"
+    f"{SERVICE_INVOCACATION_URL_PATH}/terravibes-cache/method/"
+    "{}"
+)
 
 RUNS_KEY: Final[str] = "runs"
+RUN_INDEX_KEY: Final[str] = "runs-index"
+RUN_INDEX_SHARD_KEY_TEMPLATE: Final[str] = "runs-{}"
 ALLOWED_ORIGINS: Final[List[str]] = [
     o
     for o in os.getenv(
@@ -80,6 +89,14 @@ ALLOWED_ORIGINS: Final[List[str]] = [
 
 MAX_PARALLEL_REQUESTS: Final[int] = 8
 
+# Op inputs and outputs larger than this (in bytes of JSON) are sent by reference through the
+# message bus, and stored in the state store. Set to 0 to always send them by value.
+PAYLOAD_REFERENCE_THRESHOLD: Final[int] = int(
+    os.environ.get("PAYLOAD_REFERENCE_THRESHOLD", 64 * 1024)
+)
+PAYLOAD_KEY_TEMPLATE: Final[str] = "payload-{}"
+PAYLOAD_TTL_S: Final[int] = 7 * 24 * 60 * 60
+
 HERE = os.path.dirname(os.path.abspath(__file__))
 DEFAULT_OPS_DIR = os.path.abspath(os.path.join(HERE, "..", "..", "..", "ops"))
 if not os.path.exists(DEFAULT_OPS_DIR):
@@ -2,6 +2,7 @@
 # Licensed under the MIT License.
 
 import asyncio
+import json
 import logging
 from functools import partial, wraps
 from typing import Any, Callable, overload
@@ -16,6 +17,10 @@ MAX_TIMEOUT_TRIES = 3
 DAPR_WAIT_TIME_S = 90
 
 
+class StateConflictError(RuntimeError):
+    """Raised when a state write is rejected because the stored value changed since it was read."""
+
+
 def dapr_ready_decorator(
     func: Callable[..., Any], dapr_wait_time_s: int = DAPR_WAIT_TIME_S
 ) -> Callable[..., Any]:
@@ -66,12 +71,40 @@ def dapr_ready(func: Any = None, *, dapr_wait_time_s: int = DAPR_WAIT_TIME_S) ->
         return dapr_ready_decorator(func, dapr_wait_time_s=dapr_wait_time_s)
 
 
-def process_dapr_state_response(response: ClientResponse) -> ClientResponse:
+def is_transaction_etag_mismatch(status: int, content: bytes) -> bool:
+    """Whether a state response reports an ETag mismatch in a transaction.
+
+    Dapr answers ETag mismatches in single-key writes with 409, but transactions fail with 500 and
+    an `ERR_STATE_TRANSACTION` error that mentions the mismatch, e.g.:
+
+        {"errorCode": "ERR_STATE_TRANSACTION", "message": "error while executing state
+        transaction: possible etag mismatch. error from state store: ..."}
+    """
+    if status != 500:
+        return False
+    try:
+        error = json.loads(content)
+    except ValueError:
+        return False
+    return (
+        isinstance(error, dict)
+        and error.get("errorCode") == "ERR_STATE_TRANSACTION"
+        and "etag mismatch" in str(error.get("message", "")).lower()
+    )
+
+
+async def process_dapr_state_response(response: ClientResponse) -> ClientResponse:
     if not response.ok:
+        content = await response.read()
         if response.status == 400:
             raise RuntimeError("State store is not configured")
         elif response.status == 404:
             raise KeyError(f"Key specified in {response.url} not found")
+        elif response.status == 409 or is_transaction_etag_mismatch(response.status, content):
+            raise StateConflictError(f"ETag mismatch when writing state to {response.url}")
+        raise RuntimeError(
+            f"Response {response.status} for {response.url} -- response body: {content!r}"
+        )
     if response.request_info.method == "GET" and response.status == 204:
         # https://docs.dapr.io/reference/api/state_api/#http-response-1
         raise KeyError(f"Key specified in {response.url} not found")
@@ -98,7 +131,7 @@ async def process_dapr_response(response: ClientResponse) -> ClientResponse:
         return response
 
     if response.url.path.startswith(STATE_URL_PATH):
-        return process_dapr_state_response(response)
+        return await process_dapr_state_response(response)
     elif response.url.path.startswith(SERVICE_INVOCACATION_URL_PATH):
         return await process_dapr_service_invocation_response(response)
     else:
@@ -119,8 +152,7 @@ async def handle_aiohttp_timeout(response: ClientResponse) -> ClientResponse:
         except asyncio.TimeoutError:
             tries += 1
             logger.warning(
-                f"Timeout interacting with Dapr via HTTP, "
-                f"retrying ({tries}/{MAX_TIMEOUT_TRIES})"
+                f"Timeout interacting with Dapr via HTTP, retrying ({tries}/{MAX_TIMEOUT_TRIES})"
             )
             if tries >= MAX_TIMEOUT_TRIES:
                 raise
@@ -3,9 +3,26 @@
 
 """
 dropdapr - A drop-in replacement for dapr-ext-grpc subscribe using FastAPI.
+
+Besides one event per request, subscriptions may receive events in bulk (see
+https://docs.dapr.io/developing-applications/building-blocks/pubsub/pubsub-bulk/), in which case
+handlers get a list of events and return a response for each of them.
 """
 
-from typing import Any, Awaitable, Callable, Coroutine, Dict, List, Optional, TypedDict, Union
+import json
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Coroutine,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    TypedDict,
+    Union,
+    cast,
+)
 
 import uvicorn
 from cloudevents.sdk.event import v1
@@ -14,6 +31,11 @@ from pydantic import BaseConfig
 
 BaseConfig.arbitrary_types_allowed = True
 
+# Largest number of events dapr delivers in a bulk request
+BULK_MAX_MESSAGES_COUNT = 100
+# How long dapr waits for events to fill a bulk request before delivering it
+BULK_MAX_AWAIT_DURATION_MS = 40
+
 
 class TopicEventResponse(Dict[str, str]):
     def __getattr__(self, attr: str):
@@ -33,6 +55,20 @@ class TopicEventResponseStatus:
     drop: TopicEventResponse = TopicEventResponse({"status": "DROP"})
 
 
+def request_to_event(request: Dict[str, Any]) -> v1.Event:
+    """Builds a CloudEvent from the body of a request made by dapr to a subscription route."""
+    event = v1.Event()
+    event.SetEventType(request["type"])
+    event.SetEventID(request["id"])
+    event.SetSource(request["source"])
+    try:
+        event.SetData(request["data"])
+    except KeyError:
+        event.SetData(request["data_base64"])
+    event.SetContentType(request["datacontenttype"])
+    return event
+
+
 class DaprSubscription(TypedDict):
     pubsubname: str
     topic: str
@@ -40,6 +76,49 @@ class DaprSubscription(TypedDict):
     metadata: Optional[Dict[str, str]]
 
 
+class BulkSubscribeOptions(TypedDict):
+    enabled: bool
+    maxMessagesCount: int
+    maxAwaitDurationMs: int
+
+
+class BulkDaprSubscription(DaprSubscription):
+    bulkSubscribe: BulkSubscribeOptions
+
+
+def request_to_bulk_events(request: Dict[str, Any]) -> Dict[str, Optional[v1.Event]]:
+    """Builds CloudEvents from the entries of a bulk request made by dapr to a subscription route.
+
+    Returns the events by entry id, with None for entries that are not valid CloudEvents.
+    """
+    events: Dict[str, Optional[v1.Event]] = {}
+    for entry in request.get("entries") or []:
+        event = entry.get("event")
+        try:
+            events[entry["entryId"]] = request_to_event(
+                json.loads(event) if isinstance(event, (str, bytes)) else event
+            )
+        except (KeyError, TypeError, ValueError):
+            events[entry["entryId"]] = None
+    return events
+
+
+def bulk_response(
+    entry_ids: Sequence[str], responses: Dict[str, Optional[TopicEventResponse]]
+) -> Dict[str, List[Dict[str, str]]]:
+    """Builds the response to a bulk request, with the status of each entry.
+
+    Entries without a response are dropped, and entries whose response has no status (handlers
+    that return nothing) are acknowledged, as they would be when delivered one at a time.
+    """
+    statuses: List[Dict[str, str]] = []
+    for entry_id in entry_ids:
+        response = responses.get(entry_id, TopicEventResponseStatus.drop)
+        status = TopicEventResponseStatus.success if response is None else response
+        statuses.append({"entryId": entry_id, "status": status["status"]})
+    return {"statuses": statuses}
+
+
 class App:
     def __init__(self):
         self.app = FastAPI()
@@ -93,15 +172,7 @@ class App:
     def subscribe_async(self, pubsub: str, topic: str, metadata: Optional[Dict[str, str]] = {}):
         def decorator(func: Callable[[v1.Event], Awaitable[Any]]):
             async def event_wrapper(request: Dict[str, Any]):
-                event = v1.Event()
-                event.SetEventType(request["type"])
-                event.SetEventID(request["id"])
-                event.SetSource(request["source"])
-                try:
-                    event.SetData(request["data"])
-                except KeyError:
-                    event.SetData(request["data_base64"])
-                event.SetContentType(request["datacontenttype"])
+                event = request_to_event(request)
                 try:
                     return await func(event)
                 except RuntimeError:
@@ -113,18 +184,87 @@ class App:
 
         return decorator
 
+    def add_bulk_subscription(
+        self,
+        handler: Callable[..., Any],
+        pubsub: str,
+        topic: str,
+        metadata: Optional[Dict[str, str]] = {},
+        max_messages_count: int = BULK_MAX_MESSAGES_COUNT,
+        max_await_duration_ms: int = BULK_MAX_AWAIT_DURATION_MS,
+    ):
+        self.add_subscription(handler, pubsub, topic, metadata)
+        subscription = cast(BulkDaprSubscription, self.subscriptions[-1])
+        subscription["bulkSubscribe"] = {
+            "enabled": True,
+            "maxMessagesCount": max_messages_count,
+            "maxAwaitDurationMs": max_await_duration_ms,
+        }
+
+    def subscribe_bulk_async(
+        self,
+        pubsub: str,
+        topic: str,
+        metadata: Optional[Dict[str, str]] = {},
+        max_messages_count: int = BULK_MAX_MESSAGES_COUNT,
+        max_await_duration_ms: int = BULK_MAX_AWAIT_DURATION_MS,
+    ):
+        """Subscribes to a topic with bulk delivery.
+
+        The decorated function receives the valid events of each bulk request, and returns one
+        response for each of them, in order.
+        """
+
+        def decorator(func: Callable[[List[v1.Event]], Awaitable[List[Any]]]):
+            async def event_wrapper(request: Dict[str, Any]):
+                events = request_to_bulk_events(request)
+                valid = {i: e for i, e in events.items() if e is not None}
+                try:
+                    responses = await func(list(valid.values()))
+                except RuntimeError:
+                    responses = [TopicEventResponseStatus.retry] * len(valid)
+                except Exception:
+                    responses = [TopicEventResponseStatus.drop] * len(valid)
+                return bulk_response(list(events), dict(zip(valid, responses)))
+
+            self.add_bulk_subscription(
+                event_wrapper, pubsub, topic, metadata, max_messages_count, max_await_duration_ms
+            )
+
+        return decorator
+
+    def subscribe_bulk(
+        self,
+        pubsub: str,
+        topic: str,
+        metadata: Optional[Dict[str, str]] = {},
+        max_messages_count: int = BULK_MAX_MESSAGES_COUNT,
+        max_await_duration_ms: int = BULK_MAX_AWAIT_DURATION_MS,
+    ):
+        """Synchronous counterpart of `subscribe_bulk_async`."""
+
+        def decorator(func: Callable[[List[v1.Event]], List[Any]]):
+            def event_wrapper(request: Dict[str, Any]):
+                events = request_to_bulk_events(request)
+                valid = {i: e for i, e in events.items() if e is not None}
+                try:
+                    responses = func(list(valid.values()))
+                except RuntimeError:
+                    responses = [TopicEventResponseStatus.retry] * len(valid)
+                except Exception:
+                    responses = [TopicEventResponseStatus.drop] * len(valid)
+                return bulk_response(list(events), dict(zip(valid, responses)))
+
+            self.add_bulk_subscription(
+                event_wrapper, pubsub, topic, metadata, max_messages_count, max_await_duration_ms
+            )
+
+        return decorator
+
     def subscribe(self, pubsub: str, topic: str, metadata: Optional[Dict[str, str]] = {}):
         def decorator(func: Callable[[v1.Event], Any]):
             def event_wrapper(request: Dict[str, Any]):
-                event = v1.Event()
-                event.SetEventType(request["type"])
-                event.SetEventID(request["id"])
-                event.SetSource(request["source"])
-                try:
-                    event.SetData(request["data"])
-                except KeyError:
-                    event.SetData(request["data_base64"])
-                event.SetContentType(request["datacontenttype"])
+                event = request_to_event(request)
                 try:
                     return func(event)
                 except RuntimeError:
@@ -41,19 +41,26 @@ from pystac.item import Item
 import vibe_common.telemetry as telemetry
 from vibe_core.data.core_types import OpIOType
 from vibe_core.data.utils import get_base_type, is_container_type, serialize_stac
-from vibe_core.datamodel import decode, encode
+from vibe_core.datamodel import OpResourceUsage, decode, encode
 from vibe_core.utils import get_input_ids
 
 from .constants import (
     CACHE_PUBSUB_TOPIC,
     CONTROL_PUBSUB_TOPIC,
     PUBSUB_URL_TEMPLATE,
+    RUN_STATUS_PUBSUB_TOPIC,
     STATUS_PUBSUB_TOPIC,
     TRACEPARENT_FLAGS,
     TRACEPARENT_STRING,
     WORKFLOW_REQUEST_PUBSUB_TOPIC,
 )
 from .dropdapr import TopicEventResponse as HttpTopicEventResponse
+from .payloads import (
+    OpIOPayload,
+    PayloadReference,
+    reference_payload,
+    reference_payload_async,
+)
 from .schemas import CacheInfo, OperationSpec
 
 CLOUDEVENTS_JSON: Final[str] = "application/cloudevents+json"
@@ -70,6 +77,7 @@ MessageContent = Union[
     "EvictedReplyContent",
     "WorkflowCancellationContent",
     "WorkflowDeletionContent",
+    "WorkflowStatusUpdateContent",
 ]
 ValidVersion = Literal["1.0"]
 
@@ -89,6 +97,7 @@ class MessageType(StrEnum):
     workflow_execution_request = auto()
     workflow_cancellation_request = auto()
     workflow_deletion_request = auto()
+    workflow_status_update = auto()
 
 
 class BaseModel(PyBaseModel):
@@ -111,14 +120,14 @@ class MessageHeader(BaseModel):
 
 
 class ExecuteRequestContent(BaseModel):
-    input: OpIOType
+    input: OpIOPayload
     operation_spec: OperationSpec
 
     def __str__(self):
         return (
             f"{self.__class__.__name__}"
             f"(operation_spec={self.operation_spec}, "
-            f"input={get_input_ids(self.input)})"
+            f"input={payload_ids(self.input)})"
         )
 
 
@@ -129,7 +138,7 @@ class CacheInfoExecuteRequestContent(ExecuteRequestContent):
         return (
             f"{self.__class__.__name__}"
             f"(operation_spec={self.operation_spec}, "
-            f"input={get_input_ids(self.input)}, "
+            f"input={payload_ids(self.input)}, "
             f"cache_info={self.cache_info})"
         )
 
@@ -137,7 +146,8 @@ class CacheInfoExecuteRequestContent(ExecuteRequestContent):
 class ExecuteReplyContent(BaseModel):
     cache_info: CacheInfo
     status: OpStatusType
-    output: OpIOType
+    output: OpIOPayload
+    resources: Optional[OpResourceUsage] = None
 
 
 class AckContent(BaseModel):
@@ -175,6 +185,15 @@ class WorkflowDeletionContent(BaseModel):
     pass
 
 
+class WorkflowStatusUpdateContent(BaseModel):
+    # Monotonically increasing (per run) version of the update, used to discard stale updates
+    sequence: int
+    # Workflow run details, if they changed
+    details: Optional[Dict[str, Any]]
+    # Details of the tasks that changed
+    task_details: Dict[str, Dict[str, Any]]
+
+
 class BaseMessage(BaseModel):
     header: MessageHeader
     content: MessageContent
@@ -293,6 +312,11 @@ class AckMessage(BaseMessage):
     content: AckContent
 
 
+class WorkflowStatusUpdateMessage(BaseMessage):
+    _supported_channels: Set[str] = {RUN_STATUS_PUBSUB_TOPIC}
+    content: WorkflowStatusUpdateContent
+
+
 WorkMessage = Union[
     AckMessage,
     CacheInfoExecuteRequestMessage,
@@ -303,6 +327,7 @@ WorkMessage = Union[
     WorkflowExecutionMessage,
     WorkflowCancellationMessage,
     WorkflowDeletionMessage,
+    WorkflowStatusUpdateMessage,
 ]
 
 
@@ -358,14 +383,30 @@ class WorkMessageBuilder:
         content = WorkflowDeletionContent()
         return WorkflowDeletionMessage(header=header, content=content)
 
+    @staticmethod
+    def build_workflow_status_update(
+        run_id: UUID,
+        sequence: int,
+        details: Optional[Dict[str, Any]],
+        task_details: Dict[str, Dict[str, Any]],
+    ) -> WorkMessage:
+        header = MessageHeader(type=MessageType.workflow_status_update, run_id=run_id)
+        content = WorkflowStatusUpdateContent(
+            sequence=sequence, details=details, task_details=task_details
+        )
+        return WorkflowStatusUpdateMessage(header=header, content=content)
+
     @staticmethod
     def build_execute_reply(
-        traceparent: str, cache_info: CacheInfo, output: OpIOType
+        traceparent: str,
+        cache_info: CacheInfo,
+        output: OpIOType,
+        resources: Optional[OpResourceUsage] = None,
     ) -> WorkMessage:
         run_id = run_id_from_traceparent(traceparent)
         header = MessageHeader(type=MessageType.execute_reply, run_id=run_id, parent_id=traceparent)
         content = ExecuteReplyContent(
-            cache_info=cache_info, status=OpStatusType.done, output=output
+            cache_info=cache_info, status=OpStatusType.done, output=output, resources=resources
         )
         return ExecuteReplyMessage(header=header, content=content)
 
@@ -403,6 +444,7 @@ MESSAGE_TYPE_TO_CONTENT_TYPE: Dict[MessageType, Type[MessageContent]] = {
     MessageType.workflow_execution_request: WorkflowExecutionContent,
     MessageType.workflow_cancellation_request: WorkflowCancellationContent,
     MessageType.workflow_deletion_request: WorkflowDeletionContent,
+    MessageType.workflow_status_update: WorkflowStatusUpdateContent,
 }
 
 
@@ -422,6 +464,30 @@ def build_work_message(
     raise error
 
 
+def payload_ids(payload: OpIOPayload) -> Any:
+    if isinstance(payload, PayloadReference):
+        return payload
+    return get_input_ids(payload)
+
+
+def reference_payloads(message: WorkMessage):
+    """Replaces large op inputs and outputs in the message by references to stored payloads."""
+    content = message.content
+    if isinstance(content, ExecuteRequestContent):
+        content.input = reference_payload(content.input)
+    elif isinstance(content, ExecuteReplyContent):
+        content.output = reference_payload(content.output)
+
+
+async def reference_payloads_async(message: WorkMessage):
+    """Async counterpart of `reference_payloads`."""
+    content = message.content
+    if isinstance(content, ExecuteRequestContent):
+        content.input = await reference_payload_async(content.input)
+    elif isinstance(content, ExecuteReplyContent):
+        content.output = await reference_payload_async(content.output)
+
+
 def extract_event_data(event: v1.Event) -> Dict[str, Any]:
     logger = logging.getLogger(f"{__name__}.extract_event_data")
     if not isinstance(event.data, (bytes, str)):
@@ -454,6 +520,7 @@ def send(message: WorkMessage, source: str, pubsubname: str, topic: str) -> bool
     message.update_current_trace_parent()
     logger = logging.getLogger(f"{__name__}.send")
     try:
+        reference_payloads(message)
         logger.debug(
             f"Sending message with header {message.header} from "
             f"{source} to pubsub {pubsubname}, topic {topic}"
@@ -496,6 +563,7 @@ async def send_async(message: WorkMessage, source: str, pubsubname: str, topic:
     message.update_current_trace_parent()
     logger = logging.getLogger(f"{__name__}.send_async")
     try:
+        await reference_payloads_async(message)
         logger.debug(
             f"Sending async message with header {message.header} from "
             f"{source} to pubsub {pubsubname}, topic {topic}"
@@ -0,0 +1,288 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""Pass-by-reference of large op inputs and outputs sent through the message bus.
+
+Payloads whose JSON representation is larger than a threshold are stored in the state store,
+keyed by their content hash, and messages only carry a :class:`PayloadReference`. References are
+resolved when a service needs the payload, and each service keeps the payloads it resolved (or
+stored) in memory, so that a payload is fetched and parsed at most once per service.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from time import monotonic
+from typing import Any, Dict, Optional, Protocol, Tuple, Union, cast
+
+from pydantic import BaseModel, Extra
+from pydantic.json import pydantic_encoder
+
+from vibe_core.async_client import run_sync
+from vibe_core.data.core_types import OpIOType
+
+from .constants import (
+    PAYLOAD_KEY_TEMPLATE,
+    PAYLOAD_REFERENCE_THRESHOLD,
+    PAYLOAD_TTL_S,
+    STATE_URL_TEMPLATE,
+)
+from .statestore import METADATA, STATE_STORE
+from .vibe_dapr_client import VibeDaprClient
+
+PAYLOAD_CACHE_MAX_BYTES = 256 * 1024 * 1024
+# Payloads are stored again when referenced after this fraction of their TTL, so that references
+# handed out by long-running services do not point to expired payloads
+PAYLOAD_REFRESH_RATIO = 0.5
+
+
+class PayloadReference(BaseModel):
+    """Reference to an op input or output stored in the state store."""
+
+    payload_ref: str
+    """Content hash of the payload."""
+
+    size: int
+    """Size of the JSON representation of the payload, in bytes."""
+
+    class Config:
+        extra = Extra.forbid
+
+    @property
+    def key(self) -> str:
+        return PAYLOAD_KEY_TEMPLATE.format(self.payload_ref)
+
+
+OpIOPayload = Union[PayloadReference, OpIOType]
+
+
+def encode_payload(payload: OpIOType) -> str:
+    """Encodes a payload as JSON, in a canonical form, so equal payloads have equal hashes."""
+    return json.dumps(
+        payload, sort_keys=True, separators=(",", ":"), allow_nan=False, default=pydantic_encoder
+    )
+
+
+def payload_hash(data: str) -> str:
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+class PayloadStoreProtocol(Protocol):
+    ttl_s: int
+
+    def store(self, key: str, data: str) -> None: ...
+
+    def retrieve(self, key: str) -> str: ...
+
+    async def store_async(self, key: str, data: str) -> None: ...
+
+    async def retrieve_async(self, key: str) -> str: ...
+
+
+class PayloadStore(PayloadStoreProtocol):
+    """Payload storage in the Dapr state store.
+
+    Payloads are stored as JSON strings (instead of objects), as Dapr changes the precision of
+    floating point numbers in stored objects. They expire after `ttl_s` seconds.
+    """
+
+    def __init__(
+        self,
+        state_store: str = STATE_STORE,
+        partition_key: str = METADATA["partitionKey"],
+        ttl_s: int = PAYLOAD_TTL_S,
+    ):
+        self.vibe_dapr_client = VibeDaprClient()
+        self.state_store = state_store
+        self.partition_key = partition_key
+        self.ttl_s = ttl_s
+
+    def _state(self, key: str, data: str) -> Dict[str, Any]:
+        return {
+            "key": key,
+            "value": data,
+            "metadata": {"partitionKey": self.partition_key, "ttlInSeconds": str(self.ttl_s)},
+        }
+
+    def store(self, key: str, data: str) -> None:
+        run_sync(self.store_async(key, data))
+
+    def retrieve(self, key: str) -> str:
+        return run_sync(self.retrieve_async(key))
+
+    async def store_async(self, key: str, data: str) -> None:
+        await self.vibe_dapr_client.post(
+            STATE_URL_TEMPLATE.format(self.state_store, ""),
+            data=[self._state(key, data)],
+            traceparent=None,
+        )
+
+    async def retrieve_async(self, key: str) -> str:
+        try:
+            response = await self.vibe_dapr_client.get(
+                STATE_URL_TEMPLATE.format(self.state_store, key),
+                traceparent=None,
+                params={"metadata.partitionKey": self.partition_key},
+            )
+        except KeyError as e:
+            raise KeyError(f"Payload {key} not found") from e
+        return json.loads(await response.text())
+
+
+class PayloadCache:
+    """Payloads that were resolved or stored by this service, in least recently used order.
+
+    The cached payloads are shared by all messages that reference them, so they must not be
+    modified. Payloads are only referenced without being stored (again) if this service stored
+    them recently enough, so that they do not expire before the reference is resolved.
+    """
+
+    def __init__(
+        self,
+        store: PayloadStoreProtocol,
+        threshold: int = PAYLOAD_REFERENCE_THRESHOLD,
+        max_bytes: int = PAYLOAD_CACHE_MAX_BYTES,
+    ):
+        self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
+        self.store = store
+        self.threshold = threshold
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.fetches = 0
+        # Payload, size and, for payloads stored by this service, when they were stored
+        self._entries: "OrderedDict[str, Tuple[OpIOType, int, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._pending: Dict[str, "asyncio.Future[OpIOType]"] = {}
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def _get(self, key: str) -> Optional[OpIOType]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def _put(self, key: str, payload: OpIOType, size: int, stored_at: Optional[float] = None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if stored_at is not None:
+                    self._entries[key] = (entry[0], entry[1], stored_at)
+                self._entries.move_to_end(key)
+                return
+            self._entries[key] = (payload, size, stored_at)
+            self.size += size
+            while self.size > self.max_bytes and len(self._entries) > 1:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self.size -= evicted_size
+
+    def _needs_store(self, key: str) -> bool:
+        """Whether a payload was not stored by this service, or was stored close to its TTL."""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or entry[2] is None:
+            return True
+        return monotonic() - entry[2] >= self.store.ttl_s * PAYLOAD_REFRESH_RATIO
+
+    def _encode(self, payload: OpIOPayload) -> Optional[Tuple[str, str]]:
+        """Returns the hash and JSON of payloads that should be sent by reference."""
+        if isinstance(payload, PayloadReference) or self.threshold <= 0:
+            return None
+        data = encode_payload(payload)
+        if len(data) <= self.threshold:
+            return None
+        return payload_hash(data), data
+
+    def _parse(self, reference: PayloadReference, data: str) -> OpIOType:
+        self.fetches += 1
+        payload = json.loads(data)
+        self._put(reference.payload_ref, payload, reference.size)
+        self.logger.debug(f"Resolved payload {reference.payload_ref} ({reference.size} bytes)")
+        return payload
+
+    def reference(self, payload: OpIOPayload) -> OpIOPayload:
+        """Stores a payload and returns a reference to it, if it is larger than the threshold."""
+        encoded = self._encode(payload)
+        if encoded is None:
+            return payload
+        ref, data = encoded
+        reference = PayloadReference(payload_ref=ref, size=len(data))
+        if self._needs_store(ref):
+            stored_at = monotonic()
+            self.store.store(reference.key, data)
+            self._put(ref, cast(OpIOType, payload), len(data), stored_at)
+        return reference
+
+    async def reference_async(self, payload: OpIOPayload) -> OpIOPayload:
+        """Async counterpart of :meth:`reference`."""
+        encoded = self._encode(payload)
+        if encoded is None:
+            return payload
+        ref, data = encoded
+        reference = PayloadReference(payload_ref=ref, size=len(data))
+        if self._needs_store(ref):
+            stored_at = monotonic()
+            await self.store.store_async(reference.key, data)
+            self._put(ref, cast(OpIOType, payload), len(data), stored_at)
+        return reference
+
+    def resolve(self, payload: OpIOPayload) -> OpIOType:
+        """Returns the payload a reference points to, fetching it if it was not seen before."""
+        if not isinstance(payload, PayloadReference):
+            return payload
+        cached = self._get(payload.payload_ref)
+        if cached is not None:
+            return cached
+        return self._parse(payload, self.store.retrieve(payload.key))
+
+    async def resolve_async(self, payload: OpIOPayload) -> OpIOType:
+        """Async counterpart of :meth:`resolve`.
+
+        Concurrent resolutions of the same reference share a single fetch.
+        """
+        if not isinstance(payload, PayloadReference):
+            return payload
+        cached = self._get(payload.payload_ref)
+        if cached is not None:
+            return cached
+        pending = self._pending.get(payload.payload_ref)
+        if pending is not None and pending.get_loop() is asyncio.get_running_loop():
+            return await asyncio.shield(pending)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[payload.payload_ref] = future
+        try:
+            resolved = self._parse(payload, await self.store.retrieve_async(payload.key))
+            future.set_result(resolved)
+            return resolved
+        except Exception as e:
+            future.set_exception(e)
+            # Avoid warnings about exceptions that are never retrieved
+            future.exception()
+            raise
+        finally:
+            self._pending.pop(payload.payload_ref, None)
+
+
+payload_cache = PayloadCache(PayloadStore())
+
+
+def reference_payload(payload: OpIOPayload) -> OpIOPayload:
+    return payload_cache.reference(payload)
+
+
+async def reference_payload_async(payload: OpIOPayload) -> OpIOPayload:
+    return await payload_cache.reference_async(payload)
+
+
+def resolve_payload(payload: OpIOPayload) -> OpIOType:
+    return payload_cache.resolve(payload)
+
+
+async def resolve_payload_async(payload: OpIOPayload) -> OpIOType:
+    return await payload_cache.resolve_async(payload)
@@ -0,0 +1,274 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import asyncio
+import bisect
+import logging
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from vibe_common.constants import RUN_INDEX_KEY, RUN_INDEX_SHARD_KEY_TEMPLATE, RUNS_KEY
+from vibe_common.statestore import StateConflictError, StateStoreProtocol, TransactionOperation
+
+LOGGER = logging.getLogger(__name__)
+
+MAX_CONFLICT_RETRIES = 10
+# Number of shards (days) fetched in a single bulk request when scanning the index
+SCAN_BATCH_SIZE = 30
+# Number of legacy run records fetched in a single bulk request during migration
+MIGRATION_BATCH_SIZE = 1000
+# Shard used for legacy runs without a submission time
+UNKNOWN_SUBMISSION_DAY = date(1970, 1, 1)
+
+
+class RunIndexEntry(NamedTuple):
+    submission_time: datetime
+    run_id: str
+    # Name of the workflow, if the run was submitted with a workflow name (not a custom spec)
+    workflow: Optional[str] = None
+
+    @property
+    def sort_key(self) -> Tuple[datetime, str]:
+        return self.submission_time, self.run_id
+
+
+def to_naive_utc(t: datetime) -> datetime:
+    """Converts timezone-aware datetimes to naive UTC, the convention used for submission times."""
+    if t.tzinfo is None:
+        return t
+    return t.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def shard_day(submission_time: datetime) -> str:
+    return to_naive_utc(submission_time).date().isoformat()
+
+
+def shard_key(day: str) -> str:
+    return RUN_INDEX_SHARD_KEY_TEMPLATE.format(day)
+
+
+def _entry(submission_time: datetime, run_id: str, workflow: Optional[str]) -> List[Any]:
+    return [to_naive_utc(submission_time).isoformat(), run_id, workflow]
+
+
+def _parse_entry(entry: Sequence[Any]) -> RunIndexEntry:
+    workflow = entry[2] if len(entry) > 2 else None
+    return RunIndexEntry(to_naive_utc(datetime.fromisoformat(entry[0])), entry[1], workflow)
+
+
+def workflow_name(workflow: Any) -> Optional[str]:
+    """Name under which a run is indexed, only available for runs of named workflows."""
+    return workflow if isinstance(workflow, str) else None
+
+
+class RunIndex:
+    """Time-ordered index of workflow runs, sharded by submission day.
+
+    Each day with at least one run has its own key in the state store, holding the ids of the runs
+    submitted that day in submission order. A small directory key holds the list of existing days.
+    Adding a run only reads and writes the shard of its day (and the directory when the day is
+    new), so its cost does not depend on the total number of runs. Writes use ETags, so concurrent
+    submissions from different replicas are retried instead of overwriting each other.
+
+    The index replaces the legacy `RUNS_KEY` list, which is migrated the first time the index is
+    used. The legacy key is kept untouched, but is no longer updated.
+    """
+
+    def __init__(self, state_store: StateStoreProtocol, max_retries: int = MAX_CONFLICT_RETRIES):
+        self.state_store = state_store
+        self.max_retries = max_retries
+        self.migrated = False
+        self._lock: Optional[asyncio.Lock] = None
+        self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
+
+    @property
+    def lock(self) -> asyncio.Lock:
+        # Created lazily so that the lock is bound to the running event loop
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    async def _retrieve_directory(self) -> Tuple[List[str], str]:
+        directory, etag = await self.state_store.retrieve_with_etag(RUN_INDEX_KEY)
+        return [str(d) for d in directory["shards"]], etag or ""
+
+    async def _retrieve_shard(self, day: str) -> Tuple[List[Any], str]:
+        try:
+            entries, etag = await self.state_store.retrieve_with_etag(shard_key(day))
+            return entries, etag or ""
+        except KeyError:
+            return [], ""
+
+    async def add(
+        self,
+        run_id: str,
+        submission_time: datetime,
+        operations: Sequence[TransactionOperation] = (),
+        workflow: Optional[str] = None,
+    ):
+        """Adds a run to the index.
+
+        Args:
+            run_id: id of the run
+            submission_time: time the run was submitted, used to order runs
+            operations: additional state store operations committed in the same transaction
+                (e.g., storing the run itself)
+            workflow: name of the workflow, stored in the index so runs can be filtered by
+                workflow without fetching them
+
+        Raises:
+            StateConflictError: if the index could not be updated after `max_retries` attempts
+        """
+        await self.migrate()
+        day = shard_day(submission_time)
+        async with self.lock:
+            for attempt in range(self.max_retries):
+                entries, etag = await self._retrieve_shard(day)
+                index_ops: List[TransactionOperation] = []
+                if not etag:
+                    try:
+                        shards, dir_etag = await self._retrieve_directory()
+                    except KeyError:
+                        shards, dir_etag = [], ""
+                    if day not in shards:
+                        bisect.insort(shards, day)
+                        index_ops.append(
+                            {
+                                "key": RUN_INDEX_KEY,
+                                "operation": "upsert",
+                                "value": {"shards": shards},
+                                "etag": dir_etag,
+                            }
+                        )
+                # Keep the shard sorted even if runs are not added in submission order
+                bisect.insort(entries, _entry(submission_time, run_id, workflow))
+                index_ops.append(
+                    {"key": shard_key(day), "operation": "upsert", "value": entries, "etag": etag}
+                )
+                try:
+                    await self.state_store.transaction(index_ops + list(operations))
+                    return
+                except StateConflictError:
+                    self.logger.info(
+                        f"Run index shard {day} changed while adding run {run_id}, "
+                        f"retrying ({attempt + 1}/{self.max_retries})"
+                    )
+        raise StateConflictError(f"Failed to add run {run_id} to the run index")
+
+    async def scan(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        newest_first: bool = False,
+        after: Optional[RunIndexEntry] = None,
+    ) -> AsyncIterator[RunIndexEntry]:
+        """Iterates over the runs submitted in the given time range.
+
+        Shards are fetched lazily in batches, so consumers that stop early (e.g., to fill a page)
+        only read the shards they need.
+
+        Args:
+            start: only runs submitted at or after this time are returned
+            end: only runs submitted before this time are returned
+            newest_first: whether to iterate from the most recent run
+            after: resume the iteration after this entry (in iteration order), e.g., the last
+                entry of the previous page
+
+        Yields:
+            Index entries in submission order
+        """
+        await self.migrate()
+        try:
+            shards, _ = await self._retrieve_directory()
+        except KeyError:
+            return
+        start = None if start is None else to_naive_utc(start)
+        end = None if end is None else to_naive_utc(end)
+        if start is not None:
+            shards = [d for d in shards if d >= shard_day(start)]
+        if end is not None:
+            shards = [d for d in shards if d <= shard_day(end)]
+        if after is not None:
+            after_day = shard_day(after.submission_time)
+            if newest_first:
+                shards = [d for d in shards if d <= after_day]
+            else:
+                shards = [d for d in shards if d >= after_day]
+        if newest_first:
+            shards = shards[::-1]
+
+        for i in range(0, len(shards), SCAN_BATCH_SIZE):
+            days = shards[i : i + SCAN_BATCH_SIZE]
+            for shard in await self.state_store.retrieve_bulk([shard_key(d) for d in days]):
+                entries = [_parse_entry(e) for e in shard]
+                if newest_first:
+                    entries = entries[::-1]
+                for entry in entries:
+                    if start is not None and entry.submission_time < start:
+                        continue
+                    if end is not None and entry.submission_time >= end:
+                        continue
+                    if after is not None and (
+                        entry.sort_key >= after.sort_key
+                        if newest_first
+                        else entry.sort_key <= after.sort_key
+                    ):
+                        continue
+                    yield entry
+
+    async def list_run_ids(
+        self, start: Optional[datetime] = None, end: Optional[datetime] = None
+    ) -> List[str]:
+        """Lists the ids of the runs submitted in the given time range, oldest first."""
+        return [entry.run_id async for entry in self.scan(start, end)]
+
+    async def migrate(self):
+        """Builds the index from the legacy `RUNS_KEY` list, if the index does not exist yet."""
+        if self.migrated:
+            return
+        try:
+            await self._retrieve_directory()
+            self.migrated = True
+            return
+        except KeyError:
+            pass
+
+        try:
+            legacy_ids: List[str] = await self.state_store.retrieve(RUNS_KEY)
+        except KeyError:
+            legacy_ids = []
+        self.logger.info(f"Migrating {len(legacy_ids)} runs to the run index")
+
+        shards: Dict[str, List[List[str]]] = defaultdict(list)
+        for i in range(0, len(legacy_ids), MIGRATION_BATCH_SIZE):
+            batch = legacy_ids[i : i + MIGRATION_BATCH_SIZE]
+            for run_id, run in zip(batch, await self.state_store.retrieve_bulk(batch)):
+                submission_time = (run.get("details") or {}).get("submission_time")
+                submission_time = (
+                    datetime.fromisoformat(submission_time)
+                    if submission_time
+                    else datetime.combine(UNKNOWN_SUBMISSION_DAY, datetime.min.time())
+                )
+                entry = _entry(submission_time, run_id, workflow_name(run.get("workflow")))
+                bisect.insort(shards[shard_day(submission_time)], entry)
+
+        operations: List[TransactionOperation] = [
+            {"key": shard_key(day), "operation": "upsert", "value": entries}
+            for day, entries in shards.items()
+        ]
+        # The directory is written last and must not exist, so only one migration succeeds
+        operations.append(
+            {
+                "key": RUN_INDEX_KEY,
+                "operation": "upsert",
+                "value": {"shards": sorted(shards)},
+                "etag": "",
+            }
+        )
+        try:
+            await self.state_store.transaction(operations)
+            self.logger.info(f"Migrated {len(legacy_ids)} runs to {len(shards)} index shards")
+        except StateConflictError:
+            self.logger.info("Run index was created concurrently, skipping migration")
+        self.migrated = True
@@ -122,6 +122,25 @@ class OperationParser:
         return data
 
 
+class OperationDependencyResolver:
+    def __init__(self):
+        self._resolver_map = {"parameters": self._resolve_params}
+
+    def resolve(self, op_spec: OperationSpec) -> OpResolvedDependencies:
+        output: OpResolvedDependencies = {}
+        for item, dependencies_list in op_spec.dependencies.items():
+            try:
+                output[item] = self._resolver_map[item](op_spec, dependencies_list)
+            except Exception as e:
+                raise ValueError(
+                    f"Dependency {item}: {dependencies_list} could not be resolved"
+                ) from e
+        return output
+
+    def _resolve_params(self, op_spec: OperationSpec, params_to_resolve: List[str]):
+        return {param_name: op_spec.parameters[param_name] for param_name in params_to_resolve}
+
+
 @dataclass(frozen=True)
 class OpRunId:
     name: str
@@ -5,9 +5,10 @@
 # -*- coding: utf-8 -*-
 
 import logging
-from typing import Any, List, Optional, Protocol, TypedDict
+from typing import Any, Dict, List, Optional, Protocol, Tuple, TypedDict
 
 from vibe_common.constants import STATE_URL_TEMPLATE
+from vibe_common.dapr import StateConflictError  # noqa: F401
 from vibe_common.vibe_dapr_client import VibeDaprClient
 
 LOGGER = logging.getLogger(__name__)
@@ -15,15 +16,25 @@ STATE_STORE = "statestore"
 METADATA = {"partitionKey": "eywa"}
 
 
-class TransactionOperation(TypedDict):
+class _TransactionOperation(TypedDict):
     key: str
     operation: str
     value: Optional[Any]
 
 
+class TransactionOperation(_TransactionOperation, total=False):
+    # When set, the operation only succeeds if the stored value still has this ETag.
+    # An empty string means the key must not exist yet.
+    etag: str
+
+
 class StateStoreProtocol(Protocol):
     async def retrieve(self, key: str, traceparent: Optional[str] = None) -> Any: ...
 
+    async def retrieve_with_etag(
+        self, key: str, traceparent: Optional[str] = None
+    ) -> Tuple[Any, Optional[str]]: ...
+
     async def retrieve_bulk(
         self, keys: List[str], parallelism: int = 2, traceparent: Optional[str] = None
     ) -> List[Any]: ...
@@ -58,6 +69,22 @@ class StateStore(StateStoreProtocol):
         except KeyError as e:
             raise KeyError(f"Key {key} not found") from e
 
+    async def retrieve_with_etag(
+        self, key: str, traceparent: Optional[str] = None
+    ) -> Tuple[Any, Optional[str]]:
+        """Retrieves a key alongside its ETag, for optimistic concurrency control."""
+        try:
+            response = await self.vibe_dapr_client.get(
+                STATE_URL_TEMPLATE.format(self.state_store, key),
+                traceparent=traceparent,
+                params={"metadata.partitionKey": METADATA["partitionKey"]},
+            )
+
+            etag = response.headers.get("ETag")
+            return await self.vibe_dapr_client.response_json(response), etag
+        except KeyError as e:
+            raise KeyError(f"Key {key} not found") from e
+
     async def retrieve_bulk(
         self, keys: List[str], parallelism: int = 8, traceparent: Optional[str] = None
     ) -> List[Any]:
@@ -104,16 +131,7 @@ class StateStore(StateStoreProtocol):
     async def transaction(
         self, operations: List[TransactionOperation], traceparent: Optional[str] = None
     ) -> None:
-        queries = [
-            {
-                "operation": o["operation"],
-                "request": {
-                    "key": o["key"],
-                    "value": self.vibe_dapr_client.obj_json(o["value"]),
-                },
-            }
-            for o in operations
-        ]
+        queries = [{"operation": o["operation"], "request": self._request(o)} for o in operations]
         await self.vibe_dapr_client.post(
             url=STATE_URL_TEMPLATE.format(self.state_store, "transaction"),
             data={
@@ -122,3 +140,14 @@ class StateStore(StateStoreProtocol):
             },
             traceparent=traceparent,
         )
+
+    def _request(self, operation: TransactionOperation) -> Dict[str, Any]:
+        request: Dict[str, Any] = {
+            "key": operation["key"],
+            "value": self.vibe_dapr_client.obj_json(operation["value"]),
+        }
+        if "etag" in operation:
+            if operation["etag"]:
+                request["etag"] = operation["etag"]
+            request["options"] = {"concurrency": "first-write"}
+        return request
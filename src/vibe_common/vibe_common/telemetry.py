@@ -3,6 +3,7 @@
 
 import inspect
 import logging
+from dataclasses import asdict
 from functools import wraps
 from typing import Any, Callable, Dict
 
@@ -16,6 +17,7 @@ from opentelemetry.sdk.trace.export import BatchSpanProcessor
 from opentelemetry.trace.span import INVALID_SPAN
 
 from vibe_common.constants import TRACEPARENT_STRING
+from vibe_core.datamodel import OpResourceUsage
 
 LOGGER = logging.getLogger(__name__)
 
@@ -54,6 +56,11 @@ def add_span_attributes(attributes: Dict[str, Any]):
         current_span.set_attribute(k, v)
 
 
+def add_resource_usage_attributes(usage: OpResourceUsage):
+    """Adds the resources consumed by an op run to the current span"""
+    add_span_attributes({f"op.resources.{k}": v for k, v in asdict(usage).items()})
+
+
 def update_telemetry_context(trace_parent: str):
     """Updates the current telemetry context with the trace parent"""
     attach(extract({"traceparent": trace_parent}))
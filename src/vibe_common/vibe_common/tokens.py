@@ -4,8 +4,8 @@
 import logging
 from abc import ABC, abstractmethod
 from datetime import datetime, timedelta
-from typing import Dict, Optional, Union, cast
-from urllib.parse import urljoin, urlparse
+from typing import Dict, NamedTuple, Optional, Tuple, Union, cast
+from urllib.parse import unquote, urlparse, urlunparse
 
 from azure.core.credentials import TokenCredential
 from azure.identity import DefaultAzureCredential
@@ -13,10 +13,16 @@ from azure.storage.blob import (
     BlobClient,
     BlobSasPermissions,
     BlobServiceClient,
+    ContainerSasPermissions,
     UserDelegationKey,
     generate_blob_sas,
+    generate_container_sas,
 )
 
+BLOB_SERVICE_HOST = "blob.core."
+DEFAULT_SAS_REFRESH_INTERVAL = timedelta(hours=1)
+EPOCH = datetime(1970, 1, 1)
+
 
 class StorageUserKey(ABC):
     @abstractmethod
@@ -98,7 +104,42 @@ class StorageUserKeyConnectionString(StorageUserKey):
         return client.credential.account_key
 
 
+class BlobLocation(NamedTuple):
+    account_name: str
+    container_name: str
+    blob_name: str
+
+
+def parse_blob_url(url: str) -> BlobLocation:
+    """Returns the account, container and blob names of a blob URL.
+
+    URLs of the Azure blob service are parsed directly, other URLs (e.g., of the storage emulator)
+    are parsed by the storage SDK.
+    """
+    parsed = urlparse(url)
+    account_name, _, host = parsed.netloc.partition(".")
+    container_name, _, blob_name = parsed.path.lstrip("/").partition("/")
+    if host.startswith(BLOB_SERVICE_HOST) and container_name and blob_name:
+        return BlobLocation(account_name, unquote(container_name), unquote(blob_name))
+    blob_client = BlobClient.from_blob_url(blob_url=url)
+    return BlobLocation(
+        cast(str, blob_client.account_name), blob_client.container_name, blob_client.blob_name
+    )
+
+
 class BlobTokenManager(ABC):
+    """Signs blob URLs with read-only SAS tokens.
+
+    Tokens are cached, so most URLs are signed without generating a new token. By default, tokens
+    are scoped to a single blob. When `container_scoped` is True, tokens are scoped to the
+    container of the blob instead, and one token is shared by all the blobs in the same container
+    (which also grants read access to all of them).
+
+    Time is divided in buckets of `sas_refresh_interval`, and tokens generated in the same bucket
+    share their expiry time. Tokens are generated again in the next bucket, so signed
+    URLs stay valid for at least `sas_expiration_days` (and at most `sas_refresh_interval` more).
+    """
+
     sas_expiration_days: int
     lease_time_multiplier: int
     user_key_cache: Dict[str, StorageUserKey] = {}
@@ -107,11 +148,29 @@ class BlobTokenManager(ABC):
         self,
         sas_expiration_days: int = 1,
         lease_time_ratio: int = 2,
+        container_scoped: bool = False,
+        sas_refresh_interval: timedelta = DEFAULT_SAS_REFRESH_INTERVAL,
     ):
         self.logger = logging.getLogger(self.__class__.__name__)
         self.sas_expiration = timedelta(days=sas_expiration_days)
         self.lease_time_ratio = lease_time_ratio
         self.key_lease_time = self.lease_time_ratio * self.sas_expiration
+        if not timedelta(0) < sas_refresh_interval < self.sas_expiration:
+            raise ValueError(
+                f"SAS refresh interval must be positive and shorter than the SAS expiration "
+                f"({self.sas_expiration}), got {sas_refresh_interval}"
+            )
+        if self.key_lease_time <= self.sas_expiration + sas_refresh_interval:
+            # User keys are only reused while they outlive the tokens signed with them
+            raise ValueError(
+                f"Key lease time ({self.key_lease_time}, {lease_time_ratio} times the SAS "
+                f"expiration) must be longer than the SAS expiration plus the refresh interval "
+                f"({self.sas_expiration + sas_refresh_interval})"
+            )
+        self.container_scoped = container_scoped
+        self.sas_refresh_interval = sas_refresh_interval
+        self._token_bucket = -1
+        self._token_cache: Dict[Tuple[str, str, Optional[str]], str] = {}
 
     @abstractmethod
     def _get_storage_user_key(
@@ -125,8 +184,9 @@ class BlobTokenManager(ABC):
     def _get_user_key(self, url: str, account_name: str) -> StorageUserKey:
         if account_name not in self.user_key_cache:
             self.logger.debug(f"Creating a new user key for account {account_name}")
+            # Keys must outlive the tokens they sign, which expire up to a refresh interval later
             storage_user_key = self._get_storage_user_key(
-                url, self.sas_expiration, self.key_lease_time
+                url, self.sas_expiration + self.sas_refresh_interval, self.key_lease_time
             )
 
             self.user_key_cache[account_name] = storage_user_key
@@ -134,13 +194,31 @@ class BlobTokenManager(ABC):
         return self.user_key_cache[account_name]
 
     @abstractmethod
-    def _get_token(self, blob_client: BlobClient):
+    def _generate_token(
+        self, url: str, location: BlobLocation, scope_blob: bool, expiry: datetime
+    ) -> str:
         raise NotImplementedError("Subclass needs to implement this")
 
+    def _get_token(self, url: str, location: BlobLocation) -> str:
+        now = datetime.utcnow()
+        bucket = (now - EPOCH) // self.sas_refresh_interval
+        if bucket != self._token_bucket:
+            # Tokens of previous buckets are not used anymore
+            self._token_cache = {}
+            self._token_bucket = bucket
+        blob_name = None if self.container_scoped else location.blob_name
+        key = (location.account_name, location.container_name, blob_name)
+        token = self._token_cache.get(key)
+        if token is None:
+            # Tokens have no start time, so they are valid as soon as they are generated
+            expiry = EPOCH + (bucket + 1) * self.sas_refresh_interval + self.sas_expiration
+            token = self._generate_token(url, location, blob_name is not None, expiry)
+            self._token_cache[key] = token
+        return token
+
     def sign_url(self, url: str) -> str:
-        blob_client = BlobClient.from_blob_url(blob_url=url)
-        sas_token = self._get_token(blob_client)
-        return f"{urljoin(url, urlparse(url).path)}?{sas_token}"
+        sas_token = self._get_token(url, parse_blob_url(url))
+        return f"{urlunparse(urlparse(url)._replace(params='', query='', fragment=''))}?{sas_token}"
 
 
 class BlobTokenManagerCredentialed(BlobTokenManager):
@@ -149,8 +227,12 @@ class BlobTokenManagerCredentialed(BlobTokenManager):
         sas_expiration_days: int = 1,
         lease_time_ratio: int = 2,
         credential: Optional[TokenCredential] = None,
+        container_scoped: bool = False,
+        sas_refresh_interval: timedelta = DEFAULT_SAS_REFRESH_INTERVAL,
     ):
-        super().__init__(sas_expiration_days, lease_time_ratio)
+        super().__init__(
+            sas_expiration_days, lease_time_ratio, container_scoped, sas_refresh_interval
+        )
         self.credential = DefaultAzureCredential() if credential is None else credential
 
     def _get_storage_user_key(
@@ -166,30 +248,28 @@ class BlobTokenManagerCredentialed(BlobTokenManager):
             credential=self.credential,
         )
 
-    def _get_token(
-        self,
-        blob_client: BlobClient,
-    ):
-        account_name: str = cast(str, blob_client.account_name)
-        container_name: str = blob_client.container_name
-        blob_name: str = blob_client.blob_name
-
-        start = datetime.utcnow()
-        end = start + self.sas_expiration
+    def _generate_token(
+        self, url: str, location: BlobLocation, scope_blob: bool, expiry: datetime
+    ) -> str:
         user_delegation_key = cast(
-            UserDelegationKey, self._get_user_key(blob_client.url, account_name).get_access_key()
+            UserDelegationKey, self._get_user_key(url, location.account_name).get_access_key()
         )
-
-        sas_token = generate_blob_sas(
-            account_name=account_name,
-            container_name=container_name,
+        if scope_blob:
+            return generate_blob_sas(
+                account_name=location.account_name,
+                container_name=location.container_name,
+                user_delegation_key=user_delegation_key,
+                blob_name=location.blob_name,
+                permission=BlobSasPermissions(read=True),
+                expiry=expiry,
+            )
+        return generate_container_sas(
+            account_name=location.account_name,
+            container_name=location.container_name,
             user_delegation_key=user_delegation_key,
-            blob_name=blob_name,
-            permission=BlobSasPermissions(read=True),
-            start=start,
-            expiry=end,
+            permission=ContainerSasPermissions(read=True),
+            expiry=expiry,
         )
-        return sas_token
 
 
 class BlobTokenManagerConnectionString(BlobTokenManager):
@@ -198,8 +278,12 @@ class BlobTokenManagerConnectionString(BlobTokenManager):
         connection_string: str,
         sas_expiration_days: int = 1,
         lease_time_ratio: int = 2,
+        container_scoped: bool = False,
+        sas_refresh_interval: timedelta = DEFAULT_SAS_REFRESH_INTERVAL,
     ):
-        super().__init__(sas_expiration_days, lease_time_ratio)
+        super().__init__(
+            sas_expiration_days, lease_time_ratio, container_scoped, sas_refresh_interval
+        )
         self.connection_string = connection_string
 
     def _get_storage_user_key(
@@ -214,24 +298,23 @@ class BlobTokenManagerConnectionString(BlobTokenManager):
             self.connection_string,
         )
 
-    def _get_token(
-        self,
-        blob_client: BlobClient,
-    ):
-        account_name: str = cast(str, blob_client.account_name)
-        container_name: str = blob_client.container_name
-        blob_name: str = blob_client.blob_name
-
-        start = datetime.utcnow()
-        end = start + self.sas_expiration
-        account_key = cast(str, self._get_user_key(blob_client.url, account_name).get_access_key())
-        sas_token = generate_blob_sas(
-            account_name=account_name,
-            container_name=container_name,
+    def _generate_token(
+        self, url: str, location: BlobLocation, scope_blob: bool, expiry: datetime
+    ) -> str:
+        account_key = cast(str, self._get_user_key(url, location.account_name).get_access_key())
+        if scope_blob:
+            return generate_blob_sas(
+                account_name=location.account_name,
+                container_name=location.container_name,
+                account_key=account_key,
+                blob_name=location.blob_name,
+                permission=BlobSasPermissions(read=True),
+                expiry=expiry,
+            )
+        return generate_container_sas(
+            account_name=location.account_name,
+            container_name=location.container_name,
             account_key=account_key,
-            blob_name=blob_name,
-            permission=BlobSasPermissions(read=True),
-            start=start,
-            expiry=end,
+            permission=ContainerSasPermissions(read=True),
+            expiry=expiry,
         )
-        return sas_token
@@ -10,7 +10,12 @@ from aiohttp import ClientResponse, ClientSession
 from aiohttp_retry import ExponentialRetry, RetryClient
 
 from vibe_common.constants import TRACEPARENT_HEADER_KEY
-from vibe_common.dapr import handle_aiohttp_timeout, process_dapr_response
+from vibe_common.dapr import (
+    StateConflictError,
+    handle_aiohttp_timeout,
+    is_transaction_etag_mismatch,
+    process_dapr_response,
+)
 from vibe_core.data.json_converter import dump_to_json
 
 MAX_SESSION_ATTEMPTS = 10
@@ -34,7 +39,10 @@ class VibeDaprClient:
         retry_options = ExponentialRetry(
             attempts=MAX_SESSION_ATTEMPTS,
             max_timeout=MAX_TIMEOUT_S,
-            statuses={400, 500, 502, 503, 504},
+            statuses={400, 502, 503, 504},
+            # Other server errors are retried by `_should_not_retry`
+            retry_all_server_errors=False,
+            evaluate_response_callback=_should_not_retry,
         )
         retry_client = RetryClient(client_session=session, retry_options=retry_options)
         return retry_client
@@ -52,7 +60,7 @@ class VibeDaprClient:
                 )
                 await handle_aiohttp_timeout(response)
                 return await process_dapr_response(response)
-            except KeyError:
+            except (KeyError, StateConflictError):
                 raise
             except Exception:
                 self.logger.exception(f"Failed to process request for {url}")
@@ -84,16 +92,20 @@ class VibeDaprClient:
                     )
                     await handle_aiohttp_timeout(response)
                     return await process_dapr_response(response)
+                except StateConflictError:
+                    raise
                 except RuntimeError as e:
-                    if "ERR_DIRECT_INVOKE" in str(e):
-                        tries += 1
-                        self.logger.warning(
-                            f"ERR_DIRECT_INVOKE raised by Dapr, "
-                            f"retrying ({tries}/{MAX_DIRECT_INVOKE_TRIES})"
-                        )
-                        if tries >= MAX_DIRECT_INVOKE_TRIES:
-                            self.logger.exception(f"Failed to process request for {url}")
-                            raise
+                    if "ERR_DIRECT_INVOKE" not in str(e):
+                        self.logger.exception(f"Failed to process request for {url}")
+                        raise
+                    tries += 1
+                    self.logger.warning(
+                        f"ERR_DIRECT_INVOKE raised by Dapr, "
+                        f"retrying ({tries}/{MAX_DIRECT_INVOKE_TRIES})"
+                    )
+                    if tries >= MAX_DIRECT_INVOKE_TRIES:
+                        self.logger.exception(f"Failed to process request for {url}")
+                        raise
                 except Exception:
                     self.logger.exception(f"Failed to process request for {url}")
                     raise RuntimeError(f"dapr failed to process request for {url}")
@@ -132,6 +144,17 @@ class VibeDaprClient:
         return dump_to_json(obj, **kwargs)
 
 
+async def _should_not_retry(response: ClientResponse) -> bool:
+    """Retries server errors, except for ETag mismatches in state transactions.
+
+    Transactions that fail because of an ETag mismatch will fail again, so they are given back to
+    the caller to raise :class:`StateConflictError`.
+    """
+    if response.status < 500:
+        return True
+    return is_transaction_etag_mismatch(response.status, await response.read())
+
+
 def _decode(obj: Any) -> Any:
     """Returns the given decoded JSON object with all string values that can be parsed as floats as
     Python floats.
@@ -0,0 +1,144 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List
+
+import pytest
+
+from vibe_core.client import FarmvibesAiClient, VibeWorkflowRun
+from vibe_core.datamodel import RunStatus
+
+RUN_ID = "00000000-0000-0000-0000-000000000001"
+
+
+def sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def task(status: str) -> Dict[str, Any]:
+    return {"status": status, "submission_time": "2023-01-01T00:00:00", "subtasks": None}
+
+
+class FakeServer(ThreadingHTTPServer):
+    supports_streaming: bool = True
+    # Events sent by the stream, with a delay before each
+    events: List[str] = []
+    delay_s: float = 0.1
+    # Status returned when polling
+    status: str = "done"
+    paths: List[str]
+
+
+class FakeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: FakeServer
+
+    def log_message(self, format: str, *args: Any):
+        pass
+
+    def _send_json(self, code: int, content: Any):
+        body = json.dumps(content).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def do_GET(self):
+        server = self.server
+        server.paths.append(self.path)
+        if self.path.startswith("/v0/runs/events"):
+            if not server.supports_streaming:
+                return self._send_json(404, {"message": "Not found"})
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for event in server.events:
+                time.sleep(server.delay_s)
+                self._send_chunk(event.encode())
+            self._send_chunk(b"")
+        else:
+            run = {
+                "id": RUN_ID,
+                "details.status": server.status,
+                "task_details": {"task": task(server.status)},
+            }
+            self._send_json(200, [run])
+
+
+@pytest.fixture
+def server() -> Iterator[FakeServer]:
+    httpd = FakeServer(("127.0.0.1", 0), FakeHandler)
+    httpd.paths = []
+    httpd.events = [
+        sse("snapshot", {"id": RUN_ID, "details": {"status": "running"}, "task_details": {}}),
+        # Updates only carry the status of tasks
+        sse("update", {"id": RUN_ID, "task_details": {"task": {"status": "running"}}}),
+        sse("update", {"id": RUN_ID, "details": {"status": "done"}, "task_details": {}}),
+        sse("end", {}),
+    ]
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def make_run(server: FakeServer) -> VibeWorkflowRun:
+    client = FarmvibesAiClient(f"http://127.0.0.1:{server.server_address[1]}")
+    run = VibeWorkflowRun(RUN_ID, "run", "workflow", {}, client)
+    # Polling would be too slow for the tests to pass
+    run.wait_s = 60
+    return run
+
+
+def test_block_until_complete_with_stream(server: FakeServer):
+    run = make_run(server)
+    start = time.monotonic()
+    run.block_until_complete(timeout_s=10)
+    assert time.monotonic() - start < 5
+    assert run.status == RunStatus.done
+    # Only the last call to `status` polled the service
+    assert [p.split("?")[0] for p in server.paths] == ["/v0/runs/events", "/v0/runs"]
+
+
+def test_listener_merges_updates(server: FakeServer):
+    run = make_run(server)
+    with run.client.stream_run_status([RUN_ID]) as listener:
+        listener.wait_for_status(RUN_ID, [RunStatus.done], timeout_s=10)
+        assert listener.status(RUN_ID) == RunStatus.done
+        assert listener.task_details(RUN_ID) == {"task": {"status": "running"}}
+        run._listener = listener
+        assert run.status == RunStatus.done
+        # Details of finished runs are fetched in full, once
+        assert run.task_details["task"].submission_time is not None
+        assert run.task_status == {"task": "done"}
+    # Status was read from the stream
+    assert [p.split("?")[0] for p in server.paths] == ["/v0/runs/events", "/v0/runs"]
+
+
+def test_block_until_complete_falls_back_to_polling(server: FakeServer):
+    server.supports_streaming = False
+    run = make_run(server)
+    run.block_until_complete(timeout_s=10)
+    assert run.status == RunStatus.done
+    assert server.paths[0].startswith("/v0/runs/events")
+
+
+def test_block_until_times_out_after_stream_breaks(server: FakeServer):
+    server.events = server.events[:1]
+    server.delay_s = 0.0
+    server.status = "running"
+    run = make_run(server)
+    run.wait_s = 0.1  # type: ignore
+    with pytest.raises(RuntimeError):
+        run.block_until_complete(timeout_s=1)
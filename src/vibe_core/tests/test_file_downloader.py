@@ -0,0 +1,193 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import base64
+import hashlib
+import os
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from tempfile import TemporaryDirectory
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from vibe_core import file_downloader
+from vibe_core.file_downloader import (
+    PARTIAL_SUFFIX,
+    STATE_SUFFIX,
+    DownloadVerificationError,
+    download_file,
+    get_session,
+)
+
+PART_SIZE = 1024
+CONTENT = os.urandom(10 * PART_SIZE + 123)
+
+
+class FakeServer(ThreadingHTTPServer):
+    content: bytes = CONTENT
+    supports_ranges: bool = True
+    md5: Optional[str] = None
+    # Number of requests that are cut short after sending half of the requested bytes
+    truncate_requests: int = 0
+    # Ranges that fail with a server error
+    failing_ranges: List[str] = []
+    ranges: List[Optional[str]]
+
+
+class FakeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: FakeServer
+
+    def log_message(self, format: str, *args: Any):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        range_header = self.headers.get("Range")
+        server.ranges.append(range_header)
+        content = server.content
+        headers: Dict[str, str] = {}
+        if server.md5 is not None:
+            headers["x-ms-blob-content-md5"] = server.md5
+        if range_header in server.failing_ranges:
+            self.send_response(500)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if range_header is not None and server.supports_ranges:
+            match = re.match(r"bytes=(\d+)-(\d+)", range_header)
+            assert match is not None
+            start, end = int(match.group(1)), min(int(match.group(2)), len(content) - 1)
+            if start >= len(content):
+                self.send_response(416)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            body = content[start : end + 1]
+            self.send_response(206)
+            headers["Content-Range"] = f"bytes {start}-{end}/{len(content)}"
+        else:
+            body = content
+            self.send_response(200)
+        headers["Content-Length"] = str(len(body))
+        headers["ETag"] = '"fake-etag"'
+        for k, v in headers.items():
+            self.send_header(k, v)
+        self.end_headers()
+        if server.truncate_requests > 0 and len(body) > 1:
+            server.truncate_requests -= 1
+            self.wfile.write(body[: len(body) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server():
+    httpd = FakeServer(("127.0.0.1", 0), FakeHandler)
+    httpd.ranges = []
+    httpd.failing_ranges = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def url(server: FakeServer) -> str:
+    return f"http://127.0.0.1:{server.server_address[1]}/file.bin"
+
+
+@pytest.fixture
+def tmp_dir():
+    _tmp_dir = TemporaryDirectory()
+    yield _tmp_dir.name
+    _tmp_dir.cleanup()
+
+
+def read(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def test_ranged_download(server: FakeServer, url: str, tmp_dir: str):
+    path = os.path.join(tmp_dir, "file.bin")
+    assert download_file(url, path, part_size=PART_SIZE, chunk_size=256) == path
+    assert read(path) == CONTENT
+    # One request per part
+    assert len(server.ranges) == 11
+    assert not os.path.exists(f"{path}{PARTIAL_SUFFIX}")
+    assert not os.path.exists(f"{path}{STATE_SUFFIX}")
+
+
+def test_small_file_single_request(server: FakeServer, url: str, tmp_dir: str):
+    server.content = CONTENT[:100]
+    path = os.path.join(tmp_dir, "file.bin")
+    download_file(url, path, part_size=PART_SIZE)
+    assert read(path) == CONTENT[:100]
+    assert len(server.ranges) == 1
+
+
+def test_server_without_ranges(server: FakeServer, url: str, tmp_dir: str):
+    server.supports_ranges = False
+    path = os.path.join(tmp_dir, "file.bin")
+    download_file(url, path, part_size=PART_SIZE)
+    assert read(path) == CONTENT
+    assert len(server.ranges) == 1
+
+
+def test_empty_file(server: FakeServer, url: str, tmp_dir: str):
+    server.content = b""
+    path = os.path.join(tmp_dir, "file.bin")
+    download_file(url, path, part_size=PART_SIZE)
+    assert read(path) == b""
+
+
+def test_part_resumes_after_broken_connection(server: FakeServer, url: str, tmp_dir: str):
+    path = os.path.join(tmp_dir, "file.bin")
+    server.truncate_requests = 3
+    download_file(url, path, part_size=PART_SIZE, max_parts=2)
+    assert read(path) == CONTENT
+    # Resumed requests start from the middle of a part
+    assert any(int(r.split("=")[1].split("-")[0]) % PART_SIZE for r in server.ranges if r)
+
+
+def test_resume_after_failed_download(server: FakeServer, url: str, tmp_dir: str):
+    path = os.path.join(tmp_dir, "file.bin")
+    failing = f"bytes={5 * PART_SIZE}-{6 * PART_SIZE - 1}"
+    server.failing_ranges = [failing]
+    with pytest.raises(file_downloader.requests.HTTPError):
+        download_file(url, path, part_size=PART_SIZE)
+    assert os.path.exists(f"{path}{PARTIAL_SUFFIX}")
+
+    server.failing_ranges = []
+    server.ranges = []
+    download_file(url, path, part_size=PART_SIZE)
+    assert read(path) == CONTENT
+    # Only the probe and the failed part are requested again
+    assert server.ranges == [f"bytes=0-{PART_SIZE - 1}", failing]
+
+
+def test_digest_verification(server: FakeServer, url: str, tmp_dir: str):
+    path = os.path.join(tmp_dir, "file.bin")
+    server.md5 = base64.b64encode(hashlib.md5(CONTENT).digest()).decode()
+    download_file(url, path, part_size=PART_SIZE)
+    assert read(path) == CONTENT
+
+    server.md5 = base64.b64encode(hashlib.md5(b"something else").digest()).decode()
+    with pytest.raises(DownloadVerificationError):
+        download_file(url, path, part_size=PART_SIZE)
+
+    server.md5 = None
+    with pytest.raises(DownloadVerificationError):
+        download_file(url, path, part_size=PART_SIZE, expected_md5="0" * 32)
+    download_file(url, path, part_size=PART_SIZE, expected_md5=hashlib.md5(CONTENT).hexdigest())
+
+
+def test_sessions_are_shared_per_host():
+    assert get_session("https://a.com/1") is get_session("https://a.com/2")
+    assert get_session("https://a.com/1") is not get_session("https://b.com/1")
@@ -128,3 +128,19 @@ def test_geom_field_serialization(converter: StacConverter):
     }
     round_trip = converter.from_stac_item(forward)
     assert test_vibe == round_trip
+
+
+def test_conversion_plan_matches_field_conversion(converter: StacConverter):
+    plan = converter.get_plan(DateVibe)
+    assert converter.get_plan(DateVibe) is plan
+    # Fields that do not need conversion are kept as they are, or shallow copied
+    conversions = dict(plan.property_fields)
+    assert conversions["int_field"] is None
+    assert conversions["other_list"] is list
+    assert conversions["date_field"] is not None
+
+    now = datetime.now()
+    values = {"date_dict": {"a": now}, "mixed_tuple": (1, now), "var_tuple": (now, now)}
+    types = {k: DateVibe.__annotations__[k] for k in values}
+    serialized = converter.serialize_fields(values, types)
+    assert serialized == {k: conversions[k](v) for k, v in values.items()}  # type: ignore
@@ -0,0 +1,65 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from vibe_core.data import AssetVibe
+from vibe_core.data.tabular import (
+    CSV_MIMETYPE,
+    PARQUET_MIMETYPE,
+    TableFormat,
+    read_table,
+    write_table,
+)
+
+
+@pytest.fixture
+def timeseries() -> pd.DataFrame:
+    index = pd.Index([datetime(2023, 1, d) for d in range(1, 6)], name="date")
+    return pd.DataFrame(
+        {"mean": np.linspace(0, 1, 5), "count": np.arange(5), "label": list("abcde")}, index=index
+    )
+
+
+def test_parquet_roundtrip_keeps_types_and_index(timeseries: pd.DataFrame, tmp_path: str):
+    asset = write_table(timeseries, str(tmp_path))
+    assert asset.type == PARQUET_MIMETYPE
+    assert asset.path_or_url.endswith(".parquet")
+    pd.testing.assert_frame_equal(read_table(asset), timeseries)
+
+
+def test_parquet_reads_selected_columns(timeseries: pd.DataFrame, tmp_path: str):
+    asset = write_table(timeseries, str(tmp_path))
+    pd.testing.assert_frame_equal(read_table(asset, columns=["count"]), timeseries[["count"]])
+
+
+def test_default_index_is_not_written(tmp_path: str):
+    df = pd.DataFrame({"unique_values": [0, 1, 2], "counts": [3, 3, 3]})
+    for format in TableFormat:
+        asset = write_table(df, str(tmp_path), format=format)
+        pd.testing.assert_frame_equal(read_table(asset), df)
+        indexed = read_table(asset, index_col="unique_values")
+        pd.testing.assert_frame_equal(indexed, df.set_index("unique_values"))
+
+
+def test_csv_export(timeseries: pd.DataFrame, tmp_path: str):
+    asset = write_table(timeseries, str(tmp_path), asset_id="export", format="csv")
+    assert asset.id == "export"
+    assert asset.type == CSV_MIMETYPE
+    assert os.path.basename(asset.path_or_url) == "export.csv"
+    df = read_table(asset, columns=["mean"], index_col="date")
+    assert df.index.tolist() == timeseries.index.strftime("%Y-%m-%d").tolist()
+    np.testing.assert_allclose(df["mean"], timeseries["mean"])
+
+
+def test_unsupported_asset(tmp_path: str):
+    path = os.path.join(tmp_path, "table.txt")
+    with open(path, "w") as f:
+        f.write("a b c")
+    with pytest.raises(ValueError):
+        read_table(AssetVibe(reference=path, type="text/plain", id="table"))
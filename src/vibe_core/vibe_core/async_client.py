@@ -0,0 +1,332 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""Asynchronous FarmVibes.AI client.
+
+This module provides a client that sends requests to the FarmVibes.AI service concurrently, over a
+pool of connections, so that many workflow runs (e.g., one per field) can be submitted and tracked
+without waiting for each round trip in turn. :class:`vibe_core.client.FarmvibesAiClient` uses it
+to describe and submit runs in bulk.
+
+This module requires `aiohttp`, which is not a dependency of `vibe_core` (install the `async`
+extra).
+"""
+
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Coroutine, Dict, Iterable, List, Optional, Tuple, TypeVar, Union, cast
+from urllib.parse import urljoin
+
+import aiohttp
+from requests.exceptions import HTTPError
+from shapely.geometry.base import BaseGeometry
+
+from vibe_core.client import (
+    DEFAULT_MAX_CONNECTIONS,
+    FarmvibesAiClient,
+    InputData,
+    RunSubmissionError,
+    T,
+)
+from vibe_core.data.json_converter import dump_to_json
+from vibe_core.datamodel import MetricsDict, RunConfigUser, RunStatus
+
+LIST_RUNS_MAX_IDS = 100
+"""Maximum number of run IDs per request when listing runs by ID, to keep URLs short."""
+
+R = TypeVar("R")
+
+
+def run_sync(coro: Coroutine[Any, Any, R]) -> R:
+    """Run a coroutine to completion from synchronous code.
+
+    The coroutine runs in a new event loop. If an event loop is already running in the current
+    thread (e.g., in a notebook), the new loop runs in another thread.
+
+    Args:
+        coro: The coroutine to run.
+
+    Returns:
+        The result of the coroutine.
+
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+
+class AsyncFarmvibesAiClient:
+    """An asynchronous client for the FarmVibes.AI service.
+
+    Requests share a pool of connections, which also bounds how many of them are sent
+    concurrently. The client should be closed when it is not needed anymore, e.g., by using it as
+    an async context manager::
+
+        async with AsyncFarmvibesAiClient(baseurl) as client:
+            runs = await client.describe_runs(run_ids)
+
+    Args:
+        baseurl: The base URL of the FarmVibes.AI service.
+        max_connections: The maximum number of concurrent connections to the service.
+
+    """
+
+    def __init__(self, baseurl: str, max_connections: int = DEFAULT_MAX_CONNECTIONS):
+        """Instantiate a new asynchronous FarmVibes.AI client."""
+        self.baseurl = baseurl
+        self.max_connections = max_connections
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """The HTTP session of the client, created in the running event loop when first used."""
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections),
+                headers=FarmvibesAiClient.default_headers,
+            )
+        return self._session
+
+    async def close(self):
+        """Close the connections of the client."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self) -> "AsyncFarmvibesAiClient":
+        return self
+
+    async def __aexit__(self, *args: Any):
+        await self.close()
+
+    async def _request(self, method: str, endpoint: str, **kwargs: Any) -> Any:
+        """Send a request to the FarmVibes.AI service and handle errors.
+
+        Args:
+            method: The HTTP method to use (e.g., 'GET' or 'POST').
+            endpoint: The endpoint to request.
+            kwargs: Keyword arguments to pass to :meth:`aiohttp.ClientSession.request`.
+
+        Returns:
+            The response from the FarmVibes.AI service.
+
+        Raises:
+            :exc:`requests.exceptions.HTTPError` if the service responds with an error, as
+            :class:`vibe_core.client.FarmvibesAiClient` does.
+
+        """
+        url = urljoin(self.baseurl, endpoint)
+        async with self.session.request(method, url, **kwargs) as response:
+            text = await response.text()
+        try:
+            r = json.loads(text)
+        except json.JSONDecodeError:
+            r = text
+        if response.status >= 400:
+            error_message = r.get("message", "") if isinstance(r, dict) else r
+            kind = "Client" if response.status < 500 else "Server"
+            raise HTTPError(
+                f"{response.status} {kind} Error: {response.reason} for url: {url}. {error_message}"
+            )
+        return cast(Any, r)
+
+    async def list_workflows(self) -> List[str]:
+        """List all available workflows on the FarmVibes.AI service.
+
+        Returns:
+            A list of workflow names.
+
+        """
+        return await self._request("GET", "v0/workflows")
+
+    async def get_system_metrics(self) -> MetricsDict:
+        """Get system metrics from the FarmVibes.AI service.
+
+        Returns:
+            A dictionary containing system metrics.
+
+        """
+        return MetricsDict(**await self._request("GET", "v0/system-metrics"))
+
+    async def verify_disk_space(self):
+        """Verify that there is enough disk space available for the cache.
+
+        See :meth:`vibe_core.client.FarmvibesAiClient.verify_disk_space`.
+
+        """
+        FarmvibesAiClient._check_disk_space(await self.get_system_metrics())
+
+    async def list_runs(
+        self,
+        ids: Optional[Union[str, List[str]]] = None,
+        fields: Optional[Union[str, List[str]]] = None,
+        status: Optional[Union[RunStatus, List[RunStatus]]] = None,
+        workflow: Optional[str] = None,
+        submitted_after: Optional[datetime] = None,
+        newest_first: bool = False,
+        limit: Optional[int] = None,
+    ) -> List[Any]:
+        """List workflow runs on the FarmVibes.AI service.
+
+        See :meth:`vibe_core.client.FarmvibesAiClient.list_runs` for the arguments.
+
+        Returns:
+            A list of workflow runs.
+
+        """
+        return await self._request(
+            "GET",
+            FarmvibesAiClient._list_runs_endpoint(
+                ids, fields, status, workflow, submitted_after, newest_first, limit
+            ),
+        )
+
+    async def list_runs_by_id(
+        self, run_ids: Iterable[str], fields: Optional[Union[str, List[str]]] = None
+    ) -> List[Dict[str, Any]]:
+        """List workflow runs by ID, sending requests for groups of runs concurrently.
+
+        Args:
+            run_ids: The IDs of the workflow runs to list.
+            fields: The fields to return for each workflow run.
+                If None, all fields will be returned.
+
+        Returns:
+            The workflow runs, in the order of `run_ids`.
+
+        """
+        ids = list(run_ids)
+        chunks = [ids[i : i + LIST_RUNS_MAX_IDS] for i in range(0, len(ids), LIST_RUNS_MAX_IDS)]
+        listed = await asyncio.gather(*[self.list_runs(chunk, fields) for chunk in chunks])
+        return [run for runs in listed for run in runs]
+
+    async def describe_run(self, run_id: str) -> RunConfigUser:
+        """Describe a workflow run.
+
+        Args:
+            run_id: The ID of the workflow run to describe.
+
+        Returns:
+            A :class:`RunConfigUser` object containing the workflow run description.
+
+        """
+        response = await self._request("GET", f"v0/runs/{run_id}")
+        return FarmvibesAiClient._parse_run_description(run_id, response)
+
+    async def describe_runs(self, run_ids: Iterable[str]) -> List[RunConfigUser]:
+        """Describe workflow runs concurrently.
+
+        Args:
+            run_ids: The IDs of the workflow runs to describe.
+
+        Returns:
+            The :class:`RunConfigUser` objects of the workflow runs, in the order of `run_ids`.
+
+        """
+        return list(await asyncio.gather(*[self.describe_run(i) for i in run_ids]))
+
+    async def cancel_run(self, run_id: str) -> str:
+        """Cancel a workflow run.
+
+        Args:
+            run_id: The ID of the workflow run to cancel.
+
+        Returns:
+            The message from the FarmVibes.AI service.
+
+        """
+        return (await self._request("POST", f"v0/runs/{run_id}/cancel"))["message"]
+
+    async def delete_run(self, run_id: str) -> str:
+        """Delete a workflow run.
+
+        Args:
+            run_id: The ID of the workflow run to delete.
+
+        Returns:
+            The message from the FarmVibes.AI service.
+
+        """
+        return (await self._request("DELETE", f"v0/runs/{run_id}"))["message"]
+
+    async def _submit(
+        self,
+        workflow: Union[str, Dict[str, Any]],
+        name: str,
+        geometry: Optional[BaseGeometry] = None,
+        time_range: Optional[Tuple[datetime, datetime]] = None,
+        input_data: Optional[InputData[T]] = None,
+        parameters: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        payload = dump_to_json(
+            FarmvibesAiClient._form_payload(
+                workflow, parameters, geometry, time_range, input_data, name
+            )
+        )
+        return (await self._request("POST", "v0/runs", data=payload))["id"]
+
+    async def run(
+        self,
+        workflow: Union[str, Dict[str, Any]],
+        name: str,
+        *,
+        geometry: Optional[BaseGeometry] = None,
+        time_range: Optional[Tuple[datetime, datetime]] = None,
+        input_data: Optional[InputData[T]] = None,
+        parameters: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """Run a workflow.
+
+        See :meth:`vibe_core.client.FarmvibesAiClient.run` for the arguments.
+
+        Returns:
+            The ID of the workflow run.
+
+        """
+        await self.verify_disk_space()
+        return await self._submit(workflow, name, geometry, time_range, input_data, parameters)
+
+    async def run_many(
+        self,
+        workflow: Union[str, Dict[str, Any]],
+        runs: Iterable[Dict[str, Any]],
+        max_concurrency: int = DEFAULT_MAX_CONNECTIONS,
+    ) -> List[str]:
+        """Run a workflow on several inputs, submitting runs concurrently.
+
+        Disk space is verified once, before the runs are submitted.
+
+        Args:
+            workflow: The name of the workflow to run or a dict containing
+                the workflow definition.
+            runs: The keyword arguments of :meth:`run` of each run (i.e., `name`, and either
+                `geometry` and `time_range` or `input_data`, and optionally `parameters`).
+            max_concurrency: The maximum number of runs submitted concurrently.
+
+        Returns:
+            The IDs of the workflow runs, in the order of `runs`.
+
+        Raises:
+            :exc:`vibe_core.client.RunSubmissionError` if some of the runs failed to be submitted,
+            with the IDs of the runs that were. The other runs are submitted regardless.
+
+        """
+        await self.verify_disk_space()
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def submit(kwargs: Dict[str, Any]) -> str:
+            async with semaphore:
+                return await self._submit(workflow, **kwargs)
+
+        results = await asyncio.gather(*[submit(kwargs) for kwargs in runs], return_exceptions=True)
+        errors = {i: r for i, r in enumerate(results) if isinstance(r, BaseException)}
+        if errors:
+            raise RunSubmissionError(
+                [None if i in errors else r for i, r in enumerate(results)], errors
+            ) from errors[min(errors)]
+        return cast(List[str], results)
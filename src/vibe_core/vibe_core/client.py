@@ -11,14 +11,26 @@ monitoring, cancelling, etc.)
 import json
 import logging
 import os
+import threading
 import time
 import warnings
 from abc import ABC, abstractmethod
 from dataclasses import asdict
 from datetime import datetime
 from enum import auto
-from typing import Any, Dict, List, Optional, Tuple, TypeVar, Union, cast, overload
-from urllib.parse import urljoin
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+    cast,
+    overload,
+)
+from urllib.parse import urlencode, urljoin
 
 import requests
 import yaml
@@ -80,6 +92,20 @@ DISK_FREE_THRESHOLD_BYTES = 50 * 1024 * 1024 * 1024  # 50 GiB
 TASK_SORT_KEY = "submission_time"
 """Key for sorting tasks."""
 
+STATUS_STREAM_READ_TIMEOUT_S = 60
+"""Time without receiving data after which the run status stream is considered broken.
+
+The service sends keep-alive messages more frequently than this.
+"""
+
+DEFAULT_MAX_CONNECTIONS = 16
+"""Default maximum number of concurrent connections of clients that send requests concurrently."""
+
+RUN_FIELDS = ["id", "name", "workflow", "parameters"]
+"""Fields of the workflow runs listed to build :class:`VibeWorkflowRun` objects."""
+
+LOGGER = logging.getLogger(__name__)
+
 T = TypeVar("T", bound=BaseVibe, covariant=True)
 InputData = Union[Dict[str, Union[T, List[T]]], List[T], T]
 
@@ -102,6 +128,35 @@ class ClusterType(StrEnum):
         )
 
 
+class RunSubmissionError(RuntimeError):
+    """Raised when some of the runs submitted together failed to be submitted.
+
+    The runs that were submitted are kept, so that they can be followed (or cancelled) without
+    submitting them again.
+
+    Args:
+        runs: The submitted runs (their IDs or :class:`VibeWorkflowRun` objects), in the order
+            they were given, with None for each run that failed to be submitted.
+        errors: The exception raised when submitting each run that failed, by position.
+
+    """
+
+    def __init__(self, runs: List[Any], errors: Dict[int, BaseException]):
+        """Instantiate a new run submission error."""
+        first = min(errors)
+        super().__init__(
+            f"{len(errors)} of {len(runs)} runs failed to be submitted "
+            f"(first failure, run {first}: {errors[first]})"
+        )
+        self.runs = runs
+        self.errors = errors
+
+    @property
+    def submitted(self) -> List[Any]:
+        """The runs that were submitted, in the order they were given."""
+        return [r for r in self.runs if r is not None]
+
+
 class Client(ABC):
     """An abstract base class for clients."""
 
@@ -188,8 +243,8 @@ class FarmvibesAiClient(Client):
             raise HTTPError(msg, response=e.response)
         return cast(Any, r)
 
+    @staticmethod
     def _form_payload(
-        self,
         workflow: Union[str, Dict[str, Any]],
         parameters: Optional[Dict[str, Any]],
         geometry: Optional[BaseGeometry],
@@ -253,7 +308,10 @@ class FarmvibesAiClient(Client):
             :exc:`RuntimeWarning` if the disk space is low.
 
         """
-        metrics = self.get_system_metrics()
+        self._check_disk_space(self.get_system_metrics())
+
+    @staticmethod
+    def _check_disk_space(metrics: MetricsDict):
         df = cast(Optional[int], metrics.get("disk_free", None))
         if df is not None and df < DISK_FREE_THRESHOLD_BYTES:
             warnings.warn(
@@ -401,7 +459,10 @@ class FarmvibesAiClient(Client):
             A :class:`RunConfigUser` object containing the workflow run description.
 
         """
-        response = self._request("GET", f"v0/runs/{run_id}")
+        return self._parse_run_description(run_id, self._request("GET", f"v0/runs/{run_id}"))
+
+    @staticmethod
+    def _parse_run_description(run_id: str, response: Dict[str, Any]) -> RunConfigUser:
         try:
             run = RunConfigUser(**response)
             for v in run.task_details.values():
@@ -411,6 +472,30 @@ class FarmvibesAiClient(Client):
             raise RuntimeError(f"Failed to parse description for run {run_id}: {e}") from e
         return run
 
+    def describe_runs(
+        self, run_ids: Iterable[str], max_connections: int = DEFAULT_MAX_CONNECTIONS
+    ) -> List[RunConfigUser]:
+        """Describe workflow runs, concurrently.
+
+        The runs are described by an :class:`~vibe_core.async_client.AsyncFarmvibesAiClient`,
+        which requires the `async` extra of `vibe_core`.
+
+        Args:
+            run_ids: The IDs of the workflow runs to describe.
+            max_connections: The maximum number of concurrent connections to the service.
+
+        Returns:
+            The :class:`RunConfigUser` objects of the workflow runs, in the order of `run_ids`.
+
+        """
+        from vibe_core.async_client import AsyncFarmvibesAiClient, run_sync
+
+        async def describe() -> List[RunConfigUser]:
+            async with AsyncFarmvibesAiClient(self.baseurl, max_connections) as client:
+                return await client.describe_runs(run_ids)
+
+        return run_sync(describe())
+
     def document_workflow(self, workflow_name: str) -> None:
         """Print the documentation of a workflow.
 
@@ -441,14 +526,26 @@ class FarmvibesAiClient(Client):
         self,
         ids: Optional[Union[str, List[str]]] = None,
         fields: Optional[Union[str, List[str]]] = None,
+        status: Optional[Union[RunStatus, List[RunStatus]]] = None,
+        workflow: Optional[str] = None,
+        submitted_after: Optional[datetime] = None,
+        newest_first: bool = False,
+        limit: Optional[int] = None,
     ):
         """List workflow runs on the FarmVibes.AI service.
 
+        Filters and limits are applied by the service, so only the matching runs are fetched.
+
         Args:
             ids: The IDs of the workflow runs to list.
                 If None, all workflow runs will be listed.
             fields: The fields to return for each workflow run.
                 If None, all fields will be returned.
+            status: Only list runs with this status (or one of these statuses).
+            workflow: Only list runs of the workflow with this name.
+            submitted_after: Only list runs submitted at or after this time.
+            newest_first: Whether to list the most recently submitted runs first.
+            limit: Maximum number of runs to list.
 
         Returns:
             A list of workflow runs. Each run is represented by a dictionary
@@ -456,11 +553,39 @@ class FarmvibesAiClient(Client):
             the field values.
 
         """
-        ids = [f"ids={id}" for id in ensure_list(ids)] if ids is not None else []
-        fields = [f"fields={field}" for field in ensure_list(fields)] if fields is not None else []
-        query_str = "&".join(ids + fields)
+        return self._request(
+            "GET",
+            self._list_runs_endpoint(
+                ids, fields, status, workflow, submitted_after, newest_first, limit
+            ),
+        )
 
-        return self._request("GET", f"v0/runs?{query_str}")
+    @staticmethod
+    def _list_runs_endpoint(
+        ids: Optional[Union[str, List[str]]] = None,
+        fields: Optional[Union[str, List[str]]] = None,
+        status: Optional[Union[RunStatus, List[RunStatus]]] = None,
+        workflow: Optional[str] = None,
+        submitted_after: Optional[datetime] = None,
+        newest_first: bool = False,
+        limit: Optional[int] = None,
+    ) -> str:
+        params: Dict[str, Any] = {}
+        if ids is not None:
+            params["ids"] = ensure_list(ids)
+        if fields is not None:
+            params["fields"] = ensure_list(fields)
+        if status is not None:
+            params["status"] = [str(s) for s in ensure_list(status)]
+        if workflow is not None:
+            params["workflow"] = workflow
+        if submitted_after is not None:
+            params["submitted_after"] = submitted_after.isoformat()
+        if newest_first:
+            params["newest_first"] = "true"
+        if limit is not None:
+            params["items"] = limit
+        return f"v0/runs?{urlencode(params, doseq=True)}"
 
     def get_run_by_id(self, id: str) -> "VibeWorkflowRun":
         """Get a workflow run by ID.
@@ -475,9 +600,8 @@ class FarmvibesAiClient(Client):
             A :class:`VibeWorkflowRun` object.
 
         """
-        fields = ["id", "name", "workflow", "parameters"]
-        run = self.list_runs(id, fields=fields)[0]
-        return VibeWorkflowRun(*(run[f] for f in fields), self)  # type: ignore
+        run = self.list_runs(id, fields=RUN_FIELDS)[0]
+        return VibeWorkflowRun(*(run[f] for f in RUN_FIELDS), self)  # type: ignore
 
     def get_last_runs(self, n: int) -> List["VibeWorkflowRun"]:
         """Get the last 'n' workflow runs.
@@ -495,7 +619,7 @@ class FarmvibesAiClient(Client):
         if n <= 0:
             raise ValueError(f"The number of runs (n) must be greater than 0. Got {n} instead.")
 
-        last_runs = self.list_runs()[-n:]
+        last_runs = self.list_runs(newest_first=True, limit=n)[::-1]
         if not last_runs:
             raise ValueError("No past runs available.")
         elif len(last_runs) < n:
@@ -611,6 +735,51 @@ class FarmvibesAiClient(Client):
         response = self._request("POST", "v0/runs", data=payload)
         return self.get_run_by_id(response["id"])
 
+    def run_many(
+        self,
+        workflow: Union[str, Dict[str, Any]],
+        runs: Iterable[Dict[str, Any]],
+        max_concurrency: int = DEFAULT_MAX_CONNECTIONS,
+    ) -> List["VibeWorkflowRun"]:
+        """Run a workflow on several inputs, submitting runs concurrently.
+
+        The runs are submitted by an :class:`~vibe_core.async_client.AsyncFarmvibesAiClient`,
+        which requires the `async` extra of `vibe_core`.
+
+        Args:
+            workflow: The name of the workflow to run or a dict containing
+                the workflow definition.
+            runs: The keyword arguments of :meth:`run` of each run (i.e., `name`, and either
+                `geometry` and `time_range` or `input_data`, and optionally `parameters`).
+            max_concurrency: The maximum number of runs submitted concurrently.
+
+        Returns:
+            The :class:`VibeWorkflowRun` objects of the submitted runs, in the order of `runs`.
+
+        Raises:
+            :exc:`RunSubmissionError` if some of the runs failed to be submitted, with the
+            :class:`VibeWorkflowRun` objects of the runs that were.
+
+        """
+        from vibe_core.async_client import AsyncFarmvibesAiClient, run_sync
+
+        async def submit() -> List[Dict[str, Any]]:
+            async with AsyncFarmvibesAiClient(self.baseurl, max_concurrency) as client:
+                try:
+                    run_ids = await client.run_many(workflow, runs, max_concurrency)
+                except RunSubmissionError as e:
+                    submitted = iter(await client.list_runs_by_id(e.submitted, fields=RUN_FIELDS))
+                    e.runs = [
+                        None if i is None else self._workflow_run(next(submitted)) for i in e.runs
+                    ]
+                    raise
+                return await client.list_runs_by_id(run_ids, fields=RUN_FIELDS)
+
+        return [self._workflow_run(r) for r in run_sync(submit())]
+
+    def _workflow_run(self, run: Dict[str, Any]) -> "VibeWorkflowRun":
+        return VibeWorkflowRun(*(run[f] for f in RUN_FIELDS), self)  # type: ignore
+
     def resubmit_run(self, run_id: str) -> "VibeWorkflowRun":
         """Resubmit a workflow run with the given run ID.
 
@@ -625,6 +794,19 @@ class FarmvibesAiClient(Client):
         response = self._request("POST", f"v0/runs/{run_id}/resubmit")
         return self.get_run_by_id(response["id"])
 
+    def stream_run_status(self, run_ids: Iterable[str]) -> "RunStatusListener":
+        """Follow the status of workflow runs with updates pushed by the service.
+
+        Args:
+            run_ids: The IDs of the workflow runs to follow.
+
+        Returns:
+            A listener that receives status updates in the background. It must be closed
+            after use.
+
+        """
+        return RunStatusListener(self, run_ids)
+
     def _loop_update_monitor_table(
         self,
         runs: List["VibeWorkflowRun"],
@@ -632,6 +814,27 @@ class FarmvibesAiClient(Client):
         refresh_time_s: int,
         refresh_warnings_time_min: int,
         timeout_min: Optional[int],
+    ):
+        # Runs read their status from the stream while it is healthy, and poll otherwise
+        listener = self.stream_run_status([r.id for r in runs])
+        for run in runs:
+            run._listener = listener
+        try:
+            self._update_monitor_table(
+                runs, monitor, refresh_time_s, refresh_warnings_time_min, timeout_min
+            )
+        finally:
+            for run in runs:
+                run._listener = None
+            listener.close()
+
+    def _update_monitor_table(
+        self,
+        runs: List["VibeWorkflowRun"],
+        monitor: VibeWorkflowRunMonitor,
+        refresh_time_s: int,
+        refresh_warnings_time_min: int,
+        timeout_min: Optional[int],
     ):
         stop_monitoring = False
         time_start = last_warning_refresh = time.monotonic()
@@ -726,6 +929,138 @@ class FarmvibesAiClient(Client):
         )
 
 
+class RunStatusListener:
+    """Follow status updates of workflow runs pushed by the FarmVibes.AI service.
+
+    Updates are received as server-sent events in a background thread. If the stream cannot be
+    established or breaks, the listener is marked as failed, and callers should fall back to
+    polling the service.
+
+    Args:
+        client: An instance of the :class:`FarmVibesAiClient` class.
+        run_ids: The IDs of the workflow runs to follow.
+    """
+
+    read_timeout_s = STATUS_STREAM_READ_TIMEOUT_S
+
+    def __init__(self, client: FarmvibesAiClient, run_ids: Iterable[str]):
+        """Instantiate a new RunStatusListener and start listening for updates."""
+        self.client = client
+        self.run_ids = list(run_ids)
+        self.failed = False
+        self.finished = False
+        self._details: Dict[str, Dict[str, Any]] = {}
+        self._task_details: Dict[str, Dict[str, Any]] = {}
+        self._closed = False
+        self._response: Optional[requests.Response] = None
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._listen, daemon=True)
+        self._thread.start()
+
+    def _listen(self):
+        try:
+            response = self.client.session.get(
+                urljoin(self.client.baseurl, "v0/runs/events"),
+                params={"ids": self.run_ids},
+                headers={"Accept": "text/event-stream"},
+                stream=True,
+                timeout=(self.read_timeout_s, self.read_timeout_s),
+            )
+            self._response = response
+            response.raise_for_status()
+            event, data = "", []
+            # Read chunks as they arrive instead of waiting for fixed-size reads
+            for raw_line in response.iter_lines(chunk_size=None):
+                line = raw_line.decode("utf-8") if isinstance(raw_line, bytes) else raw_line
+                if self._closed:
+                    return
+                if not line:
+                    if data:
+                        self._handle_event(event, json.loads("\n".join(data)))
+                    event, data = "", []
+                elif not line.startswith(":"):
+                    field, _, value = line.partition(":")
+                    value = value[1:] if value.startswith(" ") else value
+                    if field == "event":
+                        event = value
+                    elif field == "data":
+                        data.append(value)
+            if not self.finished:
+                raise ConnectionError("Run status stream was closed by the service")
+        except Exception as e:
+            if not self._closed:
+                LOGGER.debug(f"Run status stream failed, falling back to polling: {e}")
+            with self._condition:
+                self.failed = True
+                self._condition.notify_all()
+
+    def _handle_event(self, event: str, data: Dict[str, Any]):
+        with self._condition:
+            if event == "snapshot":
+                self._details[data["id"]] = data["details"]
+                self._task_details[data["id"]] = dict(data["task_details"])
+            elif event == "update":
+                if "details" in data:
+                    self._details[data["id"]] = data["details"]
+                self._task_details.setdefault(data["id"], {}).update(data["task_details"])
+            elif event == "end":
+                self.finished = True
+            self._condition.notify_all()
+
+    def status(self, run_id: str) -> Optional[RunStatus]:
+        """Get the latest status of a run, or None if it is not available from the stream."""
+        with self._condition:
+            if self.failed or run_id not in self._details:
+                return None
+            return RunStatus(self._details[run_id]["status"])
+
+    def task_details(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """Get the latest task details of a run, or None if not available from the stream."""
+        with self._condition:
+            if self.failed or run_id not in self._task_details:
+                return None
+            return dict(self._task_details[run_id])
+
+    def wait_for_status(
+        self, run_id: str, statuses: List[RunStatus], timeout_s: Optional[float] = None
+    ) -> Optional[RunStatus]:
+        """Wait until a run reaches one of the statuses, the stream ends, or the timeout expires.
+
+        Args:
+            run_id: The ID of the run.
+            statuses: The statuses to wait for.
+            timeout_s: Timeout in seconds. If not provided, wait indefinitely.
+
+        Returns:
+            The latest status of the run, or None if it is not available from the stream.
+
+        """
+
+        def done() -> bool:
+            if self.failed or self.finished:
+                return True
+            details = self._details.get(run_id)
+            return details is not None and details["status"] in statuses
+
+        with self._condition:
+            self._condition.wait_for(done, timeout_s)
+        return self.status(run_id)
+
+    def close(self):
+        """Stop listening for updates."""
+        self._closed = True
+        if self._response is not None:
+            self._response.close()
+
+    def __enter__(self) -> "RunStatusListener":
+        """Return the listener, to be closed when the context exits."""
+        return self
+
+    def __exit__(self, *args: Any):
+        """Close the listener."""
+        self.close()
+
+
 class VibeWorkflowRun(WorkflowRun, MonitoredWorkflowRun):
     """Represent a workflow run in FarmVibes.AI.
 
@@ -758,6 +1093,7 @@ class VibeWorkflowRun(WorkflowRun, MonitoredWorkflowRun):
         self._reason = ""
         self._output = None
         self._task_details = None
+        self._listener: Optional[RunStatusListener] = None
 
     def _convert_output(self, output: Dict[str, Any]) -> BaseVibeDict:
         """Convert the output of the workflow run to a :class:`BaseVibeDict`.
@@ -826,23 +1162,33 @@ class VibeWorkflowRun(WorkflowRun, MonitoredWorkflowRun):
 
         """
         time_start = time.monotonic()
+        # Deletion statuses are not pushed by the service, so we poll for them
+        if RunStatus.deleted not in block_until_statuses:
+            with self.client.stream_run_status([self.id]) as listener:
+                status = listener.wait_for_status(self.id, block_until_statuses, timeout_s)
+            if status in block_until_statuses:
+                self._status = cast(RunStatus, status)
+                return self
+
+        # Fall back to polling for the remaining time if the stream is not available
         while self.status not in block_until_statuses:
-            time.sleep(self.wait_s)
             if timeout_s is not None and (time.monotonic() - time_start) > timeout_s:
                 status_options = " or ".join(block_until_statuses)
                 raise RuntimeError(
                     f"Timeout of {timeout_s}s reached while waiting for the workflow to have a "
                     f"status of {status_options}. Workflow is currently in status {self.status}."
                 )
+            time.sleep(self.wait_s)
         return self
 
     @property
     def status(self) -> RunStatus:
         """Get the status of the workflow run."""
         if self._status is not RunStatus.deleted:
-            self._status = cast(
-                RunStatus, RunStatus(self.client.list_runs(self.id)[0]["details.status"])
-            )
+            status = self._listener.status(self.id) if self._listener is not None else None
+            if status is None:
+                status = RunStatus(self.client.list_runs(self.id)[0]["details.status"])
+            self._status = cast(RunStatus, status)
         return self._status
 
     @property
@@ -850,11 +1196,18 @@ class VibeWorkflowRun(WorkflowRun, MonitoredWorkflowRun):
         """Get the task details of the workflow run."""
         if self._task_details is not None:
             return self._task_details
-        status = self.status
-        task_details = self._convert_task_details(
-            self.client.list_runs(ids=self.id, fields="task_details")[0]["task_details"]
+        finished = RunStatus.finished(self.status)
+        # Status updates only carry the status of subtasks, so details of finished runs, which
+        # are cached, are always fetched in full
+        details = (
+            self._listener.task_details(self.id)
+            if self._listener is not None and not finished
+            else None
         )
-        if RunStatus.finished(status):
+        if details is None:
+            details = self.client.list_runs(ids=self.id, fields="task_details")[0]["task_details"]
+        task_details = self._convert_task_details(details)
+        if finished:
             self._task_details = task_details
         return task_details
 
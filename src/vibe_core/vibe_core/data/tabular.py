@@ -0,0 +1,107 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""Reading and writing tabular assets.
+
+Tables produced by ops are stored as Parquet files, which keep the column types and the index of
+the data frame, are compressed, and may be read one column at a time. CSV is still supported as an
+export format, and for assets written by earlier versions of the ops.
+
+This module requires `pandas` and `pyarrow`, which are not dependencies of `vibe_core` (install
+the `tabular` extra).
+"""
+
+import mimetypes
+import os
+from typing import List, Optional, Union
+
+import pandas as pd
+from strenum import StrEnum
+
+from .core_types import AssetVibe, gen_guid
+
+PARQUET_MIMETYPE = "application/vnd.apache.parquet"
+"""MIME type of Parquet assets."""
+
+CSV_MIMETYPE = mimetypes.types_map[".csv"]
+"""MIME type of CSV assets."""
+
+
+class TableFormat(StrEnum):
+    """File formats of tabular assets."""
+
+    parquet = "parquet"
+    csv = "csv"
+
+
+TABLE_MIMETYPES = {TableFormat.parquet: PARQUET_MIMETYPE, TableFormat.csv: CSV_MIMETYPE}
+PARQUET_COMPRESSION = "zstd"
+
+# So that downloaded Parquet assets get the right extension
+mimetypes.add_type(PARQUET_MIMETYPE, f".{TableFormat.parquet}")
+
+
+def _has_default_index(df: pd.DataFrame) -> bool:
+    return isinstance(df.index, pd.RangeIndex) and df.index.name is None
+
+
+def write_table(
+    df: pd.DataFrame,
+    output_dir: str,
+    asset_id: Optional[str] = None,
+    format: Union[str, TableFormat] = TableFormat.parquet,
+) -> AssetVibe:
+    """Write a data frame to a tabular asset.
+
+    The index of the data frame is written along with its columns, unless it is a default
+    (unnamed) range index.
+
+    Args:
+        df: The data frame to be written.
+        output_dir: The directory in which the file is written.
+        asset_id: The ID of the asset (and name of the file). A new ID is generated if omitted.
+        format: The file format of the asset.
+
+    Returns:
+        The asset of the written file.
+    """
+    format = TableFormat(format)
+    asset_id = asset_id or gen_guid()
+    filepath = os.path.join(output_dir, f"{asset_id}.{format}")
+    if format == TableFormat.parquet:
+        # A default index is only kept in the metadata of the file
+        df.to_parquet(filepath, engine="pyarrow", compression=PARQUET_COMPRESSION)
+    else:
+        df.to_csv(filepath, index=not _has_default_index(df))
+    return AssetVibe(reference=filepath, type=TABLE_MIMETYPES[format], id=asset_id)
+
+
+def read_table(
+    asset: AssetVibe, columns: Optional[List[str]] = None, index_col: Optional[str] = None
+) -> pd.DataFrame:
+    """Read a tabular asset into a data frame.
+
+    Parquet files are memory-mapped, and only the requested columns are read.
+
+    Args:
+        asset: The tabular asset, in Parquet or CSV format.
+        columns: The columns to be read. All columns are read if omitted.
+        index_col: The column that is the index of the table. Parquet files keep their index,
+            so it only needs to be given for CSV files.
+
+    Returns:
+        The data frame.
+
+    Raises:
+        ValueError: If the asset is not in a supported format.
+    """
+    path = asset.local_path
+    if asset.type == PARQUET_MIMETYPE or path.endswith(f".{TableFormat.parquet}"):
+        df = pd.read_parquet(path, engine="pyarrow", columns=columns, memory_map=True)
+        if index_col is not None and index_col in df.columns:
+            df = df.set_index(index_col)
+        return df
+    if asset.type == CSV_MIMETYPE or path.endswith(f".{TableFormat.csv}"):
+        usecols = None if columns is None else columns + ([index_col] if index_col else [])
+        return pd.read_csv(path, usecols=usecols, index_col=index_col)
+    raise ValueError(f"Unable to read table from asset {asset.id} of type {asset.type}")
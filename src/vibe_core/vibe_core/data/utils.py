@@ -3,15 +3,18 @@
 
 """Utilities for interacting with STAC items and serialization/deserialization."""
 
-import json
-from dataclasses import fields
+from copy import deepcopy
+from dataclasses import asdict, fields, is_dataclass
 from datetime import datetime
+from functools import partial
 from typing import (
     Any,
     Callable,
+    ClassVar,
     Dict,
     List,
     NamedTuple,
+    Optional,
     Tuple,
     Type,
     TypeVar,
@@ -23,6 +26,7 @@ from typing import (
     overload,
 )
 
+import orjson
 from pydantic import BaseModel
 from pystac.asset import Asset
 from pystac.item import Item
@@ -35,7 +39,6 @@ from .core_types import (
     BaseVibe,
     DataVibe,
     DataVibeType,
-    get_filtered_init_fields,
     get_init_field_names,
 )
 
@@ -53,20 +56,53 @@ class FieldConverter(NamedTuple):
     """A function that deserialize a value."""
 
 
+ATOMIC_TYPES = (str, int, float, bool, type(None))
+"""Types that are serialized as is, and do not need to be copied."""
+
+
 def is_json_serializable(x: Any) -> bool:
     """Check if a field is JSON serializable by Python's default serializer.
 
+    The check is done by inspecting the value, instead of trying to serialize it.
+
     Args:
         x: The value to check.
 
     Returns:
         True if the value is JSON serializable, False otherwise.
     """
-    try:
-        json.dumps(x)
+    if isinstance(x, ATOMIC_TYPES):
         return True
-    except (TypeError, OverflowError):
-        return False
+    if isinstance(x, (list, tuple)):
+        return all(is_json_serializable(i) for i in x)
+    if isinstance(x, dict):
+        return all(
+            isinstance(k, ATOMIC_TYPES) and is_json_serializable(v)
+            for k, v in x.items()  # type: ignore
+        )
+    return False
+
+
+def to_plain_value(x: Any) -> Any:
+    """Copy a field value, converting dataclasses into dicts, like :func:`dataclasses.asdict`.
+
+    Args:
+        x: The value to copy.
+
+    Returns:
+        The copied value.
+    """
+    if type(x) in ATOMIC_TYPES:
+        return x
+    if is_dataclass(x) and not isinstance(x, type):
+        return asdict(x)
+    if isinstance(x, tuple) and hasattr(x, "_fields"):
+        return type(x)(*[to_plain_value(v) for v in x])
+    if isinstance(x, (list, tuple)):
+        return type(x)(to_plain_value(v) for v in x)
+    if isinstance(x, dict):
+        return type(x)((to_plain_value(k), to_plain_value(v)) for k, v in x.items())
+    return deepcopy(x)
 
 
 def to_isoformat(x: datetime) -> str:
@@ -81,6 +117,41 @@ def to_isoformat(x: datetime) -> str:
     return x.isoformat()
 
 
+FieldPlan = Tuple[str, Optional[Callable[[Any], Any]]]
+
+
+class ConversionPlan(NamedTuple):
+    """Precompiled conversion of the fields of a :class:`BaseVibe` subclass to and from STAC."""
+
+    property_fields: List[FieldPlan]
+    """Fields stored as STAC item properties, with their serializers (None if not needed)."""
+
+    init_fields: List[FieldPlan]
+    """Fields of the `__init__` method, with their deserializers (None if not needed)."""
+
+
+def _map_list(convert: Callable[[Any], Any], value: Any) -> List[Any]:
+    return [convert(v) for v in value]
+
+
+def _map_dict(convert: Callable[[Any], Any], value: Any) -> Dict[Any, Any]:
+    return {k: convert(v) for k, v in value.items()}
+
+
+def _map_tuple(convert: Callable[[Any], Any], value: Any) -> Tuple[Any, ...]:
+    return tuple(convert(v) for v in value)
+
+
+def _map_fixed_tuple(converters: List[Optional[Callable[[Any], Any]]], value: Any):
+    return tuple(v if c is None else c(v) for v, c in zip(value, converters))
+
+
+def _serialize_model(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return orjson.loads(value.json())
+    return value
+
+
 class StacConverter:
     """Convert :class:`BaseVibe` objects to STAC Items."""
 
@@ -96,6 +167,8 @@ class StacConverter:
     BASEVIBE_FALLBACK_DATETIME = datetime(1970, 1, 1)
     """The fallback datetime to use for :class:`BaseVibe` objects."""
 
+    _plans: ClassVar[Dict[Tuple[type, Type[BaseVibe]], ConversionPlan]] = {}
+
     def __init__(self):
         """Instantiate a StacConverter object."""
         pass
@@ -121,11 +194,9 @@ class StacConverter:
     def _serialize_type(self, field_value: Any, field_type: Any) -> Any:
         converter = self.field_converters.get(field_type)
         if converter is None:
-            if isinstance(field_value, BaseModel):
-                # We have to do this, otherwise our sanitizer will filter out
-                # this value
-                return json.loads(field_value.json())
-            return field_value
+            # We have to do this for pydantic models, otherwise our sanitizer will filter out
+            # this value
+            return _serialize_model(field_value)
         return converter.serializer(field_value)
 
     def _deserialize_type(self, field_value: Any, field_type: Any) -> Any:
@@ -177,6 +248,87 @@ class StacConverter:
                     return tuple(self.convert_field(f, type(f), converter) for f in field_value)
         return converter(field_value, field_type)
 
+    def compile_field(self, field_type: Any, serialize: bool) -> Optional[Callable[[Any], Any]]:
+        """Build a function that converts values of a field, equivalent to :meth:`convert_field`.
+
+        The type inspection is done once, when building the function, instead of for every value.
+
+        Args:
+            field_type: The type of the field.
+            serialize: Whether to build a serializer or a deserializer.
+
+        Returns:
+            The conversion function, or None if values do not need to be converted.
+        """
+        converter = self._serialize_type if serialize else self._deserialize_type
+        runtime = partial(self.convert_field, field_type=field_type, converter=converter)
+        t_origin = get_origin(field_type)
+        if t_origin:
+            t_args = get_args(field_type)
+            if t_origin is list and len(t_args) == 1:
+                item = self.compile_field(t_args[0], serialize)
+                return list if item is None else partial(_map_list, item)
+            if t_origin is dict and t_args:
+                item = self.compile_field(t_args[1], serialize)
+                return dict if item is None else partial(_map_dict, item)
+            if t_origin is tuple and t_args:
+                if len(t_args) == 2 and t_args[1] == ...:
+                    item = self.compile_field(t_args[0], serialize)
+                    return tuple if item is None else partial(_map_tuple, item)
+                items = [
+                    self.compile_field(ta, serialize) if ta is datetime else None for ta in t_args
+                ]
+                return partial(_map_fixed_tuple, items)
+        else:
+            try:
+                mro = field_type.mro()
+            except (AttributeError, TypeError):
+                return runtime
+            for t in mro:
+                if t in self.field_converters:
+                    c = self.field_converters[t]
+                    return c.serializer if serialize else c.deserializer
+                elif t in (list, dict, tuple):
+                    # Item types are only known at runtime
+                    return runtime
+        if field_type in self.field_converters:
+            c = self.field_converters[field_type]
+            return c.serializer if serialize else c.deserializer
+        if not serialize or field_type in ATOMIC_TYPES:
+            return None
+        return _serialize_model
+
+    def get_plan(self, vibe_type: Type[BaseVibe]) -> ConversionPlan:
+        """Get the conversion plan of a :class:`BaseVibe` subclass, building it on first use.
+
+        Args:
+            vibe_type: The :class:`BaseVibe` subclass.
+
+        Returns:
+            The conversion plan.
+        """
+        key = (type(self), vibe_type)
+        plan = self._plans.get(key)
+        if plan is None:
+            # If this type inherits from BaseVibe but not from DataVibe, then the
+            # base is BaseVibe. Otherwise, the base is DataVibe.
+            regular_fields = get_init_field_names(
+                DataVibe if issubclass(vibe_type, DataVibe) else BaseVibe
+            )
+            init_fields = [f for f in fields(vibe_type) if f.init]
+            plan = ConversionPlan(
+                property_fields=[
+                    (f.name, self.compile_field(f.type, serialize=True))
+                    for f in init_fields
+                    if f.name not in regular_fields
+                ],
+                init_fields=[
+                    (f.name, self.compile_field(f.type, serialize=False)) for f in init_fields
+                ],
+            )
+            self._plans[key] = plan
+        return plan
+
     def serialize_fields(
         self, field_values: Dict[str, Any], field_types: Dict[str, Any]
     ) -> Dict[str, Any]:
@@ -240,15 +392,10 @@ class StacConverter:
         return self._base_vibe_to_stac(input)
 
     def _extract_properties(self, input: BaseVibe) -> Dict[str, Any]:
-        # If this object inherits from BaseVibe but not from DataVibe, then the
-        # base is BaseVibe. Otherwise, the base is DataVibe.
-        # Whatever the base is, it is the input to `get_init_field_names`
-        regular_fields = get_init_field_names(
-            BaseVibe if not isinstance(input, DataVibe) else DataVibe
-        )
-        properties = get_filtered_init_fields(input, lambda x: x not in regular_fields)
-        property_types = {f.name: f.type for f in fields(input) if f.name in properties}
-        properties = self.serialize_fields(properties, property_types)
+        properties = {}
+        for name, serializer in self.get_plan(type(input)).property_fields:
+            value = to_plain_value(getattr(input, name))
+            properties[name] = value if serializer is None else serializer(value)
         return properties
 
     def _base_vibe_to_stac(self, input: BaseVibe) -> Item:
@@ -324,13 +471,13 @@ class StacConverter:
     def _from_stac_impl(self, input: Item) -> BaseVibe:
         # Figuring out type to create
         vibe_data_type = self.resolve_type(input)
-        # Need to find the necessary arguments to the constructor of the type
-        init_fields = list(get_init_field_names(vibe_data_type))
-        init_field_types = {f.name: f.type for f in fields(vibe_data_type) if f.name in init_fields}
-        # Read properties from item stac into init fields
+        # Read properties from item stac into the arguments to the constructor of the type
         in_props: Dict[str, Any] = input.properties  # type: ignore
-        data_kw = {f: in_props[f] for f in init_fields if f in in_props}
-        data_kw = self.deserialize_fields(data_kw, init_field_types)
+        data_kw = {}
+        for name, deserializer in self.get_plan(vibe_data_type).init_fields:
+            if name in in_props:
+                value = in_props[name]
+                data_kw[name] = value if deserializer is None else deserializer(value)
         data_kw.update(self._build_extra_kwargs(input, vibe_data_type))
 
         # Creating actual object
@@ -164,6 +164,69 @@ class RunStatus(StrEnum):
         return status in (RunStatus.done, RunStatus.cancelled, RunStatus.failed)
 
 
+@dataclass
+class OpResourceUsage:
+    """Dataclass that represents the resources consumed by one or more runs of an op."""
+
+    runs: int = 1
+    """The number of op runs."""
+    wall_time_s: float = 0.0
+    """The total wall time of the op runs, in seconds."""
+    cpu_time_s: float = 0.0
+    """The total CPU time (user and system) of the op runs, in seconds."""
+    peak_rss_bytes: int = 0
+    """The largest peak resident set size of the op runs, in bytes.
+
+    Op runs are measured in a process forked by the worker, so this is the growth of the peak
+    resident set size of that process while the op ran (memory shared with the worker, and held
+    before the op started, is not included).
+    """
+    read_bytes: int = 0
+    """The total number of bytes read by the op runs (from files and sockets)."""
+    write_bytes: int = 0
+    """The total number of bytes written by the op runs (to files and sockets)."""
+    asset_bytes: int = 0
+    """The total size of the assets produced by the op runs, in bytes."""
+
+    def combine(self, other: "OpResourceUsage") -> "OpResourceUsage":
+        """Combine the resources consumed by two sets of op runs.
+
+        Args:
+            other: The resources consumed by the other op runs.
+
+        Returns:
+            The resources consumed by all op runs.
+        """
+        return OpResourceUsage(
+            runs=self.runs + other.runs,
+            wall_time_s=self.wall_time_s + other.wall_time_s,
+            cpu_time_s=self.cpu_time_s + other.cpu_time_s,
+            peak_rss_bytes=max(self.peak_rss_bytes, other.peak_rss_bytes),
+            read_bytes=self.read_bytes + other.read_bytes,
+            write_bytes=self.write_bytes + other.write_bytes,
+            asset_bytes=self.asset_bytes + other.asset_bytes,
+        )
+
+
+def combine_resource_usage(
+    *usages: Optional[Dict[str, OpResourceUsage]],
+) -> Dict[str, OpResourceUsage]:
+    """Combine the resources consumed by ops, by op name.
+
+    Args:
+        usages: Maps from op name to the resources consumed by its runs (None is ignored).
+
+    Returns:
+        A map from op name to the resources consumed by all of its runs.
+    """
+    combined: Dict[str, OpResourceUsage] = {}
+    for usage in usages:
+        for op_name, op_usage in (usage or {}).items():
+            previous = combined.get(op_name)
+            combined[op_name] = op_usage if previous is None else previous.combine(op_usage)
+    return combined
+
+
 @dataclass
 class RunDetails:
     """Dataclass that encapsulates the details of a run."""
@@ -180,6 +243,8 @@ class RunDetails:
     """The status of the run."""
     subtasks: Optional[List[Any]] = None
     """Details about the subtasks of the run."""
+    resources: Optional[Dict[str, OpResourceUsage]] = None
+    """Resources consumed by the ops that were run, by op name."""
 
 
 @dataclass
@@ -3,10 +3,19 @@
 
 """File downloader utility methods and classes."""
 
+import base64
+import binascii
+import hashlib
+import json
 import logging
 import mimetypes
 import os
-from typing import Any
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Set, Tuple
+from urllib.parse import urlparse
 
 import requests
 from requests.adapters import HTTPAdapter
@@ -27,16 +36,46 @@ CONNECT_TIMEOUT_S = 30
 READ_TIMEOUT_S = 30
 """Time in seconds for each chunk read from the server."""
 
+PART_SIZE = 16 * 1024 * 1024  # 16MB parts
+"""Size of the byte ranges requested concurrently when the server supports range requests."""
+
+MAX_PARALLEL_PARTS = 8
+"""Maximum number of byte ranges of the same file downloaded concurrently."""
+
+POOL_MAXSIZE = 4 * MAX_PARALLEL_PARTS
+"""Maximum number of connections kept alive per host, enough for a few concurrent downloads."""
+
+PART_RETRIES = REQUEST_RETRIES
+"""Number of times a byte range is resumed after the connection breaks mid-transfer."""
+
+PARTIAL_SUFFIX = ".partial"
+"""Suffix of the file that holds the data of an incomplete ranged download."""
+
+STATE_SUFFIX = ".parts"
+"""Suffix of the file that records which parts of an incomplete ranged download are done."""
+
 LOGGER = logging.getLogger(__name__)
 
+_SESSIONS: Dict[Tuple[int, str], requests.Session] = {}
+_SESSIONS_LOCK = threading.Lock()
+_CONTENT_RANGE_RE = re.compile(r"bytes (\d+)-(\d+)/(\d+|\*)")
+
+
+class DownloadVerificationError(requests.RequestException):
+    """Raised when a downloaded file does not match the expected length or digest."""
 
-def retry_session() -> requests.Session:
+
+def retry_session(pool_maxsize: int = POOL_MAXSIZE) -> requests.Session:
     """Create a session with retry support.
 
     This method creates a requests.Session object with retry support
     configured to retry failed requests up to :const:`REQUEST_RETRIES` times
     with a :const:`REQUEST_BACKOFF` time back-off factor.
 
+    Args:
+        pool_maxsize: Maximum number of connections kept alive per host
+            (defaults to :const:`POOL_MAXSIZE`).
+
     Returns:
         A configured requests.Session object
     """
@@ -51,12 +90,35 @@ def retry_session() -> requests.Session:
 
     # Had to ignore the type as urlib is loaded dinamically
     # details here (https://github.com/microsoft/pylance-release/issues/597)
-    adapter = HTTPAdapter(max_retries=retry)  # type: ignore
+    adapter = HTTPAdapter(max_retries=retry, pool_maxsize=pool_maxsize)  # type: ignore
     session.mount("http://", adapter)
     session.mount("https://", adapter)
     return session
 
 
+def get_session(url: str) -> requests.Session:
+    """Get the pooled retry session shared by all requests to the host of the given URL.
+
+    Sessions are created on first use and kept for the lifetime of the process, so consecutive
+    downloads from the same host reuse already established connections. Sessions are never
+    shared across forked processes.
+
+    Args:
+        url: URL that will be requested with the session.
+
+    Returns:
+        The session associated with the URL host.
+    """
+    parsed = urlparse(url)
+    key = (os.getpid(), f"{parsed.scheme}://{parsed.netloc}")
+    with _SESSIONS_LOCK:
+        session = _SESSIONS.get(key)
+        if session is None:
+            session = retry_session()
+            _SESSIONS[key] = session
+    return session
+
+
 def build_file_path(dir_name: str, file_name: str, type: str = "") -> str:
     """Build the full file path.
 
@@ -80,17 +142,230 @@ def build_file_path(dir_name: str, file_name: str, type: str = "") -> str:
     return file_path
 
 
+@dataclass
+class _RangedDownload:
+    """Bookkeeping of a ranged download, persisted so it can be resumed after failures."""
+
+    size: int
+    etag: Optional[str]
+    part_size: int
+    done: Set[int] = field(default_factory=set)
+
+    @property
+    def num_parts(self) -> int:
+        return -(-self.size // self.part_size)
+
+    def part_range(self, part: int) -> Tuple[int, int]:
+        start = part * self.part_size
+        return start, min(start + self.part_size, self.size) - 1
+
+    def matches(self, other: "_RangedDownload") -> bool:
+        return (self.size, self.etag, self.part_size) == (other.size, other.etag, other.part_size)
+
+    def dump(self, path: str):
+        with open(path, "w") as f:
+            json.dump(
+                {
+                    "size": self.size,
+                    "etag": self.etag,
+                    "part_size": self.part_size,
+                    "done": sorted(self.done),
+                },
+                f,
+            )
+
+    @classmethod
+    def load(cls, path: str) -> Optional["_RangedDownload"]:
+        try:
+            with open(path) as f:
+                state = json.load(f)
+            return cls(state["size"], state["etag"], state["part_size"], set(state["done"]))
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+
+def _header_md5(headers: Any, partial: bool = False) -> Optional[str]:
+    """Return the hex MD5 digest advertised by the server for the whole file, if any.
+
+    The `Content-MD5` header refers to the response body, so it is only used for responses
+    containing the whole file.
+    """
+    value = headers.get("x-ms-blob-content-md5")
+    if value is None and not partial:
+        value = headers.get("Content-MD5")
+    if not value:
+        return None
+    try:
+        return base64.b64decode(value, validate=True).hex()
+    except (binascii.Error, ValueError):
+        return None
+
+
+def _file_md5(file_path: str, chunk_size: int = CHUNK_SIZE) -> str:
+    md5 = hashlib.md5()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            md5.update(chunk)
+    return md5.hexdigest()
+
+
+def _verify_file(
+    file_path: str, url: str, expected_size: Optional[int], expected_md5: Optional[str]
+):
+    if expected_size is not None:
+        size = os.path.getsize(file_path)
+        if size != expected_size:
+            raise DownloadVerificationError(
+                f"Downloaded {size} bytes from {url}, but expected {expected_size} bytes"
+            )
+    if expected_md5 is not None:
+        digest = _file_md5(file_path)
+        if digest != expected_md5.lower():
+            raise DownloadVerificationError(
+                f"MD5 digest of file downloaded from {url} is {digest}, "
+                f"but expected {expected_md5}"
+            )
+
+
+def _write_stream(
+    r: requests.Response, f: Any, chunk_size: int, max_bytes: Optional[int] = None
+) -> int:
+    written = 0
+    for chunk in r.iter_content(chunk_size=chunk_size):
+        if max_bytes is not None:
+            chunk = chunk[: max_bytes - written]
+        f.write(chunk)
+        written += len(chunk)
+        if max_bytes is not None and written >= max_bytes:
+            break
+    return written
+
+
+def _download_part(
+    session: requests.Session,
+    url: str,
+    partial_path: str,
+    start: int,
+    end: int,
+    chunk_size: int,
+    timeout: Tuple[float, float],
+    headers: Dict[str, str],
+    kwargs: Dict[str, Any],
+):
+    """Download the inclusive byte range [start, end] into the partial file.
+
+    If the connection breaks mid-transfer, the request is resumed from the last written byte.
+    """
+    offset = start
+    for retry in range(PART_RETRIES + 1):
+        range_headers = {**headers, "Range": f"bytes={offset}-{end}"}
+        try:
+            with session.get(
+                url, stream=True, timeout=timeout, headers=range_headers, **kwargs
+            ) as r:
+                r.raise_for_status()
+                if r.status_code != 206:
+                    raise DownloadVerificationError(
+                        f"Server ignored range request for bytes {offset}-{end} of {url}"
+                    )
+                with open(partial_path, "r+b") as f:
+                    f.seek(offset)
+                    for chunk in r.iter_content(chunk_size=chunk_size):
+                        chunk = chunk[: end + 1 - offset]
+                        f.write(chunk)
+                        offset += len(chunk)
+                        if offset > end:
+                            break
+            if offset > end:
+                return
+            raise requests.ConnectionError(f"Connection closed at byte {offset} of {url}")
+        except (requests.ConnectionError, requests.exceptions.ChunkedEncodingError) as e:
+            if retry == PART_RETRIES:
+                raise
+            LOGGER.warning(
+                f"Error {e} when downloading bytes {start}-{end} of {url}. "
+                f"Resuming from byte {offset} ({retry + 1}/{PART_RETRIES})."
+            )
+
+
+def _download_ranged(
+    session: requests.Session,
+    url: str,
+    file_path: str,
+    first: requests.Response,
+    download: _RangedDownload,
+    chunk_size: int,
+    max_parts: int,
+    timeout: Tuple[float, float],
+    headers: Dict[str, str],
+    kwargs: Dict[str, Any],
+):
+    """Download all missing parts of a file concurrently, resuming a previous attempt if any."""
+    partial_path = f"{file_path}{PARTIAL_SUFFIX}"
+    state_path = f"{file_path}{STATE_SUFFIX}"
+
+    previous = _RangedDownload.load(state_path)
+    if previous is not None and previous.matches(download) and os.path.exists(partial_path):
+        download.done = previous.done
+        LOGGER.info(f"Resuming download of {url} with {len(download.done)} parts already done")
+    else:
+        with open(partial_path, "wb") as f:
+            f.truncate(download.size)
+        download.done = set()
+    download.dump(state_path)
+
+    state_lock = threading.Lock()
+
+    def mark_done(part: int):
+        with state_lock:
+            download.done.add(part)
+            download.dump(state_path)
+
+    # The probe response already holds the first part
+    if 0 not in download.done:
+        _, end = download.part_range(0)
+        with open(partial_path, "r+b") as f:
+            written = _write_stream(first, f, chunk_size, max_bytes=end + 1)
+        if written == end + 1:
+            mark_done(0)
+    first.close()
+
+    missing = [p for p in range(download.num_parts) if p not in download.done]
+
+    def fetch(part: int):
+        start, end = download.part_range(part)
+        _download_part(session, url, partial_path, start, end, chunk_size, timeout, headers, kwargs)
+        mark_done(part)
+
+    if missing:
+        with ThreadPoolExecutor(max_workers=min(max_parts, len(missing))) as executor:
+            # Consume the results so that exceptions from any part are raised here
+            list(executor.map(fetch, missing))
+
+    os.replace(partial_path, file_path)
+    os.remove(state_path)
+
+
 def download_file(
     url: str,
     file_path: str,
     chunk_size: int = CHUNK_SIZE,
     connect_timeout: float = CONNECT_TIMEOUT_S,
     read_timeout: float = READ_TIMEOUT_S,  # applies per chunk
+    part_size: int = PART_SIZE,
+    max_parts: int = MAX_PARALLEL_PARTS,
+    expected_md5: Optional[str] = None,
     **kwargs: Any,
 ) -> str:
     """Download a file from a given URL to the given file path.
 
-    The download is done using a retry session, to handle connection errors.
+    The download is done using a pooled retry session shared by all downloads from the same host,
+    to handle connection errors and reuse connections. If the server supports range requests and
+    the file is larger than `part_size`, the file is split into byte ranges that are downloaded
+    concurrently. Ranges interrupted by connection errors are resumed from the last received byte,
+    and a download that fails altogether can be resumed by calling this method again with the same
+    `file_path`. The downloaded file is checked against the length reported by the server and
+    against the MD5 digest, if one is given or advertised by the server.
 
     Args:
         url: URL of the file to download.
@@ -101,20 +376,66 @@ def download_file(
             (defaults to :const:`CONNECT_TIMEOUT_S`).
         read_timeout: Time in seconds for each chunk read from the server
             (defaults to :const:`READ_TIMEOUT_S`).
+        part_size: Size in bytes of each byte range downloaded concurrently
+            (defaults to :const:`PART_SIZE`).
+        max_parts: Maximum number of byte ranges downloaded concurrently
+            (defaults to :const:`MAX_PARALLEL_PARTS`). Use 1 to disable ranged downloads.
+        expected_md5: Optional hex MD5 digest the downloaded file must match.
         kwargs: Additional keyword arguments to be passed to the request library call.
 
     Returns:
         Path of the saved file.
+
+    Raises:
+        DownloadVerificationError: If the downloaded file does not match the expected length or
+            digest.
     """
-    session = retry_session()
+    session = get_session(url)
+    timeout = (connect_timeout, read_timeout)
+    kwargs = dict(kwargs)
+    headers = dict(kwargs.pop("headers", None) or {})
 
     try:
-        with session.get(url, stream=True, timeout=(connect_timeout, read_timeout), **kwargs) as r:
+        probe_headers = headers
+        if max_parts > 1:
+            probe_headers = {**headers, "Range": f"bytes=0-{part_size - 1}"}
+        r = session.get(url, stream=True, timeout=timeout, headers=probe_headers, **kwargs)
+        if r.status_code == 416:
+            # Empty files can't satisfy any range, fall back to a regular request
+            r.close()
+            r = session.get(url, stream=True, timeout=timeout, headers=headers, **kwargs)
+        with r:
             r.raise_for_status()
+            match = _CONTENT_RANGE_RE.match(r.headers.get("Content-Range", ""))
+            if r.status_code == 206 and match is not None and match.group(3) != "*":
+                size = int(match.group(3))
+                md5 = expected_md5 or _header_md5(r.headers, partial=True)
+                if size > part_size:
+                    download = _RangedDownload(size, r.headers.get("ETag"), part_size)
+                    _download_ranged(
+                        session,
+                        url,
+                        file_path,
+                        r,
+                        download,
+                        chunk_size,
+                        max_parts,
+                        timeout,
+                        headers,
+                        kwargs,
+                    )
+                    _verify_file(file_path, url, size, md5)
+                    return file_path
+            else:
+                # The server sent the whole file
+                content_length = r.headers.get("Content-Length")
+                is_encoded = r.headers.get("Content-Encoding", "identity") != "identity"
+                size = None if content_length is None or is_encoded else int(content_length)
+                md5 = expected_md5 or (None if is_encoded else _header_md5(r.headers))
             with open(file_path, "wb") as f:
-                for chunk in r.iter_content(chunk_size=chunk_size):
-                    f.write(chunk)
-                return file_path
+                _write_stream(r, f, chunk_size)
+            _verify_file(file_path, url, size, md5)
+            return file_path
     except requests.ConnectionError:
         LOGGER.exception(f"Connection error when downloading remote asset {url}")
         raise
@@ -145,7 +466,7 @@ def verify_url(
         True if the URL is valid, False otherwise.
     """
     status = True
-    session = retry_session()
+    session = get_session(url)
     try:
         with session.get(url, stream=True, timeout=connect_timeout, **kwargs) as r:
             r.raise_for_status()
@@ -1,8 +1,15 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT License.
 
-from typing import cast
-from uuid import UUID
+import asyncio
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, cast
+from uuid import UUID, uuid4
+
+import psutil
 
 from vibe_agent.ops import OperationDependencyResolver, OperationFactoryConfig, OpIOType
 from vibe_agent.ops_helper import OpIOConverter
@@ -23,9 +30,27 @@ from vibe_server.workflow.runner.task_io_handler import WorkflowIOHandler
 from vibe_server.workflow.workflow import GraphNodeType, Workflow
 
 MAX_OP_EXECUTION_TIME_S = 60 * 60 * 3
+# Memory reserved for each op running in parallel
+OP_MEMORY_BYTES = 2 * 1024**3
+
+
+def get_max_parallel_ops(op_memory_bytes: int = OP_MEMORY_BYTES) -> int:
+    """Returns how many ops fit in the cores and available memory of this machine."""
+    if hasattr(os, "sched_getaffinity"):
+        cpus = len(os.sched_getaffinity(0))
+    else:
+        cpus = os.cpu_count() or 1
+    memory_slots = psutil.virtual_memory().available // op_memory_bytes
+    return max(1, min(cpus, memory_slots))
 
 
 class LocalWorkflowRunner(WorkflowRunner):
+    """Runs workflows in the current machine, without the TerraVibes services.
+
+    Each subtask runs in its own child process, with at most `max_parallel_ops` subtasks running
+    at the same time. Subtasks are retried and timed out as they would be by a worker.
+    """
+
     timeout_s: float = 1  # in seconds
 
     def __init__(
@@ -35,23 +60,69 @@ class LocalWorkflowRunner(WorkflowRunner):
         factory_spec: OperationFactoryConfig,
         update_state_callback: WorkflowCallback = NoOpStateChange,
         max_tries: int = 1,
+        max_parallel_ops: Optional[int] = None,
     ):
         super().__init__(workflow, io_mapper, update_state_callback)
-        self.runner = Worker(
-            termination_grace_period_s=int(self.timeout_s),
-            control_topic="",
-            max_tries=max_tries,
-            factory_spec=factory_spec,
-        )
+        self.max_parallel_ops = max_parallel_ops or get_max_parallel_ops()
+        # Workers keep track of the op they are running, so each parallel op gets its own
+        self.workers = [
+            Worker(
+                termination_grace_period_s=int(self.timeout_s),
+                control_topic="",
+                max_tries=max_tries,
+                factory_spec=factory_spec,
+            )
+            for _ in range(self.max_parallel_ops)
+        ]
+        self.op_timings: Dict[str, List[float]] = defaultdict(list)
 
         self.dependency_resolver = OperationDependencyResolver()
 
+    def timing_summary(self) -> Dict[str, Dict[str, float]]:
+        """Returns the number of subtasks and their total, mean and max run time for each op."""
+        return {
+            op_name: {
+                "subtasks": len(timings),
+                "total_s": sum(timings),
+                "mean_s": sum(timings) / len(timings),
+                "max_s": max(timings),
+            }
+            for op_name, timings in self.op_timings.items()
+        }
+
+    def _log_timings(self, run_id: UUID, elapsed_s: float):
+        lines = [
+            f"{op_name}: {t['subtasks']:.0f} subtask(s), {t['total_s']:.2f}s total, "
+            f"{t['mean_s']:.2f}s mean, {t['max_s']:.2f}s max"
+            for op_name, t in self.timing_summary().items()
+        ]
+        self.logger.info(
+            f"Workflow {self.workflow.name} took {elapsed_s:.2f}s with up to "
+            f"{self.max_parallel_ops} parallel op(s). (run id: {run_id})\n" + "\n".join(lines)
+        )
+
+    async def run(self, input_items: OpIOType, run_id: UUID = uuid4()) -> OpIOType:
+        self.op_timings.clear()
+        self._idle_workers: "asyncio.Queue[Worker]" = asyncio.Queue()
+        for worker in self.workers:
+            self._idle_workers.put_nowait(worker)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_parallel_ops)
+        start = time.monotonic()
+        try:
+            return await super().run(input_items, run_id)
+        finally:
+            # Children of cancelled subtasks were terminated, so this does not wait for long
+            self._executor.shutdown(wait=True)
+            self._log_timings(run_id, time.monotonic() - start)
+
     async def _run_op_impl(
         self, op: GraphNodeType, input: OpIOType, run_id: UUID, subtask_idx: int
     ) -> OpIOType:
+        worker = await self._idle_workers.get()
+        future = None
         try:
             message = WorkMessageBuilder.build_execute_request(run_id, "", op.spec, input)
-            self.runner.current_message = message
+            worker.current_message = message
             stac = OpIOConverter.deserialize_input(input)
             dependencies = self.dependency_resolver.resolve(op.spec)
             message = WorkMessageBuilder.add_cache_info_to_execute_request(
@@ -63,11 +134,24 @@ class LocalWorkflowRunner(WorkflowRunner):
             await self._report_state_change(
                 WorkflowChange.SUBTASK_RUNNING, task=op.name, subtask_idx=subtask_idx
             )
-            out = self.runner.run_op_with_retry(content, run_id, MAX_OP_EXECUTION_TIME_S)
+            start = time.monotonic()
+            future = self._executor.submit(
+                worker.run_op_with_retry, content, run_id, MAX_OP_EXECUTION_TIME_S
+            )
+            out = await asyncio.wrap_future(future)
+            self.op_timings[op.name].append(time.monotonic() - start)
+            resources = worker.last_resource_usage
             await self._report_state_change(
-                WorkflowChange.SUBTASK_FINISHED, task=op.name, subtask_idx=subtask_idx
+                WorkflowChange.SUBTASK_FINISHED,
+                task=op.name,
+                subtask_idx=subtask_idx,
+                resources=None if resources is None else {op.spec.name: resources},
             )
             return out
+        except asyncio.CancelledError:
+            # The thread running the op stops once its child process is terminated
+            worker._terminate_child()
+            raise
         except Exception as e:
             self.logger.exception(f"Failed to run operation {op.name}")
             await self._report_state_change(
@@ -75,4 +159,7 @@ class LocalWorkflowRunner(WorkflowRunner):
             )
             raise
         finally:
-            self.runner.current_message = None
+            # Workers still running a cancelled op are not reused in this run
+            if future is None or future.done():
+                worker.current_message = None
+                self._idle_workers.put_nowait(worker)
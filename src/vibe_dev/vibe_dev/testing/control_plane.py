@@ -0,0 +1,542 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""In-process TerraVibes control plane, for tests and benchmarks.
+
+Runs the orchestrator, cache, workers and data ops manager in a single process, connected by an
+in-memory pub/sub and state store instead of Dapr and Redis. Ops run in the worker threads instead
+of child processes, so that measurements reflect the control plane rather than process startup.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+import traceback
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import ExitStack
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple, Union, cast
+from unittest.mock import patch
+from uuid import uuid4
+
+from cloudevents.sdk.event import v1
+from hydra_zen import instantiate
+
+from vibe_agent.cache import Cache
+from vibe_agent.data_ops import DataOpsManager
+from vibe_agent.ops import OperationFactoryConfig
+from vibe_agent.resource_usage import ResourceMeter
+from vibe_agent.storage.storage import StorageConfig
+from vibe_agent.worker import Worker
+from vibe_common.constants import (
+    CACHE_PUBSUB_TOPIC,
+    CONTROL_PUBSUB_TOPIC,
+    CONTROL_STATUS_PUBSUB,
+    PAYLOAD_TTL_S,
+    STATUS_PUBSUB_TOPIC,
+    WORKFLOW_REQUEST_PUBSUB_TOPIC,
+)
+from vibe_common.dropdapr import BULK_MAX_MESSAGES_COUNT, request_to_event
+from vibe_common.messaging import (
+    WorkMessage,
+    WorkMessageBuilder,
+    extract_message_header_from_event,
+    reference_payloads,
+    reference_payloads_async,
+)
+from vibe_common.payloads import payload_cache
+from vibe_common.run_index import RunIndex
+from vibe_common.schemas import CacheInfo, OperationSpec, OpRunId
+from vibe_common.secret_provider import AzureSecretProviderConfig
+from vibe_core.data.core_types import OpIOType
+from vibe_core.datamodel import OpResourceUsage, RunConfig, RunDetails, RunStatus
+from vibe_server.orchestrator import Orchestrator
+from vibe_server.workflow.runner.cache_probe import CacheProbeClient
+
+from .statestore import InMemoryStateStore
+
+EventHandler = Callable[[v1.Event], Awaitable[Any]]
+BulkEventHandler = Callable[[List[v1.Event]], Awaitable[List[Any]]]
+RUN_POLLING_INTERVAL_S = 0.01
+RETRY_INTERVAL_S = 0.01
+
+
+def partial_handler(
+    fun: Callable[[str, Any], Awaitable[Any]], channel: str
+) -> Callable[[Any], Awaitable[Any]]:
+    """Handler of the events (or bulks of events) of a channel."""
+
+    async def handler(event: Any) -> Any:
+        return await fun(channel, event)
+
+    return handler
+
+
+class InMemoryPayloadStore:
+    """Payload store kept in memory, for messages sent by reference."""
+
+    def __init__(self):
+        self.data: Dict[str, str] = {}
+        self.ttl_s = PAYLOAD_TTL_S
+
+    def store(self, key: str, data: str) -> None:
+        self.data[key] = data
+
+    def retrieve(self, key: str) -> str:
+        if key not in self.data:
+            raise KeyError(f"Payload {key} not found")
+        return self.data[key]
+
+    async def store_async(self, key: str, data: str) -> None:
+        self.store(key, data)
+
+    async def retrieve_async(self, key: str) -> str:
+        return self.retrieve(key)
+
+
+class InMemoryCacheMetadataStore:
+    """Cache metadata store kept in memory, with the references kept by the Redis store."""
+
+    def __init__(self):
+        self.run_ops: Dict[str, Set[OpRunId]] = defaultdict(set)
+        self.op_runs: Dict[OpRunId, Set[str]] = defaultdict(set)
+        self.op_assets: Dict[OpRunId, Set[str]] = defaultdict(set)
+        self.asset_ops: Dict[str, Set[OpRunId]] = defaultdict(set)
+
+    async def store_references(self, run_id: str, op_run_id: OpRunId, assets: Set[str]) -> None:
+        self.run_ops[run_id].add(op_run_id)
+        self.op_runs[op_run_id].add(run_id)
+        self.op_assets[op_run_id].update(assets)
+        for asset_id in assets:
+            self.asset_ops[asset_id].add(op_run_id)
+
+    async def get_run_ops(self, run_id: str) -> Set[OpRunId]:
+        return set(self.run_ops.get(run_id, set()))
+
+    async def get_op_workflow_runs(self, op_ref: OpRunId) -> Set[str]:
+        return set(self.op_runs.get(op_ref, set()))
+
+    async def get_op_assets(self, op_ref: OpRunId) -> Set[str]:
+        return set(self.op_assets.get(op_ref, set()))
+
+    async def get_assets_refs(self, asset_ids: Set[str]) -> Dict[str, Set[OpRunId]]:
+        return {a: set(self.asset_ops.get(a, set())) for a in asset_ids}
+
+    async def remove_workflow_op_refs(self, workflow_run_id: str, op_run_ref: OpRunId) -> Set[str]:
+        self.run_ops[workflow_run_id].discard(op_run_ref)
+        self.op_runs[op_run_ref].discard(workflow_run_id)
+        return set(self.op_runs[op_run_ref])
+
+    async def remove_op_asset_refs(self, op_run_ref: OpRunId, asset_ids: Set[str]) -> None:
+        self.op_assets.pop(op_run_ref, None)
+        for asset_id in asset_ids:
+            self.asset_ops[asset_id].discard(op_run_ref)
+
+
+class InMemoryPubSub:
+    """Message broker kept in memory, with the delivery semantics of Dapr pub/sub.
+
+    Each subscription receives every message published to its topic, and messages are consumed
+    by one of the handlers of the subscription, as they would be by replicas of a service.
+    Messages whose handler asks for a retry are delivered again.
+
+    Messages can be published from any thread, and are delivered in the event loop the pub/sub
+    was started in.
+    """
+
+    def __init__(self):
+        self.subscriptions: Dict[str, List["asyncio.Queue[v1.Event]"]] = defaultdict(list)
+        self.message_bytes: Dict[str, int] = defaultdict(int)
+        self.message_count: Dict[str, int] = defaultdict(int)
+        # Number of times handlers were called (i.e., requests made by Dapr), by topic
+        self.deliveries: Dict[str, int] = defaultdict(int)
+        # When messages were first published, by message id
+        self.published_at: Dict[str, float] = {}
+        self._consumers: List["asyncio.Task[None]"] = []
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
+
+    def start(self):
+        self._loop = asyncio.get_running_loop()
+
+    async def stop(self):
+        for consumer in self._consumers:
+            consumer.cancel()
+        await asyncio.gather(*self._consumers, return_exceptions=True)
+        self._consumers.clear()
+
+    def subscribe(self, topic: str, *handlers: EventHandler):
+        """Adds a subscription to a topic, with one consumer for each handler."""
+        queue: "asyncio.Queue[v1.Event]" = asyncio.Queue()
+        self.subscriptions[topic].append(queue)
+        for handler in handlers:
+            self._consumers.append(asyncio.create_task(self._consume(topic, queue, handler)))
+
+    def subscribe_bulk(
+        self,
+        topic: str,
+        *handlers: BulkEventHandler,
+        max_messages_count: int = BULK_MAX_MESSAGES_COUNT,
+    ):
+        """Adds a subscription to a topic with bulk delivery, with one consumer for each handler.
+
+        Consumers take every event available in the queue (up to `max_messages_count`) at once,
+        and handlers return one response for each of them.
+        """
+        queue: "asyncio.Queue[v1.Event]" = asyncio.Queue()
+        self.subscriptions[topic].append(queue)
+        for handler in handlers:
+            self._consumers.append(
+                asyncio.create_task(self._consume_bulk(topic, queue, handler, max_messages_count))
+            )
+
+    @staticmethod
+    def _should_retry(response: Any) -> bool:
+        status = getattr(response, "status", None)
+        return status is not None and str(getattr(status, "name", status)).lower() == "retry"
+
+    async def _consume(self, topic: str, queue: "asyncio.Queue[v1.Event]", handler: EventHandler):
+        while True:
+            event = await queue.get()
+            self.deliveries[topic] += 1
+            try:
+                response = await handler(event)
+            except Exception:
+                # Dapr drops messages whose handler fails
+                self.logger.exception(f"Failed to handle event {event.id}")
+                continue
+            if self._should_retry(response):
+                await asyncio.sleep(RETRY_INTERVAL_S)
+                queue.put_nowait(event)
+
+    async def _consume_bulk(
+        self,
+        topic: str,
+        queue: "asyncio.Queue[v1.Event]",
+        handler: BulkEventHandler,
+        max_messages_count: int,
+    ):
+        while True:
+            events = [await queue.get()]
+            while len(events) < max_messages_count and not queue.empty():
+                events.append(queue.get_nowait())
+            self.deliveries[topic] += 1
+            try:
+                responses = await handler(events)
+            except Exception:
+                self.logger.exception(f"Failed to handle {len(events)} events in bulk")
+                continue
+            retries = [e for e, r in zip(events, responses) if self._should_retry(r)]
+            if retries:
+                await asyncio.sleep(RETRY_INTERVAL_S)
+                for event in retries:
+                    queue.put_nowait(event)
+
+    def _publish(self, message: WorkMessage, source: str, topic: str) -> bool:
+        assert self._loop is not None, "Pub/sub was not started"
+        cloud_event = message.to_cloud_event(source)
+        with self._lock:
+            self.message_bytes[topic] += len(json.dumps(cloud_event))
+            self.message_count[topic] += 1
+            self.published_at.setdefault(message.id, time.monotonic())
+        event = request_to_event(cloud_event)
+        for queue in self.subscriptions.get(topic, []):
+            self._loop.call_soon_threadsafe(queue.put_nowait, event)
+        return True
+
+    def send(self, message: WorkMessage, source: str, pubsubname: str, topic: str) -> bool:
+        message.update_current_trace_parent()
+        reference_payloads(message)
+        return self._publish(message, source, topic)
+
+    async def send_async(
+        self, message: WorkMessage, source: str, pubsubname: str, topic: str
+    ) -> bool:
+        message.update_current_trace_parent()
+        await reference_payloads_async(message)
+        return self._publish(message, source, topic)
+
+
+OpResult = Union[Tuple[OpIOType, OpResourceUsage], traceback.TracebackException]
+
+
+def run_op_in_thread(
+    factory_spec: OperationFactoryConfig,  # type: ignore
+    spec: OperationSpec,
+    input: OpIOType,
+    cache_info: CacheInfo,
+) -> "Future[OpResult]":
+    """Runs an op in the calling thread, returning its result as the worker's child would.
+    Resources are measured for the whole process, so they are only approximate."""
+    future: "Future[OpResult]" = Future()
+    meter = ResourceMeter()
+    try:
+        op = instantiate(factory_spec).build(spec)
+        out = op.run(input, cache_info)
+        future.set_result((out, meter.usage(op.asset_bytes)))
+    except Exception as e:
+        future.set_result(traceback.TracebackException.from_exception(e))
+    return future
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Returns the `q`-th percentile of the values, with the nearest-rank method."""
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(q / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+@dataclass
+class ControlPlaneStats:
+    """Measurements of a workflow run in the control plane."""
+
+    run_id: str
+    status: RunStatus
+    subtasks: int
+    elapsed_s: float
+    state_writes: int
+    message_bytes: Dict[str, int]
+    scheduling_latencies_s: List[float] = field(repr=False)
+
+    @property
+    def subtasks_per_s(self) -> float:
+        return self.subtasks / self.elapsed_s
+
+    @property
+    def writes_per_subtask(self) -> float:
+        return self.state_writes / max(self.subtasks, 1)
+
+    @property
+    def total_message_bytes(self) -> int:
+        return sum(self.message_bytes.values())
+
+    def summary(self) -> str:
+        return (
+            f"{self.subtasks} subtasks in {self.elapsed_s:.2f}s "
+            f"({self.subtasks_per_s:.1f} subtasks/s), "
+            f"{self.writes_per_subtask:.2f} state writes/subtask, "
+            f"{self.total_message_bytes / 1024:.1f} KiB of messages, scheduling latency "
+            + (
+                f"p50 {percentile(self.scheduling_latencies_s, 50) * 1000:.1f}ms "
+                f"p99 {percentile(self.scheduling_latencies_s, 99) * 1000:.1f}ms"
+                if self.scheduling_latencies_s
+                else "n/a (no subtasks were run)"
+            )
+        )
+
+
+class LocalControlPlane:
+    """Orchestrator, cache, workers and data ops manager running in the current process.
+
+    Use it as an async context manager, in the event loop that runs the services::
+
+        async with LocalControlPlane(storage_spec, ops_dir) as control_plane:
+            stats = await control_plane.run_workflow(workflow_dict, input)
+    """
+
+    def __init__(
+        self,
+        storage_spec: StorageConfig,  # type: ignore
+        ops_dir: str,
+        num_workers: int = 4,
+        num_cache_replicas: int = 2,
+        statestore_latency_s: float = 0.0,
+    ):
+        self.storage_spec = storage_spec
+        self.ops_dir = ops_dir
+        self.num_workers = num_workers
+        self.num_cache_replicas = num_cache_replicas
+        self.pubsub = InMemoryPubSub()
+        self.statestore = InMemoryStateStore(latency_s=statestore_latency_s)
+        self.payload_store = InMemoryPayloadStore()
+        self.metadata_store = InMemoryCacheMetadataStore()
+        self.executor = ThreadPoolExecutor(max_workers=num_workers + num_cache_replicas + 1)
+        self.scheduling_latencies_s: Dict[str, List[float]] = defaultdict(list)
+        self._exit_stack = ExitStack()
+
+    def _patch_services(self):
+        patches = [
+            patch("vibe_server.workflow.runner.remote_runner.send_async", self.pubsub.send_async),
+            patch("vibe_server.orchestrator.send_async", self.pubsub.send_async),
+            patch("vibe_server.orchestrator.StateStore", lambda: self.statestore),
+            patch("vibe_agent.cache.send_async", self.pubsub.send_async),
+            patch("vibe_agent.worker.send_async", self.pubsub.send_async),
+            patch("vibe_agent.worker.run_op", run_op_in_thread),
+            patch.object(payload_cache, "store", self.payload_store),
+            patch.object(CacheProbeClient, "_probe_batch", self._probe_batch),
+        ]
+        for p in patches:
+            self._exit_stack.enter_context(p)
+
+    def _build_services(self):
+        self.orchestrator = Orchestrator(ops_dir=self.ops_dir)
+        self.cache = Cache(instantiate(self.storage_spec), running_on_azure=True)
+        self.cache.metadata_store = self  # type: ignore
+        self.data_ops = DataOpsManager(instantiate(self.storage_spec), self.metadata_store)
+        self.data_ops.statestore = self.statestore  # type: ignore
+        self.data_ops._init_locks()
+        factory_spec = OperationFactoryConfig(self.storage_spec, AzureSecretProviderConfig())
+        self.workers = [
+            Worker(
+                termination_grace_period_s=1,
+                control_topic=CONTROL_PUBSUB_TOPIC,
+                max_tries=1,
+                factory_spec=factory_spec,
+            )
+            for _ in range(self.num_workers)
+        ]
+        for worker in self.workers:
+            worker.statestore = self.statestore  # type: ignore
+
+    def _in_thread(self, fun: Callable[..., Any], *args: Any) -> Callable[[Any], Awaitable[Any]]:
+        async def handler(event: Any) -> Any:
+            return await asyncio.get_running_loop().run_in_executor(
+                self.executor, fun, *args, event
+            )
+
+        return handler
+
+    def _worker_handler(self, worker: Worker) -> EventHandler:
+        handler = self._in_thread(worker.fetch_work, CONTROL_PUBSUB_TOPIC)
+
+        async def timed_handler(event: v1.Event) -> Any:
+            header = extract_message_header_from_event(event)
+            published_at = self.pubsub.published_at.get(header.id)
+            if published_at is not None:
+                latency = time.monotonic() - published_at
+                self.scheduling_latencies_s[str(header.run_id)].append(latency)
+            return await handler(event)
+
+        return timed_handler
+
+    def _subscribe_services(self):
+        orchestrator, data_ops = self.orchestrator, self.data_ops
+        self.pubsub.subscribe_bulk(
+            STATUS_PUBSUB_TOPIC,
+            *[
+                partial_handler(
+                    orchestrator.handle_update_workflow_status_batch, STATUS_PUBSUB_TOPIC
+                )
+            ]
+            * 8,
+        )
+        self.pubsub.subscribe(
+            STATUS_PUBSUB_TOPIC,
+            *[partial_handler(data_ops.fetch_work, STATUS_PUBSUB_TOPIC)] * 8,
+        )
+        self.pubsub.subscribe(
+            WORKFLOW_REQUEST_PUBSUB_TOPIC,
+            partial_handler(
+                orchestrator.handle_manage_workflow_event, WORKFLOW_REQUEST_PUBSUB_TOPIC
+            ),
+        )
+        self.pubsub.subscribe_bulk(
+            CACHE_PUBSUB_TOPIC,
+            *[self._in_thread(self.cache.fetch_work_batch)] * self.num_cache_replicas,
+        )
+        self.pubsub.subscribe(
+            CONTROL_PUBSUB_TOPIC, *[self._worker_handler(w) for w in self.workers]
+        )
+
+    async def __aenter__(self) -> "LocalControlPlane":
+        self._loop = asyncio.get_running_loop()
+        self._patch_services()
+        self._build_services()
+        self.pubsub.start()
+        self._subscribe_services()
+        return self
+
+    async def __aexit__(self, *args: Any):
+        await self.pubsub.stop()
+        self.executor.shutdown(wait=True)
+        self._exit_stack.close()
+
+    async def add_refs(self, run_id: str, op_run_id: OpRunId, output: OpIOType) -> None:
+        """Adds references in the data ops manager, as the cache would by service invocation."""
+        future = asyncio.run_coroutine_threadsafe(
+            self.data_ops.add_references(run_id, op_run_id, output), self._loop
+        )
+        await asyncio.wrap_future(future)
+
+    async def _probe_batch(
+        self, run_id: str, cache_infos: List[CacheInfo]
+    ) -> List[Optional[OpIOType]]:
+        """Probes the cache as the orchestrator would by service invocation."""
+        body = json.dumps({"run_id": run_id, "cache_info": [asdict(c) for c in cache_infos]})
+        response = await asyncio.get_running_loop().run_in_executor(
+            self.executor, self.cache.handle_probe, body
+        )
+        with self.pubsub._lock:
+            self.pubsub.message_bytes["probe"] += len(body) + len(response)
+        return json.loads(response)["outputs"]
+
+    async def submit_workflow(self, workflow: Dict[str, Any], input: OpIOType) -> str:
+        """Submits a workflow run, as the REST API would, returning the run id."""
+        run_id = uuid4()
+        details = RunDetails()
+        details.submission_time = datetime.utcnow()
+        run = RunConfig(
+            name="control plane run",
+            workflow=workflow,
+            parameters=None,
+            user_input=input,
+            id=run_id,
+            details=details,
+            task_details={},
+            spatio_temporal_json=None,
+        )
+        await RunIndex(self.statestore).add(
+            str(run_id),
+            details.submission_time,
+            operations=[{"key": str(run_id), "operation": "upsert", "value": run}],
+        )
+        message = WorkMessageBuilder.build_workflow_request(run_id, workflow, None, input)
+        await self.pubsub.send_async(
+            message, "rest-api", CONTROL_STATUS_PUBSUB, WORKFLOW_REQUEST_PUBSUB_TOPIC
+        )
+        return str(run_id)
+
+    async def wait_for_run(self, run_id: str, timeout_s: float = 600) -> RunConfig:
+        deadline = time.monotonic() + timeout_s
+        while time.monotonic() < deadline:
+            run = RunConfig(**await self.statestore.retrieve(run_id))
+            if RunStatus.finished(run.details.status):
+                return run
+            await asyncio.sleep(RUN_POLLING_INTERVAL_S)
+        raise TimeoutError(f"Run {run_id} did not finish in {timeout_s} seconds")
+
+    def _count_writes(self) -> int:
+        calls = self.statestore.calls
+        return calls.get("store", 0) + calls.get("transaction", 0)
+
+    async def run_workflow(
+        self, workflow: Dict[str, Any], input: OpIOType, timeout_s: float = 600
+    ) -> ControlPlaneStats:
+        """Runs a workflow to completion and returns measurements of the run."""
+        writes = self._count_writes()
+        message_bytes = dict(self.pubsub.message_bytes)
+        start = time.monotonic()
+        run_id = await self.submit_workflow(workflow, input)
+        run = await self.wait_for_run(run_id, timeout_s)
+        elapsed_s = time.monotonic() - start
+        tasks = await self.statestore.retrieve_bulk(
+            [f"{run_id}-{t}" for t in cast(Dict[str, Any], run.workflow)["tasks"]]
+        )
+        return ControlPlaneStats(
+            run_id=run_id,
+            status=run.details.status,
+            subtasks=sum(len(t["subtasks"] or []) for t in tasks),
+            elapsed_s=elapsed_s,
+            state_writes=self._count_writes() - writes,
+            message_bytes={
+                k: v - message_bytes.get(k, 0) for k, v in self.pubsub.message_bytes.items()
+            },
+            scheduling_latencies_s=self.scheduling_latencies_s.pop(run_id, []),
+        )
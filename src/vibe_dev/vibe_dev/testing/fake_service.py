@@ -0,0 +1,145 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import json
+import threading
+import time
+from dataclasses import asdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+from uuid import uuid4
+
+from vibe_core.datamodel import RunDetails
+
+DISK_FREE_BYTES = 1024**4
+
+
+class FakeService(ThreadingHTTPServer):
+    """Stub of the runs endpoints of the REST API, keeping runs in memory.
+
+    Every request waits for `latency_s` before being answered, to simulate the round trip to (and
+    the work done by) the service. Submissions of runs named in `failing_names` fail.
+    """
+
+    daemon_threads = True
+    # Clients open many connections at once
+    request_queue_size = 128
+
+    def __init__(self, latency_s: float = 0.0, failing_names: Iterable[str] = ()):
+        super().__init__(("127.0.0.1", 0), FakeServiceHandler)
+        self.latency_s = latency_s
+        self.failing_names = set(failing_names)
+        self.runs: Dict[str, Dict[str, Any]] = {}
+        self.requests = 0
+        self.max_in_flight = 0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/"
+
+    def start(self) -> "FakeService":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self) -> "FakeService":
+        return self.start()
+
+    def __exit__(self, *args: Any):
+        self.stop()
+
+    def begin_request(self):
+        with self._lock:
+            self.requests += 1
+            self._in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+
+    def end_request(self):
+        with self._lock:
+            self._in_flight -= 1
+
+
+def project(run: Dict[str, Any], fields: List[str]) -> Dict[str, Any]:
+    projected = {}
+    for field in fields:
+        value = run
+        for key in field.split("."):
+            value = value[key]
+        projected[field] = value
+    return projected
+
+
+class FakeServiceHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Responses are sent in one write, so delayed ACKs do not slow down clients
+    wbufsize = -1
+    server: FakeService
+
+    def log_message(self, format: str, *args: Any):
+        pass
+
+    def _send_json(self, code: int, content: Any):
+        body = json.dumps(content).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self, method: str):
+        self.server.begin_request()
+        try:
+            time.sleep(self.server.latency_s)
+            url = urlsplit(self.path)
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            code, content = self._route(method, url.path.strip("/"), parse_qs(url.query), body)
+            self._send_json(code, content)
+        finally:
+            self.server.end_request()
+
+    def _route(
+        self, method: str, path: str, query: Dict[str, List[str]], body: bytes
+    ) -> Tuple[int, Any]:
+        runs = self.server.runs
+        if method == "GET" and path == "v0/system-metrics":
+            return 200, {"load_avg": [0.0, 0.0, 0.0], "disk_free": DISK_FREE_BYTES}
+        if method == "GET" and path == "v0/runs":
+            ids = query.get("ids", list(runs))
+            if any(i not in runs for i in ids):
+                return 404, {"message": "Run not found"}
+            fields = query.get("fields")
+            return 200, [runs[i] if fields is None else project(runs[i], fields) for i in ids]
+        if method == "POST" and path == "v0/runs":
+            run = json.loads(body)
+            if run["name"] in self.server.failing_names:
+                return 500, {"message": f"Failed to submit run {run['name']}"}
+            run_id = str(uuid4())
+            runs[run_id] = {
+                **run,
+                "id": run_id,
+                "details": asdict(RunDetails()),
+                "task_details": {},
+                "spatio_temporal_json": None,
+                "output": {},
+            }
+            return 201, {"id": run_id, "message": "Workflow created and queued for execution."}
+        if method == "GET" and path.startswith("v0/runs/"):
+            run_id = path.split("/")[-1]
+            if run_id not in runs:
+                return 404, {"message": f"Run {run_id} not found"}
+            return 200, runs[run_id]
+        return 404, {"message": "Not found"}
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
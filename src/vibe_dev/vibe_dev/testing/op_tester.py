@@ -20,14 +20,13 @@ from vibe_agent.ops import (
     OperationFactoryConfig,
     OperationSpec,
     OpIOType,
-    OpResolvedDependencies,
     TypeDictVibe,
 )
 from vibe_agent.ops_helper import OpIOConverter
 from vibe_agent.storage import Storage
 from vibe_agent.storage.asset_management import LocalFileAssetManager
 from vibe_agent.storage.storage import ItemDict, ensure_list
-from vibe_common.schemas import CacheInfo, OperationParser, OpRunId
+from vibe_common.schemas import CacheInfo, OperationParser, OpResolvedDependencies, OpRunId
 from vibe_common.secret_provider import AzureSecretProvider, SecretProvider
 from vibe_core import data
 from vibe_core.data.core_types import BaseVibe
@@ -0,0 +1,79 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import asyncio
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from vibe_common.statestore import StateConflictError, StateStoreProtocol, TransactionOperation
+from vibe_core.data.json_converter import dump_to_json
+
+
+class InMemoryStateStore(StateStoreProtocol):
+    """State store kept in memory, with the same ETag semantics as the Dapr state store.
+
+    Values are serialized to JSON when stored, so callers get copies, as they would from Dapr.
+    A latency may be added to every call, to simulate round trips to the Dapr sidecar.
+    """
+
+    def __init__(self, latency_s: float = 0.0):
+        self.data: Dict[str, str] = {}
+        self.etags: Dict[str, str] = {}
+        self.version = 0
+        self.calls: Dict[str, int] = {}
+        self.latency_s = latency_s
+
+    async def _count(self, method: str):
+        self.calls[method] = self.calls.get(method, 0) + 1
+        if self.latency_s > 0:
+            await asyncio.sleep(self.latency_s)
+
+    def _get(self, key: str) -> Any:
+        if key not in self.data:
+            raise KeyError(f"Key {key} not found")
+        return json.loads(self.data[key])
+
+    def _check_etag(self, operation: TransactionOperation):
+        if "etag" not in operation:
+            return
+        current = self.etags.get(operation["key"], "")
+        if operation["etag"] != current:
+            raise StateConflictError(f"ETag mismatch for key {operation['key']}")
+
+    def _set(self, key: str, obj: Any):
+        self.version += 1
+        self.data[key] = dump_to_json(obj)
+        self.etags[key] = str(self.version)
+
+    async def retrieve(self, key: str, traceparent: Optional[str] = None) -> Any:
+        await self._count("retrieve")
+        return self._get(key)
+
+    async def retrieve_with_etag(
+        self, key: str, traceparent: Optional[str] = None
+    ) -> Tuple[Any, Optional[str]]:
+        await self._count("retrieve_with_etag")
+        return self._get(key), self.etags[key]
+
+    async def retrieve_bulk(
+        self, keys: List[str], parallelism: int = 8, traceparent: Optional[str] = None
+    ) -> List[Any]:
+        await self._count("retrieve_bulk")
+        return [self._get(key) for key in keys]
+
+    async def store(self, key: str, obj: Any, traceparent: Optional[str] = None) -> None:
+        await self._count("store")
+        self._set(key, obj)
+
+    async def transaction(
+        self, operations: List[TransactionOperation], traceparent: Optional[str] = None
+    ) -> None:
+        await self._count("transaction")
+        for operation in operations:
+            self._check_etag(operation)
+        for operation in operations:
+            if operation["operation"] == "delete":
+                self.data.pop(operation["key"], None)
+                self.etags.pop(operation["key"], None)
+            else:
+                self._set(operation["key"], operation["value"])
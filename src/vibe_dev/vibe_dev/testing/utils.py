@@ -51,6 +51,7 @@ class WorkflowTestHelper:
             factory_spec=factory_spec,
             workflow=workflow,
         )
-        runner.runner.is_workflow = lambda *args, **kwargs: False  # type: ignore
+        for worker in runner.workers:  # type: ignore
+            worker.is_workflow = lambda *args, **kwargs: False  # type: ignore
 
         return runner
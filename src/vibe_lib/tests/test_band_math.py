@@ -0,0 +1,131 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import os
+from tempfile import TemporaryDirectory
+from typing import Any, Dict, Iterator
+
+import numpy as np
+import pytest
+import rasterio
+from numpy.typing import NDArray
+from rasterio.crs import CRS
+from rasterio.transform import from_origin
+
+from vibe_lib.band_math import BandExpression, BandMath, recode, write_band_math
+
+SIZE = 300
+UTM = CRS.from_epsg(32615)
+
+
+@pytest.fixture
+def tmp_dir() -> Iterator[str]:
+    _tmp_dir = TemporaryDirectory()
+    yield _tmp_dir.name
+    _tmp_dir.cleanup()
+
+
+def write_raster(path: str, data: NDArray[Any], res: float = 10.0, nodata: Any = None) -> str:
+    with rasterio.open(
+        path,
+        "w",
+        driver="GTiff",
+        width=data.shape[2],
+        height=data.shape[1],
+        count=data.shape[0],
+        dtype=data.dtype,
+        crs=UTM,
+        transform=from_origin(500000.0, 4500000.0, res, res),
+        nodata=nodata,
+    ) as dst:
+        dst.write(data)
+    return path
+
+
+def test_recode_uses_last_repeated_value():
+    x = np.array([[0, 1, 2], [3, 4, np.nan]])
+    out = recode(x, [3, 1, 0, 3], [30, 10, -1, 33])
+    np.testing.assert_array_equal(out, [[-1, 10, 2], [33, 4, np.nan]])
+    with pytest.raises(ValueError):
+        recode(x, [1, 2], [1])
+
+
+@pytest.mark.parametrize(
+    "expression, expected",
+    [
+        ("(a - b) / (a + b)", lambda a, b: (a - b) / (a + b)),
+        ("a > 2", lambda a, b: a > 2),
+        ("1 < a <= 3", lambda a, b: (1 < a) & (a <= 3)),
+        ("a > 1 and not b < 4", lambda a, b: (a > 1) & ~(b < 4)),
+        ("a if a > b else -b", lambda a, b: np.where(a > b, a, -b)),
+        ("clip(a * 2, 0, 5) + sqrt(b)", lambda a, b: np.clip(a * 2, 0, 5) + np.sqrt(b)),
+        ("recode(a, [1, 2], [-1, -2])", lambda a, b: np.select([a == 1, a == 2], [-1, -2], a)),
+    ],
+)
+def test_band_expression(expression: str, expected: Any):
+    a = np.arange(6, dtype=np.float64).reshape(2, 3)
+    b = np.full((2, 3), 3.0)
+    compiled = BandExpression(expression)
+    assert compiled.variables == {"a", "b"} - ({"b"} if "b" not in expression else set())
+    np.testing.assert_array_equal(compiled({"a": a, "b": b}), expected(a, b))
+
+
+@pytest.mark.parametrize(
+    "expression", ["__import__('os')", "a.real", "a[0]", "lambda: 1", "a +", "foo(a)", "'text'"]
+)
+def test_invalid_expressions(expression: str):
+    with pytest.raises(ValueError):
+        BandExpression(expression)
+
+
+def test_band_math_nodata():
+    bands = {"a": np.array([[1.0, np.nan], [3.0, 0.0]]), "b": np.array([[1.0, 1.0], [np.nan, 1.0]])}
+    band_math = BandMath({"ratio": "a / b", "only_a": "a > 2"}, mask="a != 3")
+    out = band_math.evaluate(bands, "uint8", 255)
+    # Nodata in inputs or mask, and non-finite results, are nodata in outputs
+    np.testing.assert_array_equal(out[0], [[1, 255], [255, 0]])
+    np.testing.assert_array_equal(out[1], [[0, 255], [255, 0]])
+
+
+def test_write_band_math(tmp_dir: str):
+    rng = np.random.default_rng(0)
+    bands = rng.integers(1, 1000, size=(3, SIZE, SIZE)).astype(np.uint16)
+    bands[0, :10, :10] = 0
+    ref = write_raster(os.path.join(tmp_dir, "ref.tif"), bands, nodata=0)
+    # Coarser raster, which is resampled to the grid of the reference
+    coarse = np.repeat(np.arange(SIZE // 2, dtype=np.float32)[None, None], SIZE // 2, axis=1)
+    other = write_raster(os.path.join(tmp_dir, "other.tif"), coarse, res=20.0)
+    band_refs = {"red": (ref, 0), "nir": (ref, 2), "other": (other, 0), "unused": (ref, 1)}
+    expressions: Dict[str, str] = {
+        "ndvi": "(nir - red) / (nir + red)",
+        "high": "recode(other, [0], [1000]) > 50",
+    }
+    out_path = os.path.join(tmp_dir, "out.tif")
+    write_band_math(
+        BandMath(expressions, mask="nir > 10"),
+        band_refs,
+        ref,
+        out_path,
+        num_workers=3,
+        block_size=64,
+    )
+
+    red, nir = bands[0].astype(np.float64), bands[2].astype(np.float64)
+    with rasterio.open(out_path) as src:
+        assert src.count == 2
+        assert src.descriptions == ("ndvi", "high")
+        assert src.crs == UTM and src.shape == (SIZE, SIZE)
+        out = src.read()
+    valid = (nir > 10) & (red > 0)
+    np.testing.assert_allclose(out[0][valid], ((nir - red) / (nir + red))[valid], rtol=1e-6)
+    assert np.isnan(out[0][~valid]).all()
+    other_resampled = np.repeat(coarse[0], 2, axis=0).repeat(2, axis=1)
+    expected_high = np.where(other_resampled == 0, 1000, other_resampled) > 50
+    mask = nir > 10
+    np.testing.assert_array_equal(out[1][mask], expected_high[mask])
+
+
+def test_write_band_math_unknown_band(tmp_dir: str):
+    ref = write_raster(os.path.join(tmp_dir, "ref.tif"), np.ones((1, 10, 10), dtype=np.uint8))
+    with pytest.raises(ValueError):
+        write_band_math(BandMath({"x": "a + b"}), {"a": (ref, 0)}, ref, ref + ".out")
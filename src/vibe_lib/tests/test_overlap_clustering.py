@@ -0,0 +1,69 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+from typing import Any
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from numpy.typing import NDArray
+
+from vibe_lib import overlap_clustering
+from vibe_lib.overlap_clustering import run_clustering
+
+SIZE = 96
+HALF_SIDE_LENGTH = 2
+ITERATIONS = 2
+
+
+@pytest.fixture
+def image() -> NDArray[Any]:
+    rng = np.random.default_rng(0)
+    # Smooth blobs with noise, so there are clusters to be found
+    x, y = np.meshgrid(np.linspace(0, 6, SIZE), np.linspace(0, 6, SIZE))
+    base = np.stack([np.sin(x) * np.cos(y), np.cos(x + y)])
+    return (base + rng.normal(0, 0.1, size=base.shape)).astype(np.float32)
+
+
+def cluster(image: NDArray[Any], **kwargs: Any) -> NDArray[Any]:
+    params = {
+        "number_classes": 3,
+        "half_side_length": HALF_SIDE_LENGTH,
+        "number_iterations": ITERATIONS,
+        "stride": 1,
+        "warmup_steps": 0,
+        "warmup_half_side_length": 0,
+        "window": SIZE,
+        **kwargs,
+    }
+    return run_clustering(image, **params)
+
+
+def test_tiles_with_halo_match_untiled(image: NDArray[Any]):
+    untiled = cluster(image)
+    # Each iteration pools twice, so this halo covers every pixel that affects the tile
+    halo = 2 * HALF_SIDE_LENGTH * ITERATIONS
+    tiled = cluster(image, window=32, halo=halo, num_workers=4)
+    assert (tiled == untiled).mean() > 0.999
+    # Without a halo, results differ near tile edges
+    seams = cluster(image, window=32, halo=0, num_workers=4)
+    assert (seams == untiled).mean() < (tiled == untiled).mean()
+
+
+def test_early_stopping(image: NDArray[Any]):
+    with patch.object(
+        overlap_clustering,
+        "perform_iteration_expectation_maximization",
+        wraps=overlap_clustering.perform_iteration_expectation_maximization,
+    ) as iteration:
+        cluster(image, number_iterations=10, tolerance=1.0)
+        assert iteration.call_count == 1
+        iteration.reset_mock()
+        cluster(
+            image, number_iterations=10, warmup_steps=2, warmup_half_side_length=4, tolerance=1.0
+        )
+        # Warmup iterations are always run
+        assert iteration.call_count == 3
+        iteration.reset_mock()
+        cluster(image, number_iterations=10)
+        assert iteration.call_count == 10
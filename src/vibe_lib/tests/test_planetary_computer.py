@@ -0,0 +1,128 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from tempfile import TemporaryDirectory
+from typing import Any, Dict, List
+from unittest.mock import MagicMock, patch
+
+import planetary_computer as pc
+import pytest
+from planetary_computer.sas import TOKEN_CACHE, SASToken
+from planetary_computer.settings import Settings
+from pystac import Asset, Item
+from requests.exceptions import HTTPError
+
+from vibe_lib import planetary_computer as pc_lib
+from vibe_lib.planetary_computer import (
+    PlanetaryComputerCollection,
+    invalidate_sas_token,
+    retry_wait,
+)
+
+BLOB_HREF = "https://account.blob.core.windows.net/container/path/to/{}.tif"
+PUBLIC_HREF = "https://ai4edatasetspublicassets.blob.core.windows.net/assets/a.tif"
+
+
+def token_key() -> str:
+    return f"{Settings.get().sas_url}/account/container"
+
+
+@pytest.fixture
+def token_cache():
+    with patch.dict(TOKEN_CACHE, clear=True):
+        TOKEN_CACHE[token_key()] = SASToken(
+            token="st=fake&se=fake&sp=r",
+            expiry=datetime.now(timezone.utc) + timedelta(hours=1),
+        )
+        yield TOKEN_CACHE
+
+
+def test_invalidate_sas_token(token_cache: Dict[str, SASToken]):
+    signed = pc.sign(BLOB_HREF.format(0))
+    assert signed == f"{BLOB_HREF.format(0)}?st=fake&se=fake&sp=r"
+
+    # Public assets and non-blob hrefs are returned unchanged
+    for href in (PUBLIC_HREF, "https://example.com/a.tif"):
+        assert pc.sign(href) == href
+        invalidate_sas_token(href)
+    assert token_key() in token_cache
+
+    invalidate_sas_token(BLOB_HREF.format(0))
+    assert token_key() not in token_cache
+
+
+@patch.object(pc_lib, "retry_wait", return_value=0)
+@patch.object(pc_lib, "download_file")
+@patch("planetary_computer.sas.requests.Session.get")
+def test_download_asset_renews_token_on_403(
+    session_get: MagicMock,
+    download_file: MagicMock,
+    _: MagicMock,
+    token_cache: Dict[str, SASToken],
+    collection: Any,
+):
+    expiry = datetime.now(timezone.utc) + timedelta(hours=1)
+    session_get.return_value.json.return_value = {
+        "token": "st=new&se=new&sp=r",
+        "msft:expiry": expiry.isoformat(),
+    }
+    download_file.side_effect = [HTTPError(response=MagicMock(status_code=403)), None]
+
+    with TemporaryDirectory() as tmp_dir:
+        collection.download_asset(Asset(href=BLOB_HREF.format(0)), tmp_dir)
+
+    hrefs = [c.args[0] for c in download_file.call_args_list]
+    assert hrefs == [
+        f"{BLOB_HREF.format(0)}?st=fake&se=fake&sp=r",
+        f"{BLOB_HREF.format(0)}?st=new&se=new&sp=r",
+    ]
+    session_get.assert_called_once()
+
+
+def test_retry_wait_is_bounded():
+    for retry in range(10):
+        wait = retry_wait(retry)
+        assert 0 <= wait <= min(pc_lib.MAX_RETRY_WAIT, pc_lib.RETRY_WAIT * 2**retry)
+
+
+@pytest.fixture
+def collection():
+    class FakeCollection(PlanetaryComputerCollection):
+        collection = "fake"
+        asset_keys = [f"B{i:02}" for i in range(12)]
+
+    with patch.object(pc_lib, "get_available_collections", return_value=["fake"]):
+        return FakeCollection()
+
+
+@patch.object(pc_lib, "download_file")
+def test_download_item_concurrently(download_file: MagicMock, collection: Any):
+    lock = threading.Lock()
+    running: List[int] = [0]
+    max_running: List[int] = [0]
+
+    def fake_download(href: str, out_path: str):
+        with lock:
+            running[0] += 1
+            max_running[0] = max(max_running[0], running[0])
+        time.sleep(0.05)
+        with lock:
+            running[0] -= 1
+        return out_path
+
+    download_file.side_effect = fake_download
+    item = Item("item", None, None, datetime.now(), {})
+    for k in collection.asset_keys:
+        item.add_asset(k, Asset(href=f"https://example.com/{k}.tif"))
+
+    with TemporaryDirectory() as tmp_dir:
+        out_dir = os.path.join(tmp_dir, "item")
+        paths = collection.download_item(item, out_dir)
+
+    # Output order follows the asset keys
+    assert paths == [os.path.join(out_dir, f"{k}.tif") for k in collection.asset_keys]
+    assert 1 < max_running[0] <= collection.max_concurrent_downloads
@@ -0,0 +1,143 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import os
+import shutil
+from datetime import datetime
+from tempfile import TemporaryDirectory
+from typing import Iterator
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+import rasterio
+from rasterio.crs import CRS
+from rasterio.enums import Resampling
+from rasterio.transform import from_origin
+from shapely import geometry as shpg
+
+from vibe_core.data import AssetVibe, Raster, gen_guid
+from vibe_lib.raster import load_raster_match
+from vibe_lib.raster_cache import CACHE_DIR_ENV, ReprojectionCache, _cache_from_env
+
+UTM = CRS.from_epsg(32615)
+
+
+@pytest.fixture
+def tmp_dir() -> Iterator[str]:
+    _tmp_dir = TemporaryDirectory()
+    yield _tmp_dir.name
+    _tmp_dir.cleanup()
+
+
+def make_raster(path: str, size: int, res: float, value_offset: float = 0) -> Raster:
+    data = np.arange(size * size, dtype=np.float32).reshape(1, size, size) + value_offset
+    data[0, 0, :5] = -1
+    with rasterio.open(
+        path,
+        "w",
+        driver="GTiff",
+        width=size,
+        height=size,
+        count=1,
+        dtype="float32",
+        crs=UTM,
+        transform=from_origin(500000.0, 4500000.0, res, res),
+        nodata=-1,
+    ) as dst:
+        dst.write(data)
+    return Raster(
+        id=gen_guid(),
+        time_range=(datetime(2023, 1, 1), datetime(2023, 1, 1)),
+        geometry=shpg.mapping(shpg.box(-92.9, 40.6, -92.8, 40.7)),
+        assets=[AssetVibe(reference=path, type="image/tiff", id=gen_guid())],
+        bands={"band": 0},
+    )
+
+
+def test_load_raster_match_is_cached(tmp_dir: str):
+    source = make_raster(os.path.join(tmp_dir, "source.tif"), 50, 20.0)
+    ref = make_raster(os.path.join(tmp_dir, "ref.tif"), 100, 10.0)
+    cache_dir = os.path.join(tmp_dir, "cache")
+    cache = ReprojectionCache(cache_dir)
+    with patch("vibe_lib.raster.reprojection_cache", cache):
+        expected = load_raster_match(source, ref, use_cache=False)
+        first = load_raster_match(source, ref)
+        second = load_raster_match(source, ref)
+        # A different resampling method is a different entry
+        load_raster_match(source, ref, resampling=Resampling.bilinear)
+    assert (cache.stats.misses, cache.stats.memory_hits) == (2, 1)
+    assert cache.stats.hit_rate == pytest.approx(1 / 3)
+    for array in (first, second):
+        np.testing.assert_array_equal(array.values, expected.values)
+        assert array.rio.crs == expected.rio.crs
+        assert array.rio.transform() == expected.rio.transform()
+    # Hits are copies, so callers may modify them
+    first[:] = 0
+    with patch("vibe_lib.raster.reprojection_cache", cache):
+        np.testing.assert_array_equal(load_raster_match(source, ref).values, expected.values)
+
+    # Another process finds the aligned raster on disk, even if the source file was copied
+    copy_path = shutil.copy(source.raster_asset.path_or_url, os.path.join(tmp_dir, "copy.tif"))
+    copy = source.clone_from(
+        source,
+        id=gen_guid(),
+        assets=[AssetVibe(reference=copy_path, type="image/tiff", id=gen_guid())],
+    )
+    other_cache = ReprojectionCache(cache_dir)
+    with patch("vibe_lib.raster.reprojection_cache", other_cache):
+        from_disk = load_raster_match(copy, ref)
+    assert (other_cache.stats.disk_hits, other_cache.stats.misses) == (1, 0)
+    assert other_cache.stats.saved_s > 0
+    np.testing.assert_array_equal(from_disk.values, expected.values)
+
+    # Different content is a different entry
+    changed = make_raster(os.path.join(tmp_dir, "changed.tif"), 50, 20.0, value_offset=1)
+    with patch("vibe_lib.raster.reprojection_cache", other_cache):
+        load_raster_match(changed, ref)
+    assert other_cache.stats.misses == 1
+
+
+def test_disk_tier_is_bounded(tmp_dir: str):
+    ref = make_raster(os.path.join(tmp_dir, "ref.tif"), 100, 10.0)
+    cache_dir = os.path.join(tmp_dir, "cache")
+    cache = ReprojectionCache(cache_dir, max_memory_bytes=0, max_disk_bytes=1)
+    with patch("vibe_lib.raster.reprojection_cache", cache):
+        for i in range(3):
+            source = make_raster(os.path.join(tmp_dir, f"{i}.tif"), 50, 20.0, value_offset=i)
+            load_raster_match(source, ref)
+    # Only the most recent file is kept, and nothing fits in memory
+    assert len(os.listdir(cache_dir)) <= 1
+    assert cache.memory_bytes == 0
+
+
+def test_disk_tier_is_opt_in(tmp_dir: str):
+    with patch.dict(os.environ):
+        os.environ.pop(CACHE_DIR_ENV, None)
+        assert _cache_from_env().cache_dir is None
+        os.environ[CACHE_DIR_ENV] = tmp_dir
+        assert _cache_from_env().cache_dir == tmp_dir
+
+
+def test_failed_writes_are_cleaned_up(tmp_dir: str):
+    source = make_raster(os.path.join(tmp_dir, "source.tif"), 50, 20.0)
+    ref = make_raster(os.path.join(tmp_dir, "ref.tif"), 100, 10.0)
+    cache_dir = os.path.join(tmp_dir, "cache")
+    cache = ReprojectionCache(cache_dir)
+    with patch("vibe_lib.raster.reprojection_cache", cache):
+        with patch("rioxarray.raster_array.RasterArray.to_raster", side_effect=OSError):
+            load_raster_match(source, ref)
+    assert cache.stats.misses == 1
+    assert os.listdir(cache_dir) == []
+
+
+def test_cache_is_only_used_by_default_with_disk_tier(tmp_dir: str):
+    source = make_raster(os.path.join(tmp_dir, "source.tif"), 50, 20.0)
+    ref = make_raster(os.path.join(tmp_dir, "ref.tif"), 100, 10.0)
+    cache = ReprojectionCache(None)
+    with patch("vibe_lib.raster.reprojection_cache", cache):
+        load_raster_match(source, ref)
+        assert cache.stats.lookups == 0
+        load_raster_match(source, ref, use_cache=True)
+        load_raster_match(source, ref, use_cache=True)
+    assert (cache.stats.misses, cache.stats.memory_hits) == (1, 1)
@@ -0,0 +1,176 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from tempfile import TemporaryDirectory
+from typing import Any, List
+
+import numpy as np
+import pytest
+import rasterio
+from rasterio.crs import CRS
+from rasterio.transform import from_origin
+from rasterio.warp import transform_geom
+from rasterio.windows import Window
+from shapely import geometry as shpg
+
+from vibe_lib.raster import (
+    get_geometry_window,
+    get_windows,
+    imap_windows,
+    include_raster_overviews,
+    read_window_to_cog,
+)
+
+SIZE = 2048
+RES = 10.0
+ORIGIN_X, ORIGIN_Y = 500000.0, 4500000.0
+UTM = CRS.from_epsg(32615)
+
+
+@pytest.fixture
+def tmp_dir():
+    _tmp_dir = TemporaryDirectory()
+    yield _tmp_dir.name
+    _tmp_dir.cleanup()
+
+
+@pytest.fixture
+def cog_path(tmp_dir: str) -> str:
+    path = os.path.join(tmp_dir, "tile.tif")
+    data = np.arange(SIZE * SIZE, dtype=np.float32).reshape(1, SIZE, SIZE)
+    with rasterio.open(
+        path,
+        "w",
+        driver="GTiff",
+        width=SIZE,
+        height=SIZE,
+        count=1,
+        dtype="float32",
+        crs=UTM,
+        transform=from_origin(ORIGIN_X, ORIGIN_Y, RES, RES),
+        tiled=True,
+        blockxsize=256,
+        blockysize=256,
+    ) as dst:
+        dst.write(data)
+    include_raster_overviews(path)
+    return path
+
+
+def utm_box_to_wgs(minx: float, miny: float, maxx: float, maxy: float) -> shpg.Polygon:
+    return shpg.shape(
+        transform_geom(UTM, "epsg:4326", shpg.mapping(shpg.box(minx, miny, maxx, maxy)))
+    )
+
+
+def test_geometry_window(cog_path: str):
+    # 100m x 100m box, 10 pixels from the upper left corner of the tile
+    geom = shpg.box(ORIGIN_X + 100, ORIGIN_Y - 200, ORIGIN_X + 200, ORIGIN_Y - 100)
+    with rasterio.open(cog_path) as src:
+        window = get_geometry_window(src, geom, geometry_crs=UTM)
+        assert (window.col_off, window.row_off, window.width, window.height) == (10, 10, 10, 10)
+        aligned = get_geometry_window(src, geom, geometry_crs=UTM, alignment=60)
+        assert (aligned.col_off, aligned.row_off, aligned.width, aligned.height) == (6, 6, 18, 18)
+
+
+def test_read_window_to_cog(cog_path: str, tmp_dir: str):
+    geom = utm_box_to_wgs(ORIGIN_X + 1000, ORIGIN_Y - 2000, ORIGIN_X + 1500, ORIGIN_Y - 1500)
+    out_path = read_window_to_cog(cog_path, geom, os.path.join(tmp_dir, "window.tif"))
+
+    with rasterio.open(cog_path) as src, rasterio.open(out_path) as dst:
+        assert dst.crs == src.crs
+        assert dst.width < SIZE // 10 and dst.height < SIZE // 10
+        # The window covers the whole geometry
+        assert shpg.box(*dst.bounds).contains(
+            shpg.box(ORIGIN_X + 1000, ORIGIN_Y - 2000, ORIGIN_X + 1500, ORIGIN_Y - 1500)
+        )
+        # The data matches the source at the same location
+        col, row = ~src.transform * (dst.bounds.left, dst.bounds.top)
+        expected = src.read(1)[
+            round(row) : round(row) + dst.height, round(col) : round(col) + dst.width
+        ]
+        assert np.array_equal(dst.read(1), expected)
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    path_to_serve: str = ""
+    bytes_sent: List[int] = []
+
+    def log_message(self, format: str, *args: Any):
+        pass
+
+    def _send(self, body_only: bool):
+        with open(self.path_to_serve, "rb") as f:
+            content = f.read()
+        range_header = self.headers.get("Range")
+        if range_header is not None:
+            match = re.match(r"bytes=(\d+)-(\d*)", range_header)
+            assert match is not None
+            start = int(match.group(1))
+            end = int(match.group(2)) if match.group(2) else len(content) - 1
+            end = min(end, len(content) - 1)
+            body = content[start : end + 1]
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(content)}")
+        else:
+            body = content
+            self.send_response(200)
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body_only:
+            self.wfile.write(body)
+            self.bytes_sent.append(len(body))
+
+    def do_HEAD(self):
+        self._send(body_only=False)
+
+    def do_GET(self):
+        self._send(body_only=True)
+
+
+def test_read_remote_window_with_ranges(cog_path: str, tmp_dir: str):
+    RangeHandler.path_to_serve = cog_path
+    RangeHandler.bytes_sent = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), RangeHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    try:
+        url = f"http://127.0.0.1:{httpd.server_address[1]}/tile.tif"
+        geom = utm_box_to_wgs(ORIGIN_X + 1000, ORIGIN_Y - 2000, ORIGIN_X + 1500, ORIGIN_Y - 1500)
+        out_path = read_window_to_cog(url, geom, os.path.join(tmp_dir, "window.tif"))
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+    with rasterio.open(out_path) as dst:
+        assert dst.width < SIZE // 10
+    # Only a small part of the file was transferred
+    assert sum(RangeHandler.bytes_sent) < os.path.getsize(cog_path) / 4
+
+
+def test_imap_windows_bounded_and_ordered():
+    wins = get_windows(100, 100, 10, 10)
+    lock = threading.Lock()
+    in_flight = [0, 0]
+
+    def process(win: Window) -> Window:
+        with lock:
+            in_flight[0] += 1
+            in_flight[1] = max(in_flight)
+        time.sleep(0.001)
+        return win
+
+    results = []
+    for win, result in imap_windows(process, wins, num_workers=4, max_pending=6):
+        with lock:
+            in_flight[0] -= 1
+        results.append(result)
+    assert results == wins
+    assert in_flight[1] <= 6
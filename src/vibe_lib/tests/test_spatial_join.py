@@ -0,0 +1,76 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+from datetime import datetime
+from typing import List
+
+import numpy as np
+import pytest
+from shapely import geometry as shpg
+from shapely.geometry.base import BaseGeometry
+
+from vibe_core.data import DataVibe
+from vibe_lib.geometry import is_approx_equal
+from vibe_lib.spatial_join import SpatialIndex, approx_equal_pairs
+
+
+def random_boxes(n: int, seed: int) -> List[BaseGeometry]:
+    rng = np.random.default_rng(seed)
+    corners = rng.uniform(0, 100, size=(n, 2))
+    sizes = rng.uniform(0.5, 10, size=(n, 2))
+    return [shpg.box(x, y, x + w, y + h) for (x, y), (w, h) in zip(corners, sizes)]
+
+
+def nested_loop(geoms1: List[BaseGeometry], geoms2: List[BaseGeometry], predicate: str):
+    pairs = [
+        (i, j)
+        for i, g1 in enumerate(geoms1)
+        for j, g2 in enumerate(geoms2)
+        if getattr(g1, predicate)(g2)
+    ]
+    return [p[0] for p in pairs], [p[1] for p in pairs]
+
+
+@pytest.mark.parametrize("predicate", ["intersects", "contains"])
+def test_predicates_match_nested_loop(predicate: str):
+    queries, indexed = random_boxes(200, 0), random_boxes(300, 1)
+    # Make sure some geometries are contained in others
+    queries += [g.buffer(1) for g in indexed[:10]]
+    idx1, idx2 = getattr(SpatialIndex(indexed), predicate)(queries)
+    expected = nested_loop(queries, indexed, predicate)
+    assert len(expected[0]) > 0
+    assert (idx1.tolist(), idx2.tolist()) == expected
+
+
+def test_nearest():
+    queries, indexed = random_boxes(50, 2), random_boxes(50, 3)
+    idx1, idx2 = SpatialIndex(indexed).nearest(queries)
+    for i, j in zip(idx1, idx2):
+        distances = [queries[i].distance(g) for g in indexed]
+        assert queries[i].distance(indexed[j]) == pytest.approx(min(distances))
+    assert set(idx1.tolist()) == set(range(len(queries)))
+    idx1, _ = SpatialIndex(indexed).nearest(queries, max_distance=1e-3)
+    assert len(idx1) < len(queries)
+
+
+def test_parses_items_and_handles_empty_collections():
+    geom = shpg.box(0, 0, 1, 1)
+    item = DataVibe("item", (datetime.now(), datetime.now()), shpg.mapping(geom), assets=[])
+    idx1, idx2 = SpatialIndex([item, shpg.mapping(geom)]).intersects([geom])
+    assert (idx1.tolist(), idx2.tolist()) == ([0, 0], [0, 1])
+    assert len(SpatialIndex([]).intersects([geom])[0]) == 0
+    assert len(SpatialIndex([geom]).nearest([])[0]) == 0
+
+
+def test_approx_equal_pairs():
+    geoms1 = random_boxes(100, 4)
+    geoms2 = [g.buffer(0.001) for g in geoms1[::2]] + random_boxes(100, 5)
+    idx1, idx2 = approx_equal_pairs(geoms1, geoms2, threshold=0.99)
+    expected = [
+        (i, j)
+        for i, g1 in enumerate(geoms1)
+        for j, g2 in enumerate(geoms2)
+        if is_approx_equal(g1, g2, threshold=0.99)
+    ]
+    assert len(expected) >= 50
+    assert list(zip(idx1.tolist(), idx2.tolist())) == expected
@@ -0,0 +1,390 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""
+Block-wise evaluation of band-math expressions over rasters.
+
+Expressions are written in a small subset of Python, where names refer to raster bands. They may
+use arithmetic (``+ - * / // % **``), comparisons (``< <= > >= == !=``), boolean logic
+(``and or not & | ~``), conditional expressions (``a if cond else b``) and the functions in
+:data:`FUNCTIONS`, including lookup-table recoding (``recode(x, [1, 2], [10, 20])``).
+Expressions are compiled once into vectorized numpy functions, and evaluated one window at a time,
+so any number of outputs is computed in a single pass over the inputs with bounded memory.
+"""
+
+import ast
+import functools
+import operator
+from contextlib import ExitStack
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+from rasterio.enums import Resampling
+from rasterio.vrt import WarpedVRT
+from rasterio.windows import Window
+
+from vibe_lib.raster import (
+    FLOAT_COMPRESSION_KWARGS,
+    INT_COMPRESSION_KWARGS,
+    get_windows,
+    imap_windows,
+    open_raster_from_ref,
+)
+
+Evaluator = Callable[[Mapping[str, NDArray[Any]]], Any]
+
+
+def recode(x: ArrayLike, from_values: ArrayLike, to_values: ArrayLike) -> NDArray[Any]:
+    """
+    Map each value in `from_values` to the value with the same index in `to_values`, with a
+    vectorized lookup table. Values that are not in `from_values` are kept unchanged.
+
+    Arguments:
+        x: array to be recoded
+        from_values: values to recode from
+        to_values: values to recode to
+
+    Returns:
+        The recoded array
+    """
+    x = np.asarray(x)
+    keys = np.asarray(from_values).ravel()
+    values = np.asarray(to_values).ravel()
+    if keys.shape != values.shape:
+        raise ValueError(
+            f"'from_values' and 'to_values' must have the same length. "
+            f"Got {keys.size} and {values.size}, respectively."
+        )
+    if keys.size == 0:
+        return x.copy()
+    order = np.argsort(keys, kind="stable")
+    keys, values = keys[order], values[order]
+    # The last of repeated `from_values` takes precedence, as it would in a dictionary
+    idx = np.clip(np.searchsorted(keys, x, side="right") - 1, 0, keys.size - 1)
+    return np.where(keys[idx] == x, values[idx], x)
+
+
+FUNCTIONS: Dict[str, Callable[..., Any]] = {
+    "abs": np.abs,
+    "sqrt": np.sqrt,
+    "exp": np.exp,
+    "log": np.log,
+    "log10": np.log10,
+    "clip": np.clip,
+    "minimum": np.minimum,
+    "maximum": np.maximum,
+    "where": np.where,
+    "isnan": np.isnan,
+    "isfinite": np.isfinite,
+    "recode": recode,
+}
+"""Functions that may be called in expressions."""
+
+CONSTANTS: Dict[str, float] = {"nan": np.nan, "inf": np.inf, "pi": np.pi}
+
+BINARY_OPERATORS: Dict[type, Callable[[Any, Any], Any]] = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: np.true_divide,
+    ast.FloorDiv: np.floor_divide,
+    ast.Mod: np.mod,
+    ast.Pow: np.power,
+    ast.BitAnd: np.logical_and,
+    ast.BitOr: np.logical_or,
+}
+
+UNARY_OPERATORS: Dict[type, Callable[[Any], Any]] = {
+    ast.USub: operator.neg,
+    ast.UAdd: operator.pos,
+    ast.Not: np.logical_not,
+    ast.Invert: np.logical_not,
+}
+
+COMPARISON_OPERATORS: Dict[type, Callable[[Any, Any], Any]] = {
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+}
+
+
+class BandExpression:
+    """
+    A band-math expression compiled into a vectorized function of the bands it refers to.
+
+    Arguments:
+        expression: expression text, e.g., ``(nir - red) / (nir + red)``
+
+    Raises:
+        ValueError: if the expression is not valid or uses unsupported syntax
+    """
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        self.variables: Set[str] = set()
+        try:
+            tree = ast.parse(expression.strip(), mode="eval")
+        except SyntaxError as e:
+            raise ValueError(f"Invalid expression '{expression}': {e.msg}") from e
+        self._evaluate = self._compile(tree.body)
+
+    def __call__(self, bands: Mapping[str, NDArray[Any]]) -> Any:
+        return self._evaluate(bands)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.expression!r})"
+
+    def _error(self, node: ast.AST, reason: str) -> ValueError:
+        return ValueError(f"{reason} in expression '{self.expression}' (offset {node.col_offset})")
+
+    def _literal(self, node: ast.AST) -> Any:
+        """Evaluate literal numbers and lists of numbers, as used by lookup tables."""
+        if isinstance(node, (ast.List, ast.Tuple)):
+            return np.array([self._literal(e) for e in node.elts])
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+            return UNARY_OPERATORS[type(node.op)](self._literal(node.operand))
+        if isinstance(node, ast.Constant) and isinstance(node.value, (bool, int, float)):
+            return node.value
+        if isinstance(node, ast.Name) and node.id in CONSTANTS:
+            return CONSTANTS[node.id]
+        raise self._error(node, "Expected a number")
+
+    def _compile(self, node: ast.AST) -> Evaluator:
+        if isinstance(node, (ast.Constant, ast.List, ast.Tuple)):
+            value = self._literal(node)
+            return lambda _: value
+        if isinstance(node, ast.Name):
+            if node.id in CONSTANTS:
+                constant = CONSTANTS[node.id]
+                return lambda _: constant
+            name = node.id
+            self.variables.add(name)
+            return lambda bands: bands[name]
+        if isinstance(node, ast.BinOp) and type(node.op) in BINARY_OPERATORS:
+            binary_op = BINARY_OPERATORS[type(node.op)]
+            left, right = self._compile(node.left), self._compile(node.right)
+            return lambda bands: binary_op(left(bands), right(bands))
+        if isinstance(node, ast.UnaryOp) and type(node.op) in UNARY_OPERATORS:
+            unary_op = UNARY_OPERATORS[type(node.op)]
+            operand = self._compile(node.operand)
+            return lambda bands: unary_op(operand(bands))
+        if isinstance(node, ast.BoolOp):
+            logical_op = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+            values = [self._compile(v) for v in node.values]
+            return lambda bands: functools.reduce(logical_op, [v(bands) for v in values])
+        if isinstance(node, ast.Compare):
+            if any(type(op) not in COMPARISON_OPERATORS for op in node.ops):
+                raise self._error(node, "Unsupported comparison")
+            ops = [COMPARISON_OPERATORS[type(op)] for op in node.ops]
+            operands = [self._compile(o) for o in [node.left, *node.comparators]]
+
+            def compare(bands: Mapping[str, NDArray[Any]]) -> Any:
+                # Chained comparisons (a < b < c) hold if all pairwise comparisons hold
+                values = [o(bands) for o in operands]
+                return functools.reduce(
+                    np.logical_and, [op(a, b) for op, a, b in zip(ops, values[:-1], values[1:])]
+                )
+
+            return compare
+        if isinstance(node, ast.IfExp):
+            test, body, orelse = (self._compile(n) for n in (node.test, node.body, node.orelse))
+            return lambda bands: np.where(test(bands), body(bands), orelse(bands))
+        if isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS:
+                raise self._error(node, f"Unknown function, expected one of {sorted(FUNCTIONS)}")
+            if node.keywords:
+                raise self._error(node, "Keyword arguments are not supported")
+            fun = FUNCTIONS[node.func.id]
+            args = [self._compile(a) for a in node.args]
+            return lambda bands: fun(*[a(bands) for a in args])
+        raise self._error(node, f"Unsupported syntax '{type(node).__name__}'")
+
+
+class BandMath:
+    """
+    Multi-output band-math program. Every output is computed from the same input bands, and
+    output pixels are set to nodata if any input band they depend on is nodata, if the result is
+    not finite, or if the `mask` expression is false.
+
+    Arguments:
+        expressions: map from output band name to its expression
+        mask: optional expression that selects valid pixels for all outputs
+    """
+
+    def __init__(self, expressions: Mapping[str, str], mask: Optional[str] = None):
+        if not expressions:
+            raise ValueError("At least one output expression is required")
+        self.expressions = {name: BandExpression(e) for name, e in expressions.items()}
+        self.mask = BandExpression(mask) if mask else None
+
+    @property
+    def variables(self) -> Set[str]:
+        """Names of all input bands used by the program."""
+        exprs = list(self.expressions.values()) + ([self.mask] if self.mask else [])
+        return set().union(*(e.variables for e in exprs))
+
+    def evaluate(
+        self, bands: Mapping[str, NDArray[Any]], dtype: Any, nodata: float
+    ) -> NDArray[Any]:
+        """
+        Evaluate all outputs over a block of input bands.
+
+        Arguments:
+            bands: map from band name to a 2D float array, with NaN where the band has no data
+            dtype: output data type
+            nodata: value of output pixels that have no data
+
+        Returns:
+            Array of shape (number of outputs, height, width)
+        """
+        shape = next(iter(bands.values())).shape
+        nodata_mask = {name: np.isnan(b) for name, b in bands.items()}
+        out = np.empty((len(self.expressions), *shape), dtype=dtype)
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            valid = np.ones(shape, dtype=bool)
+            if self.mask is not None:
+                valid &= np.broadcast_to(np.asarray(self.mask(bands), dtype=bool), shape)
+            for i, expression in enumerate(self.expressions.values()):
+                result = np.broadcast_to(np.asarray(expression(bands), dtype=np.float64), shape)
+                invalid = ~valid | ~np.isfinite(result)
+                for name in expression.variables:
+                    invalid |= nodata_mask[name]
+                out[i] = np.where(invalid, nodata, result)
+        return out
+
+
+def default_nodata(dtype: Any) -> float:
+    """NaN for floating point data types, and the largest value for integer data types."""
+    dtype = np.dtype(dtype)
+    if np.issubdtype(dtype, np.floating):
+        return np.nan
+    if np.issubdtype(dtype, np.integer):
+        return float(np.iinfo(dtype).max)
+    raise ValueError(f"Unsupported output data type {dtype}")
+
+
+def read_bands_block(
+    band_refs: Mapping[str, Tuple[str, int]], win: Window, profile: Mapping[str, Any], **vrt_kw: Any
+) -> Dict[str, NDArray[np.float64]]:
+    """
+    Read a window of bands from one or more rasters, resampled to the grid in `profile`.
+    Each file is opened once, and pixels without data are set to NaN.
+
+    Arguments:
+        band_refs: map from band name to raster reference and (zero-based) band index
+        win: window of the reference grid to be read
+        profile: profile with the CRS, transform, width and height of the reference grid
+        **vrt_kw: other options for the WarpedVRT used to resample rasters, e.g., resampling
+    """
+    by_ref: Dict[str, List[Tuple[str, int]]] = {}
+    for name, (ref, idx) in band_refs.items():
+        by_ref.setdefault(ref, []).append((name, idx))
+    grid = {k: profile[k] for k in ("crs", "transform", "width", "height")}
+    bands: Dict[str, NDArray[np.float64]] = {}
+    for ref, names in by_ref.items():
+        with ExitStack() as stack:
+            src = stack.enter_context(open_raster_from_ref(ref))
+            if any(getattr(src, k) != v for k, v in grid.items()):
+                src = stack.enter_context(WarpedVRT(src, **grid, **vrt_kw))
+            data = src.read([idx + 1 for _, idx in names], window=win, masked=True)
+        data = data.astype(np.float64).filled(np.nan)
+        bands.update({name: data[i] for i, (name, _) in enumerate(names)})
+    return bands
+
+
+def write_band_math(
+    band_math: BandMath,
+    band_refs: Mapping[str, Tuple[str, int]],
+    ref_path: str,
+    out_path: str,
+    dtype: Any = "float32",
+    nodata: Optional[float] = None,
+    resampling: Resampling = Resampling.nearest,
+    num_workers: int = 1,
+    block_size: int = 512,
+) -> None:
+    """
+    Evaluate a band-math program and write its outputs as bands of a GeoTIFF in the grid of the
+    reference raster. The raster is processed in blocks by a pool of threads, so only a few blocks
+    are held in memory at any time, and only the bands used by the program are read.
+
+    Arguments:
+        band_math: program to be evaluated
+        band_refs: map from band name to raster reference and (zero-based) band index
+        ref_path: reference raster that defines the output grid
+        out_path: output filepath
+        dtype: output data type
+        nodata: output nodata value (default: see :func:`default_nodata`)
+        resampling: method used to resample inputs that are not in the reference grid
+        num_workers: number of threads used to read and process blocks
+        block_size: size (in pixels) of the blocks processed by each thread
+    """
+    missing = band_math.variables - set(band_refs)
+    if missing:
+        raise ValueError(
+            f"Unknown band(s) {sorted(missing)} in expressions, expected one of {sorted(band_refs)}"
+        )
+    band_refs = {name: band_refs[name] for name in band_math.variables}
+    if not band_refs:
+        raise ValueError("Expressions must refer to at least one band")
+    nodata = default_nodata(dtype) if nodata is None else nodata
+    with open_raster_from_ref(ref_path) as src:
+        profile = src.profile.copy()
+    compression = (
+        FLOAT_COMPRESSION_KWARGS
+        if np.issubdtype(np.dtype(dtype), np.floating)
+        else INT_COMPRESSION_KWARGS
+    )
+    profile.update(
+        {
+            "driver": "GTiff",
+            "count": len(band_math.expressions),
+            "dtype": dtype,
+            "nodata": nodata,
+            "BIGTIFF": "IF_SAFER",
+            **compression,
+        }
+    )
+    for key in ("blockxsize", "blockysize", "photometric"):
+        profile.pop(key, None)
+
+    def process_block(win: Window) -> NDArray[Any]:
+        bands = read_bands_block(band_refs, win, profile, resampling=resampling)
+        return band_math.evaluate(bands, dtype, nodata)
+
+    wins = get_windows(profile["width"], profile["height"], block_size, block_size)
+    with open_raster_from_ref(out_path, "w", **profile) as dst:
+        for win, data in imap_windows(process_block, wins, num_workers):
+            dst.write(data, window=win)
+        dst.descriptions = tuple(band_math.expressions)
+
+
+def band_refs_from_rasters(
+    raster_refs: Sequence[str], raster_bands: Sequence[Mapping[str, int]], variables: Set[str]
+) -> Dict[str, Tuple[str, int]]:
+    """
+    Map the band names used by a program to raster references and band indices.
+
+    Arguments:
+        raster_refs: raster references
+        raster_bands: map from band name to band index, for each raster
+        variables: band names used by the program
+
+    Raises:
+        ValueError: if a band name is not in any raster, or is in more than one raster
+    """
+    band_refs: Dict[str, Tuple[str, int]] = {}
+    for ref, bands in zip(raster_refs, raster_bands):
+        for name in variables.intersection(bands):
+            if name in band_refs:
+                raise ValueError(f"Band '{name}' is ambiguous, as it is in more than one raster")
+            band_refs[name] = (ref, bands[name])
+    missing = variables - set(band_refs)
+    if missing:
+        available = sorted(set().union(*raster_bands))
+        raise ValueError(f"Unknown band(s) {sorted(missing)}, expected one of {available}")
+    return band_refs
@@ -3,13 +3,16 @@
 
 import logging
 import math
-from typing import Any
+from typing import Any, Optional
 
 import numpy as np
 import torch as T
 from numpy.typing import NDArray
+from rasterio.windows import Window
 from torch.nn.functional import avg_pool2d, interpolate
 
+from vibe_lib.raster import get_windows, imap_windows
+
 POSTERIOR_SMOOTHING = 0.001
 
 LOGGER = logging.getLogger(__name__)
@@ -107,6 +110,52 @@ def perform_iteration_expectation_maximization(
     return p_new, mean, var, prior
 
 
+# deterministic pseudo-random initial posterior, which only depends on the pixel position (and not
+# on the tile that contains it), so that overlapping tiles start from the same values
+def initial_posterior(
+    number_classes: int, xmin: int, xmax: int, ymin: int, ymax: int, seed: int = 0
+) -> T.Tensor:
+    c = T.arange(number_classes, dtype=T.float64).view(-1, 1, 1)
+    x = T.arange(xmin, xmax, dtype=T.float64).view(1, -1, 1)
+    y = T.arange(ymin, ymax, dtype=T.float64).view(1, 1, -1)
+    noise = T.sin(x * 12.9898 + y * 78.233 + c * 37.719 + seed * 4.581) * 43758.5453
+    p = (noise - T.floor(noise)).float() + 1e-6
+    return p / p.sum(0)
+
+
+def get_halo(
+    half_side_length: int, stride: int, warmup_steps: int, warmup_half_side_length: int
+) -> int:
+    """Default halo: the largest pooling radius, rounded up to a multiple of the stride."""
+    radius = max(half_side_length, warmup_half_side_length if warmup_steps > 0 else 0)
+    return math.ceil(radius / stride) * stride
+
+
+# run EM algorithm for Gaussian mixture in a single tile
+def cluster_tile(
+    data: T.Tensor,
+    p: T.Tensor,
+    half_side_length: int,
+    number_iterations: int,
+    stride: int,
+    warmup_steps: int,
+    warmup_half_side_length: int,
+    tolerance: float,
+) -> T.Tensor:
+    for i in range(number_iterations):
+        warmup = i < warmup_steps
+        p_new, _, _, _ = perform_iteration_expectation_maximization(
+            data, p, warmup_half_side_length if warmup else half_side_length, stride
+        )
+        # only check for convergence after warmup, as the window size changes afterwards
+        converged = tolerance > 0 and not warmup and (p_new - p).abs().max().item() < tolerance
+        p = p_new
+        if converged:
+            LOGGER.debug(f"Converged after {i + 1} iteration(s)")
+            break
+    return p
+
+
 # run EM algorithm for Gaussian mixture
 def run_clustering(
     image: NDArray[Any],
@@ -117,45 +166,71 @@ def run_clustering(
     warmup_steps: int,
     warmup_half_side_length: int,
     window: int,
+    halo: Optional[int] = None,
+    tolerance: float = 0.0,
+    num_workers: int = 1,
+    seed: int = 0,
 ) -> NDArray[Any]:
+    """
+    Cluster the image in `window`-sized tiles, which are processed concurrently. Each tile is
+    padded by `halo` pixels of its neighbors (by default, the pooling radius, see `get_halo`), so
+    that there are no seams at tile edges. Iterations of a tile stop early once the largest
+    change in its posteriors is below `tolerance` (0 to always run `number_iterations`).
+
+    Arguments:
+        image: array of shape (channels, height, width)
+        number_classes: number of clusters
+        half_side_length: half side of the windows where the local mixture is computed
+        number_iterations: maximum number of EM iterations
+        stride: stride of the local averages, which are then interpolated
+        warmup_steps: number of initial iterations that use `warmup_half_side_length`
+        warmup_half_side_length: half side of the windows during warmup
+        window: size of the tiles
+        halo: number of pixels each tile is padded by
+        tolerance: posterior change below which iterations stop
+        num_workers: number of tiles processed concurrently
+        seed: seed of the initial posteriors
+
+    Returns:
+        Array of shape (height, width) with the cluster of each pixel
+    """
     _, x_size, y_size = image.shape
     result = np.zeros(shape=(x_size, y_size), dtype="uint8")
-
-    for row in range(math.ceil(x_size / window)):
-        for col in range(math.ceil(y_size / window)):
-            xmin = row * window
-            xmax = (row + 1) * window
-            if xmax > x_size:
-                xmax = x_size
-            ymin = col * window
-            ymax = (col + 1) * window
-            if ymax > y_size:
-                ymax = y_size
-
-            partial_image = image[:, xmin:xmax, ymin:ymax]
-
-            logging.info(
-                f"Computing clusters for row: {row}, col: {col}, [{xmin}, {xmax}, {ymin}, {ymax}]"
+    if halo is None:
+        halo = get_halo(half_side_length, stride, warmup_steps, warmup_half_side_length)
+
+    def process_tile(win: Window) -> NDArray[Any]:
+        (xmin, xmax), (ymin, ymax) = win.toranges()
+        # read the tile with its halo, clipped to the image
+        pxmin, pxmax = max(xmin - halo, 0), min(xmax + halo, x_size)
+        pymin, pymax = max(ymin - halo, 0), min(ymax + halo, y_size)
+        LOGGER.info(f"Computing clusters for [{xmin}, {xmax}, {ymin}, {ymax}]")
+        with T.inference_mode():
+            data = T.as_tensor(image[:, pxmin:pxmax, pymin:pymax])
+            p = initial_posterior(number_classes, pxmin, pxmax, pymin, pymax, seed)
+            p = cluster_tile(
+                data,
+                p,
+                half_side_length,
+                number_iterations,
+                stride,
+                warmup_steps,
+                warmup_half_side_length,
+                tolerance,
             )
-
-            with T.inference_mode():
-                # convert image to Torch object
-                data = T.as_tensor(partial_image)
-
-                # randomly initialize posterior matrix
-                p = T.rand((number_classes,) + partial_image.shape[1:])
-                p /= p.sum(0)
-
-                # EM
-                for i in range(number_iterations):
-                    p.mean().item()  # trigger synchronization
-                    p, _, _, _ = perform_iteration_expectation_maximization(
-                        data,
-                        p,
-                        warmup_half_side_length if i < warmup_steps else half_side_length,
-                        stride,
-                    )
-
-                # return np.argmax(p.numpy(), axis=0)
-                result[xmin:xmax, ymin:ymax] = np.argmax(p.numpy(), axis=0)
+            p = p[:, xmin - pxmin : xmax - pxmin, ymin - pymin : ymax - pymin]
+            return np.argmax(p.numpy(), axis=0)
+
+    wins = get_windows(y_size, x_size, window, window)
+    num_workers = max(min(num_workers, len(wins)), 1)
+    # run each tile with a share of the intra-op threads of torch, instead of one at a time with
+    # all of them, as tiles parallelize better than the (small) ops of a single tile
+    num_threads = T.get_num_threads()
+    T.set_num_threads(max(num_threads // num_workers, 1))
+    try:
+        for win, tile in imap_windows(process_tile, wins, num_workers):
+            (xmin, xmax), (ymin, ymax) = win.toranges()
+            result[xmin:xmax, ymin:ymax] = tile
+    finally:
+        T.set_num_threads(num_threads)
     return result
@@ -8,33 +8,41 @@ Planetary computer model for TerraVibes. Helps query and download items and asse
 import io
 import logging
 import os
+import random
 import re
 import time
 import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from itertools import product
 from typing import Any, Dict, List, Optional, Tuple
-from urllib.parse import urljoin
+from urllib.parse import urljoin, urlparse
 
 import planetary_computer as pc
 import requests
 from azure.storage.blob import BlobProperties, ContainerClient
-from planetary_computer.sas import get_token
+from planetary_computer.sas import BLOB_STORAGE_DOMAIN, TOKEN_CACHE, get_token
+from planetary_computer.settings import Settings
+from planetary_computer.utils import parse_blob_url
 from pystac.asset import Asset
 from pystac.item import Item
 from pystac_client import Client
-from requests.exceptions import RequestException
+from rasterio.errors import RasterioIOError
+from requests.exceptions import HTTPError, RequestException
 from shapely import geometry as shpg
 from shapely.geometry.base import BaseGeometry
 
 from vibe_core.data import S2ProcessingLevel, Sentinel1Product, Sentinel2Product
 from vibe_core.data.core_types import BBox
 from vibe_core.file_downloader import download_file
+from vibe_lib.raster import read_window_to_cog
 
 CATALOG_URL = "https://planetarycomputer.microsoft.com/api/stac/v1"
 DATE_FORMAT = "%Y-%m-%d"
 RETRY_WAIT = 10
+MAX_RETRY_WAIT = 120
 MAX_RETRIES = 5
+MAX_CONCURRENT_DOWNLOADS = 4
 
 # https://sentinel.esa.int/web/sentinel/user-guides/sentinel-1-sar/naming-conventions
 MODE_SLICE = slice(4, 6)
@@ -45,10 +53,34 @@ DAY_SLICE = slice(23, 25)
 LOGGER = logging.getLogger(__name__)
 
 
+def invalidate_sas_token(href: str):
+    """
+    Drop the cached planetary computer token of the container of the href (e.g., after it was
+    revoked), so that the next call to `pc.sign` gets a new one.
+    """
+    parsed = urlparse(href.rstrip("/"))
+    if not parsed.netloc.endswith(BLOB_STORAGE_DOMAIN):
+        return
+    account, container = parse_blob_url(parsed)
+    TOKEN_CACHE.pop(f"{Settings.get().sas_url}/{account}/{container}", None)
+
+
+def retry_wait(retry: int) -> float:
+    """
+    Time to wait before the given retry, using exponential backoff with full jitter
+    so that concurrent downloads do not retry in lockstep.
+    """
+    return random.uniform(0, min(MAX_RETRY_WAIT, RETRY_WAIT * 2**retry))
+
+
 class PlanetaryComputerCollection:
     collection: str = ""
     filename_regex: str = r".*/(.*\.\w{3,4})(?:\?|$)"
     asset_keys: List[str] = ["image"]
+    max_concurrent_downloads: int = MAX_CONCURRENT_DOWNLOADS
+    # Alignment (in asset CRS units) of windows read from the assets of an item.
+    # Should be a multiple of the resolution of all assets, so that windows match across assets.
+    window_alignment: Optional[float] = None
 
     def __init__(self):
         self.logger = logging.getLogger(self.__class__.__name__)
@@ -87,10 +119,14 @@ class PlanetaryComputerCollection:
             query=query,
         )
 
-    def download_asset(self, asset: Asset, out_path: str) -> str:
+    def download_asset(
+        self, asset: Asset, out_path: str, geometry: Optional[BaseGeometry] = None
+    ) -> str:
         """
         Download asset from the planetary computer and save it into the desired path.
         If the output path is a directory, try to infer the filename from the asset href.
+        If a geometry (in EPSG:4326) is given, only the part of the asset (which must be a COG)
+        that covers the geometry is read through HTTP range requests and saved as a local COG.
         """
         if os.path.isdir(out_path):
             # Resolve name from href
@@ -102,29 +138,43 @@ class PlanetaryComputerCollection:
         for retry in range(MAX_RETRIES):
             href = pc.sign(asset.href)
             try:
-                download_file(href, out_path)
+                if geometry is None:
+                    download_file(href, out_path)
+                else:
+                    read_window_to_cog(href, geometry, out_path, alignment=self.window_alignment)
                 return out_path
-            except RequestException as e:
+            except (RequestException, RasterioIOError) as e:
+                if isinstance(e, HTTPError) and getattr(e.response, "status_code", None) == 403:
+                    # The token might have been revoked, get a new one on the next attempt
+                    invalidate_sas_token(asset.href)
+                wait = retry_wait(retry)
                 LOGGER.warning(
-                    f"Exception {e} downloading from {href}."
-                    f" Retrying after {RETRY_WAIT}s ({retry+1}/{MAX_RETRIES})."
+                    f"Exception {e} downloading from {asset.href}."
+                    f" Retrying after {wait:.1f}s ({retry + 1}/{MAX_RETRIES})."
                 )
-                time.sleep(RETRY_WAIT)
+                time.sleep(wait)
         raise RuntimeError(f"Failed asset {asset.href} after {MAX_RETRIES} retries.")
 
-    def download_item(self, item: Item, out_dir: str):
+    def download_item(self, item: Item, out_dir: str, geometry: Optional[BaseGeometry] = None):
         """
         Download assets from planetary computer.
+        Up to `max_concurrent_downloads` assets are downloaded at the same time.
+        If a geometry is given, only the window of each asset that covers it is downloaded.
         """
         os.makedirs(out_dir)
-        asset_paths: List[str] = []
-        for k in self.asset_keys:
-            asset_paths.append(self.download_asset(item.assets[k], out_dir))
+        assets = [item.assets[k] for k in self.asset_keys]
+        num_workers = max(1, min(self.max_concurrent_downloads, len(assets)))
+        with ThreadPoolExecutor(max_workers=num_workers) as executor:
+            asset_paths: List[str] = list(
+                executor.map(lambda asset: self.download_asset(asset, out_dir, geometry), assets)
+            )
         return asset_paths
 
 
 class Sentinel2Collection(PlanetaryComputerCollection):
     collection = "sentinel-2-l2a"
+    # Bands are at 10, 20, and 60m resolution
+    window_alignment = 60
     filename_regex = r".*/(.*\.\w{3,4})(?:\?|$)"
     asset_keys: List[str] = [
         "B01",
@@ -1,23 +1,29 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT License.
 
+import itertools
 import json
 import logging
+import math
 import mimetypes
 import os
 import shutil
 import tempfile
+from collections import deque
 from concurrent.futures import ThreadPoolExecutor, TimeoutError, as_completed
 from typing import (
     TYPE_CHECKING,
     Any,
     Callable,
     Dict,
+    Iterable,
+    Iterator,
     List,
     NamedTuple,
     Optional,
     Sequence,
     Tuple,
+    TypeVar,
     Union,
     cast,
 )
@@ -36,13 +42,15 @@ from rasterio.crs import CRS
 from rasterio.enums import Resampling
 from rasterio.io import DatasetWriter
 from rasterio.vrt import WarpedVRT
-from rasterio.warp import reproject
-from rasterio.windows import Window
+from rasterio.warp import reproject, transform_bounds
+from rasterio.windows import Window, from_bounds
 from rio_cogeo.cogeo import cog_translate, cog_validate
 from rio_cogeo.profiles import cog_profiles
+from shapely.geometry.base import BaseGeometry
 
 from vibe_core.data import AssetVibe, CategoricalRaster, Raster, gen_guid
 from vibe_core.data.rasters import ChunkLimits
+from vibe_lib.raster_cache import reprojection_cache
 
 if TYPE_CHECKING:
     MaskedArrayType = np.ma.MaskedArray[Any, np.dtype[Any]]
@@ -63,6 +71,8 @@ INT_COMPRESSION_KWARGS: Dict[str, Any] = {**COMPRESSION_KWARGS, "predictor": 2}
 
 DEFAULT_NODATA = 100
 
+T = TypeVar("T")
+
 
 class RGBA(NamedTuple):
     """
@@ -196,22 +206,44 @@ def load_raster_match(
     bands: Optional[Sequence[Union[int, str]]] = None,
     use_geometry: bool = False,
     resampling: Resampling = Resampling.nearest,
+    use_cache: Optional[bool] = None,
 ) -> xr.DataArray:
     """
     Load a resampled raster that matches the `match_raster`'s CRS, shape, and transform.
+    If `use_cache` is True, the resampled raster is loaded in memory and memoized (see
+    `vibe_lib.raster_cache`), so aligning the same raster to the same grid again in this op (or,
+    if the disk tier of the cache is enabled, in another op on the same machine) does not
+    reproject it again. By default, the cache is only used if its disk tier is enabled.
     """
     match_file = match_raster.raster_asset.url
     with rasterio.open(match_file) as ref:
         meta = ref.meta
-    return load_raster(
-        raster,
-        bands,
-        use_geometry=use_geometry,
-        crs=meta["crs"],
-        transform=meta["transform"],
+
+    def load() -> xr.DataArray:
+        return load_raster(
+            raster,
+            bands,
+            use_geometry=use_geometry,
+            crs=meta["crs"],
+            transform=meta["transform"],
+            shape=(meta["height"], meta["width"]),
+            resampling=resampling,
+        )
+
+    if use_cache is None:
+        use_cache = reprojection_cache.persistent
+    if not use_cache:
+        return load()
+    key = reprojection_cache.key(
+        raster.raster_asset.url,
+        bands=[raster.bands[b] if isinstance(b, str) else b for b in bands or []],
+        geometry=raster.geometry if use_geometry else None,
+        crs=meta["crs"].to_wkt(),
+        transform=tuple(meta["transform"]),
         shape=(meta["height"], meta["width"]),
-        resampling=resampling,
+        resampling=resampling.name,
     )
+    return reprojection_cache.get_or_compute(key, load)
 
 
 def get_profile_from_ref(ref_filepath: str, **kwargs: int) -> Dict[str, Any]:
@@ -561,6 +593,109 @@ def include_raster_overviews(src_path: str):
         shutil.move(tmpfile_name, src_path)
 
 
+REMOTE_READ_GDAL_CONFIG: Dict[str, Any] = {
+    # Avoid listing the remote directory when opening the file
+    "GDAL_DISABLE_READDIR_ON_OPEN": "EMPTY_DIR",
+    "GDAL_HTTP_MERGE_CONSECUTIVE_RANGES": "YES",
+    "GDAL_HTTP_MULTIPLEX": "YES",
+    "GDAL_HTTP_MAX_RETRY": "5",
+    "GDAL_HTTP_RETRY_DELAY": "1",
+    "VSI_CACHE": "TRUE",
+}
+
+
+def get_geometry_window(
+    src: rasterio.DatasetReader,
+    geometry: BaseGeometry,
+    geometry_crs: Any = "epsg:4326",
+    alignment: Optional[float] = None,
+) -> Window:
+    """
+    Compute the pixel window of the raster that covers the bounds of the geometry.
+
+    Arguments:
+        src: raster dataset
+        geometry: geometry of interest
+        geometry_crs: CRS of the geometry (default: EPSG:4326)
+        alignment: if given, the window is expanded so its bounds are multiples of this value
+            (in raster CRS units) away from the raster origin. Rasters with different resolutions
+            that share an origin, such as bands of the same product, then get the same bounds.
+
+    Raises:
+        rasterio.errors.WindowError: if the geometry does not intersect the raster
+    """
+    bounds = transform_bounds(geometry_crs, src.crs, *geometry.bounds)
+    window = from_bounds(*bounds, transform=src.transform)
+    step_x = step_y = 1.0
+    if alignment is not None:
+        step_x = alignment / abs(src.transform.a)
+        step_y = alignment / abs(src.transform.e)
+    col_start = math.floor(window.col_off / step_x) * step_x
+    row_start = math.floor(window.row_off / step_y) * step_y
+    col_end = math.ceil((window.col_off + window.width) / step_x) * step_x
+    row_end = math.ceil((window.row_off + window.height) / step_y) * step_y
+    window = Window.from_slices(
+        rows=(int(math.floor(row_start)), int(math.ceil(row_end))),
+        cols=(int(math.floor(col_start)), int(math.ceil(col_end))),
+    )
+    return window.intersection(Window(0, 0, src.width, src.height))
+
+
+def read_window_to_cog(
+    raster_url: str,
+    geometry: BaseGeometry,
+    out_path: str,
+    geometry_crs: Any = "epsg:4326",
+    alignment: Optional[float] = None,
+) -> str:
+    """
+    Read the part of a (possibly remote) COG that covers the geometry and save it as a local COG.
+
+    For remote files, GDAL only fetches the header and the internal blocks that intersect the
+    window through HTTP range requests, so reading a small area of a large tile transfers a tiny
+    fraction of the file.
+
+    Arguments:
+        raster_url: path or URL of the raster
+        geometry: geometry of interest
+        out_path: path of the output COG
+        geometry_crs: CRS of the geometry (default: EPSG:4326)
+        alignment: window alignment in raster CRS units, see `get_geometry_window`
+
+    Returns:
+        The output path
+    """
+    with rasterio.Env(**REMOTE_READ_GDAL_CONFIG):
+        with rasterio.open(raster_url) as src:
+            window = get_geometry_window(src, geometry, geometry_crs, alignment)
+            profile = src.profile.copy()
+            profile.update(
+                {
+                    "driver": "GTiff",
+                    "width": int(window.width),
+                    "height": int(window.height),
+                    "transform": src.window_transform(window),
+                    "BIGTIFF": "IF_SAFER",
+                    **COMPRESSION_KWARGS,
+                }
+            )
+            # Let GDAL pick block sizes compatible with the (small) window
+            for key in ("blockxsize", "blockysize"):
+                profile.pop(key, None)
+            with rasterio.open(out_path, "w", **profile) as dst:
+                dst.write(src.read(window=window))
+                for i, description in enumerate(src.descriptions, start=1):
+                    if description:
+                        dst.set_band_description(i, description)
+                try:
+                    dst.write_colormap(1, src.colormap(1))
+                except ValueError:
+                    # The raster has no colormap
+                    pass
+    include_raster_overviews(out_path)
+    return out_path
+
+
 def get_windows(width: int, height: int, win_width: int, win_height: int):
     """
     Returns non-overlapping windows that cover the raster
@@ -574,6 +709,45 @@ def get_windows(width: int, height: int, win_width: int, win_height: int):
     return wins
 
 
+def imap_windows(
+    func: Callable[[Window], T],
+    wins: Iterable[Window],
+    num_workers: int,
+    max_pending: Optional[int] = None,
+) -> Iterator[Tuple[Window, T]]:
+    """
+    Apply `func` to each window in a thread pool and yield the results in window order.
+    At most `max_pending` windows (default: twice the number of workers) are processed or waiting
+    to be consumed at any time, so memory usage is bounded by a few blocks regardless of the size
+    of the raster. The consumer (e.g., the thread writing to a raster file) runs concurrently with
+    the workers.
+
+    Arguments:
+        func: function that processes a single window
+        wins: windows to be processed
+        num_workers: number of threads used to process windows
+        max_pending: maximum number of windows in flight
+    """
+    if max_pending is None:
+        max_pending = 2 * num_workers
+    max_pending = max(max_pending, 1)
+    wins_iter = iter(wins)
+    with ThreadPoolExecutor(max_workers=num_workers) as pool:
+        pending = deque(
+            (win, pool.submit(func, win)) for win in itertools.islice(wins_iter, max_pending)
+        )
+        try:
+            while pending:
+                win, future = pending.popleft()
+                result = future.result()
+                for next_win in itertools.islice(wins_iter, 1):
+                    pending.append((next_win, pool.submit(func, next_win)))
+                yield win, result
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+
 def parallel_stack_bands(
     raster_refs: Sequence[str],
     out_path: str,
@@ -0,0 +1,260 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""
+Memoization of rasters that were reprojected and aligned to a reference grid.
+
+Aligned rasters are keyed by a hash of the source content, the target grid and the resampling
+method, and are kept in two tiers: an in-memory LRU, shared by the calls of an op, and an optional
+directory of GeoTIFFs, shared by ops that run on the same machine (and by later runs). The disk
+tier is disabled unless the `VIBE_REPROJECTION_CACHE_DIR` environment variable is set to the
+directory to use, and its size is bounded by `VIBE_REPROJECTION_CACHE_MAX_BYTES`.
+
+Ops run in a new process each time, so the in-memory tier alone rarely helps, and
+`vibe_lib.raster.load_raster_match` only uses the cache by default when the disk tier is enabled.
+The cache statistics are logged after every lookup, as processes running ops do not run exit
+handlers.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import unquote, urlsplit, urlunsplit
+
+import rioxarray as rio
+import xarray as xr
+
+LOGGER = logging.getLogger(__name__)
+
+CACHE_DIR_ENV = "VIBE_REPROJECTION_CACHE_DIR"
+CACHE_MAX_BYTES_ENV = "VIBE_REPROJECTION_CACHE_MAX_BYTES"
+DEFAULT_DISK_MAX_BYTES = 10 * 1024**3
+DEFAULT_MEMORY_MAX_BYTES = 512 * 1024**2
+# Tag of cached GeoTIFFs with the time it took to compute them
+REPROJECTION_TIME_TAG = "VIBE_REPROJECTION_S"
+HASH_CHUNK_BYTES = 8 * 1024**2
+
+
+@dataclass
+class ReprojectionCacheStats:
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    reprojection_s: float = 0.0
+    """Time spent reprojecting rasters that were not in the cache."""
+    saved_s: float = 0.0
+    """Time it took to reproject the rasters that were found in the cache."""
+
+    @property
+    def lookups(self) -> int:
+        return self.memory_hits + self.disk_hits + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        return (self.memory_hits + self.disk_hits) / self.lookups if self.lookups else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.lookups} lookup(s), hit rate {self.hit_rate:.0%} "
+            f"({self.memory_hits} in memory, {self.disk_hits} on disk), "
+            f"{self.reprojection_s:.2f}s reprojecting, {self.saved_s:.2f}s saved"
+        )
+
+
+class ReprojectionCache:
+    """
+    Two-tier cache of aligned rasters.
+
+    Cached arrays are fully loaded in memory, and a copy is returned on each hit, so callers may
+    modify them.
+
+    Arguments:
+        cache_dir: directory of the disk tier, or None to only cache in memory
+        max_memory_bytes: maximum size of the arrays kept in memory
+        max_disk_bytes: maximum size of the disk tier, beyond which the least recently used
+            files are removed
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str],
+        max_memory_bytes: int = DEFAULT_MEMORY_MAX_BYTES,
+        max_disk_bytes: int = DEFAULT_DISK_MAX_BYTES,
+    ):
+        self.cache_dir = cache_dir
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.stats = ReprojectionCacheStats()
+        self.memory_bytes = 0
+        self._memory: "OrderedDict[str, Tuple[xr.DataArray, float]]" = OrderedDict()
+        self._digests: Dict[Tuple[str, int, int], str] = {}
+        self._lock = threading.Lock()
+
+    def content_digest(self, ref: str) -> str:
+        """
+        Hash of the contents of a local file, memoized by path, size and modification time.
+        Remote files are identified by their URL, without the query string (e.g., SAS tokens).
+        """
+        url = urlsplit(ref)
+        if url.scheme == "file":
+            ref = unquote(url.path)
+        if not os.path.exists(ref):
+            return urlunsplit(url._replace(query="", fragment=""))
+        stat = os.stat(ref)
+        file_id = (os.path.abspath(ref), stat.st_size, stat.st_mtime_ns)
+        digest = self._digests.get(file_id)
+        if digest is None:
+            sha = hashlib.sha256()
+            with open(ref, "rb") as f:
+                for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b""):
+                    sha.update(chunk)
+            digest = self._digests[file_id] = sha.hexdigest()
+        return digest
+
+    def key(self, ref: str, **params: Any) -> str:
+        """Cache key of the source raster `ref` aligned with the given parameters."""
+        encoded = json.dumps(
+            {"source": self.content_digest(ref), **params}, sort_keys=True, default=str
+        )
+        return hashlib.sha256(encoded.encode()).hexdigest()
+
+    @property
+    def persistent(self) -> bool:
+        """Whether aligned rasters are also cached on disk, and shared with other processes."""
+        return self.cache_dir is not None
+
+    def _path(self, key: str) -> str:
+        assert self.cache_dir is not None
+        return os.path.join(self.cache_dir, f"{key}.tif")
+
+    def _get_memory(self, key: str) -> Optional[Tuple[xr.DataArray, float]]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+            return entry
+
+    def _put_memory(self, key: str, array: xr.DataArray, elapsed_s: float):
+        with self._lock:
+            if key in self._memory or array.nbytes > self.max_memory_bytes:
+                return
+            self._memory[key] = (array, elapsed_s)
+            self.memory_bytes += array.nbytes
+            while self.memory_bytes > self.max_memory_bytes:
+                _, (evicted, _) = self._memory.popitem(last=False)
+                self.memory_bytes -= evicted.nbytes
+
+    def _get_disk(self, key: str) -> Optional[Tuple[xr.DataArray, float]]:
+        if self.cache_dir is None or not os.path.exists(self._path(key)):
+            return None
+        path = self._path(key)
+        try:
+            with rio.open_rasterio(path, masked=True) as data:
+                array = data.load()
+            # Keep track of recently used files for eviction
+            os.utime(path)
+        except Exception:
+            LOGGER.warning(f"Failed to read cached raster {path}, ignoring it", exc_info=True)
+            return None
+        return array, float(array.attrs.pop(REPROJECTION_TIME_TAG, 0.0))
+
+    def _put_disk(self, key: str, array: xr.DataArray, elapsed_s: float):
+        if self.cache_dir is None:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=self.cache_dir)
+            os.close(fd)
+        except Exception:
+            LOGGER.warning(f"Failed to cache raster in {self.cache_dir}", exc_info=True)
+            return
+        try:
+            array.rio.to_raster(
+                tmp_path, driver="GTiff", tags={REPROJECTION_TIME_TAG: f"{elapsed_s:.6f}"}
+            )
+            # Atomic, so concurrent ops never read partially written files
+            os.replace(tmp_path, self._path(key))
+            self._evict_disk()
+        except Exception:
+            LOGGER.warning(f"Failed to cache raster in {self.cache_dir}", exc_info=True)
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                # Already moved into the cache
+                pass
+
+    def _evict_disk(self):
+        assert self.cache_dir is not None
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(".tif"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except FileNotFoundError:
+                # Removed by another process
+                pass
+
+    def get_or_compute(self, key: str, compute: Callable[[], xr.DataArray]) -> xr.DataArray:
+        """Return the cached array for `key`, computing and caching it if it is not cached."""
+        entry = self._get_memory(key)
+        if entry is not None:
+            array, elapsed_s = entry
+            with self._lock:
+                self.stats.memory_hits += 1
+                self.stats.saved_s += elapsed_s
+            self._log_lookup(key, "found in memory")
+            return array.copy()
+        entry = self._get_disk(key)
+        if entry is not None:
+            array, elapsed_s = entry
+            with self._lock:
+                self.stats.disk_hits += 1
+                self.stats.saved_s += elapsed_s
+            self._put_memory(key, array, elapsed_s)
+            self._log_lookup(key, "found on disk")
+            return array.copy()
+        start = time.monotonic()
+        array = compute().load()
+        elapsed_s = time.monotonic() - start
+        with self._lock:
+            self.stats.misses += 1
+            self.stats.reprojection_s += elapsed_s
+        self._put_disk(key, array, elapsed_s)
+        self._put_memory(key, array, elapsed_s)
+        self._log_lookup(key, f"computed in {elapsed_s:.2f}s")
+        return array.copy()
+
+    def _log_lookup(self, key: str, outcome: str):
+        LOGGER.info(
+            f"Aligned raster {key[:12]} {outcome}. Reprojection cache: {self.stats.summary()}"
+        )
+
+    def clear(self):
+        """Clear the in-memory tier and the statistics. The disk tier is kept."""
+        with self._lock:
+            self._memory.clear()
+            self.memory_bytes = 0
+            self.stats = ReprojectionCacheStats()
+
+
+def _cache_from_env() -> ReprojectionCache:
+    cache_dir = os.environ.get(CACHE_DIR_ENV) or None
+    max_disk_bytes = int(os.environ.get(CACHE_MAX_BYTES_ENV, DEFAULT_DISK_MAX_BYTES))
+    return ReprojectionCache(cache_dir, max_disk_bytes=max_disk_bytes)
+
+
+reprojection_cache = _cache_from_env()
@@ -0,0 +1,122 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""
+Spatial joins between collections of geometries, backed by a shapely STRtree.
+
+Geometries are parsed once, and predicates are evaluated in bulk over the candidate pairs found in
+the tree, instead of over every pair of items. Joins return index pairs, sorted by the index of the
+query geometry and then by the index of the tree geometry, i.e., in the order a nested loop over
+both collections would find them.
+"""
+
+from typing import Any, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import shapely
+from numpy.typing import NDArray
+from shapely import geometry as shpg
+from shapely.geometry.base import BaseGeometry
+from shapely.strtree import STRtree
+
+from vibe_core.data import DataVibe
+
+GeometryLike = Union[BaseGeometry, Mapping[str, Any], DataVibe]
+IndexPairs = Tuple[NDArray[np.intp], NDArray[np.intp]]
+
+
+def parse_geometries(items: Sequence[GeometryLike]) -> NDArray[np.object_]:
+    """
+    Parse geometries of items, which may be shapely geometries, GeoJSON-like mappings or
+    DataVibe objects, into an array of shapely geometries.
+    """
+    geoms = np.empty(len(items), dtype=object)
+    for i, item in enumerate(items):
+        if isinstance(item, DataVibe):
+            geoms[i] = shpg.shape(item.geometry)
+        elif isinstance(item, BaseGeometry):
+            geoms[i] = item
+        else:
+            geoms[i] = shpg.shape(item)
+    return geoms
+
+
+def _sorted_pairs(pairs: NDArray[np.intp]) -> IndexPairs:
+    order = np.lexsort((pairs[1], pairs[0]))
+    return pairs[0][order], pairs[1][order]
+
+
+class SpatialIndex:
+    """
+    STRtree over a collection of geometries.
+
+    Arguments:
+        items: geometries to be indexed (see :func:`parse_geometries`)
+    """
+
+    def __init__(self, items: Sequence[GeometryLike]):
+        self.geometries = parse_geometries(items)
+        self.tree = STRtree(self.geometries)
+
+    def __len__(self) -> int:
+        return len(self.geometries)
+
+    def query(self, items: Sequence[GeometryLike], predicate: str) -> IndexPairs:
+        """
+        Return pairs (query index, tree index) such that `predicate(query, tree geometry)` holds,
+        for any binary predicate supported by shapely (e.g., intersects, contains, within).
+        """
+        queries = parse_geometries(items)
+        if not len(queries) or not len(self):
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+        return _sorted_pairs(self.tree.query(queries, predicate=predicate))
+
+    def intersects(self, items: Sequence[GeometryLike]) -> IndexPairs:
+        """Return pairs (query index, tree index) of geometries that intersect."""
+        return self.query(items, "intersects")
+
+    def contains(self, items: Sequence[GeometryLike]) -> IndexPairs:
+        """Return pairs (query index, tree index) where the query contains the tree geometry."""
+        return self.query(items, "contains")
+
+    def nearest(
+        self, items: Sequence[GeometryLike], max_distance: Optional[float] = None
+    ) -> IndexPairs:
+        """
+        Return pairs (query index, tree index) of each query and its nearest tree geometries
+        (all of them, in case of ties). Queries farther than `max_distance` from every tree
+        geometry are left out.
+        """
+        queries = parse_geometries(items)
+        if not len(queries) or not len(self):
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+        pairs = self.tree.query_nearest(queries, max_distance=max_distance, all_matches=True)
+        return _sorted_pairs(pairs)
+
+
+def intersection_ratios(
+    geoms1: NDArray[np.object_], geoms2: NDArray[np.object_]
+) -> Tuple[NDArray[np.float64], NDArray[np.float64]]:
+    """
+    Vectorized normalized intersection areas of pairs of geometries, relative to the area of each
+    geometry in the pair (see `vibe_lib.geometry.norm_intersection`).
+    """
+    area = shapely.area(shapely.intersection(geoms1, geoms2))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return area / shapely.area(geoms1), area / shapely.area(geoms2)
+
+
+def approx_equal_pairs(
+    items1: Sequence[GeometryLike], items2: Sequence[GeometryLike], threshold: float
+) -> IndexPairs:
+    """
+    Return index pairs of geometries that are approximately equal, i.e., that cover more than
+    `threshold` of each other's area (see `vibe_lib.geometry.is_approx_equal`).
+    Only pairs that intersect are considered, so `threshold` must not be negative.
+    """
+    geoms1 = parse_geometries(items1)
+    index = SpatialIndex(items2)
+    idx1, idx2 = index.intersects(list(geoms1))
+    ratio1, ratio2 = intersection_ratios(geoms1[idx1], index.geometries[idx2])
+    mask = (ratio1 > threshold) & (ratio2 > threshold)
+    return idx1[mask], idx2[mask]
@@ -0,0 +1,61 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import StandardScaler
+
+from vibe_notebook.deepmc.preprocess import Preprocess
+
+PREDICT = "temperature"
+CHUNK_SIZE = 64
+TS_LOOKBACK = 8
+TS_LOOKAHEAD = 6
+NUM_ROWS = 100
+
+
+def make_data(relevant: bool) -> pd.DataFrame:
+    rng = np.random.default_rng(42)
+    index = pd.date_range("2023-01-01", periods=NUM_ROWS, freq="h")
+    df = pd.DataFrame(
+        {PREDICT: rng.normal(size=NUM_ROWS), "humidity": rng.normal(size=NUM_ROWS)}, index=index
+    )
+    if relevant:
+        df[f"{PREDICT}_forecast"] = df[PREDICT] + rng.normal(scale=0.1, size=NUM_ROWS)
+    return df
+
+
+@pytest.mark.parametrize("is_training", [True, False])
+@pytest.mark.parametrize("relevant", [True, False])
+def test_wavelet_windows_match_per_chunk_conversion(is_training: bool, relevant: bool):
+    preprocess = Preprocess(
+        StandardScaler(),
+        StandardScaler(),
+        is_training=is_training,
+        ts_lookahead=TS_LOOKAHEAD,
+        ts_lookback=TS_LOOKBACK,
+        chunk_size=CHUNK_SIZE,
+        level=2,
+        relevant=relevant,
+    )
+    df = make_data(relevant)
+    x, y, x_dates, y_dates = preprocess.wavelet_windows(df, PREDICT, first_row=1)
+
+    starts = range(1, NUM_ROWS - CHUNK_SIZE + 1)
+    assert len(x) == preprocess.level + 1
+    assert all(len(level) == len(starts) for level in x)
+    assert len(x_dates) == len(starts)
+    for w, start in enumerate(starts):
+        chunk_x, chunk_y, chunk_x_dates, chunk_y_dates = preprocess.convert_df_wavelet_input(
+            df.iloc[start : start + CHUNK_SIZE], PREDICT
+        )
+        for level, chunk_level in zip(x, chunk_x):
+            np.testing.assert_allclose(level[w], chunk_level[0])
+        np.testing.assert_array_equal(x_dates[w], chunk_x_dates[0][0])
+        if is_training:
+            assert y is not None and y_dates is not None
+            np.testing.assert_array_equal(y[w], chunk_y[0])
+            np.testing.assert_array_equal(y_dates[w], chunk_y_dates[0])
+    if not is_training:
+        assert y is None and y_dates is None
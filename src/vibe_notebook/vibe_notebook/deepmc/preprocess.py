@@ -8,9 +8,13 @@ from typing import Any, List, Optional, Tuple
 import numpy as np
 import pandas as pd
 import pywt
+from numpy.lib.stride_tricks import sliding_window_view
 from numpy.typing import NDArray
 from sklearn.preprocessing import StandardScaler
 
+# Number of chunks whose wavelet decompositions are computed at once
+WAVELET_BATCH_SIZE = 4096
+
 
 class Preprocess:
     def __init__(
@@ -42,77 +46,37 @@ class Preprocess:
     def wavelet_transform_predict(
         self, df_in: pd.DataFrame, predict: str
     ) -> Tuple[NDArray[Any], List[Any], List[Any]]:
-        i = 1
-        start = i
-        end = start
-        t_test_X = []
-        t_x_dates = []
-        t_y_dates = []
-
         test_df = pd.DataFrame(
             self.train_scaler.transform(df_in), columns=df_in.columns, index=df_in.index
         )
 
-        # convert input data to wavelet
-        while end < test_df.shape[0]:
-            start = i
-            end = start + self.trunc
-            i = i + 1
-            chunkdataDF = test_df.iloc[start:end]
-
-            test_uX, _, test_x_dates, test_y_dates = self.convert_df_wavelet_input(
-                data_df=chunkdataDF, predict=predict
-            )
-
-            t_test_X.append(test_uX)
-            t_x_dates.append(test_x_dates)
-            t_y_dates.append(test_y_dates)
+        # convert input data to wavelet, for chunks starting at each row after the first one
+        test_X, _, x_dates, y_dates = self.wavelet_windows(test_df, predict, first_row=1)
+        t_x_dates = [[x_dates[[w]]] * (self.level + 1) for w in range(x_dates.shape[0])]
+        t_y_dates = [[] if y_dates is None else y_dates[[w]] for w in range(x_dates.shape[0])]
 
-        test_X = t_test_X[0].copy()
-
-        for i in range(1, len(t_test_X)):
-            for j in range(len(t_test_X[i])):
-                test_X[j] = np.append(test_X[j], t_test_X[i][j], axis=0)
-
-        return test_X, t_x_dates, t_y_dates
+        return test_X, t_x_dates, t_y_dates  # type: ignore
 
     def wavelet_transform_train(
         self, train_df: pd.DataFrame, test_df: pd.DataFrame, out_feature: str
     ) -> Tuple[NDArray[Any], ...]:
-        t_train_X, t_train_y, t_train_X_dates, t_train_y_dates = self.prepare_wavelet_data(
-            train_df, out_feature=out_feature
-        )
+        def concat(first: NDArray[Any], arrays: NDArray[Any]) -> NDArray[Any]:
+            return np.concatenate([first, arrays], axis=0)
 
-        t_test_X, t_test_y, t_test_X_dates, t_test_y_dates = self.prepare_wavelet_data(
-            test_df, out_feature=out_feature
-        )
+        train_X, train_y, train_dates_X, train_dates_y = self.wavelet_windows(train_df, out_feature)
+        assert train_y is not None and train_dates_y is not None
+        # The first training chunk is included twice, as it always was
+        train_X = [concat(x[:1], x) for x in train_X]
+        train_y = concat(train_y[:1], train_y)
+        train_dates_X = concat(train_dates_X[:1], train_dates_X)
+        train_dates_y = concat(train_dates_y[:1], train_dates_y)
 
-        train_X = t_train_X[0].copy()
-        train_y = t_train_y[0].copy()
-        train_dates_X = t_train_X_dates[0][0].copy()
-        train_dates_y = t_train_y_dates[0].copy()
-        for i in range(len(t_train_X)):
-            train_y = np.append(train_y, t_train_y[i], axis=0)
-            train_dates_X = np.append(train_dates_X, t_train_X_dates[i][0], axis=0)
-            train_dates_y = np.append(train_dates_y, t_train_y_dates[i], axis=0)
-            for j in range(len(t_train_X[i])):
-                train_X[j] = np.append(train_X[j], t_train_X[i][j], axis=0)
-
-        test_X = t_test_X[0].copy()
-        test_y = t_test_y[0].copy()
-        test_dates_X = t_test_X_dates[0][0].copy()
-        test_dates_y = t_test_y_dates[0].copy()
-        for i in range(1, len(t_test_X)):
-            test_y = np.append(test_y, t_test_y[i], axis=0)
-            test_dates_X = np.append(test_dates_X, t_test_X_dates[i][0], axis=0)
-            test_dates_y = np.append(test_dates_y, t_test_y_dates[i], axis=0)
-            for j in range(len(t_test_X[i])):
-                test_X[j] = np.append(test_X[j], t_test_X[i][j], axis=0)
+        test_X, test_y, test_dates_X, test_dates_y = self.wavelet_windows(test_df, out_feature)
 
         return (
-            train_X,
+            train_X,  # type: ignore
             train_y,
-            test_X,
+            test_X,  # type: ignore
             test_y,
             train_dates_X,
             train_dates_y,
@@ -120,31 +84,70 @@ class Preprocess:
             test_dates_y,
         )
 
-    def prepare_wavelet_data(self, data_df: pd.DataFrame, out_feature: str):
-        i = 0
-        start = i * self.trunc
-        end = start
-        t_data_x = []
-        t_data_y = []
-        t_dates_x = []
-        t_dates_y = []
-
-        while end < data_df.shape[0]:
-            start = i
-            end = start + self.trunc
-            i = i + 1
-            o_data_df = data_df.iloc[start:end]
-
-            data_ux, data_uy, data_ux_dates, data_uy_dates = self.convert_df_wavelet_input(
-                o_data_df,
-                predict=out_feature,
-            )
-            t_data_x.append(data_ux)
-            t_data_y.append(data_uy)
-            t_dates_x.append(data_ux_dates)
-            t_dates_y.append(data_uy_dates)
-
-        return t_data_x, t_data_y, t_dates_x, t_dates_y
+    def wavelet_windows(
+        self, data_df: pd.DataFrame, predict: str, first_row: int = 0
+    ) -> Tuple[List[NDArray[Any]], Optional[NDArray[Any]], NDArray[Any], Optional[NDArray[Any]]]:
+        """
+        Vectorized `convert_df_wavelet_input` over all chunks of `chunk_size` rows starting at
+        each row from `first_row` on. Chunks are strided views of the data, and the wavelet
+        decomposition and reconstructions are computed for batches of chunks at once.
+        If there are no complete chunks, the data is converted as a single, shorter chunk.
+        Args:
+            data_df: input data
+            predict: feature to predict
+            first_row: first row of the first chunk
+        Returns:
+            inputs (the last `ts_lookback` rows of the data, followed by the reconstruction
+            for each wavelet level), outputs (only when training), input dates and output dates
+            (only when training), with one row per chunk
+        """
+        starts = np.arange(first_row, data_df.shape[0] - self.trunc + 1)
+        if not len(starts):
+            return self._convert_short_chunk(data_df.iloc[first_row:], predict)
+        n_chunks, lookback, lookahead = len(starts), self.ts_lookback, self.ts_lookahead
+        # number of rows of each chunk that are used as input
+        n_input = self.trunc - lookahead if self.is_training or self.relevant else self.trunc
+        input_ends = starts + n_input
+        values = data_df.values.astype(float)
+        target = data_df[predict].values
+        lookback_windows = sliding_window_view(values, lookback, axis=0)
+
+        x = [np.empty((n_chunks, lookback, values.shape[1]))]
+        x[0][:] = lookback_windows[input_ends - lookback].transpose(0, 2, 1)
+        x += [np.empty((n_chunks, lookback, 1)) for _ in range(self.level)]
+        shifted_dates = np.array([t + timedelta(hours=lookback) for t in data_df.index])
+        x_dates = sliding_window_view(shifted_dates, lookback)[input_ends - lookback]
+
+        series = sliding_window_view(target, n_input)
+        if self.relevant:
+            forecast = sliding_window_view(data_df[predict + "_forecast"].values, lookback)
+        for batch in range(0, n_chunks, WAVELET_BATCH_SIZE):
+            chunks = slice(batch, batch + WAVELET_BATCH_SIZE)
+            data = series[starts[chunks]]
+            if self.relevant:
+                # the forecast of the last `ts_lookback` rows extends the series
+                data = np.concatenate([data, forecast[input_ends[chunks] - lookback]], axis=1)
+            coeffs = pywt.wavedec(data, wavelet=self.wavelet, mode=self.mode, level=self.level)
+            for i in range(1, self.level + 1):
+                rec = pywt.waverec(coeffs[:-i] + [None] * i, wavelet=self.wavelet, mode=self.mode)
+                x[i][chunks, :, 0] = rec[:, n_input - lookback : n_input]
+
+        if not self.is_training:
+            return x, None, x_dates, None
+        output_starts = starts + self.trunc - lookahead
+        y = sliding_window_view(data_df[[predict]].values, lookahead, axis=0)[output_starts]
+        y_dates = sliding_window_view(
+            data_df.index.strftime("%Y-%m-%d %H:%M:%S").values, lookahead
+        )[output_starts]
+        return x, y.transpose(0, 2, 1).copy(), x_dates, y_dates.copy()
+
+    def _convert_short_chunk(
+        self, data_df: pd.DataFrame, predict: str
+    ) -> Tuple[List[NDArray[Any]], Optional[NDArray[Any]], NDArray[Any], Optional[NDArray[Any]]]:
+        x, y, x_dates, y_dates = self.convert_df_wavelet_input(data_df, predict)
+        if not self.is_training:
+            return x, None, x_dates[0], None
+        return x, y, x_dates[0], y_dates
 
     def dl_preprocess_data(
         self,
@@ -247,7 +250,9 @@ class Preprocess:
 
             data_df = data_df.iloc[: -self.ts_lookahead]
 
-        wp5 = pywt.wavedec(data=data_df[predict], wavelet=self.wavelet, mode=self.mode, level=level)
+        # pywt needs a writable buffer, and pandas may return read-only views (copy-on-write)
+        data = np.array(data_df[predict], dtype=float)
+        wp5 = pywt.wavedec(data=data, wavelet=self.wavelet, mode=self.mode, level=level)
         N = data_df.shape[0]
         for i in range(1, level + 1):
             rd.append(pywt.waverec(wp5[:-i] + [None] * i, wavelet=self.wavelet, mode=self.mode)[:N])
@@ -294,13 +299,16 @@ class Preprocess:
         )
 
         data = data_df[predict]
-        data = data.append(data_df[predict + "_forecast"].iloc[-self.ts_lookback :]).values
+        data = pd.concat([data, data_df[predict + "_forecast"].iloc[-self.ts_lookback :]])
+        data = np.array(data, dtype=float)
         wp5 = pywt.wavedec(data=data, wavelet=self.wavelet, mode=self.mode, level=self.level)
         N = data.shape[0]
 
         for i in range(1, self.level + 1):
             rd.append(
-                pywt.waverec(wp5[:-i] + [None] * i, wavelet=self.wavelet, mode=self.mode)[: N - 24]
+                pywt.waverec(wp5[:-i] + [None] * i, wavelet=self.wavelet, mode=self.mode)[
+                    : N - self.ts_lookback
+                ]
             )
 
         test_X.append(t_test_X[[-1], :, :])
@@ -153,3 +153,28 @@ def test_no_relabel_missing_edge(a_normal_graph: SomeGraph):
     edge = (3, 4, 1)
     with pytest.raises(KeyError):
         a_normal_graph.relabel(edge, 2)
+
+
+def test_in_edges_follow_mutations(a_normal_graph: SomeGraph):
+    assert sorted(a_normal_graph.edges_to(3)) == [(0, 3, 1), (1, 3, 1), (2, 3, 1)]
+    assert a_normal_graph.zero_in_degree_nodes() == [0]
+
+    edges = a_normal_graph.edges
+    a_normal_graph.relabel((1, 3, 1), 2)
+    assert (1, 2) in a_normal_graph.in_adjacency_list[3]
+    assert (1, 1) not in a_normal_graph.in_adjacency_list[3]
+    # The edge list is rebuilt after mutations
+    assert (1, 3, 2) in a_normal_graph.edges
+    assert (1, 3, 2) not in edges
+
+    a_normal_graph.remove_node(1)
+    assert 1 not in a_normal_graph.nodes
+    assert sorted(a_normal_graph.edges_to(3)) == [(0, 3, 1), (2, 3, 1)]
+    assert a_normal_graph.edges_to(2) == [(0, 2, 1)]
+    assert all(1 not in e[:2] for e in a_normal_graph.edges)
+
+    a_normal_graph.add_node(8)
+    a_normal_graph.add_edge(3, 8, 1)
+    assert a_normal_graph.edges_to(8) == [(3, 8, 1)]
+    assert a_normal_graph.edges_from(3) == [(3, 8, 1)]
+    assert len(a_normal_graph.edges) == len(edges) - 3 + 1
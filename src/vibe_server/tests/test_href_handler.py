@@ -78,7 +78,7 @@ def run_config_with_output(
     one_item_one_asset: Item, fake_op_name: str, workflow_run_config: Dict[str, Any]
 ) -> RunConfigUser:
     provider = TerravibesProvider(LocalHrefHandler("/tmp"))
-    _, run_config = provider.create_new_run(RunConfigInput(**workflow_run_config), [])
+    _, run_config = provider.create_new_run(RunConfigInput(**workflow_run_config))
     run_config.set_output({fake_op_name: [serialize_stac(one_item_one_asset)]})
     return RunConfigUser.from_runconfig(run_config)
 
@@ -12,7 +12,7 @@ from uuid import uuid4 as uuid
 import pytest
 from cloudevents.sdk.event import v1
 
-from vibe_common.constants import STATUS_PUBSUB_TOPIC, WORKFLOW_REQUEST_PUBSUB_TOPIC
+from vibe_common.constants import RUNS_KEY, STATUS_PUBSUB_TOPIC, WORKFLOW_REQUEST_PUBSUB_TOPIC
 from vibe_common.dropdapr import TopicEventResponseStatus
 from vibe_common.messaging import (
     ErrorContent,
@@ -28,6 +28,7 @@ from vibe_common.messaging import (
     encode,
     gen_traceparent,
 )
+from vibe_common.run_index import RunIndex
 from vibe_common.schemas import CacheInfo
 from vibe_common.statestore import StateStore
 from vibe_core.data.core_types import OpIOType
@@ -35,6 +36,7 @@ from vibe_core.data.json_converter import dump_to_json
 from vibe_core.data.utils import StacConverter, is_container_type, serialize_stac
 from vibe_core.datamodel import RunConfig, RunDetails, RunStatus, SpatioTemporalJson
 from vibe_dev.testing.fake_workflows_fixtures import get_fake_workflow_path  # noqa
+from vibe_dev.testing.statestore import InMemoryStateStore
 from vibe_dev.testing.workflow_fixtures import THE_DATAVIBE
 from vibe_server.orchestrator import Orchestrator, WorkflowRunManager
 from vibe_server.workflow.runner import WorkflowChange
@@ -156,6 +158,29 @@ async def test_orchestrator_update_error_response():
     assert topic_reply.status == TopicEventResponseStatus.success["status"]
 
 
+@pytest.mark.anyio
+async def test_orchestrator_update_batch_response():
+    orchestrator = Orchestrator()
+    run_id = uuid()
+    orchestrator.inqueues[str(run_id)] = Queue()
+    replies = [
+        WorkMessageBuilder.build_ack_reply(gen_traceparent(run_id)),
+        WorkMessageBuilder.build_ack_reply(gen_traceparent(uuid())),
+        WorkMessageBuilder.build_ack_reply(gen_traceparent(run_id)),
+    ]
+    topic_replies = await orchestrator.handle_update_workflow_status_batch(
+        STATUS_PUBSUB_TOPIC, [to_cloud_event(r) for r in replies]
+    )
+    assert [r.status for r in topic_replies] == [
+        TopicEventResponseStatus.success["status"],
+        TopicEventResponseStatus.drop["status"],
+        TopicEventResponseStatus.success["status"],
+    ]
+    # Updates of a run are queued in the order they were delivered
+    queue = orchestrator.inqueues[str(run_id)]
+    assert [queue.get_nowait().id for _ in range(queue.qsize())] == [replies[0].id, replies[2].id]
+
+
 @pytest.mark.anyio
 async def test_orchestrator_update_response_fails_as_message_not_in_queue():
     orchestrator = Orchestrator()
@@ -199,15 +224,11 @@ async def test_orchestrator_workflow_submission_accepts():
     assert reply.status == TopicEventResponseStatus.success["status"]
 
 
-@patch("vibe_common.statestore.StateStore.retrieve_bulk")
-@patch("vibe_common.statestore.StateStore.retrieve")
 @pytest.mark.anyio
-async def test_orchestrator_startup_sees_no_runs(retrieve: Mock, retrieve_bulk: Mock):
-    retrieve.return_value = []
-    retrieve_bulk.return_value = []
+async def test_orchestrator_startup_sees_no_runs():
     orchestrator = Orchestrator()
+    orchestrator.statestore = InMemoryStateStore()
     assert await orchestrator.get_unfinished_workflows() == []
-    retrieve_bulk.assert_called_once_with([])
 
 
 @patch("vibe_common.statestore.StateStore.retrieve")
@@ -219,21 +240,21 @@ async def test_orchestrator_startup_dapr_not_stared(retrieve: Mock):
         await orchestrator._resume_workflows()
 
 
-@patch("vibe_common.statestore.StateStore.retrieve_bulk")
-@patch("vibe_common.statestore.StateStore.retrieve")
 @pytest.mark.anyio
-async def test_orchestrator_startup_sees_no_unfinished_runs(
-    retrieve: Mock, retrieve_bulk: Mock, run_config: Dict[str, Any]
-):
-    retrieve.return_value = [run_config["id"]]
+async def test_orchestrator_startup_sees_no_unfinished_runs(run_config: Dict[str, Any]):
     run_config["details"]["status"] = RunStatus.done
-    retrieve_bulk.return_value = [run_config]
+    run_config["id"] = str(run_config["id"])
+    statestore = InMemoryStateStore()
+    await statestore.store(run_config["id"], run_config)
+    await statestore.store(RUNS_KEY, [run_config["id"]])
     orchestrator = Orchestrator()
+    orchestrator.statestore = statestore
     assert await orchestrator.get_unfinished_workflows() == []
-    retrieve_bulk.assert_called_once_with([run_config["id"]])
+    # The legacy run list was migrated to the run index
+    assert await RunIndex(statestore).list_run_ids() == [run_config["id"]]
 
 
-@patch("vibe_common.statestore.StateStore.retrieve_bulk")
+@patch("vibe_common.statestore.StateStore.transaction")
 @patch("vibe_common.statestore.StateStore.retrieve")
 @patch("vibe_common.statestore.StateStore.store")
 @patch("vibe_server.workflow.runner.task_io_handler.WorkflowIOHandler.map_output")
@@ -246,33 +267,30 @@ async def test_orchestrator_startup_sees_unfinished_runs(
     map_output: Mock,
     store: Mock,
     retrieve: Mock,
-    retrieve_bulk: Mock,
+    transaction: Mock,
     run_config: Dict[str, Any],
     fake_ops_dir: str,
     fake_workflows_dir: str,
 ):
-    first = True
-
-    def retrieve_fun(_: str):
-        nonlocal first
-        if first:
-            first = False
-            return run_config["id"]
-        return run_config
-
     _run_ops.return_value = None
     retrieve_sinks.return_value = None
     map_output.return_value = None
-    retrieve.side_effect = retrieve_fun
-    retrieve_bulk.return_value = [run_config, run_config, run_config]
+    retrieve.side_effect = lambda _: run_config
+    statestore = InMemoryStateStore()
+    run_index = RunIndex(statestore)
+    for _ in range(3):
+        run_config["id"] = str(uuid())
+        await statestore.store(run_config["id"], run_config)
+        await run_index.add(run_config["id"], datetime.now())
     build_return_value = Workflow.build(
         get_fake_workflow_path("single_and_parallel"), fake_ops_dir, fake_workflows_dir
     )
 
     with patch("vibe_server.workflow.workflow.Workflow.build", return_value=build_return_value):
         orchestrator = Orchestrator()
+        orchestrator.statestore = statestore
+        assert len(await orchestrator.get_unfinished_workflows()) == 3
         await orchestrator._resume_workflows()
-        retrieve_bulk.assert_called_once_with(run_config["id"])
         _run_ops.assert_called()
 
 
@@ -6,7 +6,7 @@ import sys
 import traceback
 from asyncio.queues import Queue
 from datetime import datetime, timezone
-from typing import Any, Optional, Tuple, cast
+from typing import Any, Dict, List, Optional, Tuple, cast
 from unittest.mock import AsyncMock, patch
 
 import pydantic
@@ -35,6 +35,7 @@ from vibe_server.workflow.runner.remote_runner import (
     RemoteWorkflowRunner,
     WorkMessageBuilder,
 )
+from vibe_server.workflow.runner.runner import WorkflowChange
 from vibe_server.workflow.runner.task_io_handler import WorkflowIOHandler
 from vibe_server.workflow.workflow import Workflow
 
@@ -129,15 +130,20 @@ async def test_message_router_len():
     handler.should_stop = True
 
 
+def build_output(op: OperationSpec, list_len: int = 1) -> OpIOType:
+    return {
+        k: ([{"a": 1}] * list_len if is_vibe_list(op.output_spec[k]) else {"a": 1})
+        for k in op.output_spec
+    }
+
+
 def build_reply(
-    parent_header: MessageHeader, op: Optional[OperationSpec] = None, failure: bool = False
+    parent_header: MessageHeader,
+    op: Optional[OperationSpec] = None,
+    failure: bool = False,
+    list_len: int = 1,
 ) -> WorkMessage:
-    if op is None:
-        output = {}
-    else:
-        output = {
-            k: ([{"a": 1}] if is_vibe_list(op.output_spec[k]) else {"a": 1}) for k in op.output_spec
-        }
+    output = {} if op is None else build_output(op, list_len)
     if failure:
         try:
             1 / 0  # type: ignore
@@ -240,3 +246,61 @@ async def test_remote_workflow_runner_fails(
             {k: helloworld_input for k in runner.workflow.inputs_spec},
             workflow_execution_message.header.run_id,
         )
+
+
+@patch("vibe_server.workflow.runner.remote_runner.send_async")
+@pytest.mark.anyio
+async def test_remote_workflow_runner_skips_cached_subtasks(
+    send_async: AsyncMock,
+    fake_ops_dir: str,
+    fake_workflows_dir: str,
+    helloworld_input: OpIOType,
+    workflow_execution_message: WorkMessage,
+):
+    inqueue: "Queue[WorkMessage]" = Queue()
+    handler = MessageRouter(inqueue)
+    workflow = Workflow.build(
+        get_fake_workflow_path("fan_out_and_in"), fake_ops_dir, fake_workflows_dir
+    )
+    changes: List[Tuple[WorkflowChange, Dict[str, Any]]] = []
+
+    async def callback(change: WorkflowChange, **kwargs: Any):
+        changes.append((change, kwargs))
+
+    runner = RemoteWorkflowRunner(
+        handler,
+        workflow,
+        workflow_execution_message.id,
+        pubsubname="",
+        source="",
+        topic="",
+        io_mapper=WorkflowIOHandler(workflow),
+        update_state_callback=callback,
+    )
+    sent: List[str] = []
+
+    async def patched_send(item: WorkMessage, *args: Any) -> None:
+        op = cast(ExecuteRequestContent, item.content).operation_spec
+        sent.append(op.name)
+        await inqueue.put(build_reply(item.header, op, list_len=3))
+
+    async def probe(run_id: str, op: OperationSpec, inputs: List[OpIOType]):
+        # The first and last subtasks are cached
+        outputs = [build_output(op, list_len=3) for _ in inputs]
+        return [o if i in (0, len(inputs) - 1) else None for i, o in enumerate(outputs)]
+
+    send_async.side_effect = patched_send
+    with patch.object(runner.cache_probe, "probe", side_effect=probe) as probe_mock:
+        output = await runner.run(
+            {k: helloworld_input for k in runner.workflow.inputs_spec},
+            workflow_execution_message.header.run_id,
+        )
+    # Tasks with a single subtask are not probed, and only cache misses are sent
+    assert [c.args[1].name for c in probe_mock.call_args_list] == ["item_list", "list_item"]
+    assert sorted(sent) == ["item_list", "item_list", "list_item", "list_list"]
+    cached = [kw for c, kw in changes if c == WorkflowChange.SUBTASKS_CACHED]
+    assert cached == [
+        {"task": "scatter", "subtask_idxs": [0, 2]},
+        {"task": "parallel", "subtask_idxs": [0, 2]},
+    ]
+    assert len(output["parallel"]) == 3
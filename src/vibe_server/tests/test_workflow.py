@@ -99,6 +99,29 @@ def test_parallelism_two_edge_types(
     assert edge[-1].type == correct_type
 
 
+@pytest.mark.parametrize("workflow_name", ["nested_workflow", "fan_out_and_in"])
+def test_edge_indexes_match_edges(
+    workflow_name: str,
+    fake_ops_dir: str,
+    fake_workflows_dir: str,
+):
+    workflow = Workflow.build(
+        get_fake_workflow_path(workflow_name), fake_ops_dir, fake_workflows_dir
+    )
+    edges = workflow.edges
+    assert edges
+    for node in workflow.nodes:
+        assert set(workflow.edges_to(node)) == {e for e in edges if e[1] == node}
+        assert set(workflow.edges_from(node)) == {e for e in edges if e[0] == node}
+        assert workflow[node.name] is node.spec
+    # Copies have independent indexes
+    copied = workflow.copy()
+    edge = edges[0]
+    copied.relabel(edge, edge[-1]._replace(type=EdgeType.gather))
+    assert edge in workflow.edges_to(edge[1])
+    assert edge not in copied.edges_to(edge[1])
+
+
 def test_gather_not_parallel(
     fake_ops_dir: str,
     fake_workflows_dir: str,
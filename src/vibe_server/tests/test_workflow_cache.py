@@ -0,0 +1,99 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import os
+import shutil
+from tempfile import TemporaryDirectory
+from typing import List, Tuple
+
+import pytest
+
+from vibe_core.data.core_types import DataVibe
+from vibe_server.workflow.cache import WorkflowCache, referenced_files
+from vibe_server.workflow.input_handler import patch_workflow_sources
+
+
+@pytest.fixture
+def tmp_dirs(fake_ops_dir: str, fake_workflows_dir: str):
+    """Copies of the fake ops and workflows, so that tests can modify them."""
+    _tmp_dir = TemporaryDirectory()
+    ops_dir = os.path.join(_tmp_dir.name, "ops")
+    workflows_dir = os.path.join(_tmp_dir.name, "workflows")
+    shutil.copytree(fake_ops_dir, ops_dir)
+    shutil.copytree(fake_workflows_dir, workflows_dir)
+    yield ops_dir, workflows_dir
+    _tmp_dir.cleanup()
+
+
+def touch(path: str):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+def test_referenced_files(tmp_dirs: Tuple[str, str]):
+    ops_dir, workflows_dir = tmp_dirs
+    files = referenced_files(os.path.join(workflows_dir, "nested_workflow.yaml"), *tmp_dirs)
+    expected = [
+        os.path.join(workflows_dir, "nested_workflow.yaml"),
+        os.path.join(workflows_dir, "list_list.yaml"),
+        os.path.join(ops_dir, "fake", "str_list.yaml"),
+        os.path.join(ops_dir, "fake", "list_list.yaml"),
+    ]
+    assert sorted(files) == sorted(expected)
+
+
+def test_cache_hits_and_invalidation(tmp_dirs: Tuple[str, str]):
+    ops_dir, workflows_dir = tmp_dirs
+    path = os.path.join(workflows_dir, "nested_workflow.yaml")
+    cache = WorkflowCache()
+
+    first = cache.build(path, ops_dir, workflows_dir)
+    second = cache.build(path, ops_dir, workflows_dir)
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert first is not second
+    assert [n.name for n in first.nodes] == [n.name for n in second.nodes]
+
+    # Different parameter overrides are different entries
+    cache.build(path, ops_dir, workflows_dir, {})
+    assert cache.misses == 1
+    touch(os.path.join(ops_dir, "fake", "list_list.yaml"))
+    cache.build(path, ops_dir, workflows_dir)
+    assert cache.misses == 2
+    touch(os.path.join(workflows_dir, "list_list.yaml"))
+    cache.build(path, ops_dir, workflows_dir)
+    assert cache.misses == 3
+    cache.build(path, ops_dir, workflows_dir)
+    assert cache.misses == 3
+
+
+def test_cache_parameter_overrides(tmp_dirs: Tuple[str, str]):
+    ops_dir, workflows_dir = tmp_dirs
+    path = os.path.join(workflows_dir, "resolve_params.yaml")
+    cache = WorkflowCache()
+    default = cache.build(path, ops_dir, workflows_dir)
+    overridden = cache.build(path, ops_dir, workflows_dir, {"new": 1})
+    assert cache.misses == 2
+    assert default.workflow_spec.parameters["new"] == "overwritten"
+    assert overridden.workflow_spec.parameters["new"] == 1
+    assert overridden["simple"].parameters["overwrite"] == 1
+    # Parameter defaults do not depend on overrides
+    compiled = cache.get_compiled(path, ops_dir, workflows_dir, {"new": 1})
+    assert compiled.parameters["new"].default == "overwritten"
+
+
+def test_patching_copies_does_not_change_cache(tmp_dirs: Tuple[str, str]):
+    ops_dir, workflows_dir = tmp_dirs
+    path = os.path.join(workflows_dir, "item_item.yaml")
+    cache = WorkflowCache()
+
+    patched = cache.build(path, ops_dir, workflows_dir)
+    patch_workflow_sources({"input": []}, patched)
+    assert len(patched.nodes) == 2
+
+    workflow = cache.build(path, ops_dir, workflows_dir)
+    assert cache.hits == 1
+    assert workflow.inputs_spec == {"input": DataVibe}
+    assert len(workflow.nodes) == 1
+    assert len(workflow.edges) == 0
+    sources: List[str] = workflow.source_mappings["input"]
+    assert sources == ["task.user_data"]
@@ -1,6 +1,7 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT License.
 
+import asyncio
 from collections import Counter
 from dataclasses import asdict
 from datetime import datetime
@@ -9,7 +10,7 @@ from unittest.mock import Mock, patch
 
 import pytest
 
-from vibe_core.datamodel import RunDetails, RunStatus
+from vibe_core.datamodel import OpResourceUsage, RunDetails, RunStatus
 from vibe_server.orchestrator import WorkflowStateUpdate
 from vibe_server.workflow.runner import WorkflowChange
 
@@ -418,3 +419,93 @@ async def test_workflow_state_update_subtasks(commit: Mock, run_config: Dict[str
     await updater(WorkflowChange.SUBTASK_QUEUED, task=op_name, subtask_idx=1)
     assert subtasks[1]["status"] == RunStatus.queued
     compare((0, 1, 1, 1))
+
+
+@patch.object(WorkflowStateUpdate, "commit_cache_for")
+@pytest.mark.anyio
+async def test_cached_subtasks_are_updated_at_once(commit: Mock, run_config: Dict[str, Any]):
+    op_name = "fake-op"
+    updater = await setup_updater(run_config, [op_name])
+    await updater(WorkflowChange.TASK_STARTED, task=op_name, num_subtasks=3)
+    commit.reset_mock()
+    await updater(WorkflowChange.SUBTASKS_CACHED, task=op_name, subtask_idxs=[0, 2])
+    # All cached subtasks are committed together
+    commit.assert_called_once()
+    subtasks = updater.task_cache[op_name]["subtasks"]
+    assert [s["status"] for s in subtasks] == [RunStatus.done, RunStatus.pending, RunStatus.done]
+    RunDetails(**subtasks[0])
+    assert updater._get_cache(op_name, None)[0]["status"] == RunStatus.pending
+    await updater(WorkflowChange.SUBTASK_FINISHED, task=op_name, subtask_idx=1)
+    assert updater._get_cache(op_name, None)[0]["status"] == RunStatus.done
+
+
+@patch.object(WorkflowStateUpdate, "commit_cache_for")
+@pytest.mark.anyio
+async def test_resources_are_aggregated(commit: Mock, run_config: Dict[str, Any]):
+    tasks = ["task1", "task2"]
+    updater = await setup_updater(run_config, tasks)
+    await updater(WorkflowChange.TASK_STARTED, task=tasks[0], num_subtasks=2)
+    await updater(WorkflowChange.TASK_STARTED, task=tasks[1], num_subtasks=1)
+    usages = [
+        OpResourceUsage(wall_time_s=1.0, cpu_time_s=0.5, peak_rss_bytes=100, asset_bytes=10),
+        OpResourceUsage(wall_time_s=2.0, cpu_time_s=1.5, peak_rss_bytes=300, asset_bytes=20),
+        OpResourceUsage(wall_time_s=4.0, cpu_time_s=4.0, peak_rss_bytes=200, read_bytes=5),
+    ]
+    for subtask_idx, usage in enumerate(usages[:2]):
+        resources = {"op1": usage}
+        await updater(
+            WorkflowChange.SUBTASK_FINISHED,
+            task=tasks[0],
+            subtask_idx=subtask_idx,
+            resources=resources,
+        )
+    # Resources of subtasks that already finished are not counted twice
+    await updater(
+        WorkflowChange.SUBTASK_FINISHED, task=tasks[0], subtask_idx=0, resources={"op1": usages[0]}
+    )
+    await updater(WorkflowChange.SUBTASK_FINISHED, task=tasks[0], subtask_idx=1)
+    await updater(
+        WorkflowChange.SUBTASK_FINISHED, task=tasks[1], subtask_idx=0, resources={"op2": usages[2]}
+    )
+
+    task_cache = updater._get_cache(tasks[0], None)[0]
+    RunDetails(**task_cache)
+    assert task_cache["subtasks"][1]["resources"] == {"op1": asdict(usages[1])}
+    assert task_cache["resources"] == {"op1": asdict(usages[0].combine(usages[1]))}
+    wf_cache = updater._get_cache(None, None)[0]
+    assert wf_cache["resources"] is None
+
+    await updater(WorkflowChange.WORKFLOW_FINISHED)
+    details = RunDetails(**wf_cache)
+    assert details.resources is not None
+    assert details.resources["op1"] == OpResourceUsage(
+        runs=2, wall_time_s=3.0, cpu_time_s=2.0, peak_rss_bytes=300, asset_bytes=30
+    )
+    assert details.resources["op2"] == usages[2]
+
+
+@patch.object(WorkflowStateUpdate, "commit_cache_for")
+@pytest.mark.anyio
+async def test_concurrent_updates_are_committed_together(commit: Mock, run_config: Dict[str, Any]):
+    op_name = "fake-op"
+    num_subtasks = 10
+    updater = await setup_updater(run_config, [op_name])
+    await updater(WorkflowChange.TASK_STARTED, task=op_name, num_subtasks=num_subtasks)
+    commits: List[Tuple[bool, List[str]]] = []
+
+    async def slow_commit(update_workflow: bool, tasks: List[str]):
+        commits.append((update_workflow, tasks))
+        await asyncio.sleep(0.01)
+
+    commit.side_effect = slow_commit
+    await asyncio.gather(
+        *[
+            updater(WorkflowChange.SUBTASK_FINISHED, task=op_name, subtask_idx=i)
+            for i in range(num_subtasks)
+        ]
+    )
+    # Updates made during the first commit are committed together in the second one
+    assert len(commits) == 2
+    assert all(tasks == [op_name] for _, tasks in commits)
+    assert commits[-1][0]
+    assert updater._get_cache(op_name, None)[0]["status"] == RunStatus.done
@@ -4,6 +4,7 @@
 import asyncio
 import asyncio.queues
 import logging
+import time
 from argparse import ArgumentParser
 from copy import copy
 from dataclasses import asdict
@@ -21,7 +22,7 @@ from vibe_common.constants import (
     CACHE_PUBSUB_TOPIC,
     CONTROL_STATUS_PUBSUB,
     DEFAULT_OPS_DIR,
-    RUNS_KEY,
+    RUN_STATUS_PUBSUB_TOPIC,
     STATUS_PUBSUB_TOPIC,
     WORKFLOW_REQUEST_PUBSUB_TOPIC,
 )
@@ -37,10 +38,18 @@ from vibe_common.messaging import (
     accept_or_fail_event_async,
     extract_message_header_from_event,
     run_id_from_traceparent,
+    send_async,
 )
+from vibe_common.run_index import RunIndex
 from vibe_common.statestore import StateStore, TransactionOperation
 from vibe_common.telemetry import add_trace, setup_telemetry, update_telemetry_context
-from vibe_core.datamodel import RunConfig, RunDetails, RunStatus
+from vibe_core.datamodel import (
+    OpResourceUsage,
+    RunConfig,
+    RunDetails,
+    RunStatus,
+    combine_resource_usage,
+)
 from vibe_core.logconfig import LOG_BACKUP_COUNT, MAX_LOG_FILE_BYTES, configure_logging
 
 from .workflow import workflow_from_input
@@ -80,13 +89,20 @@ class WorkflowStateUpdate(WorkflowCallback):
     user_request_reason = "Cancellation requested by user"
     workflow_failure_reason = "Cancelled due to failure during workflow execution"
 
-    def __init__(self, workflowRunId: UUID):
+    def __init__(self, workflowRunId: UUID, publish_updates: bool = True):
         self.run_id = workflowRunId
+        self.publish_updates = publish_updates
+        self.sequence = 0
+        self._publications: Set["asyncio.Task[None]"] = set()
         self.wf_cache: Dict[str, Any] = {}
         self.task_cache: Dict[str, Any] = {}
         self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
         self.statestore = StateStore()
         self.update_lock = asyncio.Lock()
+        self.commit_lock = asyncio.Lock()
+        # Changes to the cache that were not committed yet (tasks are kept in order)
+        self._pending_workflow = False
+        self._pending_tasks: Dict[str, None] = {}
         # Cache "empty" RunDetails because creating it triggers the big bad bug
         self.pending_run = asdict(RunDetails())
         self.wf_change_to_update = {
@@ -100,6 +116,7 @@ class WorkflowStateUpdate(WorkflowCallback):
             WorkflowChange.SUBTASK_FINISHED: self.complete_subtask,
             WorkflowChange.SUBTASK_FAILED: self.fail_subtask,
             WorkflowChange.SUBTASK_PENDING: self.pend_subtask,
+            WorkflowChange.SUBTASKS_CACHED: self.complete_cached_subtasks,
         }
         self._cache_init = False
 
@@ -118,13 +135,16 @@ class WorkflowStateUpdate(WorkflowCallback):
         return True, tasks
 
     def complete_workflow(self) -> Updates:
+        self._update_workflow_resources()
         return self._update_finish_change(None, None, cancelled=False, reason=""), []
 
     def cancel_workflow(self) -> Updates:
+        self._update_workflow_resources()
         fun = partial(self._update_finish_change, cancelled=True, reason=self.user_request_reason)
         return self._propagate_down(fun)
 
     def fail_workflow(self, reason: str) -> Updates:
+        self._update_workflow_resources()
         wf_updated = self._update_failure_change(None, None, reason=reason)
         if not wf_updated:
             # We won't cancel the workflow because it is already finished
@@ -149,10 +169,44 @@ class WorkflowStateUpdate(WorkflowCallback):
     def execute_subtask(self, task: str, subtask_idx: int) -> Updates:
         return self._propagate_up(self._update_start_change, task, subtask_idx)
 
-    def complete_subtask(self, task: str, subtask_idx: int) -> Updates:
+    def complete_subtask(
+        self,
+        task: str,
+        subtask_idx: int,
+        resources: Optional[Dict[str, OpResourceUsage]] = None,
+    ) -> Updates:
+        cache, _ = self._get_cache(task, subtask_idx)
+        if resources is not None and not RunStatus.finished(cache["status"]):
+            cache["resources"] = {k: asdict(v) for k, v in resources.items()}
+            task_cache, _ = self._get_cache(task, None)
+            task_cache["resources"] = self._combine_resources(task_cache["subtasks"])
         fun = partial(self._update_finish_change, cancelled=False, reason="")
         return self._propagate_up(fun, task, subtask_idx)
 
+    def complete_cached_subtasks(self, task: str, subtask_idxs: List[int]) -> Updates:
+        """Marks subtasks whose outputs were found in the cache as done, in a single update."""
+        now = datetime.now()
+        completed = 0
+        for subtask_idx in subtask_idxs:
+            cache, _ = self._get_cache(task, subtask_idx)
+            if RunStatus.finished(cache["status"]):
+                continue
+            for field in ("submission_time", "start_time"):
+                if cache[field] is None:
+                    cache[field] = now
+            cache["end_time"] = now
+            cache["status"] = RunStatus.done
+            completed += 1
+        if not completed:
+            return False, []
+        self.logger.info(
+            f"Changed status of {completed} cached subtasks of {task} to {RunStatus.done}. "
+            f"(run id: {self.run_id})"
+        )
+        if not self._update_task_status(task):
+            return False, [task]
+        return self._update_workflow_status(), [task]
+
     def fail_subtask(self, task: str, subtask_idx: int, reason: str) -> Updates:
         fail_fun = partial(self._update_failure_change, reason=reason)
         subtask_updated = fail_fun(task, subtask_idx, reason=reason)
@@ -174,6 +228,22 @@ class WorkflowStateUpdate(WorkflowCallback):
     def pend_subtask(self, task: str, subtask_idx: int) -> Updates:
         return self._propagate_up(self._update_pending_change, task, subtask_idx)
 
+    @staticmethod
+    def _combine_resources(caches: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        combined = combine_resource_usage(
+            *(
+                {k: OpResourceUsage(**v) for k, v in (c.get("resources") or {}).items()}
+                for c in caches
+            )
+        )
+        return {k: asdict(v) for k, v in combined.items()} or None
+
+    def _update_workflow_resources(self):
+        # Tasks keep track of the resources consumed by their subtasks, so this is only
+        # computed once the workflow finishes, to avoid updating the workflow for every subtask
+        cache, _ = self._get_cache(None, None)
+        cache["resources"] = self._combine_resources(list(self.task_cache.values()))
+
     def _combine_children_status(self, children_status: Set[RunStatus]) -> RunStatus:
         for status in (RunStatus.running, RunStatus.queued, RunStatus.pending):
             if status in children_status:
@@ -362,6 +432,58 @@ class WorkflowStateUpdate(WorkflowCallback):
             )
 
         await self.statestore.transaction(operations)
+        if self.publish_updates:
+            self.publish_update(update_workflow, tasks)
+
+    def publish_update(self, update_workflow: bool, tasks: List[str]) -> None:
+        """Publishes committed changes, so that the REST API can push them to clients.
+
+        Updates are best-effort and sent in the background, without holding up the workflow:
+        clients fall back to polling the state store, so failures are only logged. Subtasks are
+        reduced to their status to keep messages small.
+        """
+        # Wall-clock based, so that sequences keep increasing if the workflow is resumed
+        self.sequence = max(time.time_ns(), self.sequence + 1)
+        task_details = {
+            t: {
+                **self.task_cache[t],
+                "subtasks": (
+                    None
+                    if self.task_cache[t]["subtasks"] is None
+                    else [{"status": s["status"]} for s in self.task_cache[t]["subtasks"]]
+                ),
+            }
+            for t in tasks
+        }
+        message = WorkMessageBuilder.build_workflow_status_update(
+            self.run_id,
+            self.sequence,
+            dict(self.wf_cache["details"]) if update_workflow else None,
+            task_details,
+        )
+        publication = asyncio.create_task(self._send_update(message))
+        self._publications.add(publication)
+        publication.add_done_callback(self._publications.discard)
+
+    async def _send_update(self, message: WorkMessage) -> None:
+        try:
+            await send_async(
+                message, "orchestrator", CONTROL_STATUS_PUBSUB, RUN_STATUS_PUBSUB_TOPIC
+            )
+        except Exception:
+            self.logger.warning(
+                f"Failed to publish status update for workflow run {self.run_id}", exc_info=True
+            )
+
+    async def _commit_pending(self) -> None:
+        async with self.commit_lock:
+            if not self._pending_workflow and not self._pending_tasks:
+                # Committed along with the changes of another update
+                return
+            update_workflow, tasks = self._pending_workflow, list(self._pending_tasks)
+            self._pending_workflow = False
+            self._pending_tasks.clear()
+            await self.commit_cache_for(update_workflow, tasks)
 
     async def __call__(self, change: WorkflowChange, **kwargs: Any) -> None:
         async with self.update_lock:
@@ -372,8 +494,12 @@ class WorkflowStateUpdate(WorkflowCallback):
             if not self._cache_init:
                 await self._init_cache()
             update_workflow, tasks_to_update = self.update_cache_for(change, **kwargs)
-            if update_workflow or tasks_to_update:
-                await self.commit_cache_for(update_workflow, tasks_to_update)
+            self._pending_workflow = self._pending_workflow or update_workflow
+            self._pending_tasks.update(dict.fromkeys(tasks_to_update))
+        # Changes made while a commit is in progress are committed together in the next one,
+        # so bursts of updates (e.g., subtasks of a fan-out finishing together) take a single
+        # transaction. Updates return once their changes are committed.
+        await self._commit_pending()
 
 
 class WorkflowRunManager:
@@ -542,9 +668,9 @@ class Orchestrator:
         self.ops_dir = ops_dir
         self.workflows_dir = workflows_dir
 
-        @self.app.subscribe_async(self.pubsubname, self.status_topic)
-        async def update(event: v1.Event):
-            await self.handle_update_workflow_status(self.status_topic, event)
+        @self.app.subscribe_bulk_async(self.pubsubname, self.status_topic)
+        async def update(events: List[v1.Event]) -> List[TopicEventResponse]:
+            return await self.handle_update_workflow_status_batch(self.status_topic, events)
 
         @self.app.subscribe_async(self.pubsubname, self.new_workflow_topic)
         async def manage_workflow(event: v1.Event):
@@ -568,6 +694,12 @@ class Orchestrator:
 
         return await accept_or_fail_event_async(event, success_callback, self._failure_callback)
 
+    async def handle_update_workflow_status_batch(
+        self, channel: str, events: List[v1.Event]
+    ) -> List[TopicEventResponse]:
+        """Routes a batch of status updates, in the order they were delivered."""
+        return [await self.handle_update_workflow_status(channel, event) for event in events]
+
     async def handle_manage_workflow_event(self, channel: str, event: v1.Event):
         update_telemetry_context(extract_message_header_from_event(event).current_trace_parent)
 
@@ -688,12 +820,7 @@ class Orchestrator:
         await asyncio.gather(server_task, resume_call)
 
     async def get_unfinished_workflows(self) -> List[RunConfig]:
-        keys = []
-        try:
-            keys = await self.statestore.retrieve(RUNS_KEY)
-        except KeyError:
-            await self.statestore.store(RUNS_KEY, [])
-
+        keys = await RunIndex(self.statestore).list_run_ids()
         all_runs = cast(
             List[RunConfig], [RunConfig(**r) for r in await self.statestore.retrieve_bulk(keys)]
         )
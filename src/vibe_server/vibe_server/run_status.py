@@ -0,0 +1,108 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from typing import Any, Dict, Iterable, Optional, Set
+
+from fastapi.encoders import jsonable_encoder
+
+from vibe_core.datamodel import RunStatus
+
+HEARTBEAT_INTERVAL_S = 15
+MAX_PENDING_UPDATES = 1000
+HEARTBEAT = ": keep-alive\n\n"
+
+
+def format_event(event: str, data: Any) -> str:
+    """Formats a server-sent event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+
+def is_final_status(status: str) -> bool:
+    """Whether the run will not receive further status updates from the orchestrator."""
+    return RunStatus.finished(RunStatus(status)) or status in (
+        RunStatus.deleting,
+        RunStatus.deleted,
+    )
+
+
+class RunStatusSubscription:
+    """Queue of status updates for a set of runs, consumed by a single event stream."""
+
+    def __init__(self, run_ids: Iterable[str], max_pending: int = MAX_PENDING_UPDATES):
+        self.run_ids = set(run_ids)
+        self.queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(max_pending)
+        # Set when updates were dropped because the consumer is too slow
+        self.lagged = False
+
+    def put(self, update: Dict[str, Any]):
+        try:
+            self.queue.put_nowait(update)
+        except asyncio.QueueFull:
+            self.lagged = True
+
+    def drain(self):
+        while not self.queue.empty():
+            self.queue.get_nowait()
+
+
+class RunStatusBroadcaster:
+    """Fans out workflow status updates published by the orchestrator to subscribed streams.
+
+    Updates are only tracked for runs with at least one subscriber. Since the message broker
+    does not guarantee ordering, the workflow details and each task's details are versioned
+    independently by the update sequence, and stale values are discarded.
+    """
+
+    def __init__(self, max_pending: int = MAX_PENDING_UPDATES):
+        self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
+        self.max_pending = max_pending
+        self.subscriptions: Dict[str, Set[RunStatusSubscription]] = defaultdict(set)
+        self.versions: Dict[str, Dict[Optional[str], int]] = {}
+
+    def subscribe(self, run_ids: Iterable[str]) -> RunStatusSubscription:
+        subscription = RunStatusSubscription(run_ids, self.max_pending)
+        for run_id in subscription.run_ids:
+            self.subscriptions[run_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: RunStatusSubscription):
+        for run_id in subscription.run_ids:
+            subscriptions = self.subscriptions.get(run_id)
+            if subscriptions is None:
+                continue
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self.subscriptions[run_id]
+                self.versions.pop(run_id, None)
+
+    def publish(
+        self,
+        run_id: str,
+        sequence: int,
+        details: Optional[Dict[str, Any]],
+        task_details: Dict[str, Dict[str, Any]],
+    ):
+        """Forwards the parts of an update that are newer than what was previously forwarded."""
+        subscriptions = self.subscriptions.get(run_id)
+        if not subscriptions:
+            return
+        versions = self.versions.setdefault(run_id, {})
+        delta: Dict[str, Any] = {"id": run_id, "task_details": {}}
+        # The workflow details are versioned with the `None` key
+        for key, value in [(None, details), *task_details.items()]:
+            if value is None or versions.get(key, -1) >= sequence:
+                continue
+            versions[key] = sequence
+            if key is None:
+                delta["details"] = value
+            else:
+                delta["task_details"][key] = value
+        if "details" not in delta and not delta["task_details"]:
+            self.logger.debug(f"Discarding stale status update for run {run_id}")
+            return
+        for subscription in subscriptions:
+            subscription.put(delta)
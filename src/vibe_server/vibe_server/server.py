@@ -2,14 +2,17 @@
 # Licensed under the MIT License.
 
 import asyncio
+import base64
+import json
 import logging
 import os
 from argparse import ArgumentParser, Namespace
-from dataclasses import asdict
+from dataclasses import asdict, dataclass
 from datetime import datetime
 from enum import auto
 from typing import (
     Any,
+    AsyncIterator,
     Dict,
     Final,
     List,
@@ -30,7 +33,7 @@ import yaml
 from dapr.conf import settings
 from fastapi import Body, FastAPI, Path, Query, status
 from fastapi.encoders import jsonable_encoder
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi_versioning import VersionedFastAPI, version
 from hydra_zen import instantiate
 from opentelemetry import trace
@@ -41,11 +44,23 @@ from vibe_common.constants import (
     ALLOWED_ORIGINS,
     CONTROL_STATUS_PUBSUB,
     DEFAULT_SECRET_STORE_NAME,
-    RUNS_KEY,
+    RUN_STATUS_PUBSUB_TOPIC,
     WORKFLOW_REQUEST_PUBSUB_TOPIC,
 )
 from vibe_common.dapr import dapr_ready
-from vibe_common.messaging import WorkMessageBuilder, send
+from vibe_common.dropdapr import (
+    DaprSubscription,
+    TopicEventResponse,
+    TopicEventResponseStatus,
+    request_to_event,
+)
+from vibe_common.messaging import (
+    WorkflowStatusUpdateContent,
+    WorkMessageBuilder,
+    event_to_work_message,
+    send,
+)
+from vibe_common.run_index import RunIndex, RunIndexEntry, to_naive_utc, workflow_name
 from vibe_common.secret_provider import DaprSecretConfig
 from vibe_common.statestore import StateStore, TransactionOperation
 from vibe_common.telemetry import (
@@ -58,25 +73,34 @@ from vibe_core.datamodel import (
     SUMMARY_DEFAULT_FIELDS,
     Message,
     MetricsDict,
+    OpResourceUsage,
     RunConfig,
     RunConfigInput,
     RunConfigUser,
     RunDetails,
     RunStatus,
     SpatioTemporalJson,
+    combine_resource_usage,
 )
 from vibe_core.logconfig import LOG_BACKUP_COUNT, MAX_LOG_FILE_BYTES, configure_logging
 
 from .href_handler import BlobHrefHandler, HrefHandler, LocalHrefHandler
+from .run_status import (
+    HEARTBEAT,
+    HEARTBEAT_INTERVAL_S,
+    RunStatusBroadcaster,
+    RunStatusSubscription,
+    format_event,
+    is_final_status,
+)
 from .workflow import get_workflow_path, workflow_from_input
 from .workflow import list_workflows as list_existing_workflows
+from .workflow.cache import WorkflowCache
 from .workflow.input_handler import (
     build_args_for_workflow,
     patch_workflow_sources,
     validate_workflow_input,
 )
-from .workflow.parameter import ParameterResolver
-from .workflow.workflow import Workflow
 
 RUN_CONFIG_SUBMISSION_EXAMPLE: Final[Dict[str, Any]] = {
     "name": "example workflow run for sample region",
@@ -112,6 +136,63 @@ MOUNT_DIR: Final[str] = "/mnt"
 RunList = Union[List[str], List[Dict[str, Any]], JSONResponse]
 WorkflowList = Union[List[str], Dict[str, Any], JSONResponse]
 CreateRunResponse = Union[Dict[str, Union[UUID, str]], JSONResponse]
+OpProfile = Dict[str, Dict[str, Union[int, float]]]
+RUN_STATUS_EVENT_ROUTE: Final[str] = f"/events/{CONTROL_STATUS_PUBSUB}/{RUN_STATUS_PUBSUB_TOPIC}"
+NEXT_CURSOR_HEADER: Final[str] = "X-Next-Cursor"
+# Number of run records fetched at once when filtering runs by status
+STATUS_FILTER_BATCH_SIZE: Final[int] = 100
+
+
+@dataclass
+class RunFilter:
+    status: Optional[List[RunStatus]] = None
+    workflow: Optional[str] = None
+    submitted_after: Optional[datetime] = None
+
+    def __bool__(self) -> bool:
+        return bool(self.status) or self.workflow is not None or self.submitted_after is not None
+
+    def matches_status(self, run_data: Dict[str, Any]) -> bool:
+        return not self.status or run_data["details"]["status"] in self.status
+
+    def matches_workflow(self, workflow: Optional[str]) -> bool:
+        return self.workflow is None or workflow == self.workflow
+
+    def matches(self, run_data: Dict[str, Any]) -> bool:
+        if not self.matches_status(run_data):
+            return False
+        if not self.matches_workflow(workflow_name(run_data.get("workflow"))):
+            return False
+        if self.submitted_after is not None:
+            submission_time = run_data["details"].get("submission_time")
+            return submission_time is not None and to_naive_utc(
+                datetime.fromisoformat(submission_time)
+            ) >= to_naive_utc(self.submitted_after)
+        return True
+
+
+def needs_task_details(fields: List[str]) -> bool:
+    return any(f == "task_details" or f.startswith("task_details.") for f in fields)
+
+
+def profile_resource_usage(usage: OpResourceUsage) -> Dict[str, Union[int, float]]:
+    profile: Dict[str, Union[int, float]] = asdict(usage)
+    for field in ("wall_time_s", "cpu_time_s", "read_bytes", "write_bytes", "asset_bytes"):
+        profile[f"mean_{field}"] = profile[field] / usage.runs if usage.runs else 0
+    return profile
+
+
+def encode_cursor(entry: RunIndexEntry) -> str:
+    payload = json.dumps([entry.submission_time.isoformat(), entry.run_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> RunIndexEntry:
+    try:
+        submission_time, run_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return RunIndexEntry(datetime.fromisoformat(submission_time), str(run_id))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor {cursor}") from e
 
 
 class WorkflowReturnFormat(StrEnum):
@@ -127,7 +208,11 @@ class TerravibesProvider:
     def __init__(self, href_handler: HrefHandler):
         self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
         self.state_store = StateStore()
+        self.run_index = RunIndex(self.state_store)
         self.href_handler = href_handler
+        self.workflow_cache = WorkflowCache()
+        self.run_status = RunStatusBroadcaster()
+        self.heartbeat_interval_s = HEARTBEAT_INTERVAL_S
 
     @add_trace
     def summarize_runs(self, runs: List[RunConfig], fields: List[str] = SUMMARY_DEFAULT_FIELDS):
@@ -137,24 +222,27 @@ class TerravibesProvider:
         For example, to extract the "status" member from "details", use "details.status".
         """
 
-        summarized_runs = [{k: v for k, v in asdict(e).items() if k in fields} for e in runs]
-        for field in fields:
-            if "." not in field:
-                continue
-            for i, src in enumerate([asdict(r) for r in runs]):
+        summarized_runs: List[Dict[str, Any]] = []
+        for run in runs:
+            src = asdict(run)
+            summary = {k: v for k, v in src.items() if k in fields}
+            for field in fields:
+                if "." not in field:
+                    continue
                 prefixes, suffix = field.rsplit(".", maxsplit=1)
                 obj = src
-                for prefix in prefixes.split("."):
-                    try:
+                try:
+                    for prefix in prefixes.split("."):
                         obj = obj[prefix]
-                        summarized_runs[i].update({field: obj[suffix]})
-                    except TypeError as e:
-                        # We are trying to get a subfield from a field that
-                        # didn't exist in the first place. `obj` is None, so we
-                        # won't be able to get it here
-                        raise KeyError(
-                            f"Workflow run with id {runs[i].id} does not have field {field}"
-                        ) from e
+                    summary[field] = obj[suffix]
+                except TypeError as e:
+                    # We are trying to get a subfield from a field that
+                    # didn't exist in the first place. `obj` is None, so we
+                    # won't be able to get it here
+                    raise KeyError(
+                        f"Workflow run with id {run.id} does not have field {field}"
+                    ) from e
+            summarized_runs.append(summary)
         return summarized_runs
 
     @add_trace
@@ -193,10 +281,9 @@ class TerravibesProvider:
             return [i for i in list_existing_workflows() if "private" not in i]
         try:
             if return_format == WorkflowReturnFormat.description:
-                wf = Workflow.build(get_workflow_path(workflow))
-                wf_spec = wf.workflow_spec
-                param_resolver = ParameterResolver(wf_spec.workflows_dir, wf_spec.ops_dir)
-                parameters = param_resolver.resolve(wf_spec)
+                compiled = self.workflow_cache.get_compiled(get_workflow_path(workflow))
+                wf = compiled.workflow.copy()
+                parameters = compiled.parameters
                 param_defaults = {k: v.default for k, v in parameters.items()}
                 param_descriptions = {k: v.description for k, v in parameters.items()}
                 description = wf.workflow_spec.description
@@ -235,24 +322,41 @@ class TerravibesProvider:
         page: Optional[int],
         items: Optional[int],
         fields: Optional[List[str]],
+        run_status: Optional[List[RunStatus]] = None,
+        workflow: Optional[str] = None,
+        submitted_after: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        newest_first: bool = False,
     ) -> RunList:
-        def paginate(
-            things: List[Any], page: Optional[int] = 0, items: Optional[int] = 0
-        ) -> List[Any]:
-            if items is None or items <= 0:
-                return things
-            if page is None or page <= 0:
-                page = 0
-            return things[items * page : items * (page + 1)]
-
-        ret: Union[List[str], List[Dict[str, Any]]] = []
+        """Lists runs, optionally filtered, paginated and projected to a list of fields.
+
+        Filters and pagination are applied before any run is fetched from the state store, and the
+        (potentially large) task details are only fetched if one of the `fields` needs them.
+        When a page is full, the cursor to the next page is returned in the `NEXT_CURSOR_HEADER`
+        header of the response.
+        """
+        run_filter = RunFilter(run_status, workflow, submitted_after)
+        limit = items if items is not None and items > 0 else None
+        offset = limit * page if limit is not None and page is not None and page > 0 else 0
+
         try:
+            next_cursor: Optional[str] = None
             if ids is None:
-                all_ids = await self.list_runs_from_store()
+                if not run_filter and limit is None and cursor is None and not newest_first:
+                    if fields is None:
+                        return await self.list_runs_from_store()
+                after = decode_cursor(cursor) if cursor is not None else None
+                entries, run_data = await self.select_runs_from_index(
+                    run_filter, offset, limit, after, newest_first
+                )
+                if limit is not None and len(entries) == limit:
+                    next_cursor = encode_cursor(entries[-1])
                 if fields is None:
-                    return all_ids
-
-                ret = self.summarize_runs(await self.get_bulk_runs_by_id(all_ids), fields)
+                    ret: RunList = [e.run_id for e in entries]
+                    return self._with_cursor(ret, next_cursor)
+                missing = [e.run_id for e in entries if e.run_id not in run_data]
+                run_data.update(zip(missing, await self.retrieve_runs_data(missing)))
+                run_data = [run_data[e.run_id] for e in entries]
             else:
                 ids = cast(List[Any], ids)
                 if not all([isinstance(i, UUID) for i in ids]):
@@ -260,18 +364,116 @@ class TerravibesProvider:
                         status_code=status.HTTP_400_BAD_REQUEST,
                         content=asdict(Message("Provided ids must be UUIDs")),
                     )
-                if fields is None:
-                    ret = self.summarize_runs(await self.get_bulk_runs_by_id(ids))
-                else:
-                    ret = self.summarize_runs(await self.get_bulk_runs_by_id(ids), fields)
-
-            return paginate(ret, page, items)
+                if not run_filter:
+                    ids = ids[offset : offset + limit] if limit is not None else ids[offset:]
+                run_data = await self.retrieve_runs_data(ids)
+                if run_filter:
+                    run_data = [r for r in run_data if run_filter.matches(r)]
+                    run_data = run_data[offset : offset + limit] if limit else run_data[offset:]
+                fields = SUMMARY_DEFAULT_FIELDS if fields is None else fields
+
+            if needs_task_details(fields):
+                await self.retrieve_task_details(run_data)
+            runs = [RunConfig(**data) for data in run_data]
+            return self._with_cursor(self.summarize_runs(runs, fields), next_cursor)
         except (KeyError, IndexError):
             reason = f"Failed to get id(s) {ids}"
             self.logger.debug(reason)
             return JSONResponse(
                 status_code=status.HTTP_404_NOT_FOUND, content=asdict(Message(reason))
             )
+        except ValueError as e:
+            return JSONResponse(
+                status_code=status.HTTP_400_BAD_REQUEST, content=asdict(Message(str(e)))
+            )
+
+    def _with_cursor(self, runs: RunList, next_cursor: Optional[str]) -> RunList:
+        if next_cursor is None:
+            return runs
+        return JSONResponse(
+            content=jsonable_encoder(runs), headers={NEXT_CURSOR_HEADER: next_cursor}
+        )
+
+    @add_trace
+    async def select_runs_from_index(
+        self,
+        run_filter: "RunFilter",
+        offset: int,
+        limit: Optional[int],
+        after: Optional[RunIndexEntry],
+        newest_first: bool,
+    ) -> Tuple[List[RunIndexEntry], Dict[str, Dict[str, Any]]]:
+        """Walks the run index in submission order, selecting the runs of the requested page.
+
+        Submission time and workflow name are filtered directly on the index. Run records are
+        only fetched (in batches) when filtering by status, and the fetched records are returned
+        so that they can be reused by the caller. Other records are left for the caller to fetch.
+        """
+        selected: List[RunIndexEntry] = []
+        run_data: Dict[str, Dict[str, Any]] = {}
+        batch: List[RunIndexEntry] = []
+        to_skip = offset
+
+        def take(entries: List[RunIndexEntry]) -> bool:
+            nonlocal to_skip
+            for entry in entries:
+                if to_skip > 0:
+                    to_skip -= 1
+                    continue
+                selected.append(entry)
+                if limit is not None and len(selected) >= limit:
+                    return True
+            return False
+
+        async def check_status(entries: List[RunIndexEntry]) -> List[RunIndexEntry]:
+            data = await self.retrieve_runs_data([e.run_id for e in entries])
+            run_data.update({e.run_id: d for e, d in zip(entries, data)})
+            return [e for e, d in zip(entries, data) if run_filter.matches_status(d)]
+
+        async for entry in self.run_index.scan(
+            start=run_filter.submitted_after, newest_first=newest_first, after=after
+        ):
+            if not run_filter.matches_workflow(entry.workflow):
+                continue
+            if not run_filter.status:
+                if take([entry]):
+                    break
+                continue
+            batch.append(entry)
+            if len(batch) >= STATUS_FILTER_BATCH_SIZE:
+                done = take(await check_status(batch))
+                batch = []
+                if done:
+                    break
+        else:
+            if batch:
+                take(await check_status(batch))
+        return selected, run_data
+
+    @add_trace
+    async def profile_ops(
+        self,
+        workflow: Optional[str] = None,
+        submitted_after: Optional[datetime] = None,
+        items: Optional[int] = None,
+    ) -> OpProfile:
+        """Aggregates the resources consumed by ops over workflow runs, by op name.
+
+        Runs are selected from the run index, most recently submitted first, and only their
+        records (not their task details, which hold the resources of every subtask) are fetched.
+        Totals are returned along with means per op run, and the largest peak RSS of any op run.
+        """
+        run_filter = RunFilter(workflow=workflow, submitted_after=submitted_after)
+        limit = items if items is not None and items > 0 else None
+        entries, _ = await self.select_runs_from_index(run_filter, 0, limit, None, True)
+        run_data = await self.retrieve_runs_data([e.run_id for e in entries])
+        usage = combine_resource_usage(
+            *(
+                {k: OpResourceUsage(**v) for k, v in (d["details"].get("resources") or {}).items()}
+                for d in run_data
+            )
+        )
+        return {name: profile_resource_usage(usage[name]) for name in sorted(usage)}
 
     async def describe_run(
         self,
@@ -287,6 +489,81 @@ class TerravibesProvider:
                 content=asdict(Message(f'Workflow execution "{run_id}" not found')),
             )
 
+    async def stream_run_events(self, run_ids: List[UUID]):
+        """Streams status updates of workflow runs as server-sent events.
+
+        The stream starts with a `snapshot` event per run, followed by `update` events containing
+        the workflow details and/or the details of the tasks that changed. An `end` event is sent
+        when all runs are finished. Snapshots are sent again if the client falls behind.
+        """
+        ids = list(dict.fromkeys(str(i) for i in run_ids))
+        # Subscribe before fetching the snapshot, so that no update is missed in between
+        subscription = self.run_status.subscribe(ids)
+        try:
+            runs = await self.get_bulk_runs_by_id(ids)
+        except KeyError:
+            self.run_status.unsubscribe(subscription)
+            return JSONResponse(
+                status_code=status.HTTP_404_NOT_FOUND,
+                content=asdict(Message(f"Failed to get id(s) {ids}")),
+            )
+        return StreamingResponse(
+            self._run_events(subscription, runs),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache"},
+        )
+
+    async def _run_events(
+        self, subscription: RunStatusSubscription, runs: List[RunConfig]
+    ) -> AsyncIterator[str]:
+        snapshot_fields = ["id", "details", "task_details"]
+        pending = set()
+        try:
+            while True:
+                for snapshot in self.summarize_runs(runs, snapshot_fields):
+                    yield format_event("snapshot", snapshot)
+                    run_id = str(snapshot["id"])
+                    if not is_final_status(snapshot["details"]["status"]):
+                        pending.add(run_id)
+                    else:
+                        pending.discard(run_id)
+                while pending and not subscription.lagged:
+                    try:
+                        update = await asyncio.wait_for(
+                            subscription.queue.get(), self.heartbeat_interval_s
+                        )
+                    except asyncio.TimeoutError:
+                        yield HEARTBEAT
+                        continue
+                    yield format_event("update", update)
+                    details = update.get("details")
+                    if details is not None and is_final_status(details["status"]):
+                        pending.discard(update["id"])
+                if not pending:
+                    break
+                # Updates were dropped, start over from fresh snapshots
+                subscription.lagged = False
+                subscription.drain()
+                runs = await self.get_bulk_runs_by_id(sorted(pending))
+            yield format_event("end", {})
+        finally:
+            self.run_status.unsubscribe(subscription)
+
+    async def receive_run_status_event(self, request: Dict[str, Any]) -> TopicEventResponse:
+        """Handles status updates published by the orchestrator through dapr."""
+        try:
+            message = event_to_work_message(request_to_event(request))
+            content = message.content
+            if not isinstance(content, WorkflowStatusUpdateContent):
+                raise ValueError(f"Unexpected message of type {message.header.type}")
+            self.run_status.publish(
+                str(message.run_id), content.sequence, content.details, content.task_details
+            )
+        except Exception:
+            self.logger.exception("Failed to process run status update")
+            return TopicEventResponseStatus.drop
+        return TopicEventResponseStatus.success
+
     @add_trace
     async def cancel_run(
         self,
@@ -366,7 +643,7 @@ class TerravibesProvider:
             ):
                 raise ValueError(f'Workflow "{runConfig.workflow}" unknown')
 
-            workflow = workflow_from_input(runConfig.workflow)
+            workflow = workflow_from_input(runConfig.workflow, self.workflow_cache)
             inputs_spec = workflow.inputs_spec
             # Build and validate inputs
             user_input = build_args_for_workflow(runConfig.user_input, list(inputs_spec))
@@ -374,13 +651,12 @@ class TerravibesProvider:
             validate_workflow_input(user_input, inputs_spec)
             patch_workflow_sources(user_input, workflow)
 
-            run_ids: List[str] = await self.list_runs_from_store()
-            new_id, new_run = self.create_new_run(runConfig, run_ids)
+            new_id, new_run = self.create_new_run(runConfig)
             add_span_attributes({"run_id": new_id})
 
             if new_id is None:
                 raise RuntimeError("Failed to create new run id")
-            await self.update_run_state(run_ids, new_run)
+            await self.update_run_state(new_run)
 
             # Update run id with parsed workflow and user input
             new_run.workflow = asdict(workflow.workflow_spec)
@@ -443,7 +719,7 @@ class TerravibesProvider:
         )
         return await self.create_run(run_config)
 
-    def create_new_run(self, workflow: RunConfigInput, run_ids: List[str]):
+    def create_new_run(self, workflow: RunConfigInput):
         new_id = str(uuid4())
 
         workflow_data = {k: v for k, v in asdict(workflow).items() if k != "user_input"}
@@ -459,22 +735,18 @@ class TerravibesProvider:
             workflow_data["spatio_temporal_json"] = None
 
         new_run = RunConfig(**workflow_data)
-        run_ids.append(new_id)
 
         return new_id, new_run
 
     @add_trace
-    async def update_run_state(self, run_ids: List[str], new_run: RunConfig):
-        await self.state_store.transaction(
-            [
-                cast(
-                    TransactionOperation,
-                    {
-                        "key": RUNS_KEY,
-                        "operation": "upsert",
-                        "value": run_ids,
-                    },
-                ),
+    async def update_run_state(self, new_run: RunConfig):
+        if new_run.details.submission_time is None:
+            raise ValueError(f"Workflow run {new_run.id} has no submission time to be indexed by")
+        await self.run_index.add(
+            str(new_run.id),
+            new_run.details.submission_time,
+            workflow=workflow_name(new_run.workflow),
+            operations=[
                 cast(
                     TransactionOperation,
                     {
@@ -483,27 +755,37 @@ class TerravibesProvider:
                         "value": new_run,
                     },
                 ),
-            ]
+            ],
         )
 
     @add_trace
     async def list_runs_from_store(self) -> List[str]:
-        try:
-            return await self.state_store.retrieve(RUNS_KEY)
-        except KeyError:
-            # No workflows exist yet, ignore the failure
+        return await self.run_index.list_run_ids()
+
+    @add_trace
+    async def retrieve_runs_data(
+        self, run_ids: Union[List[str], List[UUID]]
+    ) -> List[Dict[str, Any]]:
+        if not run_ids:
             return []
+        return await self.state_store.retrieve_bulk([str(id) for id in run_ids])
 
     @add_trace
-    async def get_bulk_runs_by_id(self, run_ids: Union[List[str], List[UUID]]) -> List[RunConfig]:
-        run_data = await self.state_store.retrieve_bulk([str(id) for id in run_ids])
+    async def retrieve_task_details(self, run_data: List[Dict[str, Any]]):
         run_id_to_data = {r["id"]: r for r in run_data}
         run_task_ids = [(r["id"], task) for r in run_data for task in r.get("tasks", [])]
+        if not run_task_ids:
+            return
         task_data = await self.state_store.retrieve_bulk([f"{i[0]}-{i[1]}" for i in run_task_ids])
         for run_task_id, task_datum in zip(run_task_ids, task_data):
             run_id, task_name = run_task_id
             run_datum = run_id_to_data[run_id]
             run_datum["task_details"][task_name] = task_datum
+
+    @add_trace
+    async def get_bulk_runs_by_id(self, run_ids: Union[List[str], List[UUID]]) -> List[RunConfig]:
+        run_data = await self.state_store.retrieve_bulk([str(id) for id in run_ids])
+        await self.retrieve_task_details(run_data)
         runs = [RunConfig(**cast(Dict[str, Any], data)) for data in run_data]
         return runs
 
@@ -599,6 +881,7 @@ class TerravibesAPI(FastAPI):
         - `GET /runs/{run_id}`: Get information of a specific run.
         - `POST /runs`: Submit a new workflow run.
         - `POST /runs/{run_id}/cancel`: Cancel a workflow run.
+        - `GET /ops/profile`: Get the resources consumed by each op, aggregated over runs.
         """
 
         self.openapi_tags = [
@@ -676,9 +959,66 @@ class TerravibesAPI(FastAPI):
                     "If not provided, only run ids are returned."
                 ),
             ),
+            status: Optional[List[RunStatus]] = Query(
+                None, description="Only return runs with one of these statuses."
+            ),
+            workflow: Optional[str] = Query(
+                None, description="Only return runs of the workflow with this name."
+            ),
+            submitted_after: Optional[datetime] = Query(
+                None, description="Only return runs submitted at or after this time (UTC)."
+            ),
+            cursor: Optional[str] = Query(
+                None,
+                description=(
+                    "Cursor returned in the X-Next-Cursor header of the previous page. "
+                    "The next page starts right after the last run of the previous one."
+                ),
+            ),
+            newest_first: bool = Query(
+                False, description="Whether to list the most recently submitted runs first."
+            ),
         ) -> RunList:
             """List all the workflow runs currently in the system."""
-            return await self.terravibes.list_runs(ids, page, items, fields)
+            return await self.terravibes.list_runs(
+                ids, page, items, fields, status, workflow, submitted_after, cursor, newest_first
+            )
+
+        @self.get("/runs/events", tags=["runs"], response_model=None)
+        @version(0)
+        async def terravibes_stream_run_events(
+            ids: List[UUID] = Query(..., description="The IDs of the runs to follow."),
+        ):
+            """Stream workflow and task status updates of runs as server-sent events.
+
+            The stream starts with a `snapshot` event per run, followed by `update` events with
+            the changed workflow and task details, and ends with an `end` event when all runs
+            are finished.
+            """
+            return await self.terravibes.stream_run_events(ids)
+
+        @self.get("/ops/profile", tags=["runs"], response_model=None)
+        @version(0)
+        async def terravibes_profile_ops(
+            workflow: Optional[str] = Query(
+                None, description="Only profile runs of the workflow with this name."
+            ),
+            submitted_after: Optional[datetime] = Query(
+                None, description="Only profile runs submitted at or after this time (UTC)."
+            ),
+            items: Optional[int] = Query(
+                0, description="The number of most recent runs to profile (all if 0)."
+            ),
+        ) -> OpProfile:
+            """Get the resources consumed by each op, aggregated over workflow runs.
+
+            For every op name, returns the number of op runs, their total and mean wall time,
+            CPU time, bytes read and written and size of produced assets, and their largest peak
+            resident set size. The peak resident set size of an op run is how much the memory of
+            the process running it grew over what it held when the op started, so memory shared
+            with the worker (e.g., imported modules) is not included.
+            """
+            return await self.terravibes.profile_ops(workflow, submitted_after, items)
 
         @self.get("/runs/{run_id}", tags=["runs"])
         @version(0)
@@ -747,6 +1087,26 @@ class TerravibesAPI(FastAPI):
         self.versioned_wrapper = VersionedFastAPI(
             self, version_format="{major}", prefix_format="/v{major}"
         )
+        # Status updates from the orchestrator are delivered by dapr outside of the versioned API
+        run_status_subscription: DaprSubscription = {
+            "pubsubname": CONTROL_STATUS_PUBSUB,
+            "topic": RUN_STATUS_PUBSUB_TOPIC,
+            "route": RUN_STATUS_EVENT_ROUTE,
+            "metadata": {},
+        }
+        self.versioned_wrapper.add_api_route(
+            "/dapr/subscribe",
+            lambda: [run_status_subscription],
+            methods=["GET"],
+            include_in_schema=False,
+        )
+        self.versioned_wrapper.add_api_route(
+            RUN_STATUS_EVENT_ROUTE,
+            self.terravibes.receive_run_status_event,
+            methods=["POST"],
+            response_model=Any,
+            include_in_schema=False,
+        )
         self.versioned_wrapper.add_middleware(
             CORSMiddleware,
             allow_origins=allowed_origins,
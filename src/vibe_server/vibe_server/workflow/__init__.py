@@ -3,20 +3,28 @@
 
 import os
 import re
-from typing import Any, Dict, List, Union
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union
 
 from ..workflow.spec_parser import WorkflowParser, get_workflow_dir
 from ..workflow.workflow import Workflow
 
+if TYPE_CHECKING:
+    from ..workflow.cache import WorkflowCache
+
 
 def get_workflow_path(name: str, base: str = get_workflow_dir()) -> str:
     return os.path.join(base, name) + ".yaml"
 
 
-def workflow_from_input(input: Union[str, Dict[str, Any]]) -> Workflow:
+def workflow_from_input(
+    input: Union[str, Dict[str, Any]], cache: Optional["WorkflowCache"] = None
+) -> Workflow:
     workflow: Workflow
     if isinstance(input, str):
-        workflow = Workflow.build(get_workflow_path(input))
+        if cache is not None:
+            workflow = cache.build(get_workflow_path(input))
+        else:
+            workflow = Workflow.build(get_workflow_path(input))
     else:
         workflow = Workflow(WorkflowParser.parse_dict(input))
     return workflow
@@ -0,0 +1,155 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import hashlib
+import json
+import logging
+import os
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from vibe_common.constants import DEFAULT_OPS_DIR
+
+from .parameter import Parameter, ParameterResolver
+from .spec_parser import WorkflowParser, get_workflow_dir
+from .workflow import Workflow
+
+MAX_CACHED_WORKFLOWS = 256
+
+CacheKey = Tuple[str, str, str, str]
+FileMtimes = Dict[str, Optional[int]]
+
+
+def parameters_hash(parameters_override: Optional[Dict[str, Any]]) -> str:
+    if not parameters_override:
+        return ""
+    dump = json.dumps(parameters_override, sort_keys=True, default=str)
+    return hashlib.sha256(dump.encode()).hexdigest()
+
+
+def referenced_files(workflow_path: str, ops_dir: str, workflow_dir: str) -> List[str]:
+    """Lists the YAML files of a workflow and of all ops and workflows it (transitively) uses."""
+    files: List[str] = []
+    seen = set()
+    pending = [os.path.abspath(workflow_path)]
+    while pending:
+        path = pending.pop()
+        if path in seen:
+            continue
+        seen.add(path)
+        files.append(path)
+        try:
+            tasks = WorkflowParser._load_workflow(path).get("tasks") or {}
+        except (OSError, AttributeError):
+            # Missing or invalid files fail the build, which is not cached
+            continue
+        for task in tasks.values():
+            if not isinstance(task, dict):
+                continue
+            if "workflow" in task:
+                inner_path = os.path.join(workflow_dir, f"{task['workflow']}.yaml")
+                pending.append(os.path.abspath(inner_path))
+            elif "op" in task:
+                op_dir = task.get("op_dir", task["op"])
+                op_path = os.path.abspath(os.path.join(ops_dir, op_dir, f"{task['op']}.yaml"))
+                if op_path not in seen:
+                    seen.add(op_path)
+                    files.append(op_path)
+    return files
+
+
+def file_mtimes(files: List[str]) -> FileMtimes:
+    mtimes: FileMtimes = {}
+    for f in files:
+        try:
+            mtimes[f] = os.stat(f).st_mtime_ns
+        except OSError:
+            mtimes[f] = None
+    return mtimes
+
+
+class CompiledWorkflow:
+    """A built workflow, along with the modification times of all the files used to build it."""
+
+    def __init__(self, workflow: Workflow, mtimes: FileMtimes):
+        self.workflow = workflow
+        self.mtimes = mtimes
+        self._parameters: Optional[Dict[str, Parameter]] = None
+
+    def is_stale(self) -> bool:
+        return file_mtimes(list(self.mtimes)) != self.mtimes
+
+    @property
+    def parameters(self) -> Dict[str, Parameter]:
+        """Workflow parameters, resolved through all inner workflows and ops on first access."""
+        if self._parameters is None:
+            spec = self.workflow.workflow_spec
+            self._parameters = ParameterResolver(spec.workflows_dir, spec.ops_dir).resolve(spec)
+        return self._parameters
+
+
+class WorkflowCache:
+    """Cache of built (parsed, resolved and validated) workflows.
+
+    Entries are keyed by workflow path, directories and parameter overrides, and are rebuilt
+    when any of the YAML files referenced by the workflow (including nested workflows and ops)
+    is modified. Workflows handed out by the cache are copies, so they can be patched (e.g., by
+    `patch_workflow_sources`) without affecting other requests.
+    """
+
+    def __init__(self, max_size: int = MAX_CACHED_WORKFLOWS):
+        self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[CacheKey, CompiledWorkflow]" = OrderedDict()
+
+    def get_compiled(
+        self,
+        workflow_path: str,
+        ops_dir: str = DEFAULT_OPS_DIR,
+        workflow_dir: str = get_workflow_dir(),
+        parameters_override: Optional[Dict[str, Any]] = None,
+    ) -> CompiledWorkflow:
+        """Returns the cached workflow entry, building the workflow if needed.
+
+        The returned entry is shared, so its workflow must not be modified. Use `build` to get
+        a copy that can be modified.
+        """
+        key = (
+            os.path.abspath(workflow_path),
+            os.path.abspath(ops_dir),
+            os.path.abspath(workflow_dir),
+            parameters_hash(parameters_override),
+        )
+        entry = self._entries.get(key)
+        if entry is not None and not entry.is_stale():
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry
+
+        self.misses += 1
+        # Get modification times before building, so changes made during the build are picked up
+        mtimes = file_mtimes(referenced_files(workflow_path, ops_dir, workflow_dir))
+        workflow = Workflow.build(workflow_path, ops_dir, workflow_dir, parameters_override)
+        entry = CompiledWorkflow(workflow, mtimes)
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        self.logger.debug(f"Built workflow {workflow_path} ({len(mtimes)} referenced files)")
+        return entry
+
+    def build(
+        self,
+        workflow_path: str,
+        ops_dir: str = DEFAULT_OPS_DIR,
+        workflow_dir: str = get_workflow_dir(),
+        parameters_override: Optional[Dict[str, Any]] = None,
+    ) -> Workflow:
+        """Cached counterpart of `Workflow.build`, returning a copy of the cached workflow."""
+        entry = self.get_compiled(workflow_path, ops_dir, workflow_dir, parameters_override)
+        return entry.workflow.copy()
+
+    def clear(self):
+        self._entries.clear()
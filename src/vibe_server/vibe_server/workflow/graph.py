@@ -5,7 +5,18 @@
 
 from collections import defaultdict
 from enum import IntEnum
-from typing import Callable, Dict, Generic, Iterable, Iterator, List, Set, Tuple, TypeVar
+from typing import (
+    Callable,
+    Dict,
+    Generic,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+)
 from warnings import warn
 
 T = TypeVar("T")
@@ -21,16 +32,41 @@ class VisitStatus(IntEnum):
 
 
 class Graph(Generic[T, V]):
+    """Directed graph with labeled edges.
+
+    Out-edges (`adjacency_list`) and in-edges (`in_adjacency_list`) are indexed by node and kept
+    in sync by `add_node`, `add_edge`, `relabel` and `remove_node`, which should be used for all
+    mutations. The edge list is cached until the next mutation.
+    """
+
     adjacency_list: Dict[T, Adjacency[T, V]]
+    in_adjacency_list: Dict[T, Adjacency[T, V]]
 
     def __init__(self):
         self.adjacency_list = {}
+        self.in_adjacency_list = {}
+        self._edges: Optional[List[Edge[T, V]]] = None
+
+    def _make_edge(self, origin: T, destination: T, label: V) -> Edge[T, V]:
+        return (origin, destination, label)
+
+    def _invalidate(self):
+        self._edges = None
 
     def add_node(self, node: T):
         if node in self.adjacency_list:
             warn(f"Trying to add already existing node {node} to graph. Ignoring.")
         else:
             self.adjacency_list[node] = set()
+            self.in_adjacency_list[node] = set()
+
+    def remove_node(self, node: T):
+        """Removes a node and all edges from and to it."""
+        for destination, label in self.adjacency_list.pop(node):
+            self.in_adjacency_list[destination].discard((node, label))
+        for origin, label in self.in_adjacency_list.pop(node):
+            self.adjacency_list[origin].discard((node, label))
+        self._invalidate()
 
     def add_edge(self, origin: T, destination: T, label: V):
         if origin not in self.adjacency_list:
@@ -42,11 +78,17 @@ class Graph(Generic[T, V]):
             )
             self.add_node(destination)
         self.adjacency_list[origin].add((destination, label))
+        self.in_adjacency_list[destination].add((origin, label))
+        self._invalidate()
 
     def relabel(self, edge: Edge[T, V], new_label: V):
         """Changes an existing edge's label to `new_label`."""
-        self.adjacency_list[edge[0]].remove((edge[1], edge[2]))
-        self.adjacency_list[edge[0]].add((edge[1], new_label))
+        origin, destination, label = edge
+        self.adjacency_list[origin].remove((destination, label))
+        self.adjacency_list[origin].add((destination, new_label))
+        self.in_adjacency_list[destination].remove((origin, label))
+        self.in_adjacency_list[destination].add((origin, new_label))
+        self._invalidate()
 
     @property
     def nodes(self) -> List[T]:
@@ -54,24 +96,25 @@ class Graph(Generic[T, V]):
 
     @property
     def edges(self) -> List[Edge[T, V]]:
-        return [
-            (origin, destination[0], destination[1])
-            for origin, destinations in self.adjacency_list.items()
-            for destination in destinations
-        ]
+        if self._edges is None:
+            self._edges = [
+                self._make_edge(origin, *destination)
+                for origin, destinations in self.adjacency_list.items()
+                for destination in destinations
+            ]
+        return list(self._edges)
 
     def neighbors(self, vertex: T) -> Set[T]:
         return set(e[0] for e in self.adjacency_list[vertex])
 
-    def edges_from(self, vertex: T) -> Iterable[Edge[T, V]]:
-        return [(vertex, *dst) for dst in self.adjacency_list[vertex]]
+    def edges_from(self, vertex: T) -> List[Edge[T, V]]:
+        return [self._make_edge(vertex, *dst) for dst in self.adjacency_list[vertex]]
+
+    def edges_to(self, vertex: T) -> List[Edge[T, V]]:
+        return [self._make_edge(src, vertex, lbl) for src, lbl in self.in_adjacency_list[vertex]]
 
     def zero_in_degree_nodes(self) -> Iterable[T]:
-        in_degrees: Dict[T, int] = {k: 0 for k in self.adjacency_list}
-        for destinations in self.adjacency_list.values():
-            for destination in destinations:
-                in_degrees[destination[0]] += 1
-        return [k for k, v in in_degrees.items() if v == 0]
+        return [k for k in self.adjacency_list if not self.in_adjacency_list[k]]
 
     def _dfs_impl(
         self,
@@ -27,7 +27,7 @@ def add_node(workflow: Workflow, node: GraphNodeType):
     workflow.add_node(node)
 
     def rollback():
-        del workflow.adjacency_list[node]
+        workflow.remove_node(node)
         del workflow.index[node.name]
 
     return rollback
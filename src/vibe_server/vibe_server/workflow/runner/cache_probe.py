@@ -0,0 +1,70 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import asyncio
+import json
+import logging
+from dataclasses import asdict
+from typing import List, Optional
+
+from vibe_common.constants import (
+    CACHE_INVOKE_URL_TEMPLATE,
+    CACHE_PROBE_METHOD,
+    MAX_PARALLEL_REQUESTS,
+)
+from vibe_common.schemas import CacheInfo, OperationDependencyResolver, OperationSpec
+from vibe_common.telemetry import get_current_trace_parent
+from vibe_common.vibe_dapr_client import VibeDaprClient
+from vibe_core.data.core_types import OpIOType
+from vibe_core.data.utils import deserialize_stac
+
+# Number of subtasks probed by each request, to keep responses under the maximum request size
+PROBE_BATCH_SIZE = 100
+
+
+def build_cache_info(op_spec: OperationSpec, input: OpIOType) -> CacheInfo:
+    """Builds the cache info the cache service computes for an execute request."""
+    dependencies = OperationDependencyResolver().resolve(op_spec)
+    sources = {k: deserialize_stac(v) for k, v in input.items()}
+    return CacheInfo(op_spec.name, op_spec.version, sources, dependencies)
+
+
+class CacheProbeClient:
+    """Looks up cached outputs of several subtasks of an op at once in the cache service."""
+
+    def __init__(self, batch_size: int = PROBE_BATCH_SIZE):
+        self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
+        self.vibe_dapr_client = VibeDaprClient()
+        self.batch_size = batch_size
+
+    async def _probe_batch(
+        self, run_id: str, cache_infos: List[CacheInfo]
+    ) -> List[Optional[OpIOType]]:
+        response = await self.vibe_dapr_client.post(
+            url=CACHE_INVOKE_URL_TEMPLATE.format(CACHE_PROBE_METHOD),
+            data={"run_id": run_id, "cache_info": [asdict(c) for c in cache_infos]},
+            traceparent=get_current_trace_parent(),
+        )
+        # Not decoded with `response_json`, which is meant for state store values
+        outputs: List[Optional[OpIOType]] = json.loads(await response.text())["outputs"]
+        if len(outputs) != len(cache_infos):
+            raise RuntimeError(
+                f"Expected {len(cache_infos)} outputs from cache probe, got {len(outputs)}"
+            )
+        return outputs
+
+    async def probe(
+        self, run_id: str, op_spec: OperationSpec, inputs: List[OpIOType]
+    ) -> List[Optional[OpIOType]]:
+        """Returns the cached output for each input of the op, or None if it is not cached."""
+        cache_infos = [build_cache_info(op_spec, i) for i in inputs]
+        semaphore = asyncio.Semaphore(MAX_PARALLEL_REQUESTS)
+
+        async def probe_batch(batch: List[CacheInfo]) -> List[Optional[OpIOType]]:
+            async with semaphore:
+                return await self._probe_batch(run_id, batch)
+
+        size = self.batch_size
+        batches = [cache_infos[i : i + size] for i in range(0, len(cache_infos), size)]
+        results = await asyncio.gather(*[probe_batch(b) for b in batches])
+        return [output for result in results for output in result]
@@ -18,12 +18,15 @@ from vibe_common.messaging import (
     WorkMessageBuilder,
     send_async,
 )
+from vibe_common.payloads import OpIOPayload, resolve_payload_async
 from vibe_common.telemetry import add_span_attributes, add_trace
 from vibe_core.data.core_types import OpIOType
 
 from ..workflow import GraphNodeType, Workflow
+from .cache_probe import CacheProbeClient
 from .runner import (
     CancelledOpError,
+    NoCacheProbe,
     NoOpStateChange,
     WorkflowCallback,
     WorkflowChange,
@@ -32,6 +35,8 @@ from .runner import (
 
 SLEEP_S = 0.2
 RAISE_STR = "raise"
+# Ops with fewer subtasks are looked up in the cache by the cache service, as they are executed
+MIN_SUBTASKS_TO_PROBE = 2
 T = TypeVar("T")
 
 
@@ -126,6 +131,25 @@ class RemoteWorkflowRunner(WorkflowRunner):
         self.message_router = message_router
         self.traceid = traceid
         self.id_queue_map: Dict[str, "asyncio.queues.Queue[WorkMessage]"] = {}
+        self.cache_probe = CacheProbeClient()
+
+    @property
+    def is_connected(self) -> bool:
+        return all(e is not None for e in (self.source, self.pubsubname, self.topic))
+
+    async def _probe_cache(
+        self, op: GraphNodeType, inputs: List[OpIOType], run_id: UUID
+    ) -> List[Optional[OpIOType]]:
+        if not self.is_connected or len(inputs) < MIN_SUBTASKS_TO_PROBE:
+            return await NoCacheProbe(op, inputs, run_id)
+        try:
+            return await self.cache_probe.probe(str(run_id), op.spec, inputs)
+        except Exception:
+            # Subtasks will still be looked up in the cache, one at a time
+            self.logger.warning(
+                f"Failed to probe cache for op {op.name}. (run id: {run_id})", exc_info=True
+            )
+            return await NoCacheProbe(op, inputs, run_id)
 
     def _handle_failure(self, request: ExecuteRequestMessage, reply: WorkMessage) -> NoReturn:
         content = cast(ErrorContent, reply.content)
@@ -147,7 +171,7 @@ class RemoteWorkflowRunner(WorkflowRunner):
             WorkflowChange.SUBTASK_RUNNING, task=op_name, subtask_idx=subtask_idx
         )
 
-    def _process_reply(self, request: WorkMessage, reply: WorkMessage) -> OpIOType:
+    def _process_reply(self, request: WorkMessage, reply: WorkMessage) -> OpIOPayload:
         assert (
             reply.header.type != MessageType.execute_request
         ), f"Received invalid message {reply.id}"
@@ -182,7 +206,7 @@ class RemoteWorkflowRunner(WorkflowRunner):
             f"Failed to run op {op_spec.name} (subtask {subtask_idx})"
             f"with execution request id {request.id}, run id {run_id}."
         )
-        if all([e is not None for e in (self.source, self.pubsubname, self.topic)]):
+        if self.is_connected:
             await send_async(request, self.source, self.pubsubname, self.topic)  # type: ignore
 
         while True:
@@ -201,9 +225,19 @@ class RemoteWorkflowRunner(WorkflowRunner):
                 continue
             elif reply.header.type in (MessageType.execute_reply, MessageType.error):
                 try:
-                    return self._process_reply(request, reply)
+                    output = self._process_reply(request, reply)
                 finally:
                     self.message_router.task_done(request.id)
+                output = await resolve_payload_async(output)
+                resources = cast(ExecuteReplyContent, reply.content).resources
+                if resources is not None:
+                    await self._report_state_change(
+                        WorkflowChange.SUBTASK_FINISHED,
+                        task=op.name,
+                        subtask_idx=subtask_idx,
+                        resources={op_spec.name: resources},
+                    )
+                return output
             else:
                 raise RuntimeError(f"Received unsupported message {reply}. Aborting execution.")
 
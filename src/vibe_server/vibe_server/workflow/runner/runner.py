@@ -7,7 +7,19 @@ import logging
 from abc import ABC, abstractmethod
 from collections import defaultdict
 from enum import auto
-from typing import Any, Awaitable, Callable, Dict, Iterable, List, Protocol, Set, Tuple, cast
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Protocol,
+    Set,
+    Tuple,
+    cast,
+)
 from uuid import UUID, uuid4
 
 from fastapi_utils.enums import StrEnum
@@ -16,7 +28,7 @@ from vibe_core.data.core_types import OpIOType
 from vibe_core.data.utils import is_vibe_list
 from vibe_core.utils import ensure_list
 
-from ..workflow import DESTINATION, LABEL, EdgeLabel, EdgeType, GraphNodeType, InputFanOut, Workflow
+from ..workflow import LABEL, EdgeLabel, EdgeType, GraphNodeType, InputFanOut, Workflow
 from .task_io_handler import TaskIOHandler, WorkflowIOHandler
 
 
@@ -33,6 +45,15 @@ async def NoOpStateChange(change: "WorkflowChange", **kwargs: Any) -> None:
     return None
 
 
+CacheProbe = Callable[[GraphNodeType, List[OpIOType], UUID], Awaitable[List[Optional[OpIOType]]]]
+
+
+async def NoCacheProbe(
+    op: GraphNodeType, inputs: List[OpIOType], run_id: UUID
+) -> List[Optional[OpIOType]]:
+    return [None for _ in inputs]
+
+
 class WorkflowChange(StrEnum):
     WORKFLOW_STARTED = cast("WorkflowChange", auto())
     WORKFLOW_FINISHED = cast("WorkflowChange", auto())
@@ -44,6 +65,7 @@ class WorkflowChange(StrEnum):
     SUBTASK_FINISHED = cast("WorkflowChange", auto())
     SUBTASK_FAILED = cast("WorkflowChange", auto())
     SUBTASK_PENDING = cast("WorkflowChange", auto())
+    SUBTASKS_CACHED = cast("WorkflowChange", auto())
 
 
 class OpParallelism:
@@ -55,12 +77,14 @@ class OpParallelism:
         op: GraphNodeType,
         run_task: Callable[[GraphNodeType, OpIOType, UUID, int], Awaitable[OpIOType]],
         update_state_callback: WorkflowCallback = NoOpStateChange,
+        probe_cache: CacheProbe = NoCacheProbe,
     ):
         self.op = op
         self.in_edges = in_edges
         self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
         self.run_task = run_task
         self.update_state = update_state_callback
+        self.probe_cache = probe_cache
 
     def is_parallel(self, edge: EdgeLabel) -> bool:
         return edge.type in self.parallel_edges
@@ -122,9 +146,22 @@ class OpParallelism:
             f"Will run op {self.op.name} with {len(inputs)} different input(s). "
             f"(run id: {run_id})"
         )
+        cached = await self.probe_cache(self.op, inputs, run_id)
+        cached_idxs = [idx for idx, output in enumerate(cached) if output is not None]
+        if cached_idxs:
+            self.logger.info(
+                f"Found cached outputs for {len(cached_idxs)}/{len(inputs)} input(s) of op "
+                f"{self.op.name}. (run id: {run_id})"
+            )
+            await self.update_state(
+                WorkflowChange.SUBTASKS_CACHED, task=self.op.name, subtask_idxs=cached_idxs
+            )
 
         async def sub_run(args: Tuple[int, OpIOType]) -> OpIOType:
             idx, input = args
+            output = cached[idx]
+            if output is not None:
+                return output
             try:
                 self.logger.debug(
                     f"Executing task {idx + 1}/{len(inputs)} of op {self.op.name}. "
@@ -191,6 +228,16 @@ class WorkflowRunner(ABC):
     ) -> OpIOType:
         raise NotImplementedError
 
+    async def _probe_cache(
+        self, op: GraphNodeType, inputs: List[OpIOType], run_id: UUID
+    ) -> List[Optional[OpIOType]]:
+        """Returns the cached output of each subtask of an op, or None for subtasks to be run.
+
+        Runners that can look up cached outputs of several subtasks at once override this, so that
+        only cache misses are run.
+        """
+        return await NoCacheProbe(op, inputs, run_id)
+
     async def _run_graph_impl(self, input: OpIOType, run_id: UUID) -> OpIOType:
         self.io_handler.add_sources(input)
         for ops in self.workflow:
@@ -208,10 +255,11 @@ class WorkflowRunner(ABC):
             tasks: List[Tuple[GraphNodeType, "asyncio.Task[List[OpIOType]]"]] = []
             for op in ops:
                 op_parallelism[op.name] = OpParallelism(
-                    [e[LABEL] for e in self.workflow.edges if e[DESTINATION] == op],
+                    [e[LABEL] for e in self.workflow.edges_to(op)],
                     op,
                     self._run_op_impl,
                     update_state_callback=self.update_state,
+                    probe_cache=self._probe_cache,
                 )
                 task = asyncio.create_task(
                     self._submit_op(op, run_id, op_parallelism[op.name]), name=op.name
@@ -5,7 +5,7 @@ import logging
 import os
 import re
 from collections import defaultdict
-from copy import deepcopy
+from copy import copy, deepcopy
 from enum import IntEnum
 from re import Pattern
 from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple, Type, TypeVar, cast
@@ -548,10 +548,10 @@ class Workflow(Graph[GraphNodeType, EdgeLabel]):
                     raise ValueError(f"'{node.name}.{port}' not in op output spec")
 
     def __getitem__(self, op_name: str) -> OperationSpec:
-        for op in self.nodes:
-            if op.name == op_name:
-                return op.spec
-        raise KeyError(f"op {op_name} does not exist")
+        try:
+            return self.index[op_name].spec
+        except KeyError:
+            raise KeyError(f"op {op_name} does not exist")
 
     @property
     def name(self):
@@ -579,15 +579,23 @@ class Workflow(Graph[GraphNodeType, EdgeLabel]):
     def sinks(self) -> Dict[GraphNodeType, List[str]]:
         return {k: v for k, v in self._sinks.items()}
 
+    def _make_edge(
+        self, origin: GraphNodeType, destination: GraphNodeType, label: EdgeLabel
+    ) -> WorkflowEdge:
+        return WorkflowEdge((origin, destination, label))
+
     @property
     def edges(self) -> List[WorkflowEdge]:
-        return [WorkflowEdge(e) for e in super().edges]
+        return cast(List[WorkflowEdge], super().edges)
 
     def edges_from(self, node: GraphNodeType) -> List[WorkflowEdge]:
-        return [WorkflowEdge(e) for e in super().edges_from(node)]
+        return cast(List[WorkflowEdge], super().edges_from(node))
+
+    def edges_to(self, node: GraphNodeType) -> List[WorkflowEdge]:
+        return cast(List[WorkflowEdge], super().edges_to(node))
 
     def edge_to(self, node: GraphNodeType, port_name: str):
-        edges = [e for e in self.edges if e[LABEL].dstport == port_name and e[DESTINATION] is node]
+        edges = [e for e in self.edges_to(node) if e[LABEL].dstport == port_name]
         port_str = f"'{node.name}.{port_name}'"
         if not edges:
             raise ValueError(f"{port_str} is not a destination of any port")
@@ -605,6 +613,24 @@ class Workflow(Graph[GraphNodeType, EdgeLabel]):
     def get_op_parameter(self, op_name: str) -> Optional[Dict[str, Any]]:
         return self.workflow_spec.tasks[op_name].parameters
 
+    def copy(self) -> "Workflow":
+        """Returns a copy of the workflow that can be patched without modifying this one.
+
+        The graph (including its edge indexes), the name index, the source/sink mappings and the
+        workflow spec are copied, while op specs, which are not modified after the workflow is
+        built, are shared between copies.
+        """
+        new = copy(self)
+        new.workflow_spec = deepcopy(self.workflow_spec)
+        new.adjacency_list = {k: set(v) for k, v in self.adjacency_list.items()}
+        new.in_adjacency_list = {k: set(v) for k, v in self.in_adjacency_list.items()}
+        new.index = dict(self.index)
+        new.source_mappings = {k: list(v) for k, v in self.source_mappings.items()}
+        new._sources = defaultdict(list, {k: list(v) for k, v in self._sources.items()})
+        new.sink_mappings = dict(self.sink_mappings)
+        new._sinks = defaultdict(list, {k: list(v) for k, v in self._sinks.items()})
+        return new
+
     @classmethod
     def build(
         cls,